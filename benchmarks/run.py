@@ -0,0 +1,331 @@
+"""AgentEvo 自身开销基准测试 / Benchmarks for AgentEvo's own overhead
+
+用桩 Agent 和本地桩评判服务测量框架本身的开销，结果输出为 JSON 便于跨版本对比。
+Measures the framework's own overhead with a stub Agent and a local stub judge server;
+results are written as JSON for tracking regressions across releases.
+
+用法 / Usage:
+    python benchmarks/run.py                       # 全部基准 / all benchmarks
+    python benchmarks/run.py --only generator,sse  # 指定基准 / selected benchmarks
+    python benchmarks/run.py --cases 500 --concurrency 1,10,50 -o bench.json
+
+基准项 / Benchmarks:
+    load       Generator.load_test_cases       YAML 加载 + pydantic 校验 / YAML loading + pydantic validation
+    generator  Generator.run_all               执行调度开销 / execution scheduling overhead
+    evaluator  Evaluator.evaluate_all          评判调度 + LLM 客户端开销 / judge scheduling + LLM client overhead
+    html       _generate_html_report           HTML 报告渲染 / HTML report rendering
+    sse        HttpAdapter SSE 解析 / SSE parsing
+
+指标 / Metrics:
+    cases_per_sec           吞吐 / throughput
+    overhead_ms_per_case    (实测耗时 - 理想耗时) / 用例数，理想耗时 = ceil(N / 并发) × 桩延迟
+                            (wall time - ideal time) / cases, ideal = ceil(N / concurrency) × stub latency
+    memory_bytes_per_case   tracemalloc 峰值 / 用例数（单独一轮测量）/ tracemalloc peak / cases (separate round)
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import stub_agent  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+from agent_evo.adapters.http import HttpAdapter  # noqa: E402
+from agent_evo.cli.commands.report import _generate_html_report  # noqa: E402
+from agent_evo.core.evaluator import Evaluator  # noqa: E402
+from agent_evo.core.generator import Generator, GeneratorResult  # noqa: E402
+from agent_evo.models import (  # noqa: E402
+    AgentConfig, CaseResult, CaseStatus, Config, EvalReport, FactorResult, LLMConfig, TestCase,
+)
+
+ALL_BENCHMARKS = ["load", "generator", "evaluator", "html", "sse"]
+
+
+# ── 数据准备 / Fixtures ──────────────────────────────────────
+
+def make_case_dict(i: int) -> dict[str, Any]:
+    return {
+        "id": f"bench_{i:05d}",
+        "name": f"benchmark case {i}",
+        "input": f"question number {i}",
+        "expected": {
+            "output": f"answer to: question number {i}",
+            "contains": ["answer"],
+            "not_contains": ["error"],
+        },
+        "tags": ["bench", f"group_{i % 10}"],
+    }
+
+
+def make_project(root: Path, n_cases: int, files: int = 10) -> Config:
+    """生成一个包含 n_cases 条用例的临时项目 / Create a temp project with n_cases cases"""
+    (root / "prompt.md").write_text("You are a benchmark agent.", encoding="utf-8")
+    gold = root / "tests" / "gold"
+    gold.mkdir(parents=True, exist_ok=True)
+    per_file = math.ceil(n_cases / files)
+    for f in range(files):
+        cases = [make_case_dict(i) for i in range(f * per_file, min((f + 1) * per_file, n_cases))]
+        if not cases:
+            break
+        (gold / f"suite_{f:02d}.yaml").write_text(
+            yaml.dump({"name": f"suite_{f}", "cases": cases}, allow_unicode=True), encoding="utf-8",
+        )
+    return Config(
+        agent=AgentConfig(type="callable", module="stub_agent", function="run", prompt_file="prompt.md"),
+        llm=LLMConfig(model="stub-judge", api_key="bench"),
+    )
+
+
+def make_report_data(n_cases: int) -> dict[str, Any]:
+    results = []
+    for i in range(n_cases):
+        case = make_case_dict(i)
+        passed = i % 4 != 0
+        results.append(CaseResult(
+            case_id=case["id"], case_name=case["name"],
+            status=CaseStatus.PASSED if passed else CaseStatus.FAILED,
+            input=case["input"], output=f"answer to: {case['input']}", expected=case["expected"],
+            factor_scores=[FactorResult(factor_id="content", score=0.9 if passed else 0.3, reason="stub")],
+            score=0.9 if passed else 0.3, passed=passed, tags=case["tags"],
+            fail_reason=None if passed else "stub failure", execution_time_ms=10,
+        ))
+    passed = sum(1 for r in results if r.passed)
+    report = EvalReport(
+        total=n_cases, passed=passed, failed=n_cases - passed,
+        pass_rate=passed / n_cases if n_cases else 0.0, results=results,
+    )
+    return json.loads(report.model_dump_json())
+
+
+# ── 测量 / Measurement ───────────────────────────────────────
+
+async def timed(fn: Callable[[], Awaitable[Any]]) -> float:
+    start = time.perf_counter()
+    await fn()
+    return time.perf_counter() - start
+
+
+async def memory_peak(fn: Callable[[], Awaitable[Any]]) -> int:
+    tracemalloc.start()
+    try:
+        await fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def throughput_entry(n: int, wall: float, ideal: float, **extra: Any) -> dict[str, Any]:
+    return {
+        **extra,
+        "cases": n,
+        "wall_s": round(wall, 4),
+        "ideal_s": round(ideal, 4),
+        "cases_per_sec": round(n / wall, 2) if wall else None,
+        "overhead_ms_per_case": round(max(wall - ideal, 0.0) / n * 1000, 4) if n else None,
+    }
+
+
+# ── 基准项 / Benchmarks ──────────────────────────────────────
+
+async def bench_load(args: argparse.Namespace, root: Path, config: Config) -> dict[str, Any]:
+    generator = Generator(config, root)
+
+    async def load():
+        generator.load_test_cases()
+
+    wall = min([await timed(load) for _ in range(args.repeat)])
+    peak = await memory_peak(load)
+    return {
+        **throughput_entry(args.cases, wall, 0.0),
+        "memory_bytes_per_case": peak // args.cases,
+    }
+
+
+async def bench_generator(
+    args: argparse.Namespace, root: Path, config: Config, cases: list[TestCase],
+) -> dict[str, Any]:
+    stub_agent.LATENCY_S = args.agent_latency_ms / 1000
+    generator = Generator(config, root)
+    runs = []
+    for c in args.concurrency:
+        wall = await timed(lambda: generator.run_all(cases, concurrency=c))
+        ideal = math.ceil(len(cases) / c) * stub_agent.LATENCY_S
+        runs.append(throughput_entry(len(cases), wall, ideal, concurrency=c))
+    peak = await memory_peak(lambda: generator.run_all(cases, concurrency=max(args.concurrency)))
+    return {"agent_latency_ms": args.agent_latency_ms, "runs": runs,
+            "memory_bytes_per_case": peak // len(cases)}
+
+
+async def bench_evaluator(args: argparse.Namespace, config: Config, cases: list[TestCase]) -> dict[str, Any]:
+    results = [
+        GeneratorResult(case=c, output=f"answer to: {c.input_query}", execution_time_ms=10)
+        for c in cases
+    ]
+    config = config.model_copy(deep=True)
+    if args.judge_provider == "fake":
+        # 进程内桩评判，不经过网络栈 / In-process stub judge, bypasses the network stack
+        config.llm.provider = "fake"
+        config.llm.options = {
+            "latency_ms": args.judge_latency_ms, "error_rate": args.judge_error_rate,
+            "seed": args.seed, "score": 0.9,
+        }
+        return await _evaluator_runs(args, config, results, args.judge_latency_ms / 1000)
+
+    async with StubServer(args.judge_latency_ms / 1000, args.judge_error_rate, args.seed) as server:
+        config.llm.base_url = f"{server.base_url}/v1"
+        summary = await _evaluator_runs(args, config, results, server.latency_s)
+        summary["judge_errors"] = server.errors
+        return summary
+
+
+async def _evaluator_runs(
+    args: argparse.Namespace, config: Config, results: list[GeneratorResult], latency_s: float,
+) -> dict[str, Any]:
+    runs = []
+    for c in args.concurrency:
+        evaluator = Evaluator(config)
+        wall = await timed(lambda: evaluator.evaluate_all(results, concurrency=c))
+        ideal = math.ceil(len(results) / c) * latency_s
+        runs.append(throughput_entry(
+            len(results), wall, ideal, concurrency=c,
+            judge_calls=sum(p.calls for p in evaluator.llm.usage.summary().by_phase.values()),
+        ))
+        await evaluator.llm.aclose()
+    peak = await memory_peak(
+        lambda: Evaluator(config).evaluate_all(results, concurrency=max(args.concurrency))
+    )
+    return {
+        "judge_provider": args.judge_provider,
+        "judge_latency_ms": args.judge_latency_ms,
+        "judge_error_rate": args.judge_error_rate,
+        "runs": runs,
+        "memory_bytes_per_case": peak // len(results),
+    }
+
+
+async def bench_html(args: argparse.Namespace) -> dict[str, Any]:
+    data = make_report_data(args.cases)
+
+    async def render():
+        _generate_html_report(data)
+
+    wall = min([await timed(render) for _ in range(args.repeat)])
+    peak = await memory_peak(render)
+    return {
+        **throughput_entry(args.cases, wall, 0.0),
+        "memory_bytes_per_case": peak // args.cases,
+    }
+
+
+async def bench_sse(args: argparse.Namespace) -> dict[str, Any]:
+    runs = []
+    async with StubServer(seed=args.seed) as server:
+        for events in args.sse_events:
+            adapter = HttpAdapter(
+                url=f"{server.base_url}/sse?events={events}&size={args.sse_event_size}",
+                stream=True,
+            )
+            wall = min([await timed(lambda: adapter.invoke("bench")) for _ in range(args.repeat)])
+            runs.append({
+                "events": events,
+                "event_size": args.sse_event_size,
+                "wall_s": round(wall, 4),
+                "events_per_sec": round(events / wall, 2) if wall else None,
+                "us_per_event": round(wall / events * 1_000_000, 3) if events else None,
+            })
+    return {"runs": runs}
+
+
+# ── 入口 / Entry point ───────────────────────────────────────
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    def int_list(value: str) -> list[int]:
+        return [int(v) for v in value.split(",") if v]
+
+    parser = argparse.ArgumentParser(description="AgentEvo benchmarks")
+    parser.add_argument("--only", default=",".join(ALL_BENCHMARKS),
+                        help=f"逗号分隔的基准项 / Comma-separated benchmarks: {','.join(ALL_BENCHMARKS)}")
+    parser.add_argument("--cases", type=int, default=200, help="用例数 / Number of cases")
+    parser.add_argument("--concurrency", type=int_list, default=[1, 5, 20, 50],
+                        help="并发度列表 / Concurrency levels")
+    parser.add_argument("--agent-latency-ms", type=float, default=10.0, help="桩 Agent 延迟 / Stub agent latency")
+    parser.add_argument("--judge-latency-ms", type=float, default=20.0, help="桩评判延迟 / Stub judge latency")
+    parser.add_argument("--judge-error-rate", type=float, default=0.0, help="桩评判错误率 / Stub judge error rate")
+    parser.add_argument("--judge-provider", choices=["stub", "fake"], default="stub",
+                        help="stub: 本地 HTTP 桩服务；fake: 进程内 fake 提供商 / stub: local HTTP stub server; fake: in-process fake provider")
+    parser.add_argument("--sse-events", type=int_list, default=[100, 1000, 10000],
+                        help="SSE 事件数列表 / SSE event counts")
+    parser.add_argument("--sse-event-size", type=int, default=16, help="SSE 单事件字节数 / Bytes per SSE event")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数（取最小值）/ Repetitions (min is kept)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子 / Random seed")
+    parser.add_argument("-o", "--output", default=None, help="JSON 输出路径 / JSON output path")
+    return parser.parse_args(argv)
+
+
+async def main(argv: list[str]) -> dict[str, Any]:
+    args = parse_args(argv)
+    selected = [b.strip() for b in args.only.split(",") if b.strip()]
+    unknown = set(selected) - set(ALL_BENCHMARKS)
+    if unknown:
+        raise SystemExit(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="agent-evo-bench-") as tmp:
+        root = Path(tmp)
+        config = make_project(root, args.cases)
+        cases = Generator(config, root).load_test_cases()
+
+        for name in selected:
+            print(f"running {name} ...", file=sys.stderr)
+            if name == "load":
+                results[name] = await bench_load(args, root, config)
+            elif name == "generator":
+                results[name] = await bench_generator(args, root, config, cases)
+            elif name == "evaluator":
+                results[name] = await bench_evaluator(args, config, cases)
+            elif name == "html":
+                results[name] = await bench_html(args)
+            elif name == "sse":
+                results[name] = await bench_sse(args)
+
+    try:
+        agent_evo_version = version("agent-evo")
+    except PackageNotFoundError:
+        agent_evo_version = None
+
+    output = {
+        "meta": {
+            "agent_evo_version": agent_evo_version,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "params": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "results": results,
+    }
+
+    text = json.dumps(output, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
+        print(f"written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+    return output
+
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1:]))
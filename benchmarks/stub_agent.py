@@ -0,0 +1,15 @@
+"""基准测试用的桩 Agent / Stub Agent for benchmarks
+
+固定延迟、确定性输出，用于把 Agent 自身耗时从框架开销中剥离。
+Fixed latency and deterministic output, so the Agent's own time can be separated from framework overhead.
+"""
+
+import asyncio
+
+# 由 run.py 在每轮基准前设置 / Set by run.py before each benchmark round
+LATENCY_S = 0.01
+
+
+async def run(query: str, context: dict = None) -> str:
+    await asyncio.sleep(LATENCY_S)
+    return f"answer to: {query}"
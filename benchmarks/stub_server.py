@@ -0,0 +1,177 @@
+"""基准测试用的本地桩服务 / Local stub server for benchmarks
+
+- POST /v1/chat/completions：OpenAI 兼容的评判模型，返回确定性的评分 JSON
+  OpenAI-compatible judge returning deterministic score JSON
+- GET|POST /sse?events=N&size=M：SSE 流式 Agent，输出 N 个 text 事件后发送 done
+  SSE streaming Agent emitting N text events followed by done
+
+延迟和错误率可配置；错误由固定种子的随机数决定，保证多次运行结果一致。
+Latency and error rate are configurable; errors come from a seeded RNG so runs are reproducible.
+只依赖标准库 asyncio；在独立线程的事件循环中运行，桩服务的开销不计入被测代码的事件循环。
+Depends only on stdlib asyncio; runs on its own event loop in a separate thread, so the stub's
+work does not load the event loop of the code under test.
+"""
+
+import asyncio
+import json
+import random
+import threading
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+JUDGE_RESPONSE = json.dumps({
+    "content": {"applicable": True, "score": 0.9, "reason": "stub judge"},
+    "behavior": {"applicable": False},
+    "structure": {"applicable": False},
+})
+
+
+class StubServer:
+    """桩服务 / Stub server"""
+
+    def __init__(self, latency_s: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.port = 0
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self) -> None:
+        """在后台线程中启动服务，监听就绪后返回 / Start serving in a background thread, return once listening"""
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), name="stub-server", daemon=True)
+        self._thread.start()
+        await asyncio.to_thread(ready.wait)
+        if self._server is None:
+            await asyncio.to_thread(self._thread.join)
+            raise RuntimeError("stub server failed to start")
+
+    async def stop(self) -> None:
+        if self._loop is None:
+            return
+        if self._server is not None:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop))
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        await asyncio.to_thread(self._thread.join)
+        self._loop = self._thread = self._server = None
+
+    def _serve(self, ready: threading.Event) -> None:
+        """服务线程：运行桩服务自己的事件循环 / Server thread: runs the stub's own event loop"""
+        loop = self._loop
+        asyncio.set_event_loop(loop)
+        try:
+            self._server = loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+            self.port = self._server.sockets[0].getsockname()[1]
+        finally:
+            ready.set()
+        if self._server is None:
+            loop.close()
+            return
+        try:
+            loop.run_forever()
+        finally:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+    async def _shutdown(self) -> None:
+        # 先关闭 keep-alive 空闲连接 / Close idle keep-alive connections first
+        for writer in list(self._writers):
+            writer.close()
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> "StubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理一个连接上的多个请求（keep-alive）/ Serve multiple requests on one connection (keep-alive)"""
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin-1").split("\r\n")
+                method, target, _ = lines[0].split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length", 0))
+                if length:
+                    await reader.readexactly(length)
+
+                self.requests += 1
+                url = urlsplit(target)
+                if url.path == "/sse":
+                    await self._serve_sse(writer, parse_qs(url.query))
+                    return
+                await self._serve_judge(writer)
+        except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _serve_judge(self, writer: asyncio.StreamWriter) -> None:
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors += 1
+            body = json.dumps({"error": {"message": "stub error", "type": "server_error"}}).encode()
+            status = "500 Internal Server Error"
+        else:
+            body = json.dumps({
+                "id": "stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "stub-judge",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": JUDGE_RESPONSE},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 500, "completion_tokens": 50, "total_tokens": 550},
+            }).encode()
+            status = "200 OK"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+
+    async def _serve_sse(self, writer: asyncio.StreamWriter, query: dict[str, list[str]]) -> None:
+        events = int(query.get("events", ["100"])[0])
+        size = int(query.get("size", ["16"])[0])
+        text = "x" * size
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nConnection: close\r\n\r\n")
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+
+        line = f'data: {json.dumps({"event": "text", "content": text})}\n\n'.encode()
+        # 每批写入若干事件，模拟网络分片 / Write events in batches to mimic network chunking
+        batch = 32
+        for i in range(0, events, batch):
+            writer.write(line * min(batch, events - i))
+            await writer.drain()
+        writer.write(f'data: {json.dumps({"event": "done"})}\n\n'.encode())
+        await writer.drain()
@@ -1,7 +1,13 @@
 """适配器模块 / Adapter modules"""
 
-from agent_evo.adapters.base import AgentAdapter
+from agent_evo.adapters.base import AgentAdapter, AgentResponse
 from agent_evo.adapters.callable import CallableAdapter
 from agent_evo.adapters.http import HttpAdapter
+from agent_evo.adapters.stream_guard import (
+    StreamGuard, StreamPredicate, ForbiddenKeywordPredicate, ForbiddenToolPredicate,
+)
 
-__all__ = ["AgentAdapter", "CallableAdapter", "HttpAdapter"]
+__all__ = [
+    "AgentAdapter", "AgentResponse", "CallableAdapter", "HttpAdapter",
+    "StreamGuard", "StreamPredicate", "ForbiddenKeywordPredicate", "ForbiddenToolPredicate",
+]
@@ -1,12 +1,41 @@
 """适配器基类 / Adapter base class"""
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:
+    from agent_evo.adapters.stream_guard import StreamGuard
+
+
+class AgentResponse:
+    """Agent 单次调用结果（含计时信息）/ Single Agent invocation result (with timing info)"""
+
+    def __init__(
+        self,
+        output: str,
+        ttfb_ms: Optional[int] = None,
+        aborted: Optional[str] = None,
+        latency_ms: Optional[int] = None,
+    ):
+        self.output = output
+        # 首字节耗时，仅流式适配器可测得 / Time to first byte, only measurable by streaming adapters
+        self.ttfb_ms = ttfb_ms
+        # 流式调用被提前终止的原因，output 为已收到的部分 / Reason a stream was stopped early; output is the partial text
+        self.aborted = aborted
+        # 批量调用中单条的耗时，适配器能逐条计时才设置 / Per-item latency in a batch call, set when the adapter can time each item
+        self.latency_ms = latency_ms
 
 
 class AgentAdapter(ABC):
     """Agent 适配器基类 / Agent adapter base class"""
 
+    # 批量调用能力，支持的适配器覆盖这三个属性 / Batch capability, overridden by adapters that support it
+    supports_batch: bool = False
+    max_batch_size: int = 1
+    batch_window_ms: int = 0
+
     @abstractmethod
     async def invoke(self, input: str, context: Optional[dict[str, Any]] = None) -> str:
         """
@@ -21,6 +50,50 @@ class AgentAdapter(ABC):
         """
         pass
 
+    async def invoke_detailed(
+        self,
+        input: str,
+        context: Optional[dict[str, Any]] = None,
+        guard: Optional["StreamGuard"] = None,
+    ) -> AgentResponse:
+        """
+        调用 Agent 并返回附带计时信息的结果 / Invoke the Agent and return result with timing info
+
+        默认实现直接包装 invoke()，支持测量首字节耗时的适配器可覆盖此方法。
+        流式适配器可使用 guard 在输出过程中提前终止；非流式适配器忽略它。
+        Default implementation wraps invoke(); adapters that can measure TTFB may override.
+        Streaming adapters may use guard to stop early while output streams; others ignore it.
+        """
+        return AgentResponse(output=await self.invoke(input, context))
+
+    async def invoke_batch(
+        self,
+        inputs: list[str],
+        contexts: list[Optional[dict[str, Any]]],
+    ) -> list[Union[AgentResponse, Exception]]:
+        """
+        批量调用 Agent / Invoke the Agent with a batch of inputs
+
+        返回与 inputs 等长、顺序一致的列表；单条失败时对应位置为异常对象。能逐条计时的实现应设置
+        AgentResponse.latency_ms，否则各条的耗时按整批计。默认实现逐条并发调用 invoke_detailed() 并逐条计时，
+        supports_batch 为 True 的适配器应覆盖为真正的批量请求。
+        Returns a list aligned with inputs; a per-item failure is an exception instance at its position.
+        Implementations that can time each item should set AgentResponse.latency_ms; otherwise every
+        item is timed as the whole batch. The default calls invoke_detailed() per item concurrently
+        and times each; adapters with supports_batch=True should override it with a real batch request.
+        """
+        async def timed(input: str, context: Optional[dict[str, Any]]) -> AgentResponse:
+            start = time.perf_counter()
+            response = await self.invoke_detailed(input, context)
+            response.latency_ms = int((time.perf_counter() - start) * 1000)
+            return response
+
+        results = await asyncio.gather(
+            *[timed(i, c) for i, c in zip(inputs, contexts)],
+            return_exceptions=True,
+        )
+        return list(results)
+
     @abstractmethod
     def get_prompt_file(self) -> Optional[str]:
         """
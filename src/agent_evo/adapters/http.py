@@ -4,15 +4,20 @@
 Call remote Agent service via HTTP API, supports both JSON and SSE streaming responses.
 """
 
+import asyncio
 import json
 import os
 import re
+import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional, Union
 
 import httpx
 
-from agent_evo.adapters.base import AgentAdapter
+from agent_evo.adapters.base import AgentAdapter, AgentResponse
+from agent_evo.adapters.sse import SSEDecoder, SSEEvent
+from agent_evo.adapters.stream_guard import StreamGuard
+from agent_evo.utils.i18n import t
 
 
 def _resolve_env_vars(value: str) -> str:
@@ -23,17 +28,6 @@ def _resolve_env_vars(value: str) -> str:
     return re.sub(r"\$\{(\w+)\}", _replace, value)
 
 
-def _resolve_deep(obj: Any) -> Any:
-    """递归解析对象中所有字符串的环境变量 / Recursively resolve env vars in all strings"""
-    if isinstance(obj, str):
-        return _resolve_env_vars(obj)
-    if isinstance(obj, dict):
-        return {k: _resolve_deep(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_resolve_deep(item) for item in obj]
-    return obj
-
-
 def _get_by_path(data: Any, path: str) -> Any:
     """通过点分路径从嵌套字典中提取值 / Extract value from nested dict by dot-separated path
 
@@ -51,31 +45,117 @@ def _get_by_path(data: Any, path: str) -> Any:
     return current
 
 
-def _build_request_body(template: dict[str, Any], input_text: str, context: Optional[dict[str, Any]]) -> dict:
-    """根据模板构建请求体，替换 ${input} 和 ${context.*} 占位符
-    Build request body from template, replacing ${input} and ${context.*} placeholders
+# 模板占位符：${input} 或 ${context.key} / Template placeholders: ${input} or ${context.key}
+_PLACEHOLDER = re.compile(r"\$\{(input|context\.[^}]+)\}")
+
+# 请求体构建函数：(input, context) -> body / Body builder: (input, context) -> body
+BodyBuilder = Callable[[str, Optional[dict[str, Any]]], Any]
+
+
+def _compile_string(value: str) -> Optional[BodyBuilder]:
+    """将含占位符的字符串编译为构建函数；不含占位符时返回 None
+    Compile a string with placeholders into a builder; return None if it has none
+
+    静态部分的 ${ENV_VAR} 在编译时解析；输入和上下文的值只填入一次，不会被再次替换。
+    ${ENV_VAR} in static parts is resolved at compile time; input and context values are filled
+    in exactly once and never substituted again.
     """
-    def _substitute(obj: Any) -> Any:
+    if not _PLACEHOLDER.search(value):
+        return None
+
+    # 完整字符串占位符保留原始类型 / Whole-string placeholders keep the value's original type
+    if value == "${input}":
+        return lambda input_text, context: input_text
+    whole = _PLACEHOLDER.fullmatch(value)
+    if whole:
+        key = whole.group(1)[8:]
+        return lambda input_text, context: (context or {}).get(key, value)
+
+    # 内联替换：拆成静态片段与占位槽 / Inline: split into static segments and placeholder slots
+    statics: list[str] = []
+    slots: list[tuple[Optional[str], str]] = []  # (context key 或 None 表示 input, 原始占位符)
+    pos = 0
+    for match in _PLACEHOLDER.finditer(value):
+        statics.append(_resolve_env_vars(value[pos:match.start()]))
+        name = match.group(1)
+        slots.append((None if name == "input" else name[8:], match.group(0)))
+        pos = match.end()
+    tail = _resolve_env_vars(value[pos:])
+
+    def build(input_text: str, context: Optional[dict[str, Any]]) -> str:
+        parts: list[str] = []
+        for static, (key, raw) in zip(statics, slots):
+            parts.append(static)
+            if key is None:
+                parts.append(input_text)
+            elif context and key in context:
+                parts.append(str(context[key]))
+            else:
+                parts.append(raw)
+        parts.append(tail)
+        return "".join(parts)
+
+    return build
+
+
+def _compile_template(template: Any) -> BodyBuilder:
+    """将请求体模板编译为构建函数，不含占位符的子树在编译时一次性解析并复用
+    Compile the body template into a builder; subtrees without placeholders are resolved once and reused
+
+    静态子树在多次调用间共享，构建结果应视为只读。
+    Static subtrees are shared between calls, so built bodies must be treated as read-only.
+    """
+    def compile_node(obj: Any) -> tuple[bool, Any]:
+        """返回 (是否动态, 常量值或构建函数) / Return (is_dynamic, constant or builder)"""
+        if isinstance(obj, str):
+            builder = _compile_string(obj)
+            return (True, builder) if builder else (False, _resolve_env_vars(obj))
+        if isinstance(obj, dict):
+            items = [(k, *compile_node(v)) for k, v in obj.items()]
+            if not any(dynamic for _, dynamic, _ in items):
+                return False, {k: v for k, _, v in items}
+            return True, lambda i, c: {k: (v(i, c) if dynamic else v) for k, dynamic, v in items}
+        if isinstance(obj, list):
+            items = [compile_node(v) for v in obj]
+            if not any(dynamic for dynamic, _ in items):
+                return False, [v for _, v in items]
+            return True, lambda i, c: [v(i, c) if dynamic else v for dynamic, v in items]
+        return False, obj
+
+    dynamic, node = compile_node(template)
+    if dynamic:
+        return node
+    return lambda input_text, context: node
+
+
+def _compile_batch_template(template: Any) -> Callable[[list[Any]], Any]:
+    """编译批量请求体模板，"${items}" 替换为逐条请求体列表
+    Compile the batch body template; "${items}" is replaced by the per-item body list"""
+    def compile_node(obj: Any) -> Callable[[list[Any]], Any]:
+        if obj == "${items}":
+            return lambda items: items
         if isinstance(obj, str):
-            # 完整字符串替换 / Whole string replacement
-            if obj == "${input}":
-                return input_text
-            if obj.startswith("${context.") and obj.endswith("}"):
-                key = obj[10:-1]  # 去掉 ${context. 和 }
-                return (context or {}).get(key, obj)
-            # 内联替换 / Inline replacement
-            result = obj.replace("${input}", input_text)
-            if context:
-                for k, v in context.items():
-                    result = result.replace(f"${{context.{k}}}", str(v))
-            return _resolve_env_vars(result)
+            value = _resolve_env_vars(obj)
+            return lambda items: value
         if isinstance(obj, dict):
-            return {k: _substitute(v) for k, v in obj.items()}
+            children = {k: compile_node(v) for k, v in obj.items()}
+            return lambda items: {k: build(items) for k, build in children.items()}
         if isinstance(obj, list):
-            return [_substitute(item) for item in obj]
-        return obj
+            children_list = [compile_node(v) for v in obj]
+            return lambda items: [build(items) for build in children_list]
+        return lambda items: obj
+
+    return compile_node(template)
 
-    return _substitute(template)
+
+def _build_request_body(template: dict[str, Any], input_text: str, context: Optional[dict[str, Any]]) -> dict:
+    """根据模板构建请求体，替换 ${input} 和 ${context.*} 占位符
+    Build request body from template, replacing ${input} and ${context.*} placeholders
+
+    每次调用都重新编译；适配器内部使用预编译的版本。
+    Compiles on every call; the adapter uses a precompiled builder instead.
+    """
+    return _compile_template(template)(input_text, context)
 
 
 class HttpAdapter(AgentAdapter):
@@ -105,6 +185,14 @@ class HttpAdapter(AgentAdapter):
         stream_text_events: Optional[list[str]] = None,
         timeout: float = 120.0,
         prompt_file: Optional[str] = None,
+        max_output_chars: Optional[int] = None,
+        max_stream_seconds: Optional[float] = None,
+        batch_body_template: Optional[dict[str, Any]] = None,
+        batch_url: Optional[str] = None,
+        batch_response_path: str = "results",
+        batch_item_response_path: Optional[str] = None,
+        max_batch_size: int = 32,
+        batch_window_ms: int = 20,
     ):
         """
         Args:
@@ -120,11 +208,25 @@ class HttpAdapter(AgentAdapter):
             stream_text_events: SSE 中视为文本输出的事件类型 / Event types treated as text output
             timeout: 请求超时（秒）/ Request timeout in seconds
             prompt_file: 本地提示词文件路径（可选）/ Local prompt file path (optional)
+            max_output_chars: 流式输出长度上限，超出即中止 / Max streamed output length, aborts when exceeded
+            max_stream_seconds: 流式输出时长上限，超出即中止 / Max stream duration, aborts when exceeded
+            batch_body_template: 批量请求体模板，设置后启用批量调用（"${items}" 为逐条请求体列表）
+                                 Batch body template, enables batching when set ("${items}" is the per-item body list)
+            batch_url: 批量接口地址，默认同 url / Batch endpoint, defaults to url
+            batch_response_path: 批量响应中结果列表的 JSON 路径 / JSON path of the result list in batch response
+            batch_item_response_path: 单条结果中输出文本的 JSON 路径 / JSON path of the output within each result
+            max_batch_size: 单批最大条数 / Max items per batch
+            batch_window_ms: 凑批最长等待时间（毫秒）/ Max time to wait for a batch to fill (ms)
         """
         self._url = url
         self._method = method.upper()
         self._headers = headers or {}
         self._body_template = body_template or {"input": "${input}"}
+        # 构造时一次性解析 URL / 请求头中的环境变量并编译请求体模板
+        # Resolve env vars in URL / headers and compile the body template once at construction
+        self._resolved_url = _resolve_env_vars(url)
+        self._resolved_headers = {k: _resolve_env_vars(v) for k, v in self._headers.items()}
+        self._build_body = _compile_template(self._body_template)
         self._response_path = response_path
         self._stream = stream
         self._stream_event_field = stream_event_field
@@ -132,18 +234,78 @@ class HttpAdapter(AgentAdapter):
         self._stream_done_event = stream_done_event
         self._stream_text_events = stream_text_events or ["text"]
         self._timeout = timeout
+        self._max_output_chars = max_output_chars
+        self._max_stream_seconds = max_stream_seconds
         self._prompt_file = prompt_file
 
+        # 批量调用：流式接口不支持 / Batch invocation: not supported for streaming endpoints
+        self.supports_batch = batch_body_template is not None and not stream
+        self.max_batch_size = max_batch_size
+        self.batch_window_ms = batch_window_ms
+        self._batch_url = _resolve_env_vars(batch_url) if batch_url else self._resolved_url
+        self._build_batch_body = _compile_batch_template(batch_body_template or {"items": "${items}"})
+        self._batch_response_path = batch_response_path
+        self._batch_item_response_path = batch_item_response_path
+
     async def invoke(self, input: str, context: Optional[dict[str, Any]] = None) -> str:
         """调用远程 Agent / Call remote Agent"""
-        url = _resolve_env_vars(self._url)
-        headers = {k: _resolve_env_vars(v) for k, v in self._headers.items()}
-        body = _build_request_body(self._body_template, input, context)
+        return (await self.invoke_detailed(input, context)).output
+
+    async def invoke_detailed(
+        self,
+        input: str,
+        context: Optional[dict[str, Any]] = None,
+        guard: Optional[StreamGuard] = None,
+    ) -> AgentResponse:
+        """调用远程 Agent，流式模式下记录首字节耗时并支持提前终止
+        Call remote Agent, recording time to first byte and supporting early stop in streaming mode"""
+        url = self._resolved_url
+        headers = self._resolved_headers
+        body = self._build_body(input, context)
 
         if self._stream:
-            return await self._invoke_stream(url, headers, body)
+            return await self._invoke_stream(url, headers, body, guard)
         else:
-            return await self._invoke_json(url, headers, body)
+            return AgentResponse(output=await self._invoke_json(url, headers, body))
+
+    async def invoke_batch(
+        self,
+        inputs: list[str],
+        contexts: list[Optional[dict[str, Any]]],
+    ) -> list[Union[AgentResponse, Exception]]:
+        """一次请求调用一批输入 / Invoke a batch of inputs in one request"""
+        if not self.supports_batch:
+            return await super().invoke_batch(inputs, contexts)
+
+        items = [self._build_body(i, c) for i, c in zip(inputs, contexts)]
+        async with httpx.AsyncClient(timeout=self._timeout) as client:
+            response = await client.request(
+                method=self._method,
+                url=self._batch_url,
+                headers=self._resolved_headers,
+                json=self._build_batch_body(items),
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        results = _get_by_path(data, self._batch_response_path)
+        if not isinstance(results, list) or len(results) != len(inputs):
+            raise RuntimeError(
+                f"批量响应条数不匹配 / Batch response size mismatch: "
+                f"expected {len(inputs)}, got {len(results) if isinstance(results, list) else type(results).__name__}"
+            )
+
+        responses: list[Union[AgentResponse, Exception]] = []
+        for item in results:
+            try:
+                output = _get_by_path(item, self._batch_item_response_path) if self._batch_item_response_path else item
+            except KeyError:
+                # 单条失败：保留服务端返回的错误信息 / Per-item failure: keep the error returned by the service
+                error = item.get("error", item) if isinstance(item, dict) else item
+                responses.append(RuntimeError(f"Agent returned error: {error}"))
+                continue
+            responses.append(AgentResponse(output=str(output) if output is not None else ""))
+        return responses
 
     async def _invoke_json(self, url: str, headers: dict, body: dict) -> str:
         """非流式 JSON 请求 / Non-streaming JSON request"""
@@ -164,71 +326,141 @@ class HttpAdapter(AgentAdapter):
 
         return str(result) if result is not None else ""
 
-    async def _invoke_stream(self, url: str, headers: dict, body: dict) -> str:
+    async def _invoke_stream(
+        self, url: str, headers: dict, body: dict, guard: Optional[StreamGuard] = None,
+    ) -> AgentResponse:
         """SSE 流式请求 / SSE streaming request"""
         chunks: list[str] = []
-        done_content: Optional[str] = None
-
-        async with httpx.AsyncClient(timeout=self._timeout) as client:
-            async with client.stream(
-                method=self._method,
-                url=url,
-                headers=headers,
-                json=body,
-            ) as response:
-                response.raise_for_status()
-
-                buffer = ""
-                async for raw_chunk in response.aiter_text():
-                    buffer += raw_chunk
-
-                    # 解析 SSE 行 / Parse SSE lines
-                    while "\n" in buffer:
-                        line, buffer = buffer.split("\n", 1)
-                        line = line.strip()
-
-                        if not line:
-                            continue
-
-                        # 处理标准 SSE "data: {...}" 格式
-                        # Handle standard SSE "data: {...}" format
-                        if line.startswith("data:"):
-                            payload = line[5:].strip()
-                        else:
-                            payload = line
-
-                        if not payload or payload == "[DONE]":
-                            continue
-
-                        try:
-                            event_data = json.loads(payload)
-                        except json.JSONDecodeError:
-                            continue
-
-                        event_type = event_data.get(self._stream_event_field, "")
-
-                        if event_type == self._stream_done_event:
-                            # done 事件：如果有 content 字段且 cover=true，则用 done 的内容
-                            dc = event_data.get(self._stream_content_field)
-                            cover = event_data.get("cover", False)
-                            if dc is not None and cover:
-                                done_content = str(dc)
-                            elif dc is not None:
-                                done_content = str(dc)
-                            break
-                        elif event_type == "error":
-                            msg = event_data.get("message", "Unknown error")
-                            code = event_data.get("code", 500)
-                            raise RuntimeError(f"Agent returned error (code={code}): {msg}")
-                        elif event_type in self._stream_text_events:
-                            content = event_data.get(self._stream_content_field, "")
-                            if content:
-                                chunks.append(str(content))
+        state: dict[str, Any] = {"ttfb_ms": None, "output_chars": 0}
+        start_time = time.perf_counter()
+
+        async def read() -> AgentResponse:
+            decoder = SSEDecoder()
+            async with httpx.AsyncClient(timeout=self._timeout) as client:
+                async with client.stream(
+                    method=self._method,
+                    url=url,
+                    headers=headers,
+                    json=body,
+                ) as response:
+                    response.raise_for_status()
+
+                    async for raw_chunk in response.aiter_bytes():
+                        if state["ttfb_ms"] is None:
+                            state["ttfb_ms"] = int((time.perf_counter() - start_time) * 1000)
+                        for event in decoder.feed(raw_chunk):
+                            result = self._consume_event(event, chunks, state, guard)
+                            if result is not None:
+                                return result
+
+                    for event in decoder.flush():
+                        result = self._consume_event(event, chunks, state, guard)
+                        if result is not None:
+                            return result
+
+            return self._stream_result(chunks, None, state["ttfb_ms"])
+
+        if self._max_stream_seconds is None:
+            return await read()
+        try:
+            return await asyncio.wait_for(read(), timeout=self._max_stream_seconds)
+        except asyncio.TimeoutError:
+            # 超时即中止，保留已收到的部分 / Abort on timeout, keeping what was received
+            return AgentResponse(
+                output="".join(chunks), ttfb_ms=state["ttfb_ms"],
+                aborted=t("stream_max_duration").format(seconds=self._max_stream_seconds),
+            )
 
+    def _consume_event(
+        self,
+        event: SSEEvent,
+        chunks: list[str],
+        state: dict[str, Any],
+        guard: Optional[StreamGuard],
+    ) -> Optional[AgentResponse]:
+        """处理一个事件，流结束或需中止时返回结果 / Handle one event, return a result when the stream ends or aborts"""
+        before = len(chunks)
+        done, done_content = self._handle_event(event, chunks)
+        if done:
+            return self._stream_result(chunks, done_content, state["ttfb_ms"])
+
+        for text in chunks[before:]:
+            state["output_chars"] += len(text)
+            reason = guard.feed(text) if guard else None
+            if reason is None and self._max_output_chars and state["output_chars"] > self._max_output_chars:
+                reason = t("stream_max_output").format(chars=self._max_output_chars)
+            if reason:
+                # 返回即退出 async with，连接随之关闭 / Returning exits the async with, closing the connection
+                return AgentResponse(output="".join(chunks), ttfb_ms=state["ttfb_ms"], aborted=reason)
+        return None
+
+    @staticmethod
+    def _stream_result(chunks: list[str], done_content: Optional[str], ttfb_ms: Optional[int]) -> AgentResponse:
         # 优先使用 done 事件的完整内容 / Prefer done event's full content
         if done_content is not None:
-            return done_content
-        return "".join(chunks)
+            return AgentResponse(output=done_content, ttfb_ms=ttfb_ms)
+        return AgentResponse(output="".join(chunks), ttfb_ms=ttfb_ms)
+
+    def _handle_event(self, event: SSEEvent, chunks: list[str]) -> tuple[bool, Optional[str]]:
+        """处理一个 SSE 事件，返回 (是否结束, done 事件内容)
+        Handle one SSE event, return (finished, done event content)"""
+        payload = event.data.strip()
+        if not payload:
+            return False, None
+        if payload == "[DONE]":
+            return True, None
+
+        for event_data in self._parse_payload(payload):
+            if not isinstance(event_data, dict):
+                # 非 JSON 数据：按 SSE event 字段处理纯文本 / Non-JSON data: treat as plain text by SSE event field
+                if event.event in self._stream_text_events:
+                    chunks.append(event_data)
+                elif event.event == self._stream_done_event:
+                    return True, event_data or None
+                continue
+
+            # 事件类型优先取 JSON 字段，其次取 SSE 的 event 字段
+            # Event type from the JSON field first, then the SSE event field
+            event_type = event_data.get(self._stream_event_field) or (
+                event.event if event.event != "message" else ""
+            )
+
+            if event_type == self._stream_done_event:
+                # done 事件：如果有 content 字段，则用 done 的内容
+                # done event: use its content field when present
+                dc = event_data.get(self._stream_content_field)
+                return True, str(dc) if dc is not None else None
+            elif event_type == "error":
+                msg = event_data.get("message", "Unknown error")
+                code = event_data.get("code", 500)
+                raise RuntimeError(f"Agent returned error (code={code}): {msg}")
+            elif event_type in self._stream_text_events:
+                content = event_data.get(self._stream_content_field, "")
+                if content:
+                    chunks.append(str(content))
+        return False, None
+
+    @staticmethod
+    def _parse_payload(payload: str) -> list[Any]:
+        """解析 data 内容；多行 data 整体不是 JSON 时逐行解析（兼容每行一个 JSON 且不空行分隔的流）
+        Parse data; when multi-line data isn't JSON as a whole, parse line by line
+        (compatible with streams that put one JSON per line without blank-line separators)"""
+        try:
+            return [json.loads(payload)]
+        except json.JSONDecodeError:
+            pass
+        if "\n" not in payload:
+            return [payload]
+        items: list[Any] = []
+        for line in payload.split("\n"):
+            line = line.strip()
+            if not line or line == "[DONE]":
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                items.append(line)
+        return items
 
     def get_prompt_file(self) -> Optional[str]:
         """获取提示词文件路径 / Get prompt file path"""
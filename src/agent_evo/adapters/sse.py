@@ -0,0 +1,138 @@
+"""SSE 增量解码器 / Incremental SSE decoder
+
+按字节增量解析 text/event-stream，总开销与流长度成线性关系：
+每个字节只扫描一次，已消费的前缀在每次 feed 结束时一次性丢弃。
+Parses text/event-stream incrementally at the byte level with cost linear in stream length:
+each byte is scanned once and the consumed prefix is dropped once per feed.
+
+支持 / Supports:
+- \\n、\\r\\n、\\r 三种换行 / \\n, \\r\\n and \\r line endings
+- 多行 data（以 \\n 拼接）/ multi-line data (joined with \\n)
+- event / id / retry 字段与 ":" 注释行 / event / id / retry fields and ":" comment lines
+
+兼容非标准流 / Compatible with non-standard streams:
+- 裸 JSON 行（NDJSON）视为独立的 data 事件 / bare JSON lines (NDJSON) become standalone data events
+- 流结束时未以空行结尾的事件也会被派发 / an event not terminated by a blank line is dispatched at end of stream
+"""
+
+import re
+from typing import Optional
+
+_LINE_END = re.compile(rb"\r\n|\r|\n")
+
+
+class SSEEvent:
+    """一个 SSE 事件 / One SSE event"""
+
+    __slots__ = ("event", "data", "id", "retry")
+
+    def __init__(self, data: str, event: str = "message", id: Optional[str] = None, retry: Optional[int] = None):
+        self.data = data
+        self.event = event
+        self.id = id
+        self.retry = retry
+
+    def __repr__(self) -> str:
+        return f"SSEEvent(event={self.event!r}, data={self.data!r}, id={self.id!r})"
+
+
+class SSEDecoder:
+    """增量 SSE 解码器 / Incremental SSE decoder
+
+    用法 / Usage:
+        decoder = SSEDecoder()
+        async for chunk in response.aiter_bytes():
+            for event in decoder.feed(chunk):
+                ...
+        for event in decoder.flush():
+            ...
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # 缓冲区中已确认不含换行的前缀长度，避免长行跨多个分片时重复扫描
+        # Length of the buffered prefix known to contain no line end, so long lines spanning chunks aren't rescanned
+        self._scanned = 0
+        self._data: list[str] = []
+        self._event = ""
+        self._retry: Optional[int] = None
+        self._started = False
+        # id 按规范跨事件保留 / Per spec, the last event id persists across events
+        self.last_event_id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> list[SSEEvent]:
+        """输入一段字节，返回已完整的事件 / Feed bytes, return completed events"""
+        if not chunk:
+            return []
+        buffer = self._buffer
+        buffer += chunk
+        if not self._started:
+            # 去掉流开头的 BOM / Strip BOM at start of stream
+            if len(buffer) < 3 and b"\xef\xbb\xbf".startswith(bytes(buffer)):
+                return []
+            if buffer.startswith(b"\xef\xbb\xbf"):
+                del buffer[:3]
+            self._started = True
+
+        events: list[SSEEvent] = []
+        pos = 0
+        end = len(buffer)
+        for match in _LINE_END.finditer(buffer, self._scanned):
+            # 末尾的单个 \r 可能是被拆开的 \r\n，留到下一次 / A trailing lone \r may be half of \r\n, keep it
+            if match.group() == b"\r" and match.end() == end:
+                break
+            self._process_line(bytes(buffer[pos:match.start()]).decode("utf-8", errors="replace"), events)
+            pos = match.end()
+        if pos:
+            del buffer[:pos]
+        self._scanned = len(buffer) - 1 if buffer.endswith(b"\r") else len(buffer)
+        return events
+
+    def flush(self) -> list[SSEEvent]:
+        """流结束时派发剩余内容 / Dispatch whatever remains at end of stream"""
+        events: list[SSEEvent] = []
+        if self._buffer:
+            line = bytes(self._buffer).rstrip(b"\r").decode("utf-8", errors="replace")
+            self._buffer.clear()
+            self._scanned = 0
+            self._process_line(line, events)
+        self._dispatch(events)
+        return events
+
+    def _process_line(self, line: str, events: list[SSEEvent]) -> None:
+        if not line:
+            self._dispatch(events)
+            return
+        if line[0] == ":":
+            return
+
+        field, sep, value = line.partition(":")
+        if sep and value.startswith(" "):
+            value = value[1:]
+
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            if "\0" not in value:
+                self.last_event_id = value
+        elif field == "retry":
+            if value.isdigit():
+                self._retry = int(value)
+        elif line[0] in "{[":
+            # 非 SSE 的裸 JSON 行 / Bare JSON line outside SSE framing
+            self._dispatch(events)
+            events.append(SSEEvent(data=line, id=self.last_event_id))
+
+    def _dispatch(self, events: list[SSEEvent]) -> None:
+        if self._data:
+            events.append(SSEEvent(
+                data="\n".join(self._data),
+                event=self._event or "message",
+                id=self.last_event_id,
+                retry=self._retry,
+            ))
+        self._data = []
+        self._event = ""
+        self._retry = None
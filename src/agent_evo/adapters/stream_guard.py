@@ -0,0 +1,161 @@
+"""流式提前终止 / Streaming early termination
+
+评测器为每条用例注册增量谓词，流式适配器每收到一段文本就检查一次，
+一旦命中（如出现禁止的关键词或工具调用）即停止读取并中止本次调用。
+The evaluator registers incremental predicates per case; streaming adapters check them on every
+text chunk and stop reading as soon as one fires (e.g. a forbidden keyword or tool call appears).
+
+谓词通常只检查「上一段尾部窗口 + 新文本」，单次检查开销与已输出长度无关；
+禁止工具谓词只保留并解析最早一个尚未完成的工具调用之后的文本。
+Predicates usually only look at "tail window of previous text + new text", so each check costs
+the same regardless of how much has been streamed; the forbidden-tool predicate only keeps and
+parses the text from the earliest tool call that is not complete yet.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from agent_evo.utils.i18n import t
+
+# Action 调用的开头（工具名及其后的空白）/ Head of an Action call (tool name and the whitespace after it)
+_ACTION_HEAD = re.compile(r"Action:\s*\S+(\s*)")
+
+
+class StreamPredicate(ABC):
+    """增量谓词基类 / Incremental predicate base class
+
+    dimension 为谓词代替判定的评判维度，命中时该维度记 0 分，按其权重与 fatal 配置参与评分。
+    dimension is the judge dimension the predicate decides early; on a hit that dimension scores 0
+    and counts with its configured weight and fatal setting.
+    """
+
+    # 需要保留的上文长度，保证跨分片的匹配不会漏掉 / Previous text to keep so matches spanning chunks aren't missed
+    window: int = 0
+    dimension: str = "content"
+
+    @abstractmethod
+    def check(self, window: str, chunk: str) -> Optional[str]:
+        """检查文本窗口（上文尾部 + 新片段 chunk），命中时返回原因
+        Check a text window (previous tail + the new chunk), return a reason on hit"""
+
+
+class ForbiddenKeywordPredicate(StreamPredicate):
+    """输出中出现禁止的关键词（not_contains，content 维度）
+    A forbidden keyword appears in the output (not_contains, content dimension)"""
+
+    dimension = "content"
+
+    def __init__(self, keywords: list[str]):
+        self.keywords = [k for k in keywords if k]
+        self.window = max((len(k) for k in self.keywords), default=1) - 1
+
+    def check(self, window: str, chunk: str) -> Optional[str]:
+        for keyword in self.keywords:
+            if keyword in window:
+                return t("stream_forbidden_keyword").format(keyword=keyword)
+        return None
+
+
+class ForbiddenToolPredicate(StreamPredicate):
+    """输出中出现禁止的工具调用（behavior 维度）/ A forbidden tool call appears in the output (behavior dimension)
+
+    与 CoreJudgeFactor._extract_tool_calls 使用相同的 <tool_call> 与 Action 格式，只有评判时同样会识别的
+    完整调用才命中；出现过 <tool_call> 调用后不再识别 Action 格式，与评判一致。
+    已解析的调用之前的文本会被丢弃，每次只解析最早一个未完成调用（或可能跨分片的标记）之后的文本。
+    整段输出为 JSON 的调用要等 JSON 完整后才能识别，不做提前终止，由评判处理。
+    Uses the same <tool_call> and Action formats as CoreJudgeFactor._extract_tool_calls, so only a
+    complete call the judge would also recognise fires; once a <tool_call> call has been seen the
+    Action format is no longer recognised, as in the judge.
+    Text before the calls already parsed is dropped, so each check only parses from the earliest
+    unfinished call (or a marker that may span chunks). Calls in an all-JSON output can only be
+    parsed once the JSON is complete; they are left to the judge rather than stopped early.
+    """
+
+    dimension = "behavior"
+
+    _XML_MARKER = "<tool_call>"
+    _ACTION_MARKER = "Action:"
+    _ACTION_INPUT = "Action Input:"
+
+    def __init__(self, tools: list[str]):
+        # 延迟导入：factors 模块依赖本模块 / Lazy import: the factors module depends on this one
+        from agent_evo.core.factors import TOOL_CALL_ACTION, TOOL_CALL_XML, CoreJudgeFactor
+
+        self._xml, self._action = TOOL_CALL_XML, TOOL_CALL_ACTION
+        self._xml_call, self._action_call = CoreJudgeFactor._xml_tool_call, CoreJudgeFactor._action_tool_call
+        self.tools = [tool for tool in tools if tool]
+        self._buffer = ""        # 尚未解析完的输出尾部 / Tail of the output not fully parsed yet
+        self._xml_seen = False   # 已出现 <tool_call> 调用 / A <tool_call> call has been seen
+
+    def check(self, window: str, chunk: str) -> Optional[str]:
+        if not self.tools:
+            return None
+        self._buffer += chunk
+        called: list[str] = []
+        end = 0
+        for match in self._xml.finditer(self._buffer):
+            call = self._xml_call(match)
+            if call is not None:
+                self._xml_seen = True
+                called.append(call["name"])
+            end = match.end()
+        if not self._xml_seen:
+            for match in self._action.finditer(self._buffer, end):
+                called.append(self._action_call(match)["name"])
+                end = match.end()
+        tool = next((tool for tool in self.tools if tool in called), None)
+        if tool:
+            return t("stream_forbidden_tool").format(tool=tool)
+
+        # 保留最早一个未完成调用的起点；没有时只保留可能被截断的标记 / Keep from the earliest unfinished call, else a possibly cut marker
+        starts = [self._buffer.find(self._XML_MARKER, end)]
+        if not self._xml_seen:
+            pos = self._buffer.find(self._ACTION_MARKER, end)
+            while pos >= 0 and not self._action_unfinished(pos):
+                pos = self._buffer.find(self._ACTION_MARKER, pos + 1)
+            starts.append(pos)
+        starts = [pos for pos in starts if pos >= 0]
+        keep = min(starts) if starts else max(end, len(self._buffer) - len(self._XML_MARKER) + 1)
+        self._buffer = self._buffer[keep:]
+        return None
+
+    def _action_unfinished(self, pos: int) -> bool:
+        """pos 处的 "Action:" 是否仍可能成为完整调用（如 "Action: Final Answer" 不会）
+        Whether the "Action:" at pos may still become a complete call ("Action: Final Answer" cannot)"""
+        head = _ACTION_HEAD.match(self._buffer, pos)
+        if head is None or head.end() == len(self._buffer):
+            return True
+        if not head.group(1).endswith("\n"):
+            return False
+        rest = self._buffer[head.end():]
+        if len(rest) <= len(self._ACTION_INPUT):
+            return self._ACTION_INPUT.startswith(rest)
+        if not rest.startswith(self._ACTION_INPUT):
+            return False
+        arguments = rest[len(self._ACTION_INPUT):].lstrip()
+        return not arguments or arguments.startswith("{")
+
+
+class StreamGuard:
+    """单次流式调用的谓词集合 / Predicate set for one streaming call"""
+
+    def __init__(self, predicates: list[StreamPredicate]):
+        self.predicates = predicates
+        self._window = max((p.window for p in predicates), default=0)
+        self._tail = ""
+        # 命中的谓词所代替的维度 / Dimension of the predicate that fired
+        self.dimension: Optional[str] = None
+
+    def feed(self, text: str) -> Optional[str]:
+        """输入新的文本片段，任一谓词命中时返回原因 / Feed new text, return a reason if any predicate fires"""
+        if not text:
+            return None
+        window = self._tail + text
+        for predicate in self.predicates:
+            reason = predicate.check(window, text)
+            if reason:
+                self.dimension = predicate.dimension
+                return reason
+        self._tail = window[-self._window:] if self._window else ""
+        return None
@@ -10,6 +10,7 @@ from rich.console import Console
 from agent_evo.core.config import load_config
 from agent_evo.core.pipeline import Pipeline
 from agent_evo.utils.i18n import t
+from agent_evo.utils.profiling import Profiler
 
 console = Console()
 
@@ -21,10 +22,30 @@ async def run_auto(
     include_silver: bool = False,
     create_pr: bool = False,
     output: Optional[str] = None,
+    budget: Optional[float] = None,
+    trace: Optional[str] = None,
+    profile: bool = False,
+    order: str = "file",
+    seed: Optional[int] = None,
 ):
     """一站式评测 + 自动优化 / One-stop evaluation + auto optimization"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_dir = Path("reports")
+    json_path = Path(output) if output else report_dir / f"auto_{timestamp}.json"
+    html_path = report_dir / f"auto_{timestamp}.html"
+
+    report = None
+    profiler = Profiler() if profile else None
+    if profiler:
+        profiler.start()
     try:
         config = load_config(config_path)
+        if budget is not None:
+            config.llm.budget_usd = budget
+        if trace:
+            config.tracing.enabled = True
+            config.tracing.exporter = "json"
+            config.tracing.path = trace
         pipeline = Pipeline(config)
 
         console.print(f"\n[bold cyan]{t('auto_start')}[/bold cyan]\n")
@@ -38,17 +59,14 @@ async def run_auto(
             tier=tier,
             include_silver=include_silver,
             dry_run=False,
+            order=order,
+            seed=seed,
         )
 
         report = result.eval_report
 
         # 保存报告 / Save report
-        report_dir = Path("reports")
         report_dir.mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        json_path = Path(output) if output else report_dir / f"auto_{timestamp}.json"
-        html_path = report_dir / f"auto_{timestamp}.html"
 
         report_json = report.model_dump_json(indent=2)
         json_path.write_text(report_json, encoding="utf-8")
@@ -84,3 +102,9 @@ async def run_auto(
         import traceback
         traceback.print_exc()
         raise SystemExit(1)
+    finally:
+        # 运行失败时也停止采集并保存已有的剖析结果 / Stop and save what was profiled even when the run fails
+        if profiler:
+            from agent_evo.cli.commands.eval import save_profile
+            profiler.stop()
+            save_profile(profiler, json_path.with_suffix(""), report)
@@ -0,0 +1,88 @@
+"""dedupe 命令：清理测评集中的近似重复用例
+dedupe command: remove near-duplicate cases from the test suites"""
+
+from pathlib import Path
+from typing import Optional
+
+import yaml
+from rich.console import Console
+from rich.table import Table
+
+from agent_evo.core.config import load_config
+from agent_evo.core.dedup import MinHashIndex, suite_files
+from agent_evo.core.serializer import load_test_cases_from_yaml
+from agent_evo.utils.i18n import t
+
+console = Console()
+
+
+def run_dedupe(config_path: str, threshold: Optional[float], dry_run: bool):
+    """扫描黄金集与白银集，删除白银集中的近似重复用例；黄金集只报告不修改
+    Scan gold and silver suites and delete near-duplicates from silver; gold cases are reported, never modified"""
+    try:
+        config = load_config(config_path)
+        if threshold is not None:
+            config.dedup.threshold = threshold
+        dedup = config.dedup
+
+        files = suite_files(config)
+        if not files:
+            console.print(f"[yellow]{t('no_test_files')}[/yellow]")
+            return
+        gold_files = {Path(f).resolve() for f in suite_files(config, include_silver=False)}
+
+        # 按文件顺序（黄金集在前）建立索引，先出现的用例保留
+        # Index in file order (gold first); the first occurrence is kept
+        index = MinHashIndex(dedup.threshold, dedup.num_perm, dedup.ngram)
+        total = 0
+        removals: dict[str, set[str]] = {}   # file -> 待删除的 case_id / case ids to delete
+        rows: list[tuple[str, str, str, float, bool]] = []
+        for f in files:
+            is_gold = Path(f).resolve() in gold_files
+            for case in load_test_cases_from_yaml(f):
+                total += 1
+                signature = index.signature(case.input_query)
+                match = index.query(signature)
+                if match is None:
+                    index.add(case.id, signature)
+                    continue
+                removable = not is_gold
+                rows.append((case.id, f, match[0], match[1], removable))
+                if removable:
+                    removals.setdefault(f, set()).add(case.id)
+
+        if not rows:
+            console.print(f"[green]{t('dedupe_none').format(n=total)}[/green]")
+            return
+
+        table = Table(show_header=True, header_style="bold")
+        table.add_column(t("col_id"), style="cyan")
+        table.add_column(t("dedupe_col_file"))
+        table.add_column(t("dedupe_col_duplicate_of"))
+        table.add_column(t("dedupe_col_similarity"))
+        for case_id, f, duplicate_of, similarity, removable in rows:
+            label = case_id if removable else f"{case_id} [dim]({t('dedupe_kept_gold')})[/dim]"
+            table.add_row(label, f, duplicate_of, f"{similarity:.2f}")
+        console.print(table)
+
+        removed = sum(len(ids) for ids in removals.values())
+        if dry_run:
+            console.print(f"\n[yellow]{t('dedupe_dry_run').format(n=removed, total=total)}[/yellow]")
+            return
+        for f, ids in removals.items():
+            _remove_cases(f, ids)
+        console.print(f"\n[green]{t('dedupe_done').format(n=removed, total=total, files=len(removals))}[/green]")
+
+    except FileNotFoundError as e:
+        console.print(f"[red]{e}[/red]")
+        raise SystemExit(1)
+
+
+def _remove_cases(file_path: str, case_ids: set[str]):
+    """从 YAML 文件中删除指定用例，其余内容保持不变 / Delete the given cases from a YAML file, leaving the rest intact"""
+    path = Path(file_path)
+    with open(path, "r", encoding="utf-8") as fh:
+        data = yaml.safe_load(fh)
+    data["cases"] = [c for c in data["cases"] if c.get("id") not in case_ids]
+    with open(path, "w", encoding="utf-8") as fh:
+        yaml.dump(data, fh, allow_unicode=True, default_flow_style=False, sort_keys=False)
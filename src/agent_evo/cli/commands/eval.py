@@ -11,6 +11,8 @@ from rich.table import Table
 from agent_evo.core.config import load_config
 from agent_evo.core.pipeline import Pipeline
 from agent_evo.utils.i18n import t
+from agent_evo.utils.llm import format_cascade_line, format_usage_lines
+from agent_evo.utils.profiling import Profiler, format_profile_lines
 
 console = Console()
 
@@ -21,24 +23,46 @@ async def run_eval(
     output: Optional[str],
     tier: Optional[str] = None,
     include_silver: bool = False,
+    budget: Optional[float] = None,
+    trace: Optional[str] = None,
+    profile: bool = False,
+    order: str = "file",
+    seed: Optional[int] = None,
+    sample: Optional[str] = None,
+    affected_by: Optional[str] = None,
 ):
     """运行评测 / Run evaluation"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_dir = Path("reports")
+    # 确定输出路径 / Determine output paths
+    json_path = Path(output) if output else report_dir / f"eval_{timestamp}.json"
+    html_path = report_dir / f"eval_{timestamp}.html"
+
+    report = None
+    profiler = Profiler() if profile else None
+    if profiler:
+        profiler.start()
     try:
         config = load_config(config_path)
+        if budget is not None:
+            config.llm.budget_usd = budget
+        if trace:
+            config.tracing.enabled = True
+            config.tracing.exporter = "json"
+            config.tracing.path = trace
         pipeline = Pipeline(config)
-        report = await pipeline.eval_only(tags=tags, tier=tier, include_silver=include_silver)
+        report = await pipeline.eval_only(
+            tags=tags, tier=tier, include_silver=include_silver, order=order, seed=seed, sample=sample,
+            affected_by=affected_by,
+        )
 
         # 显示结果 / Display results
         _print_report(report)
+        if report.sampling:
+            print_sampling(report.sampling)
 
         # 保存报告 / Save report
-        report_dir = Path("reports")
         report_dir.mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # 确定输出路径 / Determine output paths
-        json_path = Path(output) if output else report_dir / f"eval_{timestamp}.json"
-        html_path = report_dir / f"eval_{timestamp}.html"
 
         # 保存 JSON 报告 / Save JSON report
         report_json = report.model_dump_json(indent=2)
@@ -58,6 +82,49 @@ async def run_eval(
     except Exception as e:
         console.print(f"[red]{t('eval_failed').format(msg=e)}[/red]")
         raise SystemExit(1)
+    finally:
+        # 运行失败时也停止采集并保存已有的剖析结果 / Stop and save what was profiled even when the run fails
+        if profiler:
+            profiler.stop()
+            save_profile(profiler, json_path.with_suffix(""), report)
+
+
+def save_profile(profiler: Profiler, base_path: Path, report) -> None:
+    """保存并打印性能剖析结果；保存失败只打印警告，不掩盖运行本身的错误
+    Save and print profiling results; a failed save only prints a warning so it never masks the run's own error"""
+    try:
+        paths = profiler.save(base_path, report)
+    except OSError as e:
+        console.print(f"[yellow]{t('warn')}: {e}[/yellow]")
+        return
+    console.print()
+    for line in format_profile_lines(profiler.summary(report), paths):
+        console.print(line)
+
+
+def print_sampling(sampling) -> None:
+    """打印抽样评测推断到完整测评集的通过率与置信区间
+    Print the full-suite pass rate and confidence interval inferred from a sampled run"""
+    estimate = sampling.estimate
+    console.print(
+        f"\n[bold]{t('sample_title').format(n=estimate.sampled, total=estimate.population, seed=sampling.seed)}[/bold]"
+    )
+    console.print(f"{t('sample_estimate')}: {estimate.pass_rate:.1%}  {_interval(estimate)}")
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column(t("col_tag"), style="cyan")
+    table.add_column(t("sample_col_cases"), justify="right")
+    table.add_column(t("pass_rate"), justify="right")
+    table.add_column(t("sample_col_ci"), justify="right")
+    for tag, est in sampling.tags.items():
+        table.add_row(tag, f"{est.sampled}/{est.population}", f"{est.pass_rate:.1%}", _interval(est))
+    console.print(table)
+
+
+def _interval(estimate) -> str:
+    if estimate.ci_low is None:
+        return "-"
+    return f"{estimate.ci_low:.1%} – {estimate.ci_high:.1%}"
 
 
 def _print_report(report):
@@ -72,6 +139,12 @@ def _print_report(report):
     if report.duration_seconds:
         console.print(f"{t('duration')}: {report.duration_seconds:.2f}s")
 
+    for line in format_usage_lines(report.usage):
+        console.print(line)
+    cascade_line = format_cascade_line(report.cascade)
+    if cascade_line:
+        console.print(cascade_line)
+
     # 详细结果表格 / Detailed results table
     if report.results:
         console.print(f"\n[bold]{t('detailed_results')}[/bold]\n")
@@ -46,12 +46,19 @@ async def run_gate_check(config_path: str):
             else:
                 console.print(f"  {tag}: [dim]{t('gate_no_cases')}[/dim]")
 
+        # 被跳过的检查（如批量调用的耗时）不能算作已验证 / Skipped checks (e.g. batched latency) do not count as verified
+        unverified = {fid: fs.skipped_count for fid, fs in report.factor_summary.items() if fs.skipped_count}
+        if unverified:
+            console.print(f"\n[yellow]{t('gate_unverified')}[/yellow]")
+            for fid, count in unverified.items():
+                console.print(f"  [yellow]{t('factor_unverified').format(fid=fid, count=count)}[/yellow]")
+
         if all_passed:
             console.print(f"\n[bold green]{t('gate_check_pass')}[/bold green]")
         else:
             console.print(f"\n[bold red]{t('gate_check_fail')}[/bold red]")
             raise SystemExit(1)
 
-    except FileNotFoundError as e:
+    except (FileNotFoundError, ValueError) as e:
         console.print(f"[red]{e}[/red]")
         raise SystemExit(1)
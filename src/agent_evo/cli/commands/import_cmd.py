@@ -1,15 +1,33 @@
 """import 命令：从线上数据导入测评集
 import command: import test cases from production data"""
 
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
 from rich.console import Console
+from rich.table import Table
 
 from agent_evo.core.config import load_config
+from agent_evo.core.dedup import CorpusIndex, load_corpus_index, suite_files
+from agent_evo.core.import_state import ImportState
 from agent_evo.core.importer import TestCaseImporter
-from agent_evo.core.serializer import load_test_cases_from_yaml, save_test_cases
+from agent_evo.core.serializer import YamlCaseWriter
+from agent_evo.models import Config, TestCase
+from agent_evo.models.config import ImportConfig
+from agent_evo.models.import_models import ImportResult
 from agent_evo.utils.i18n import t
+from agent_evo.utils.llm import format_usage_lines
 
 console = Console()
 
+_MAX_RELATED_ROWS = 20   # 最多打印的相似用例行数 / Max similar-case rows printed
+_MAX_STRATA_SHOWN = 5    # 最多打印的采样丢弃层数 / Max sampled-out strata printed
+
+# 产生用例的导入过程：接收 _CaseSink（作为 on_case 回调，seen 为已有用例 ID，index 为去重索引），返回导入结果
+# An import producing cases: takes the _CaseSink (the on_case callback; seen holds existing case IDs
+# and index is the dedup index) and returns the import result
+Producer = Callable[["_CaseSink"], Awaitable[ImportResult]]
+
 
 async def run_import(
     config_path: str,
@@ -17,24 +35,31 @@ async def run_import(
     format: str,
     output_path: str,
     auto_refine: bool,
+    budget: Optional[float] = None,
+    concurrency: Optional[int] = None,
+    sampling: Optional[dict] = None,
 ):
     """从线上数据导入测评集 / Import test cases from production data"""
     try:
-        config = load_config(config_path)
+        config = _load(config_path, budget, concurrency, sampling)
         importer = TestCaseImporter(config)
+        try:
+            records = importer.iter_records(file_path, format)
+        except ValueError as e:
+            console.print(f"[red]{e}[/red]")
+            raise SystemExit(1)
 
         console.print(t("importing").format(path=file_path, fmt=format))
 
-        # 导入 / Import
-        cases, result = await importer.import_from_file(
-            file_path=file_path,
-            format=format,
-            auto_refine=auto_refine,
-        )
+        # 逐条读取、并发提炼、增量去重并写入 / Read one by one, refine concurrently, dedup and write incrementally
+        async def produce(sink):
+            return await importer.refine_stream(
+                records, auto_refine, on_case=sink, seen=sink.seen, dedup_index=sink.index,
+            )
 
-        await _post_import(importer, cases, result, output_path, source_desc=file_path)
+        await _import_into(importer, produce, output_path, source_desc=file_path)
 
-    except FileNotFoundError as e:
+    except (FileNotFoundError, ImportError, ValueError) as e:
         console.print(f"[red]{e}[/red]")
         raise SystemExit(1)
 
@@ -44,10 +69,21 @@ async def run_import_from_source(
     source_name: str,
     output_path: str,
     auto_refine: bool,
+    budget: Optional[float] = None,
+    concurrency: Optional[int] = None,
+    resume: bool = True,
+    full: bool = False,
+    sampling: Optional[dict] = None,
 ):
-    """从 HTTP API 数据源拉取并导入 / Fetch from HTTP API source and import"""
+    """从 HTTP API 数据源拉取并导入；中断后默认从断点继续
+    Fetch from HTTP API source and import; an interrupted import resumes from its checkpoint by default
+
+    配置了 watermark 的数据源只拉取不早于水位的记录；full 时忽略水位全量拉取。
+    Sources with a watermark only fetch records not older than it; with full the watermark is ignored.
+    """
+    state = source = None
     try:
-        config = load_config(config_path)
+        config = _load(config_path, budget, concurrency, sampling)
 
         # 查找数据源配置 / Find source config by name
         source = None
@@ -65,62 +101,198 @@ async def run_import_from_source(
             raise SystemExit(1)
 
         importer = TestCaseImporter(config)
+        state = ImportState.load(config, Path.cwd())
+        position = state.checkpoint(source) if resume else None
+        since = None if full else state.watermark(source)
 
         console.print(t("fetching_source").format(name=source_name, url=source.url))
+        if position:
+            console.print(f"[yellow]{t('import_resuming').format(page=position.get('page', 1))}[/yellow]")
+        if since is not None:
+            console.print(t("import_watermark").format(field=source.watermark.field, value=since))
 
-        cases, result = await importer.import_from_source(
-            source=source,
-            auto_refine=auto_refine,
-        )
+        # 拉取与提炼流水线进行；每完整处理一页就保存断点
+        # Fetching and refinement are pipelined; the checkpoint is saved after each fully processed page
+        def on_checkpoint(next_position):
+            state.set_checkpoint(source, next_position)
+            state.save()
 
-        await _post_import(importer, cases, result, output_path, source_desc=f"{source_name} ({source.url})")
+        async def produce(sink):
+            result = await importer.refine_source(
+                source, auto_refine, on_case=sink, resume=position, on_checkpoint=on_checkpoint,
+                since=since, seen=sink.seen, dedup_index=sink.index,
+            )
+            # 完整导入后才推进水位 / The watermark only advances after a complete import
+            if result.watermark is not None:
+                state.set_watermark(source, result.watermark)
+                state.save()
+            elif result.failed:
+                # 失败的记录下次导入时重试 / Failed records are retried on the next import
+                console.print(f"[yellow]{t('import_failed_retry').format(n=result.failed)}[/yellow]")
+            return result
+
+        await _import_into(
+            importer, produce, output_path, source_desc=f"{source_name} ({source.url})", incremental=since is not None,
+        )
 
     except Exception as e:
         console.print(f"[red]{t('fetch_source_error').format(err=e)}[/red]")
+        if state is not None and source is not None and state.checkpoint(source):
+            console.print(f"[yellow]{t('import_checkpoint_saved').format(page=state.checkpoint(source).get('page', 1))}[/yellow]")
         raise SystemExit(1)
 
 
-async def _post_import(
+def _load(
+    config_path: str, budget: Optional[float], concurrency: Optional[int], sampling: Optional[dict] = None,
+) -> Config:
+    """读取配置并应用命令行覆盖；sampling 中为 None 的项不覆盖
+    Load config and apply command-line overrides; None entries in sampling are left alone"""
+    config = load_config(config_path)
+    if budget is not None:
+        config.llm.budget_usd = budget
+    if concurrency is not None:
+        config.import_config = config.import_config or ImportConfig()
+        config.import_config.concurrency = concurrency
+    overrides = {k: v for k, v in (sampling or {}).items() if v is not None}
+    if overrides:
+        config.import_config = config.import_config or ImportConfig()
+        config.import_config.sampling = config.import_config.sampling.model_copy(update=overrides)
+    return config
+
+
+class _CaseSink:
+    """导入用例的增量处理：查找相似的已有用例、写入；去重在提炼前按 index 进行（见 refine_stream）
+    Incremental handling of imported cases: look up similar existing cases, write; dedup happens
+    before refinement against index (see refine_stream)"""
+
+    def __init__(
+        self, config: Config, writer: YamlCaseWriter, corpus: Optional[CorpusIndex], dedup: bool, seen: set[str],
+    ):
+        self.config = config
+        self.seen = seen
+        self.writer = writer
+        self.corpus = corpus
+        # 与测评集及此前导入的记录对比；保留的记录会加入索引
+        # Records are compared with the corpus and earlier imported records; kept records join the index
+        self.index = corpus.inputs if dedup and corpus is not None else None
+        self.related: list[tuple[str, str]] = []   # 最多 _MAX_RELATED_ROWS 行 / At most _MAX_RELATED_ROWS rows
+        self.related_count = 0
+
+    def __call__(self, case: TestCase) -> None:
+        if self.corpus is not None:
+            # 已有哪些用例覆盖了这条线上失败 / Which existing cases already cover this production failure
+            matches = [m for m in self.corpus.similar(case.input_query, limit=3) if m[0] != case.id]
+            if matches:
+                self.related_count += 1
+                if len(self.related) < _MAX_RELATED_ROWS:
+                    self.related.append(
+                        (case.id, ", ".join(f"{case_id} ({score:.2f})" for case_id, _, score in matches))
+                    )
+        self.writer.write([case])
+
+
+async def _import_into(
     importer: TestCaseImporter,
-    cases: list,
-    result,
+    produce: Producer,
     output_path: str,
     source_desc: str,
+    incremental: bool = False,
 ):
-    """导入后的公共处理：去重、写入、打印结果 / Post-import: dedup, save, print results"""
-    if result.errors:
-        for err in result.errors:
-            console.print(f"[yellow]{t('warn')}: {err}[/yellow]")
+    """导入的公共流程：每条用例去重后立即追加到输出文件，然后打印结果
+    Common import flow: each case is deduplicated and appended to the output file right away, then results are printed
 
-    if not cases:
-        console.print(f"[red]{t('no_cases_imported')}[/red]")
-        raise SystemExit(1)
+    输出文件中已有的用例会保留并参与去重。incremental 时没有新记录不算错误。
+    Cases already in the output file are kept and take part in dedup. With incremental, having no
+    new records is not an error.
+    """
+    config = importer.config
+    import_cfg = config.import_config
+    corpus = None
+    if config.dedup.enabled:
+        try:
+            corpus = load_corpus_index(config, _corpus_files(config, output_path))
+        except Exception:
+            corpus = None
 
-    # 去重（与已有用例对比）/ Deduplicate (compare with existing cases)
-    try:
-        from pathlib import Path
-        if Path(output_path).exists():
-            existing = load_test_cases_from_yaml(output_path)
-            before = len(cases)
-            cases = await importer.deduplicate(cases, existing)
-            removed = before - len(cases)
-            if removed:
-                console.print(f"[yellow]{t('dedup_removed')}: {removed}[/yellow]")
-                result.duplicates_removed = removed
-    except Exception:
-        pass
-
-    # 写入文件 / Write to file
-    path = save_test_cases(
-        cases, output_path,
+    with YamlCaseWriter(
+        output_path,
         name="Production Import / 线上导入测评集",
         description=f"Imported from / 导入自 {source_desc}",
-    )
+        append=True,
+    ) as writer:
+        # 已有用例 ID：幂等 ID 已存在的记录直接跳过 / Existing case IDs: records whose idempotent ID exists are skipped
+        seen = set(corpus.case_files) if corpus is not None else set()
+        seen.update(writer.existing_ids)
+        sink = _CaseSink(
+            config, writer, corpus, dedup=import_cfg is None or import_cfg.auto_deduplicate, seen=seen,
+        )
+        result = await produce(sink)
+
+    for err in result.errors:
+        console.print(f"[yellow]{t('warn')}: {err}[/yellow]")
+    if result.failed > len(result.errors):
+        console.print(f"[yellow]... +{result.failed - len(result.errors)}[/yellow]")
+
+    if not result.errors and (not result.total_records or result.skipped == result.total_records):
+        if incremental or result.skipped:
+            console.print(f"[green]{t('import_no_new').format(skipped=result.skipped)}[/green]")
+            return
+        console.print(f"[red]{t('no_valid_records')}[/red]")
+        raise SystemExit(1)
+    if not result.imported and not result.duplicates_removed:
+        console.print(f"[red]{t('no_cases_imported')}[/red]")
+        raise SystemExit(1)
+
+    if result.duplicates_removed:
+        console.print(f"[yellow]{t('dedup_removed')}: {result.duplicates_removed}[/yellow]")
+    _print_related(sink, result.imported)
 
     console.print(f"\n[green]{t('import_done')}[/green]")
     console.print(f"  {t('total_records')}: {result.total_records}")
-    console.print(f"  {t('imported_count')}: {len(cases)}")
+    console.print(f"  {t('imported_count')}: {writer.count}")
     console.print(f"  {t('dedup_removed')}: {result.duplicates_removed}")
-    console.print(f"  {t('pending_count')}: {len(cases)}")
-    console.print(f"  {t('output_file')}: {path}")
+    if result.skipped:
+        console.print(f"  {t('import_skipped')}: {result.skipped}")
+    _print_sampling(result)
+    console.print(f"  {t('pending_count')}: {writer.count}")
+    console.print(f"  {t('output_file')}: {writer.path}")
     console.print(f"\n[yellow]{t('import_review_hint')}[/yellow]")
+    for line in format_usage_lines(importer.llm.usage.summary()):
+        console.print(line)
+
+
+def _corpus_files(config, output_path: str) -> list[str]:
+    """黄金 / 白银集文件及已存在的输出文件 / Gold / silver suite files plus the output file if it exists"""
+    files = suite_files(config)
+    output = Path(output_path)
+    if output.exists() and output.resolve() not in {Path(f).resolve() for f in files}:
+        files.append(output_path)
+    return files
+
+
+def _print_sampling(result: ImportResult) -> None:
+    """打印采样丢弃的数量、原因与丢弃最多的层 / Print how many records were sampled out, why, and the top strata"""
+    if not result.sampled_out:
+        return
+    reasons = ", ".join(f"{t('sampled_reason_' + reason)} {n}" for reason, n in result.sampled_out_by.items())
+    console.print(f"  {t('import_sampled_out')}: {result.sampled_out} ({reasons})")
+    strata = list(result.sampled_out_strata.items())
+    shown = ", ".join(f"{name} ({n})" for name, n in strata[:_MAX_STRATA_SHOWN])
+    more = f", ... +{len(strata) - _MAX_STRATA_SHOWN}" if len(strata) > _MAX_STRATA_SHOWN else ""
+    console.print(f"  {t('import_sampled_strata')}: {shown}{more}")
+
+
+def _print_related(sink: _CaseSink, total: int) -> None:
+    """打印与导入用例相似的已有用例 / Print existing cases similar to the imported ones"""
+    if not sink.related_count:
+        return
+
+    console.print(f"\n{t('import_related').format(n=sink.related_count, total=total)}")
+    table = Table(show_header=True, header_style="bold")
+    table.add_column(t("col_id"), style="cyan")
+    table.add_column(t("import_related_col"))
+    for case_id, related in sink.related:
+        table.add_row(case_id, related)
+    console.print(table)
+    if sink.related_count > len(sink.related):
+        console.print(f"[dim]... +{sink.related_count - len(sink.related)}[/dim]")
@@ -1,20 +1,36 @@
 """mutate 命令：变异扩充测评集
 mutate command: expand test suite via mutation"""
 
+from pathlib import Path
+from typing import Optional
+
 from rich.console import Console
 
 from agent_evo.core.config import load_config
+from agent_evo.core.dedup import find_duplicates, load_corpus_index, suite_files
 from agent_evo.core.mutator import Mutator
-from agent_evo.core.serializer import load_test_cases_from_yaml, save_test_cases
+from agent_evo.core.serializer import YamlCaseWriter, load_test_cases_from_yaml, save_test_cases
 from agent_evo.utils.i18n import t
+from agent_evo.utils.llm import format_usage_lines
 
 console = Console()
 
 
-async def run_mutate(config_path: str, seed_path: str, count: int, output_path: str):
+async def run_mutate(
+    config_path: str,
+    seed_path: str,
+    count: int,
+    output_path: str,
+    budget: Optional[float] = None,
+    concurrency: Optional[int] = None,
+):
     """基于种子用例变异扩充 / Expand test suite based on seed cases"""
     try:
         config = load_config(config_path)
+        if budget is not None:
+            config.llm.budget_usd = budget
+        if concurrency is not None:
+            config.mutation.concurrency = concurrency
         mutator = Mutator(config)
 
         # 加载种子用例 / Load seed cases
@@ -27,28 +43,70 @@ async def run_mutate(config_path: str, seed_path: str, count: int, output_path:
         console.print(t("mutate_per_seed").format(n=count))
         console.print()
 
-        # 变异 / Mutate
-        mutations = await mutator.mutate(seeds, count_per_case=count)
+        # 变异：每条种子完成后立即追加到输出文件，中断时已生成的用例不会丢失
+        # Mutate: each finished seed is appended to the output file right away, so an interrupted run keeps its cases
+        name = "Mutation Generated / 变异生成测评集"
+        description = f"Mutated from / 基于 {seed_path} 变异生成"
+        index = _dedup_index(config, seeds, output_path) if config.dedup.enabled else None
+        duplicates: set[str] = set()
+        with YamlCaseWriter(output_path, name=name, description=description) as writer:
+            done = 0
+
+            def on_seed_done(seed, seed_mutations, error):
+                nonlocal done
+                done += 1
+                if error is not None:
+                    console.print(f"[yellow]{t('mutate_seed_failed').format(done=done, total=len(seeds), id=seed.id, err=error)}[/yellow]")
+                    return
+                if index is not None:
+                    # 去掉与已有用例或先前变异近似重复的用例 / Drop near-duplicates of existing cases or earlier mutations
+                    seed_mutations, dups = find_duplicates(seed_mutations, [], config.dedup, index=index)
+                    duplicates.update(case.id for case, _, _ in dups)
+                writer.write(seed_mutations)
+                console.print(t("mutate_seed_progress").format(
+                    done=done, total=len(seeds), id=seed.id, n=len(seed_mutations), written=writer.count,
+                ))
+
+            mutations = await mutator.mutate(seeds, count_per_case=count, on_seed_done=on_seed_done)
+        mutations = [m for m in mutations if m.id not in duplicates]
         console.print(t("generated_mutations").format(n=len(mutations)))
+        if duplicates:
+            console.print(f"[yellow]{t('dedup_removed')}: {len(duplicates)}[/yellow]")
 
         # LLM 预审 / LLM pre-review
         if config.mutation.auto_review:
             console.print(t("llm_reviewing"))
-            mutations = await mutator.review_batch(mutations)
-            rejected = sum(1 for m in mutations if m.review_status.value == "rejected")
-            if rejected:
-                console.print(f"[yellow]{t('review_rejected').format(n=rejected)}[/yellow]")
+            review = await mutator.review_batch(mutations)
+            if review.rejected:
+                console.print(f"[yellow]{t('review_rejected').format(n=len(review.rejected))}[/yellow]")
+            if review.unreviewed:
+                # 未审核的用例保留为 pending，但要明确告知，不能当作已通过
+                # Unreviewed cases stay pending, but are reported rather than treated as approved
+                ids = list(review.unreviewed)
+                console.print(f"[red]{t('review_unreviewed').format(n=len(ids), ids=', '.join(ids[:10]) + (' ...' if len(ids) > 10 else ''))}[/red]")
+                console.print(f"[dim]{next(iter(review.unreviewed.values()))}[/dim]")
 
-        # 写入文件 / Write to file
+        # 写入最终文件（去掉预审拒绝的用例）/ Write the final file (without cases rejected by pre-review)
         approved = [m for m in mutations if m.review_status.value != "rejected"]
-        path = save_test_cases(
-            approved, output_path,
-            name="Mutation Generated / 变异生成测评集",
-            description=f"Mutated from / 基于 {seed_path} 变异生成",
-        )
+        path = save_test_cases(approved, output_path, name=name, description=description)
         console.print(f"\n[green]{t('written_cases').format(n=len(approved), path=path)}[/green]")
         console.print(f"[yellow]{t('mutate_review_hint')}[/yellow]")
+        for line in format_usage_lines(mutator.llm.usage.summary()):
+            console.print(line)
 
-    except FileNotFoundError as e:
+    except (FileNotFoundError, ValueError) as e:
         console.print(f"[red]{e}[/red]")
         raise SystemExit(1)
+
+
+def _dedup_index(config, seeds: list, output_path: str):
+    """由持久化的测评集索引（黄金 / 白银集）与种子建立去重索引；输出文件会被覆盖，不计入
+    Build the dedup index from the persistent corpus index (gold / silver suites) and the seeds;
+    the output file is overwritten, so it is left out"""
+    output = Path(output_path).resolve()
+    files = [f for f in suite_files(config) if Path(f).resolve() != output]
+    index = load_corpus_index(config, files).inputs
+    for seed in seeds:
+        if seed.id not in index:
+            index.add(seed.id, index.signature(seed.input_query))
+    return index
@@ -6,7 +6,9 @@ from typing import Optional
 
 from rich.console import Console
 
+from agent_evo.models import CascadeSummary, SampleSummary
 from agent_evo.utils.i18n import t
+from agent_evo.utils.llm import format_cascade_line
 
 console = Console()
 
@@ -61,6 +63,10 @@ def _print_terminal_report(data: dict):
 
     console.print(f"{t('pass_rate')}: [{status_color}]{pass_rate:.1%}[/{status_color}]")
     console.print(f"{t('total')}: {data.get('total', 0)}  {t('passed')}: {data.get('passed', 0)}  {t('failed')}: {data.get('failed', 0)}")
+    if data.get("cascade"):
+        cascade_line = format_cascade_line(CascadeSummary.model_validate(data["cascade"]))
+        if cascade_line:
+            console.print(cascade_line)
 
     # 详细结果 / Detailed results
     results = data.get("results", [])
@@ -80,6 +86,8 @@ def _print_terminal_report(data: dict):
                 "failed": "[red]❌[/red]",
                 "error": "[yellow]⚠[/yellow]"
             }.get(status, status)
+            if r.get("quarantined"):
+                status_display += f" [dim]{t('quarantined_label')}[/dim]"
 
             table.add_row(
                 r.get("case_id", ""),
@@ -90,6 +98,10 @@ def _print_terminal_report(data: dict):
 
         console.print(table)
 
+    if data.get("sampling"):
+        from agent_evo.cli.commands.eval import print_sampling
+        print_sampling(SampleSummary.model_validate(data["sampling"]))
+
 
 def _generate_html_report(data: dict) -> str:
     """生成 HTML 报告 / Generate HTML report"""
@@ -116,10 +128,14 @@ def _generate_html_report(data: dict) -> str:
         "pass_rate": "通过率" if is_zh else "Pass Rate",
         "threshold": "阈值" if is_zh else "Threshold",
         "meets": "达标" if is_zh else "Meets",
+        "ci": "95% 置信区间" if is_zh else "95% CI",
+        "flakiness": "不稳定度" if is_zh else "Flakiness",
+        "quarantined": "已隔离" if is_zh else "Quarantined",
         "factor": "维度" if is_zh else "Factor",
         "activated": "激活次数" if is_zh else "Activated",
         "avg_score": "平均分" if is_zh else "Avg Score",
         "fail_count": "未满分次数" if is_zh else "Sub-perfect",
+        "skipped_count": "未验证次数" if is_zh else "Not Verified",
         "input": "输入" if is_zh else "Input",
         "actual_output": "实际输出" if is_zh else "Actual Output",
         "expected_output": "期望输出" if is_zh else "Expected Output",
@@ -156,6 +172,11 @@ def _generate_html_report(data: dict) -> str:
             f'<span class="badge bg-secondary me-1">{esc(tag)}</span>'
             for tag in r.get("tags", [])
         )
+        flakiness = r.get("flakiness")
+        if flakiness is not None:
+            tags_html += f' <span class="badge bg-light text-dark border me-1">{L["flakiness"]} {flakiness:.0%}</span>'
+        if r.get("quarantined"):
+            tags_html += f' <span class="badge bg-dark me-1">{L["quarantined"]}</span>'
 
         exec_time = r.get("execution_time_ms")
         time_str = f"{exec_time / 1000:.1f}s" if exec_time else "-"
@@ -242,6 +263,7 @@ def _generate_html_report(data: dict) -> str:
         tag_color = "success" if tag_pass_rate >= 0.95 else "warning" if tag_pass_rate >= 0.7 else "danger"
         threshold = stats.get("threshold")
         meets = stats.get("meets_threshold")
+        ci_low, ci_high = stats.get("ci_low"), stats.get("ci_high")
         meets_str = f'<span class="badge bg-{"success" if meets else "danger"}">{L["yes"] if meets else L["no"]}</span>' if meets is not None else L["na"]
         tag_stats_html += f"""
         <tr>
@@ -250,6 +272,7 @@ def _generate_html_report(data: dict) -> str:
             <td>{stats.get("passed", 0)}</td>
             <td>{stats.get("failed", 0)}</td>
             <td class="text-{tag_color} fw-bold">{tag_pass_rate:.0%}</td>
+            <td>{f"{ci_low:.0%} – {ci_high:.0%}" if ci_low is not None else L["na"]}</td>
             <td>{f"{threshold:.0%}" if threshold is not None else L["na"]}</td>
             <td>{meets_str}</td>
         </tr>
@@ -260,15 +283,18 @@ def _generate_html_report(data: dict) -> str:
     for fid, fs in data.get("factor_summary", {}).items():
         avg = fs.get("avg_score", 0)
         bar_color = "success" if avg >= 0.9 else "warning" if avg >= 0.7 else "danger"
+        # 全部被跳过的维度没有平均分 / A factor skipped everywhere has no average
+        avg_html = f"""
+                <span class="text-{bar_color} fw-bold">{avg:.2f}</span>
+                <div class="progress mt-1" style="height:4px;"><div class="progress-bar bg-{bar_color}" style="width:{int(avg*100)}%"></div></div>
+        """ if fs.get("activated_count", 0) else '<span class="text-muted">-</span>'
         factor_summary_html += f"""
         <tr>
             <td><strong>{esc(fid)}</strong></td>
             <td>{fs.get("activated_count", 0)}</td>
-            <td>
-                <span class="text-{bar_color} fw-bold">{avg:.2f}</span>
-                <div class="progress mt-1" style="height:4px;"><div class="progress-bar bg-{bar_color}" style="width:{int(avg*100)}%"></div></div>
-            </td>
+            <td>{avg_html}</td>
             <td>{fs.get("fail_count", 0)}</td>
+            <td class="{"text-warning fw-bold" if fs.get("skipped_count") else "text-muted"}">{fs.get("skipped_count", 0)}</td>
         </tr>
         """
 
@@ -280,6 +306,25 @@ def _generate_html_report(data: dict) -> str:
         gate_label = "发布已阻断" if is_zh else "Release Blocked"
         gate_html = f'<div class="alert alert-danger mt-3"><strong>🚫 {gate_label}</strong>: {esc(blocking)}</div>'
 
+    # ── 评判级联 ──
+    cascade_html = ""
+    if data.get("cascade"):
+        cascade_line = format_cascade_line(CascadeSummary.model_validate(data["cascade"]))
+        if cascade_line:
+            cascade_html = f'<div class="alert alert-info">{esc(cascade_line)}</div>'
+
+    # ── 抽样评测 ──
+    sampling_html = ""
+    if data.get("sampling"):
+        sampling = SampleSummary.model_validate(data["sampling"])
+        est = sampling.estimate
+        title = t("sample_title").format(n=est.sampled, total=est.population, seed=sampling.seed)
+        interval = f"{est.ci_low:.1%} – {est.ci_high:.1%}" if est.ci_low is not None else L["na"]
+        sampling_html = (
+            f'<div class="alert alert-secondary">{esc(title)}<br>'
+            f'{esc(t("sample_estimate"))}: <strong>{est.pass_rate:.1%}</strong> ({esc(t("sample_col_ci"))}: {interval})</div>'
+        )
+
     return f"""
 <!DOCTYPE html>
 <html lang="{"zh" if is_zh else "en"}">
@@ -349,6 +394,8 @@ def _generate_html_report(data: dict) -> str:
         </div>
 
         {gate_html}
+        {cascade_html}
+        {sampling_html}
 
         <!-- 因子汇总 -->
         {"" if not data.get("factor_summary") else f'''
@@ -357,7 +404,7 @@ def _generate_html_report(data: dict) -> str:
             <div class="card-body p-0">
                 <table class="table table-sm mb-0">
                     <thead><tr>
-                        <th>{L["factor"]}</th><th>{L["activated"]}</th><th>{L["avg_score"]}</th><th>{L["fail_count"]}</th>
+                        <th>{L["factor"]}</th><th>{L["activated"]}</th><th>{L["avg_score"]}</th><th>{L["fail_count"]}</th><th>{L["skipped_count"]}</th>
                     </tr></thead>
                     <tbody>{factor_summary_html}</tbody>
                 </table>
@@ -373,7 +420,7 @@ def _generate_html_report(data: dict) -> str:
                 <table class="table table-sm mb-0">
                     <thead><tr>
                         <th>{L["tag"]}</th><th>{L["total"]}</th><th>{L["passed"]}</th><th>{L["failed"]}</th>
-                        <th>{L["pass_rate"]}</th><th>{L["threshold"]}</th><th>{L["meets"]}</th>
+                        <th>{L["pass_rate"]}</th><th>{L["ci"]}</th><th>{L["threshold"]}</th><th>{L["meets"]}</th>
                     </tr></thead>
                     <tbody>{tag_stats_html}</tbody>
                 </table>
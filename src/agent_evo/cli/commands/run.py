@@ -1,5 +1,7 @@
 """run 命令 / run command"""
 
+from datetime import datetime
+from pathlib import Path
 from typing import Optional
 
 from rich.console import Console
@@ -7,6 +9,7 @@ from rich.console import Console
 from agent_evo.core.config import load_config
 from agent_evo.core.pipeline import Pipeline
 from agent_evo.utils.i18n import t
+from agent_evo.utils.profiling import Profiler
 
 console = Console()
 
@@ -19,10 +22,32 @@ async def run_pipeline(
     dry_run: bool,
     tier: Optional[str] = None,
     include_silver: bool = False,
+    budget: Optional[float] = None,
+    trace: Optional[str] = None,
+    profile: bool = False,
+    order: str = "file",
+    seed: Optional[int] = None,
+    profile_output: Optional[str] = None,
 ):
-    """运行完整流程 / Run full pipeline"""
+    """运行完整流程 / Run full pipeline
+
+    run 不保存报告，剖析结果写到 profile_output（默认 reports/run_<时间戳>）。
+    run saves no report; the profile goes to profile_output (reports/run_<timestamp> by default).
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    profile_base = Path(profile_output) if profile_output else Path("reports") / f"run_{timestamp}"
+    report = None
+    profiler = Profiler() if profile else None
+    if profiler:
+        profiler.start()
     try:
         config = load_config(config_path)
+        if budget is not None:
+            config.llm.budget_usd = budget
+        if trace:
+            config.tracing.enabled = True
+            config.tracing.exporter = "json"
+            config.tracing.path = trace
         pipeline = Pipeline(config)
 
         result = await pipeline.run(
@@ -32,8 +57,12 @@ async def run_pipeline(
             tier=tier,
             include_silver=include_silver,
             dry_run=dry_run,
+            order=order,
+            seed=seed,
         )
 
+        report = result.eval_report
+
         console.print("\n" + "=" * 50)
         if result.success:
             console.print(f"[bold green]{t('pipeline_success')}[/bold green]")
@@ -53,3 +82,9 @@ async def run_pipeline(
         import traceback
         traceback.print_exc()
         raise SystemExit(1)
+    finally:
+        # 运行失败时也停止采集并保存已有的剖析结果 / Stop and save what was profiled even when the run fails
+        if profiler:
+            from agent_evo.cli.commands.eval import save_profile
+            profiler.stop()
+            save_profile(profiler, profile_base, report)
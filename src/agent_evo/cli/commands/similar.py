@@ -0,0 +1,36 @@
+"""similar 命令：在测评集中查找相似用例
+similar command: find similar cases in the test suites"""
+
+from typing import Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from agent_evo.core.config import load_config
+from agent_evo.core.dedup import load_corpus_index
+from agent_evo.utils.i18n import t
+
+console = Console()
+
+
+def run_similar(config_path: str, text: str, field: str, limit: int, threshold: Optional[float]):
+    """用持久化的测评集索引查询与文本相似的用例 / Query cases similar to a text via the persistent corpus index"""
+    try:
+        config = load_config(config_path)
+        corpus = load_corpus_index(config)
+        matches = corpus.similar(text, field=field, threshold=threshold, limit=limit)
+        if not matches:
+            console.print(f"[yellow]{t('similar_none').format(n=len(corpus))}[/yellow]")
+            return
+
+        table = Table(show_header=True, header_style="bold")
+        table.add_column(t("col_id"), style="cyan")
+        table.add_column(t("dedupe_col_file"))
+        table.add_column(t("dedupe_col_similarity"))
+        for case_id, f, score in matches:
+            table.add_row(case_id, f, f"{score:.2f}")
+        console.print(table)
+
+    except FileNotFoundError as e:
+        console.print(f"[red]{e}[/red]")
+        raise SystemExit(1)
@@ -11,6 +11,7 @@ from rich.console import Console
 from rich.table import Table
 
 from agent_evo.core.config import load_config
+from agent_evo.core.history import RunHistory
 from agent_evo.models.test_case import TestCase, TestSuite
 from agent_evo.utils.i18n import t
 
@@ -95,6 +96,38 @@ def run_stats(config_path: str):
         if pending > 0:
             console.print(f"\n[yellow]{t('pending_review').format(n=pending)}[/yellow]")
 
+        # 不稳定用例（来自运行历史）/ Flaky cases (from run history)
+        if config.history.enabled:
+            _print_flaky_cases(config)
+
     except FileNotFoundError as e:
         console.print(f"[red]{e}[/red]")
         raise SystemExit(1)
+
+
+def _print_flaky_cases(config) -> None:
+    """打印不稳定度最高的用例 / Print the flakiest cases"""
+    history = RunHistory.load(config.history, Path.cwd())
+    scored = [
+        (score, case_id) for case_id in history.cases
+        if (score := history.flakiness(case_id)) is not None and score > 0
+    ]
+    console.print()
+    if not scored:
+        console.print(f"[dim]{t('flaky_none')}[/dim]")
+        return
+
+    flaky = history.flaky_cases()
+    table = Table(title=t("flaky_title"), show_header=True, header_style="bold")
+    table.add_column(t("col_id"), style="cyan")
+    table.add_column(t("col_flakiness"), justify="right")
+    table.add_column(t("col_runs"), justify="right")
+    table.add_column(t("col_recent"))
+    table.add_column(t("col_status"))
+    for score, case_id in sorted(scored, reverse=True)[:20]:
+        recent = "".join("P" if o == "passed" else "F" for o in history.outcomes(case_id)[-10:])
+        marker = ""
+        if case_id in flaky:
+            marker = t("quarantined_label") if config.history.flaky_action == "quarantine" else t("flaky_label")
+        table.add_row(case_id, f"{score:.0%}", str(len(history.cases[case_id])), recent, marker)
+    console.print(table)
@@ -2,14 +2,16 @@
 
 import asyncio
 import os
+from enum import Enum
 from pathlib import Path
-from typing import Optional
+from typing import Any, Coroutine, Optional
 
 import typer
 from dotenv import load_dotenv
 from rich.console import Console
 
 from agent_evo import __version__
+from agent_evo.core.generator import CASE_ORDERS
 
 # 自动加载开发者项目目录下的 .env 文件 / Auto-load .env from developer's project directory
 load_dotenv(dotenv_path=Path.cwd() / ".env", override=False)
@@ -21,6 +23,24 @@ app = typer.Typer(
 )
 console = Console()
 
+# 用例执行顺序的可选值 / Choices for the case execution order
+CaseOrder = Enum("CaseOrder", {order: order for order in CASE_ORDERS}, type=str)
+
+
+def _run_command(command: Coroutine[Any, Any, None]) -> None:
+    """在新的事件循环中运行命令，结束时（包括出错退出）关闭本循环的 LLM 连接池
+    Run a command on a new event loop, closing the loop's LLM connection pools when it ends
+    (including on error exits)"""
+    from agent_evo.utils.llm import close_llm_clients
+
+    async def main() -> None:
+        try:
+            await command
+        finally:
+            await close_llm_clients()
+
+    asyncio.run(main())
+
 
 def version_callback(value: bool):
     if value:
@@ -53,11 +73,18 @@ def eval_cmd(
     tier: Optional[str] = typer.Option(None, "--tier", help="只运行指定层级 / Run specified tier only: gold/silver"),
     include_silver: bool = typer.Option(False, "--include-silver", help="同时包含白银测评集 / Include silver test cases"),
     output: Optional[str] = typer.Option(None, "-o", "--output", help="报告输出路径 / Report output path"),
+    budget: Optional[float] = typer.Option(None, "--budget", help="LLM 花费上限（美元），超出后不再发起新调用 / LLM spend cap in USD, no new calls once exceeded"),
+    trace: Optional[str] = typer.Option(None, "--trace", help="启用链路追踪并写入 JSON 文件 / Enable tracing and write spans to a JSON file"),
+    profile: bool = typer.Option(False, "--profile", help="性能剖析，结果保存在报告旁 / Profile the run, saved next to the report"),
+    order: CaseOrder = typer.Option("file", "--order", help="用例执行顺序 / Case execution order"),
+    seed: Optional[int] = typer.Option(None, "--seed", help="--order random 与 --sample 的随机种子 / Random seed for --order random and --sample"),
+    sample: Optional[str] = typer.Option(None, "--sample", help="只评测分层抽样的 N 条或 P% 用例，并推断完整测评集的通过率 / Evaluate a stratified sample of N cases or P%, extrapolating the full-suite pass rate"),
+    affected_by: Optional[str] = typer.Option(None, "--affected-by", help="只评测受提示词改动影响的用例：diff 文件、- 或 git 版本 / Evaluate only cases affected by a prompt change: a diff file, - or a git revision"),
 ):
     """运行评测（不优化）/ Run evaluation (no optimization)"""
     from agent_evo.cli.commands.eval import run_eval
     tag_list = tags.split(",") if tags else None
-    asyncio.run(run_eval(config, tag_list, output, tier, include_silver))
+    _run_command(run_eval(config, tag_list, output, tier, include_silver, budget, trace, profile, order.value, seed, sample, affected_by))
 
 
 @app.command()
@@ -68,11 +95,16 @@ def auto(
     include_silver: bool = typer.Option(False, "--include-silver", help="同时包含白银测评集 / Include silver test cases"),
     pr: bool = typer.Option(False, "--pr", help="创建 PR / Create PR"),
     output: Optional[str] = typer.Option(None, "-o", "--output", help="报告输出路径 / Report output path"),
+    budget: Optional[float] = typer.Option(None, "--budget", help="LLM 花费上限（美元），超出后不再发起新调用 / LLM spend cap in USD, no new calls once exceeded"),
+    trace: Optional[str] = typer.Option(None, "--trace", help="启用链路追踪并写入 JSON 文件 / Enable tracing and write spans to a JSON file"),
+    profile: bool = typer.Option(False, "--profile", help="性能剖析，结果保存在报告旁 / Profile the run, saved next to the report"),
+    order: CaseOrder = typer.Option("file", "--order", help="用例执行顺序 / Case execution order"),
+    seed: Optional[int] = typer.Option(None, "--seed", help="--order random 的随机种子 / Random seed for --order random"),
 ):
     """一站式评测 + 自动优化（推荐）/ One-stop evaluation + auto optimization (recommended)"""
     from agent_evo.cli.commands.auto import run_auto
     tag_list = tags.split(",") if tags else None
-    asyncio.run(run_auto(config, tag_list, tier, include_silver, pr, output))
+    _run_command(run_auto(config, tag_list, tier, include_silver, pr, output, budget, trace, profile, order.value, seed))
 
 
 @app.command()
@@ -84,11 +116,19 @@ def run(
     fix: bool = typer.Option(False, "--fix", help="自动修复失败用例 / Auto-fix failed cases"),
     pr: bool = typer.Option(False, "--pr", help="创建 PR / Create PR"),
     dry_run: bool = typer.Option(False, "--dry-run", help="预览模式，不实际修改 / Preview mode, no actual modifications"),
+    budget: Optional[float] = typer.Option(None, "--budget", help="LLM 花费上限（美元），超出后不再发起新调用 / LLM spend cap in USD, no new calls once exceeded"),
+    trace: Optional[str] = typer.Option(None, "--trace", help="启用链路追踪并写入 JSON 文件 / Enable tracing and write spans to a JSON file"),
+    profile: bool = typer.Option(False, "--profile", help="性能剖析，结果保存在报告旁 / Profile the run, saved next to the report"),
+    order: CaseOrder = typer.Option("file", "--order", help="用例执行顺序 / Case execution order"),
+    seed: Optional[int] = typer.Option(None, "--seed", help="--order random 的随机种子 / Random seed for --order random"),
+    profile_output: Optional[str] = typer.Option(None, "--profile-output", help="剖析结果的路径前缀（默认 reports/run_<时间戳>）/ Path prefix for --profile output (default reports/run_<timestamp>)"),
 ):
     """运行完整流程（评测 + 优化 + PR）/ Run full pipeline (eval + optimize + PR)"""
     from agent_evo.cli.commands.run import run_pipeline
     tag_list = tags.split(",") if tags else None
-    asyncio.run(run_pipeline(config, tag_list, fix, pr, dry_run, tier, include_silver))
+    _run_command(run_pipeline(
+        config, tag_list, fix, pr, dry_run, tier, include_silver, budget, trace, profile, order.value, seed, profile_output,
+    ))
 
 
 @app.command()
@@ -108,10 +148,12 @@ def mutate(
     count: int = typer.Option(3, "--count", help="每条种子生成数量 / Number of mutations per seed"),
     output: str = typer.Option("./tests/silver/generated.yaml", "-o", "--output", help="输出文件路径 / Output file path"),
     config: str = typer.Option("agent-evo.yaml", "-c", "--config", help="配置文件路径 / Config file path"),
+    budget: Optional[float] = typer.Option(None, "--budget", help="LLM 花费上限（美元），超出后不再发起新调用 / LLM spend cap in USD, no new calls once exceeded"),
+    concurrency: Optional[int] = typer.Option(None, "--concurrency", min=1, help="并发变异的种子数，覆盖 mutation.concurrency / Seeds mutated concurrently, overrides mutation.concurrency"),
 ):
     """基于黄金集变异扩充测评集 / Expand test suite via mutation from gold set"""
     from agent_evo.cli.commands.mutate import run_mutate
-    asyncio.run(run_mutate(config, seed, count, output))
+    _run_command(run_mutate(config, seed, count, output, budget, concurrency))
 
 
 @app.command()
@@ -134,6 +176,14 @@ def import_cmd(
     output: str = typer.Option("./tests/silver/production.yaml", "-o", "--output", help="输出文件路径 / Output file path"),
     auto_refine: bool = typer.Option(True, "--auto-refine/--no-auto-refine", help="自动提炼为标准 TestCase / Auto-refine to standard TestCase"),
     config: str = typer.Option("agent-evo.yaml", "-c", "--config", help="配置文件路径 / Config file path"),
+    budget: Optional[float] = typer.Option(None, "--budget", help="LLM 花费上限（美元），超出后不再发起新调用 / LLM spend cap in USD, no new calls once exceeded"),
+    concurrency: Optional[int] = typer.Option(None, "--concurrency", min=1, help="同时进行的 LLM 提炼调用数，覆盖 import.concurrency / Refinement calls in flight, overrides import.concurrency"),
+    resume: bool = typer.Option(True, "--resume/--no-resume", help="--source 中断后从断点继续 / Resume an interrupted --source import from its checkpoint"),
+    full: bool = typer.Option(False, "--full", help="--source 忽略水位全量拉取 / Ignore the --source watermark and fetch everything"),
+    sample: Optional[int] = typer.Option(None, "--sample", min=1, help="最多提炼的记录数，覆盖 import.sampling.max_records / Max records to refine, overrides import.sampling.max_records"),
+    per_stratum: Optional[int] = typer.Option(None, "--per-stratum", min=1, help="每层最多提炼的记录数，覆盖 import.sampling.max_per_stratum / Max records refined per stratum, overrides import.sampling.max_per_stratum"),
+    stratify_by: Optional[str] = typer.Option(None, "--stratify-by", help="分层依据：error_type、cluster、metadata.<key> / Strata: error_type, cluster, metadata.<key>"),
+    sample_method: Optional[str] = typer.Option(None, "--sample-method", help="采样方式：first 或 reservoir / Sampling method: first or reservoir"),
 ):
     """从线上数据导入测评集 / Import test cases from production data
 
@@ -142,22 +192,55 @@ def import_cmd(
       --source  从 HTTP API 数据源拉取 / Fetch from HTTP API source
     """
     from agent_evo.cli.commands.import_cmd import run_import, run_import_from_source
+    if sample_method not in (None, "first", "reservoir"):
+        console.print("[red]--sample-method: first / reservoir[/red]")
+        raise typer.Exit(1)
+    sampling = {
+        "max_records": sample, "max_per_stratum": per_stratum, "stratify_by": stratify_by, "method": sample_method,
+    }
     if source:
-        asyncio.run(run_import_from_source(config, source, output, auto_refine))
+        _run_command(run_import_from_source(config, source, output, auto_refine, budget, concurrency, resume, full, sampling))
     elif file:
-        asyncio.run(run_import(config, file, format, output, auto_refine))
+        _run_command(run_import(config, file, format, output, auto_refine, budget, concurrency, sampling))
     else:
         console.print("[red]请指定 --file 或 --source / Please specify --file or --source[/red]")
         raise typer.Exit(1)
 
 
+@app.command()
+def dedupe(
+    threshold: Optional[float] = typer.Option(None, "--threshold", min=0.0, max=1.0, help="相似度阈值，覆盖 dedup.threshold / Similarity threshold, overrides dedup.threshold"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="只报告不删除 / Report only, do not delete"),
+    config: str = typer.Option("agent-evo.yaml", "-c", "--config", help="配置文件路径 / Config file path"),
+):
+    """清理测评集中的近似重复用例 / Remove near-duplicate cases from the test suites"""
+    from agent_evo.cli.commands.dedupe import run_dedupe
+    run_dedupe(config, threshold, dry_run)
+
+
+@app.command()
+def similar(
+    text: str = typer.Argument(..., help="要查询的文本 / Text to look up"),
+    field: str = typer.Option("input", "--field", help="比较的字段：input 或 output（期望输出）/ Field to compare: input or output (expected output)"),
+    limit: int = typer.Option(5, "-k", "--limit", min=1, help="最多返回条数 / Maximum results"),
+    threshold: Optional[float] = typer.Option(None, "--threshold", min=0.0, max=1.0, help="相似度阈值，覆盖 dedup.related_threshold / Similarity threshold, overrides dedup.related_threshold"),
+    config: str = typer.Option("agent-evo.yaml", "-c", "--config", help="配置文件路径 / Config file path"),
+):
+    """在测评集中查找相似用例 / Find similar cases in the test suites"""
+    from agent_evo.cli.commands.similar import run_similar
+    if field not in ("input", "output"):
+        console.print("[red]--field 只能为 input 或 output / --field must be input or output[/red]")
+        raise typer.Exit(1)
+    run_similar(config, text, field, limit, threshold)
+
+
 @app.command(name="gate-check")
 def gate_check(
     config: str = typer.Option("agent-evo.yaml", "-c", "--config", help="配置文件路径 / Config file path"),
 ):
     """发布前门禁检查 / Pre-release gate check"""
     from agent_evo.cli.commands.gate_check import run_gate_check
-    asyncio.run(run_gate_check(config))
+    _run_command(run_gate_check(config))
 
 
 @app.command()
@@ -0,0 +1,399 @@
+"""近似重复检测 / Near-duplicate detection
+
+用输入文本字符 n-gram 的 MinHash 签名估计两条用例的 Jaccard 相似度，
+再用 LSH 分桶快速找出候选，不需要嵌入模型或额外依赖，对中英文都适用。
+签名采用单次哈希 MinHash（one permutation hashing + 致密化），每个 n-gram 只哈希一次。
+Estimates the Jaccard similarity of two cases from MinHash signatures of character n-grams of
+their input, with LSH banding to find candidates quickly. Needs no embedding model or extra
+dependency and works for both Chinese and English text. Signatures use one permutation hashing
+with densification, so each n-gram is hashed only once.
+
+用法 / Usage:
+    index = MinHashIndex(threshold=0.8)
+    for case in existing:
+        index.add(case.id, index.signature(case.input_query))
+    unique, duplicates = find_duplicates(new_cases, existing, config.dedup)
+
+整个测评集（黄金集 + 白银集）的索引由 CorpusIndex 持久化在 dedup.index_path，
+按 YAML 文件的修改时间与大小增量更新，供去重与「相似用例」查询复用：
+The index over the whole corpus (gold + silver) is persisted by CorpusIndex at dedup.index_path,
+updated incrementally by YAML file mtime and size, and shared by dedup and "similar cases" lookups:
+    corpus = load_corpus_index(config)
+    corpus.similar("How do I reset my password?")
+"""
+
+import base64
+import hashlib
+import json
+import operator
+import re
+import struct
+from collections import Counter
+from glob import glob
+from pathlib import Path
+from typing import Any, Optional
+
+from agent_evo.core.serializer import load_test_cases_from_yaml
+from agent_evo.models import Config, TestCase
+from agent_evo.models.config import DedupConfig
+
+_EMPTY = 0xFFFFFFFF           # 空桶标记 / Empty bin marker
+_OFFSET = 1 << 32             # 致密化的距离偏移 / Distance offset for densification
+_MIN_SCORED = 64             # 限定条数查询时至少评分的候选数 / Min candidates scored for limited queries
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """小写并折叠空白 / Lowercase and collapse whitespace"""
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+
+def shingles(text: str, ngram: int = 3) -> set[str]:
+    """字符 n-gram 集合 / Set of character n-grams"""
+    text = normalize(text)
+    if len(text) <= ngram:
+        return {text} if text else set()
+    return {text[i:i + ngram] for i in range(len(text) - ngram + 1)}
+
+
+def _lsh_params(num_perm: int, threshold: float) -> tuple[int, int]:
+    """选择分桶数与每桶行数：候选阈值 (1/b)^(1/r) 取不超过 threshold - 0.1 的最大值，宁多勿漏；
+    行数不必整除 num_perm，多余的签名位置只参与相似度计算
+    Pick bands and rows: the candidate threshold (1/b)^(1/r) is the largest one not above
+    threshold - 0.1, favouring extra candidates over missed ones; rows need not divide num_perm,
+    leftover signature positions only count towards similarity"""
+    best = (num_perm, 1)
+    best_t = 0.0
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        t = (1 / bands) ** (1 / rows)
+        if best_t < t <= threshold - 0.1:
+            best, best_t = (bands, rows), t
+    return best
+
+
+class MinHashIndex:
+    """MinHash-LSH 索引 / MinHash-LSH index
+
+    signatures 为 key → 签名，可直接序列化；桶由签名重建。
+    signatures maps key → signature and can be serialized as is; buckets are rebuilt from it.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, ngram: int = 3, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self._salt = seed.to_bytes(8, "big")
+        self.bands, self.rows = _lsh_params(num_perm, threshold)
+        self.signatures: dict[str, tuple[int, ...]] = {}
+        self._buckets: list[dict[tuple[int, ...], list[str]]] = [{} for _ in range(self.bands)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.signatures
+
+    def sketch(self, text: str) -> bytes:
+        """文本的原始 MinHash 桶（每桶 32 位，便于持久化）/ Raw MinHash bins of a text (32 bits each, for persistence)
+
+        每个 n-gram 的哈希值按 hash % num_perm 落入一个桶，桶内取最小值。
+        Each n-gram hash falls into bin hash % num_perm, keeping the minimum per bin.
+        """
+        k = self.num_perm
+        bins = [_EMPTY] * k
+        for s in shingles(text, self.ngram):
+            h = int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8, salt=self._salt).digest(), "big")
+            b, v = h % k, (h >> 32) % _EMPTY
+            if v < bins[b]:
+                bins[b] = v
+        return struct.pack(f">{k}I", *bins)
+
+    def densify(self, sketch: bytes) -> tuple[int, ...]:
+        """由原始桶得到签名：空桶借用右侧（循环）最近的非空桶并加上距离偏移，保证估计无偏
+        Signature from raw bins: empty bins borrow from the nearest non-empty bin to the right
+        (circularly) plus a distance offset, which keeps the estimate unbiased"""
+        k = self.num_perm
+        bins = struct.unpack(f">{k}I", sketch)
+        if all(v == _EMPTY for v in bins):
+            return (_EMPTY,) * k
+        signature = list(bins)
+        for i in range(k):
+            if bins[i] == _EMPTY:
+                distance = 1
+                while bins[(i + distance) % k] == _EMPTY:
+                    distance += 1
+                signature[i] = bins[(i + distance) % k] + distance * _OFFSET
+        return tuple(signature)
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        """文本的 MinHash 签名 / MinHash signature of a text"""
+        return self.densify(self.sketch(text))
+
+    @staticmethod
+    def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+        """由签名估计的 Jaccard 相似度 / Jaccard similarity estimated from signatures"""
+        return sum(map(operator.eq, a, b)) / len(a)
+
+    def _bands_of(self, signature: tuple[int, ...]):
+        for i in range(self.bands):
+            yield i, signature[i * self.rows:(i + 1) * self.rows]
+
+    def add(self, key: str, signature: tuple[int, ...]) -> None:
+        """加入索引 / Add to the index"""
+        self.signatures[key] = signature
+        for i, band in self._bands_of(signature):
+            self._buckets[i].setdefault(band, []).append(key)
+
+    def query(self, signature: tuple[int, ...]) -> Optional[tuple[str, float]]:
+        """最相似且达到阈值的已有 key 与相似度，没有则为 None
+        The most similar existing key at or above the threshold with its similarity, or None"""
+        matches = self.query_all(signature, limit=1)
+        return matches[0] if matches else None
+
+    def query_all(
+        self, signature: tuple[int, ...], threshold: Optional[float] = None, limit: Optional[int] = None,
+    ) -> list[tuple[str, float]]:
+        """达到阈值的所有 key 与相似度，按相似度降序；阈值低于建索引阈值时可能漏掉部分结果
+        All keys at or above the threshold with their similarity, most similar first; thresholds
+        below the index threshold may miss some results"""
+        threshold = self.threshold if threshold is None else threshold
+        collisions: Counter[str] = Counter()
+        for i, band in self._bands_of(signature):
+            collisions.update(self._buckets[i].get(band, ()))
+        if limit:
+            # 只为碰撞分桶最多的候选计算相似度，避免高度相似的语料中逐一比较
+            # Only score the candidates sharing the most bands, so highly similar corpora do not degrade to a scan
+            candidates = [key for key, _ in collisions.most_common(max(limit * 8, _MIN_SCORED))]
+        else:
+            candidates = list(collisions)
+        matches = []
+        for key in candidates:
+            score = self.similarity(signature, self.signatures[key])
+            if score >= threshold:
+                matches.append((key, score))
+        matches.sort(key=lambda m: (-m[1], m[0]))
+        return matches[:limit] if limit else matches
+
+    def remove(self, key: str) -> None:
+        """从索引中移除 / Remove from the index"""
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for i, band in self._bands_of(signature):
+            bucket = self._buckets[i].get(band)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[i][band]
+
+
+def build_index(cases: list[TestCase], config: DedupConfig) -> MinHashIndex:
+    """用已有用例建立索引 / Build an index from existing cases"""
+    index = MinHashIndex(config.threshold, config.num_perm, config.ngram)
+    for case in cases:
+        index.add(case.id, index.signature(case.input_query))
+    return index
+
+
+def find_duplicates(
+    cases: list[TestCase],
+    existing: list[TestCase],
+    config: DedupConfig,
+    index: Optional[MinHashIndex] = None,
+) -> tuple[list[TestCase], list[tuple[TestCase, str, float]]]:
+    """找出与已有用例或彼此近似重复的用例 / Find cases that near-duplicate existing cases or each other
+
+    返回 (保留的用例, [(重复用例, 重复于, 相似度)])；保留的用例会加入索引。
+    Returns (kept cases, [(duplicate, duplicate of, similarity)]); kept cases are added to the index.
+    """
+    index = index if index is not None else build_index(existing, config)
+    unique: list[TestCase] = []
+    duplicates: list[tuple[TestCase, str, float]] = []
+    for case in cases:
+        signature = index.signature(case.input_query)
+        match = index.query_all(signature, threshold=config.threshold, limit=1)
+        if match:
+            duplicates.append((case, match[0][0], match[0][1]))
+        else:
+            unique.append(case)
+            index.add(case.id, signature)
+    return unique, duplicates
+
+
+def suite_files(config: Config, include_silver: bool = True) -> list[str]:
+    """黄金集与白银集的 YAML 文件（黄金集在前）/ Gold and silver suite YAML files (gold first)"""
+    files: list[str] = []
+    patterns = [config.test_cases, config.silver_test_cases] if include_silver else [config.test_cases]
+    for pattern in patterns:
+        for f in sorted(glob(pattern, recursive=True)):
+            if f not in files:
+                files.append(f)
+    return files
+
+
+class CorpusIndex:
+    """测评集的持久化 MinHash-LSH 索引（输入与期望输出各一份）
+    Persistent MinHash-LSH index over the test corpus (one for inputs, one for expected outputs)
+
+    文件中按 YAML 文件保存每条用例的原始 MinHash 桶及文件的修改时间与大小；
+    refresh 只重新读取变化的文件并移除已删除的文件，LSH 桶在加载时由签名重建。
+    The file stores each case's raw MinHash bins per YAML file, along with the file's mtime and size;
+    refresh only re-reads changed files and drops deleted ones, and LSH buckets are rebuilt from the
+    signatures on load.
+
+    LSH 按 min(threshold, related_threshold) 分桶，因此去重与相似查询都能用同一份索引。
+    同一 case_id 出现在多个文件中时，以先索引的为准。
+    LSH bands are tuned for min(threshold, related_threshold), so dedup and similarity lookups share
+    one index. When a case_id appears in several files, the one indexed first wins.
+    """
+
+    FIELDS = ("input", "output")
+
+    def __init__(self, config: DedupConfig, path: Path, files: Optional[dict[str, dict[str, Any]]] = None):
+        self.config = config
+        self.path = path
+        lsh_threshold = min(config.threshold, config.related_threshold)
+        self.inputs = MinHashIndex(lsh_threshold, config.num_perm, config.ngram)
+        self.outputs = MinHashIndex(lsh_threshold, config.num_perm, config.ngram)
+        # file -> {"mtime_ns", "size", "cases": {case_id: [input 桶, output 桶或 None]}}
+        # file -> {"mtime_ns", "size", "cases": {case_id: [input bins, output bins or None]}}
+        self.files: dict[str, dict[str, Any]] = {}
+        # case_id -> 所在文件 / file holding the case
+        self.case_files: dict[str, str] = {}
+        self.dirty = False
+        for f, entry in (files or {}).items():
+            self._add_file(f, entry)
+
+    def __len__(self) -> int:
+        return len(self.case_files)
+
+    @property
+    def _params(self) -> dict[str, int]:
+        return {"num_perm": self.config.num_perm, "ngram": self.config.ngram}
+
+    @classmethod
+    def load(cls, config: DedupConfig, project_dir: Path) -> "CorpusIndex":
+        """读取索引文件；不存在、损坏或签名参数变化时从空索引开始
+        Load the index file; start empty if it is missing, corrupt or the signature parameters changed"""
+        path = project_dir / config.index_path
+        data: dict[str, Any] = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        index = cls(config, path)
+        if data.get("params") == index._params:
+            for f, entry in data.get("files", {}).items():
+                index._add_file(f, entry)
+        else:
+            index.dirty = bool(data)
+        return index
+
+    def save(self) -> None:
+        """有变化时写回索引文件 / Write the index file if anything changed"""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({"version": 1, "params": self._params, "files": self.files}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        self.dirty = False
+
+    def refresh(self, files: list[str]) -> tuple[int, int]:
+        """与给定的 YAML 文件同步：重新索引新增或变化的文件，移除不在列表中的文件
+        Sync with the given YAML files: re-index new or changed files and drop files not in the list
+
+        返回 (重新索引的文件数, 移除的文件数)。
+        Returns (files re-indexed, files dropped).
+        """
+        updated = 0
+        for f in files:
+            try:
+                stat = Path(f).stat()
+            except OSError:
+                continue
+            entry = self.files.get(f)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            self._drop_file(f)
+            cases: dict[str, list[Optional[str]]] = {}
+            for case in load_test_cases_from_yaml(f):
+                output = case.expected_output
+                cases[case.id] = [
+                    self._encode(self.inputs.sketch(case.input_query)),
+                    self._encode(self.outputs.sketch(output)) if output else None,
+                ]
+            self._add_file(f, {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "cases": cases})
+            updated += 1
+
+        wanted = set(files)
+        removed = [f for f in self.files if f not in wanted]
+        for f in removed:
+            self._drop_file(f)
+        if updated or removed:
+            self.dirty = True
+        return updated, len(removed)
+
+    def similar(
+        self, text: str, field: str = "input", threshold: Optional[float] = None, limit: Optional[int] = 5,
+    ) -> list[tuple[str, str, float]]:
+        """与文本相似的已索引用例 [(case_id, 文件, 相似度)]，按相似度降序；阈值默认 related_threshold
+        Indexed cases similar to the text as [(case_id, file, similarity)], most similar first;
+        the threshold defaults to related_threshold"""
+        index = self.inputs if field == "input" else self.outputs
+        threshold = self.config.related_threshold if threshold is None else threshold
+        return [
+            (key, self.case_files[key], score)
+            for key, score in index.query_all(index.signature(text), threshold=threshold, limit=limit)
+            if key in self.case_files
+        ]
+
+    @staticmethod
+    def _encode(sketch: bytes) -> str:
+        return base64.b64encode(sketch).decode("ascii")
+
+    def _add_file(self, f: str, entry: dict[str, Any]) -> None:
+        self.files[f] = entry
+        for case_id, sketches in entry.get("cases", {}).items():
+            if case_id not in self.case_files:
+                self._add_case(case_id, f, sketches)
+
+    def _add_case(self, case_id: str, f: str, sketches: list[Optional[str]]) -> None:
+        input_sketch, output_sketch = sketches
+        self.case_files[case_id] = f
+        self.inputs.add(case_id, self.inputs.densify(base64.b64decode(input_sketch)))
+        if output_sketch:
+            self.outputs.add(case_id, self.outputs.densify(base64.b64decode(output_sketch)))
+
+    def _drop_file(self, f: str) -> None:
+        entry = self.files.pop(f, None)
+        if entry is None:
+            return
+        orphaned = []
+        for case_id in entry.get("cases", {}):
+            if self.case_files.get(case_id) == f:
+                del self.case_files[case_id]
+                self.inputs.remove(case_id)
+                self.outputs.remove(case_id)
+                orphaned.append(case_id)
+        # 被遮蔽的同 ID 用例由下一个先索引的文件接替 / A shadowed case with the same ID passes to the next indexed file
+        for case_id in orphaned:
+            for other, other_entry in self.files.items():
+                sketches = other_entry.get("cases", {}).get(case_id)
+                if sketches:
+                    self._add_case(case_id, other, sketches)
+                    break
+
+
+def load_corpus_index(config: Config, files: Optional[list[str]] = None) -> CorpusIndex:
+    """加载测评集索引，与 YAML 文件（默认黄金集 + 白银集）同步后写回
+    Load the corpus index, sync it with the YAML files (gold + silver by default) and write it back"""
+    corpus = CorpusIndex.load(config.dedup, Path.cwd())
+    corpus.refresh(suite_files(config) if files is None else files)
+    corpus.save()
+    return corpus
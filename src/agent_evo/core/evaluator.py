@@ -4,16 +4,19 @@ import asyncio
 from typing import Optional
 
 from agent_evo.models import (
-    Config, CaseResult, CaseStatus, EvalReport, TagStats,
-    FactorResult, FactorSummary,
+    Config, TestCase, CaseResult, CaseStatus, EvalReport, TagStats,
+    FactorResult, FactorSummary, CascadeSummary,
 )
-from agent_evo.models.config import FactorConfig
-from agent_evo.core.generator import GeneratorResult
+from agent_evo.models.config import FactorConfig, LLMConfig
+from agent_evo.adapters.stream_guard import StreamGuard
+from agent_evo.core.generator import Generator, GeneratorResult
 from agent_evo.core.factors import (
-    EvaluationFactor, CoreJudgeFactor, CustomFactor,
+    EvaluationFactor, CoreJudgeFactor, CustomFactor, LatencyFactor,
 )
-from agent_evo.utils.llm import LLMClient
+from agent_evo.utils.llm import LLMClient, UsageTracker, BudgetExceededError
 from agent_evo.utils.i18n import t
+from agent_evo.utils.tracing import span
+from agent_evo.utils.stats import mean_variance, pass_at_k, wilson_interval
 
 
 class Evaluator:
@@ -25,10 +28,17 @@ class Evaluator:
     3. 检查致命因子 → 加权汇总 → 判定通过/失败 / Check fatal factors → weighted sum → pass/fail
     """
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, usage: Optional[UsageTracker] = None):
         self.config = config
-        self.llm = LLMClient(config.llm)
+        self.llm = LLMClient(config.llm, usage=usage)
         self.factors = self._init_factors()
+        # 评判缓存：(因子, 用例, 输入, 输出) → 评判任务，同一输出的并发评判共享一次调用
+        # Judge cache: (factor, case, input, output) → judging task; concurrent judgments of one output share a call
+        self._judge_cache: dict[tuple[str, str, str, str], asyncio.Future] = {}
+        # 由运行历史填充：用例不稳定度与被隔离的用例
+        # Filled from run history: case flakiness and quarantined cases
+        self.flakiness: dict[str, float] = {}
+        self.quarantined: set[str] = set()
 
     def _init_factors(self) -> list[EvaluationFactor]:
         """初始化因子列表，注入配置的权重和 fatal 设置
@@ -43,6 +53,13 @@ class Evaluator:
             for dim_id, cfg in self.config.judge.factors.items()
             if dim_id in ("content", "behavior", "structure")
         }
+        core.pass_threshold = self.config.judge.pass_threshold
+        cascade = self.config.judge.cascade
+        if cascade.enabled:
+            # 快速评判模型继承 llm 的配置并共享用量统计 / The fast judge inherits llm settings and shares usage
+            fast_config = LLMConfig.model_validate({**self.config.llm.model_dump(), **cascade.llm})
+            core.cascade = cascade
+            core.fast_llm = LLMClient(fast_config, usage=self.llm.usage)
         factors.append(core)
 
         # 自定义因子 / Custom factor
@@ -52,8 +69,32 @@ class Evaluator:
         custom.fatal = custom_cfg.fatal
         factors.append(custom)
 
+        # 耗时预算因子（默认致命，预算本身即门禁）/ Latency budget factor (fatal by default, budgets are gates)
+        latency = LatencyFactor(self.config.tag_policies)
+        latency_cfg: FactorConfig = self.config.judge.factors.get("latency", FactorConfig(fatal=True))
+        latency.weight = latency_cfg.weight
+        latency.fatal = latency_cfg.fatal
+        factors.append(latency)
+
         return factors
 
+    # ── 流式提前终止 / Streaming early stop ───────────────────
+
+    def build_stream_guard(self, case: TestCase) -> Optional[StreamGuard]:
+        """收集已激活因子的增量谓词 / Collect incremental predicates from activated factors"""
+        predicates = [
+            p for f in self.factors if f.is_triggered(case.expected)
+            for p in f.stream_predicates(case)
+        ]
+        return StreamGuard(predicates) if predicates else None
+
+    def attach_stream_guards(self, generator: Generator) -> None:
+        """配置了 early_stop 时，为执行器注册流式守卫
+        Register stream guards on the generator when early_stop is configured"""
+        http = self.config.agent.http
+        if http and http.stream and http.early_stop:
+            generator.stream_guard_factory = self.build_stream_guard
+
     # ── 单条用例评测 / Single case evaluation ────────────────
 
     async def evaluate_case(self, result: GeneratorResult) -> CaseResult:
@@ -71,48 +112,79 @@ class Evaluator:
                 error_message=result.error, tags=case.tags,
             )
 
+        # 流式输出超出上限被终止：输出不完整，直接判失败
+        # Stream stopped at a limit: the output is incomplete, fail directly
+        if result.aborted and result.aborted_dimension is None:
+            return CaseResult(
+                case_id=case.id, case_name=case.name, status=CaseStatus.FAILED,
+                input=case.input_query, output=result.output,
+                expected=case.expected.model_dump(),
+                factor_scores=[FactorResult(factor_id="early_stop", score=0.0, reason=result.aborted)],
+                weighted_score=0.0, score=0.0, passed=False,
+                fail_reason=t("stream_aborted").format(reason=result.aborted),
+                summary=t("stream_aborted").format(reason=result.aborted),
+                execution_time_ms=result.execution_time_ms, tags=case.tags,
+            )
+
+        # 每个维度的权重和 fatal 配置 / Weight and fatal config for each dimension
+        factor_configs = self._get_factor_configs()
+
+        # 谓词命中：其代替的维度记 0 分；该维度致命时直接判失败，不再调用 LLM
+        # A predicate fired: the dimension it stands in for scores 0; fail right away without the LLM when it is fatal
+        early_stop = None
+        if result.aborted:
+            early_stop = FactorResult(
+                factor_id=result.aborted_dimension, score=0.0,
+                reason=t("stream_aborted").format(reason=result.aborted), details={"early_stop": True},
+            )
+            if factor_configs.get(early_stop.factor_id, {}).get("fatal", False):
+                return self._fatal_result(result, [early_stop], early_stop)
+
         # 1. 激活因子并收集所有维度结果
         # 1. Activate factors and collect all dimension results
         all_factor_results: list[FactorResult] = []
         for f in self.factors:
             if f.is_triggered(case.expected):
-                results_list = await f.evaluate(case, result.output, llm=self.llm)
+                with span("judge", case_id=case.id, tags=case.tags, factor=f.factor_id) as s:
+                    results_list, cached = await self._judge(f, result)
+                    if s.is_recording():
+                        s.set_attribute("scores", [f"{fr.factor_id}={fr.score:.2f}" for fr in results_list])
+                        if cached:
+                            s.set_attribute("cached", True)
+                        cascade = self._cascade_info(results_list)
+                        if cascade:
+                            s.set_attribute("judge_tier", cascade["tier"])
                 all_factor_results.extend(results_list)
+        if early_stop is not None:
+            all_factor_results = [fr for fr in all_factor_results if fr.factor_id != early_stop.factor_id]
+            all_factor_results.append(early_stop)
+
+        # 跳过检查的维度（如测不到的耗时）只做展示，不参与评分
+        # Dimensions whose check was skipped (e.g. an unmeasured timing) are shown but not scored
+        scored = [fr for fr in all_factor_results if not fr.details.get("skipped")]
 
         # 无因子激活时，降级为简单通过
         # When no factor is activated, degrade to simple pass
-        if not all_factor_results:
+        if not scored:
             return CaseResult(
                 case_id=case.id, case_name=case.name, status=CaseStatus.PASSED,
                 input=case.input_query, output=result.output,
                 expected=case.expected.model_dump(), score=1.0, passed=True,
+                factor_scores=all_factor_results,
                 weighted_score=1.0, summary=t("no_factor_activated"),
                 execution_time_ms=result.execution_time_ms, tags=case.tags,
             )
 
-        # 2. 获取每个维度的权重和 fatal 配置
-        # 2. Get weight and fatal config for each dimension
-        factor_configs = self._get_factor_configs()
-
-        # 3. 致命因子检查 / 3. Fatal factor check
-        for fr in all_factor_results:
+        # 2. 致命因子检查 / 2. Fatal factor check
+        for fr in scored:
             cfg = factor_configs.get(fr.factor_id, {})
             if cfg.get("fatal", False) and fr.score < 1.0:
-                return CaseResult(
-                    case_id=case.id, case_name=case.name, status=CaseStatus.FAILED,
-                    input=case.input_query, output=result.output,
-                    expected=case.expected.model_dump(),
-                    factor_scores=all_factor_results, weighted_score=0.0,
-                    score=0.0, passed=False,
-                    fail_reason=t("fatal_factor_fail").format(fid=fr.factor_id, reason=fr.reason),
-                    summary=t("fatal_factor_summary").format(fid=fr.factor_id),
-                    execution_time_ms=result.execution_time_ms, tags=case.tags,
-                )
-
-        # 4. 加权汇总 / 4. Weighted aggregation
+                return self._fatal_result(result, all_factor_results, fr)
+
+        # 3. 加权汇总 / 3. Weighted aggregation
         total_weight = 0.0
         weighted_sum = 0.0
-        for fr in all_factor_results:
+        for fr in scored:
             w = factor_configs.get(fr.factor_id, {}).get("weight", 1.0)
             total_weight += w
             weighted_sum += w * fr.score
@@ -124,7 +196,7 @@ class Evaluator:
         if not passed:
             failed_factors = [
                 f"{fr.factor_id}({fr.score:.2f}): {fr.reason}"
-                for fr in all_factor_results if fr.score < 1.0
+                for fr in scored if fr.score < 1.0
             ]
             fail_reason = t("weighted_below_threshold").format(score=weighted_score, threshold=self.config.judge.pass_threshold) + "; " + "; ".join(failed_factors)
 
@@ -139,6 +211,32 @@ class Evaluator:
             execution_time_ms=result.execution_time_ms, tags=case.tags,
         )
 
+    async def _judge(self, factor: EvaluationFactor, result: GeneratorResult) -> tuple[list[FactorResult], bool]:
+        """执行因子评判，可缓存的因子对相同输出复用结果
+        Run a factor, reusing the result for identical outputs when the factor is cacheable
+
+        返回 (结果, 是否命中缓存) / Returns (results, whether the cache was hit)
+        """
+        case = result.case
+        if not factor.cacheable:
+            return await factor.evaluate(case, result.output, llm=self.llm, execution=result), False
+
+        key = (factor.factor_id, case.id, case.input_query, result.output)
+        future = self._judge_cache.get(key)
+        cached = future is not None
+        if future is None:
+            future = asyncio.ensure_future(factor.evaluate(case, result.output, llm=self.llm, execution=result))
+            self._judge_cache[key] = future
+
+            # 失败的评判不缓存，下次重新评判 / Failed judgments aren't cached and are retried next time
+            def _drop_failed(f: asyncio.Future, key=key) -> None:
+                if f.cancelled() or f.exception() is not None:
+                    self._judge_cache.pop(key, None)
+            future.add_done_callback(_drop_failed)
+
+        results_list = await asyncio.shield(future)
+        return [fr.model_copy(deep=True) for fr in results_list], cached
+
     def _get_factor_configs(self) -> dict[str, dict]:
         """从配置和 CoreJudgeFactor 中提取所有维度的权重/fatal
         Extract weight/fatal for all dimensions from config and CoreJudgeFactor"""
@@ -162,7 +260,12 @@ class Evaluator:
 
         async def eval_with_semaphore(result: GeneratorResult) -> CaseResult:
             async with semaphore:
-                return await self.evaluate_case(result)
+                try:
+                    return await self.evaluate_case(result)
+                except BudgetExceededError:
+                    # 超出预算后不再发起新的评判，需要 LLM 的用例标记为跳过
+                    # No new judging once over budget, cases needing the LLM are skipped
+                    return self._skipped_result(result)
 
         eval_tasks = [eval_with_semaphore(r) for r in results]
         raw_results = await asyncio.gather(*eval_tasks, return_exceptions=True)
@@ -182,22 +285,44 @@ class Evaluator:
                 ))
             else:
                 case_results.append(res)
+        for case_result, result in zip(case_results, results):
+            case_result.batched = result.batched
+
+        cascade = self._cascade_summary(case_results) if self.config.judge.cascade.enabled else None
+
+        # 合并同一用例的多次采样 / Merge the samples of each case
+        case_results, sample_outcomes = self._merge_samples(results, case_results)
+
+        # 标注不稳定度；被隔离的用例保留在结果中，但不计入统计与门禁
+        # Annotate flakiness; quarantined cases stay in the results but are excluded from stats and gating
+        quarantined: list[str] = []
+        for r in case_results:
+            r.flakiness = self.flakiness.get(r.case_id)
+            if r.case_id in self.quarantined:
+                r.quarantined = True
+                quarantined.append(r.case_id)
+        counted = [
+            (r, outcome) for r, outcome in zip(case_results, sample_outcomes) if not r.quarantined
+        ]
 
         # 统计 / Statistics
-        total = len(case_results)
-        passed = sum(1 for r in case_results if r.status == CaseStatus.PASSED)
-        failed = sum(1 for r in case_results if r.status == CaseStatus.FAILED)
-        error = sum(1 for r in case_results if r.status == CaseStatus.ERROR)
+        total = len(counted)
+        passed = sum(1 for r, _ in counted if r.status == CaseStatus.PASSED)
+        failed = sum(1 for r, _ in counted if r.status == CaseStatus.FAILED)
+        error = sum(1 for r, _ in counted if r.status == CaseStatus.ERROR)
+        skipped = sum(1 for r, _ in counted if r.status == CaseStatus.SKIPPED)
 
         # 按 tag 统计 / Statistics by tag
         stats_by_tag: dict[str, TagStats] = {}
         failures_by_tag: dict[str, list[str]] = {}
-        for r in case_results:
+        for r, (n_samples, n_passed) in counted:
             for tag in r.tags:
                 if tag not in stats_by_tag:
                     stats_by_tag[tag] = TagStats()
                 stats = stats_by_tag[tag]
                 stats.total += 1
+                stats.samples += n_samples
+                stats.samples_passed += n_passed
                 if r.status == CaseStatus.PASSED:
                     stats.passed += 1
                 elif r.status == CaseStatus.FAILED:
@@ -210,6 +335,9 @@ class Evaluator:
         blocking_tags: list[str] = []
         for tag, stats in stats_by_tag.items():
             stats.pass_rate = stats.passed / stats.total if stats.total > 0 else 0.0
+            interval = wilson_interval(stats.samples_passed, stats.samples)
+            if interval:
+                stats.ci_low, stats.ci_high = interval
             policy = self.config.tag_policies.get(tag)
             if policy:
                 stats.threshold = policy.pass_threshold
@@ -222,7 +350,7 @@ class Evaluator:
         factor_summary = self._compute_factor_summary(case_results)
 
         return EvalReport(
-            total=total, passed=passed, failed=failed, error=error,
+            total=total, passed=passed, failed=failed, error=error, skipped=skipped,
             pass_rate=passed / total if total > 0 else 0.0,
             results=case_results,
             stats_by_tag=stats_by_tag,
@@ -230,6 +358,130 @@ class Evaluator:
             release_blocked=release_blocked,
             blocking_tags=blocking_tags,
             failures_by_tag=failures_by_tag,
+            quarantined=quarantined,
+            usage=self.llm.usage.summary(),
+            cascade=cascade,
+        )
+
+    def _merge_samples(
+        self, results: list[GeneratorResult], case_results: list[CaseResult],
+    ) -> tuple[list[CaseResult], list[tuple[int, int]]]:
+        """将同一用例的相邻采样合并为一条结果
+        Merge adjacent samples of the same case into one result
+
+        返回 (合并后的结果, 每条结果的 (采样数, 通过采样数)) /
+        Returns (merged results, (samples, passed samples) per result)
+        """
+        merged: list[CaseResult] = []
+        outcomes: list[tuple[int, int]] = []
+        i = 0
+        while i < len(results):
+            j = i + 1
+            while j < len(results) and results[j].case is results[i].case and results[j].sample_index > 0:
+                j += 1
+            group = case_results[i:j]
+            if len(group) == 1:
+                group[0].samples_passed = 1 if group[0].status == CaseStatus.PASSED else 0
+                merged.append(group[0])
+                outcomes.append((1, group[0].samples_passed))
+            else:
+                merged.append(self._aggregate_samples(group))
+                outcomes.append((len(group), merged[-1].samples_passed))
+            i = j
+        return merged, outcomes
+
+    def _aggregate_samples(self, samples: list[CaseResult]) -> CaseResult:
+        """汇总多次采样：pass@k、平均分与方差，按通过比例判定用例状态
+        Aggregate samples: pass@k, mean score and variance; case status from the passing fraction
+
+        采样出错计为未通过；全部出错时用例为 ERROR，存在跳过的采样时用例为 SKIPPED。
+        Errored samples count as not passing; the case is ERROR if all samples errored and SKIPPED
+        if any sample was skipped.
+        """
+        n = len(samples)
+        c = sum(1 for r in samples if r.status == CaseStatus.PASSED)
+        scores = [r.score for r in samples]
+        mean, variance = mean_variance(scores)
+
+        if any(r.status == CaseStatus.SKIPPED for r in samples):
+            status = CaseStatus.SKIPPED
+        elif all(r.status == CaseStatus.ERROR for r in samples):
+            status = CaseStatus.ERROR
+        elif c / n >= self.config.judge.sample_pass_ratio:
+            status = CaseStatus.PASSED
+        else:
+            status = CaseStatus.FAILED
+
+        # 以与最终状态一致的第一个采样为代表，保留其输出与因子归因
+        # The first sample matching the final status is the representative, keeping its output and attribution
+        representative = next((r for r in samples if r.status == status), None)
+        if representative is None:
+            representative = next((r for r in samples if r.status != CaseStatus.PASSED), samples[0])
+
+        merged = representative.model_copy(update={
+            "status": status,
+            "passed": status == CaseStatus.PASSED,
+            "score": mean,
+            "weighted_score": mean,
+            "summary": t("samples_summary").format(passed=c, n=n, mean=mean, var=variance),
+            "execution_time_ms": int(sum(r.execution_time_ms for r in samples) / n),
+            "batched": any(r.batched for r in samples),
+            "samples": n,
+            "samples_passed": c,
+            "sample_scores": scores,
+            "pass_at_k": {k: pass_at_k(n, c, k) for k in range(1, n + 1)},
+            "mean_score": mean,
+            "score_variance": variance,
+        })
+        if status == CaseStatus.PASSED:
+            merged.fail_reason = None
+        return merged
+
+    @staticmethod
+    def _cascade_info(factor_results: list[FactorResult]) -> Optional[dict]:
+        """核心评判的级联信息（tier / reason）/ Cascade info of the core judgment (tier / reason)"""
+        return next((fr.details["cascade"] for fr in factor_results if "cascade" in fr.details), None)
+
+    def _cascade_summary(self, case_results: list[CaseResult]) -> CascadeSummary:
+        """统计快速评判与升级次数（按采样计）/ Count fast judgments and escalations (per sample)"""
+        summary = CascadeSummary()
+        for r in case_results:
+            info = self._cascade_info(r.factor_scores)
+            if info is None:
+                continue
+            summary.judged += 1
+            if info["tier"] == "strong":
+                summary.escalated += 1
+                summary.by_reason[info["reason"]] = summary.by_reason.get(info["reason"], 0) + 1
+        return summary
+
+    @staticmethod
+    def _fatal_result(
+        result: GeneratorResult, factor_scores: list[FactorResult], fatal: FactorResult,
+    ) -> CaseResult:
+        """致命维度未通过的用例 / Case failed by a fatal dimension"""
+        case = result.case
+        return CaseResult(
+            case_id=case.id, case_name=case.name, status=CaseStatus.FAILED,
+            input=case.input_query, output=result.output,
+            expected=case.expected.model_dump(),
+            factor_scores=factor_scores, weighted_score=0.0,
+            score=0.0, passed=False,
+            fail_reason=t("fatal_factor_fail").format(fid=fatal.factor_id, reason=fatal.reason),
+            summary=t("fatal_factor_summary").format(fid=fatal.factor_id),
+            execution_time_ms=result.execution_time_ms, tags=case.tags,
+        )
+
+    @staticmethod
+    def _skipped_result(result: GeneratorResult) -> CaseResult:
+        """因超预算未评判的用例 / Case left unjudged because the budget was exceeded"""
+        case = result.case
+        return CaseResult(
+            case_id=case.id, case_name=case.name, status=CaseStatus.SKIPPED,
+            input=case.input_query, output=result.output,
+            expected=case.expected.model_dump(), score=0.0,
+            summary=t("budget_skipped"),
+            execution_time_ms=result.execution_time_ms, tags=case.tags,
         )
 
     @staticmethod
@@ -239,8 +491,12 @@ class Evaluator:
         for r in results:
             for fr in r.factor_scores:
                 if fr.factor_id not in summaries:
-                    summaries[fr.factor_id] = {"scores": [], "fail": 0, "fatal_fail": 0}
+                    summaries[fr.factor_id] = {"scores": [], "fail": 0, "fatal_fail": 0, "skipped": 0}
                 s = summaries[fr.factor_id]
+                if fr.details.get("skipped"):
+                    # 未验证的检查单独计数，避免通过结果被误读为已验证 / Counted apart so a pass is not read as verified
+                    s["skipped"] += 1
+                    continue
                 s["scores"].append(fr.score)
                 if fr.score < 1.0:
                     s["fail"] += 1
@@ -252,6 +508,7 @@ class Evaluator:
                 avg_score=sum(data["scores"]) / len(data["scores"]) if data["scores"] else 0.0,
                 fail_count=data["fail"],
                 fatal_fail_count=data["fatal_fail"],
+                skipped_count=data["skipped"],
             )
             for fid, data in summaries.items()
         }
@@ -10,6 +10,8 @@ Evaluation is divided into two types of factors:
    If user provides additional precise validation rules (keywords, JSON Schema, etc.), deterministic checks are layered on top.
 2. CustomFactor — 用户提供自定义校验函数时才激活。
    Activated only when user provides custom validation functions.
+3. LatencyFactor — 配置了耗时预算（用例或 tag 级别）时激活，确定性检查，不调用 LLM。
+   Activated when latency budgets are configured (case or tag level); deterministic, no LLM call.
 """
 
 import importlib
@@ -17,13 +19,24 @@ import json
 import re
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
+from agent_evo.adapters.stream_guard import (
+    StreamPredicate, ForbiddenKeywordPredicate, ForbiddenToolPredicate,
+)
+from agent_evo.models.config import JudgeCascadeConfig, TagPolicyConfig
 from agent_evo.models.test_case import ExpectedOutput, TestCase
 from agent_evo.models.eval_result import FactorResult
-from agent_evo.utils.llm import LLMClient
+from agent_evo.utils.llm import LLMClient, BudgetExceededError
 from agent_evo.utils.i18n import t
 
+if TYPE_CHECKING:
+    from agent_evo.core.generator import GeneratorResult
+
+# 文本中的工具调用格式，评判与流式提前终止共用 / Text tool call formats, shared by judging and streaming early stop
+TOOL_CALL_XML = re.compile(r'<tool_call>\s*(\{.*?\})\s*</tool_call>', re.DOTALL)
+TOOL_CALL_ACTION = re.compile(r'Action:\s*(\S+)\s*\nAction Input:\s*(\{.*?\})(?:\n|$)', re.DOTALL)
+
 
 class EvaluationFactor(ABC):
     """评测因子基类 / Evaluation factor base class"""
@@ -31,14 +44,32 @@ class EvaluationFactor(ABC):
     factor_id: str = ""
     weight: float = 1.0
     fatal: bool = False
+    # 结果只取决于用例和输出时可缓存，相同输出不重复评判
+    # Cacheable when the result depends only on the case and the output, so identical outputs aren't re-judged
+    cacheable: bool = True
 
     @abstractmethod
     def is_triggered(self, expected: ExpectedOutput) -> bool:
         """根据 expected 字段判断是否激活 / Determine activation based on expected fields"""
 
     @abstractmethod
-    async def evaluate(self, case: TestCase, output: str, llm: Optional[LLMClient] = None) -> list[FactorResult]:
-        """执行评测，返回因子结果列表 / Execute evaluation, return factor result list"""
+    async def evaluate(
+        self,
+        case: TestCase,
+        output: str,
+        llm: Optional[LLMClient] = None,
+        execution: Optional["GeneratorResult"] = None,
+    ) -> list[FactorResult]:
+        """执行评测，返回因子结果列表 / Execute evaluation, return factor result list
+
+        execution 为本次执行的原始结果（含耗时），供需要执行信息的因子使用。
+        execution is the raw execution result (with timing) for factors that need it.
+        """
+
+    def stream_predicates(self, case: TestCase) -> list[StreamPredicate]:
+        """流式输出过程中可提前判定失败的增量谓词，默认无
+        Incremental predicates that can fail the case while output streams; none by default"""
+        return []
 
 
 # ─── 核心评判因子（一次 LLM 调用，三个维度）─────────────────
@@ -48,6 +79,10 @@ class CoreJudgeFactor(EvaluationFactor):
     """核心评判因子：一次 LLM 调用同时评判 content / behavior / structure 三个维度。
     Core judge factor: one LLM call evaluating content/behavior/structure dimensions.
 
+    启用级联时先由快速模型评判，分数接近通过阈值或维度间不一致时再调用主模型。
+    With a cascade, a fast model judges first; the main model is called when the score is near
+    the pass threshold or the dimensions disagree.
+
     LLM 会自动判断每个维度是否适用（applicable），不适用的维度不参与评分。
     LLM auto-determines applicability; inapplicable dimensions are excluded from scoring.
     如果用户额外提供了精确校验规则，则在 LLM 评判之外叠加确定性检查。
@@ -65,6 +100,11 @@ class CoreJudgeFactor(EvaluationFactor):
             "behavior": {"weight": 0.8, "fatal": False},
             "structure": {"weight": 0.5, "fatal": False},
         }
+        # 评判级联：快速模型与升级条件，由 Evaluator 注入（None 表示不级联）
+        # Judge cascade: fast model and escalation settings, injected by Evaluator (None disables it)
+        self.fast_llm: Optional[LLMClient] = None
+        self.cascade: Optional[JudgeCascadeConfig] = None
+        self.pass_threshold: float = 0.7
 
     @staticmethod
     def _load_judge_prompt() -> str:
@@ -76,18 +116,54 @@ class CoreJudgeFactor(EvaluationFactor):
     def is_triggered(self, expected: ExpectedOutput) -> bool:
         return expected.output is not None
 
-    async def evaluate(self, case: TestCase, output: str, llm: Optional[LLMClient] = None) -> list[FactorResult]:
-        results: list[FactorResult] = []
-
-        # ── 1. LLM 一次性评判三个维度 / 1. LLM evaluates three dimensions at once ──
-        llm_scores = {}
-        if llm and case.expected.output:
-            llm_scores = await self._llm_judge(case, output, llm)
-
-        # ── 2. 叠加精确校验规则 / 2. Layer on precise validation rules ──
+    def stream_predicates(self, case: TestCase) -> list[StreamPredicate]:
+        """not_contains 与禁止的工具调用可在流式输出中确定性地提前判定
+        not_contains and forbidden tool calls can be decided deterministically while output streams"""
+        predicates: list[StreamPredicate] = []
+        expected = case.expected
+        if expected.not_contains:
+            predicates.append(ForbiddenKeywordPredicate(expected.not_contains))
+        constraints = expected.tool_call_constraints
+        if constraints and constraints.forbidden_tools:
+            predicates.append(ForbiddenToolPredicate(constraints.forbidden_tools))
+        return predicates
+
+    async def evaluate(
+        self,
+        case: TestCase,
+        output: str,
+        llm: Optional[LLMClient] = None,
+        execution: Optional["GeneratorResult"] = None,
+    ) -> list[FactorResult]:
+        # ── 1. 精确校验规则 / 1. Precise validation rules ──
         extra_checks = self._run_extra_checks(case, output)
 
-        # ── 3. 合并每个维度的分数 / 3. Merge scores for each dimension ──
+        # ── 2. LLM 一次性评判三个维度，并与精确校验合并 / 2. LLM judges three dimensions at once, merged with checks ──
+        if not (llm and case.expected.output):
+            return self._merge_dimensions({}, extra_checks)
+        if self.fast_llm is None or self.cascade is None:
+            return self._merge_dimensions(await self._llm_judge(case, output, llm), extra_checks)
+
+        # ── 级联：快速模型先评，不确定时升级到主模型 / Cascade: fast model first, escalate when uncertain ──
+        fast_scores = await self._llm_judge(case, output, self.fast_llm, phase="judge_fast")
+        results = self._merge_dimensions(fast_scores, extra_checks)
+        reason = self._escalation_reason(fast_scores, results)
+        if reason:
+            fast_score = self._weighted_score(results)
+            results = self._merge_dimensions(await self._llm_judge(case, output, llm), extra_checks)
+            cascade = {"tier": "strong", "reason": reason, "fast_score": round(fast_score, 4)}
+        else:
+            cascade = {"tier": "fast"}
+        for fr in results:
+            fr.details["cascade"] = cascade
+        return results
+
+    def _merge_dimensions(
+        self, llm_scores: dict[str, dict], extra_checks: dict[str, list[tuple[str, float, str]]],
+    ) -> list[FactorResult]:
+        """合并 LLM 评判与精确校验，得到每个维度的结果
+        Merge LLM judgments and precise checks into one result per dimension"""
+        results: list[FactorResult] = []
         for dim_id in ["content", "behavior", "structure"]:
             llm_result = llm_scores.get(dim_id)
             dim_extras = extra_checks.get(dim_id, [])
@@ -122,7 +198,32 @@ class CoreJudgeFactor(EvaluationFactor):
 
         return results
 
-    async def _llm_judge(self, case: TestCase, output: str, llm: LLMClient) -> dict[str, dict]:
+    def _weighted_score(self, results: list[FactorResult]) -> float:
+        """按维度权重计算加权分 / Weighted score using the dimension weights"""
+        total_weight = sum(self.dimension_configs.get(fr.factor_id, {}).get("weight", 1.0) for fr in results)
+        if total_weight <= 0:
+            return 0.0
+        return sum(
+            self.dimension_configs.get(fr.factor_id, {}).get("weight", 1.0) * fr.score for fr in results
+        ) / total_weight
+
+    def _escalation_reason(self, fast_scores: dict[str, dict], results: list[FactorResult]) -> Optional[str]:
+        """快速评判是否需要升级：error / band / spread，无需升级时为 None
+        Whether the fast judgment needs escalation: error / band / spread, None when it can stand"""
+        if any(v.get("error") for v in fast_scores.values()):
+            return "error"
+        if not results:
+            return None
+        if abs(self._weighted_score(results) - self.pass_threshold) <= self.cascade.band:
+            return "band"
+        scores = [v.get("score", 0.0) for v in fast_scores.values() if v.get("applicable", True)]
+        if len(scores) > 1 and max(scores) - min(scores) > self.cascade.max_spread:
+            return "spread"
+        return None
+
+    async def _llm_judge(
+        self, case: TestCase, output: str, llm: LLMClient, phase: str = "judge",
+    ) -> dict[str, dict]:
         """一次 LLM 调用，返回三个维度的评判结果
         One LLM call, return judge results for three dimensions"""
         judge_hints = case.judge_hints or ""
@@ -140,6 +241,7 @@ class CoreJudgeFactor(EvaluationFactor):
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
                 temperature=0.1,
+                phase=phase,
             )
             result = json.loads(response)
             # 确保返回的是 dict[str, dict] 格式
@@ -148,11 +250,15 @@ class CoreJudgeFactor(EvaluationFactor):
                 k: v for k, v in result.items()
                 if isinstance(v, dict) and k in ("content", "behavior", "structure")
             }
+        except BudgetExceededError:
+            # 超预算不算评判失败，交由 Evaluator 标记为跳过
+            # Over budget is not a judge failure, let Evaluator mark the case skipped
+            raise
         except Exception as e:
             # LLM 调用失败，所有维度返回错误
             # LLM call failed, return error for all dimensions
             return {
-                dim: {"applicable": True, "score": 0.0, "reason": t("llm_judge_error").format(err=e)}
+                dim: {"applicable": True, "score": 0.0, "reason": t("llm_judge_error").format(err=e), "error": True}
                 for dim in ("content", "behavior", "structure")
             }
 
@@ -278,33 +384,38 @@ class CoreJudgeFactor(EvaluationFactor):
             return tool_calls
 
         # <tool_call> XML 标签格式 / <tool_call> XML tag format
-        xml_pattern = re.findall(r'<tool_call>\s*(\{.*?\})\s*</tool_call>', output, re.DOTALL)
-        for match in xml_pattern:
-            try:
-                tc = json.loads(match)
-                tool_calls.append({
-                    "name": tc.get("name", tc.get("tool", "")),
-                    "arguments": tc.get("arguments", tc.get("params", tc.get("parameters", {}))),
-                })
-            except (json.JSONDecodeError, TypeError):
-                pass
+        for match in TOOL_CALL_XML.finditer(output):
+            call = CoreJudgeFactor._xml_tool_call(match)
+            if call is not None:
+                tool_calls.append(call)
 
         if tool_calls:
             return tool_calls
 
         # Action/Action Input 文本格式 / Action/Action Input text format
-        action_pattern = re.findall(
-            r'Action:\s*(\S+)\s*\nAction Input:\s*(\{.*?\})(?:\n|$)',
-            output, re.DOTALL,
-        )
-        for action_name, action_input in action_pattern:
-            try:
-                args = json.loads(action_input)
-            except (json.JSONDecodeError, TypeError):
-                args = {"raw": action_input}
-            tool_calls.append({"name": action_name, "arguments": args})
+        return [CoreJudgeFactor._action_tool_call(match) for match in TOOL_CALL_ACTION.finditer(output)]
+
+    @staticmethod
+    def _xml_tool_call(match: re.Match) -> Optional[dict[str, Any]]:
+        """解析一个 <tool_call> 匹配，JSON 无效时为 None / Parse one <tool_call> match, None for invalid JSON"""
+        try:
+            tc = json.loads(match.group(1))
+            return {
+                "name": tc.get("name", tc.get("tool", "")),
+                "arguments": tc.get("arguments", tc.get("params", tc.get("parameters", {}))),
+            }
+        except (json.JSONDecodeError, TypeError):
+            return None
 
-        return tool_calls
+    @staticmethod
+    def _action_tool_call(match: re.Match) -> dict[str, Any]:
+        """解析一个 Action / Action Input 匹配 / Parse one Action / Action Input match"""
+        action_name, action_input = match.groups()
+        try:
+            args = json.loads(action_input)
+        except (json.JSONDecodeError, TypeError):
+            args = {"raw": action_input}
+        return {"name": action_name, "arguments": args}
 
     def _check_required_tool_calls(
         self, output: str, required: list,
@@ -491,7 +602,13 @@ class CustomFactor(EvaluationFactor):
     def is_triggered(self, expected: ExpectedOutput) -> bool:
         return expected.validator is not None
 
-    async def evaluate(self, case: TestCase, output: str, llm: Optional[LLMClient] = None) -> list[FactorResult]:
+    async def evaluate(
+        self,
+        case: TestCase,
+        output: str,
+        llm: Optional[LLMClient] = None,
+        execution: Optional["GeneratorResult"] = None,
+    ) -> list[FactorResult]:
         validator_path = case.expected.validator
         if not validator_path:
             return [FactorResult(factor_id=self.factor_id, score=1.0, reason=t("no_custom_check"))]
@@ -519,3 +636,107 @@ class CustomFactor(EvaluationFactor):
                 return [FactorResult(factor_id=self.factor_id, score=float(result), reason="")]
         except Exception as e:
             return [FactorResult(factor_id=self.factor_id, score=0.0, reason=t("custom_check_error").format(err=e))]
+
+
+# ─── Latency 因子（耗时预算）/ Latency factor (latency budgets) ──
+
+class LatencyFactor(EvaluationFactor):
+    """耗时预算校验：检查总耗时和首字节耗时是否超出预算
+    Latency budget check: verify total latency and time to first byte stay within budget
+
+    用例级预算（expected.max_latency_ms / max_ttfb_ms）优先；未配置时使用用例各 tag
+    的 tag_policies 预算，多个 tag 取最严格值。
+    Case-level budgets (expected.max_latency_ms / max_ttfb_ms) take precedence; otherwise the
+    tag_policies budgets of the case's tags apply, the strictest one wins.
+
+    测不到的耗时（非流式适配器的首字节耗时、只能整批计时的批量调用）不做检查，原因写入 reason；全部检查都被跳过时
+    结果标记为 details["skipped"]，不参与加权与致命判断。
+    Timings that were not measured (TTFB on non-streaming adapters, batch calls timed as a whole)
+    are not checked and the reason says so; when every check is skipped the result is marked
+    details["skipped"] and takes no part in weighting or the fatal check.
+    """
+
+    factor_id = "latency"
+    cacheable = False  # 依赖每次执行的耗时 / Depends on per-execution timing
+
+    def __init__(self, tag_policies: Optional[dict[str, TagPolicyConfig]] = None):
+        self.tag_policies = tag_policies or {}
+        self._has_tag_budgets = any(
+            p.max_latency_ms is not None or p.max_ttfb_ms is not None
+            for p in self.tag_policies.values()
+        )
+
+    def is_triggered(self, expected: ExpectedOutput) -> bool:
+        return (
+            self._has_tag_budgets
+            or expected.max_latency_ms is not None
+            or expected.max_ttfb_ms is not None
+        )
+
+    def resolve_budgets(self, case: TestCase) -> tuple[Optional[int], Optional[int]]:
+        """计算用例生效的 (max_latency_ms, max_ttfb_ms) / Resolve effective (max_latency_ms, max_ttfb_ms)"""
+        def _strictest(field: str) -> Optional[int]:
+            case_budget = getattr(case.expected, field)
+            if case_budget is not None:
+                return case_budget
+            tag_budgets = [
+                getattr(self.tag_policies[tag], field) for tag in case.tags
+                if tag in self.tag_policies and getattr(self.tag_policies[tag], field) is not None
+            ]
+            return min(tag_budgets) if tag_budgets else None
+
+        return _strictest("max_latency_ms"), _strictest("max_ttfb_ms")
+
+    async def evaluate(
+        self,
+        case: TestCase,
+        output: str,
+        llm: Optional[LLMClient] = None,
+        execution: Optional["GeneratorResult"] = None,
+    ) -> list[FactorResult]:
+        max_latency_ms, max_ttfb_ms = self.resolve_budgets(case)
+        if execution is None or (max_latency_ms is None and max_ttfb_ms is None):
+            return []
+
+        checks: list[tuple[str, float, str]] = []
+        skipped: list[str] = []
+        if max_latency_ms is not None:
+            if execution.batched:
+                # 批量调用只测得整批耗时 / A batch call only measured the whole batch
+                skipped.append(t("latency_batched"))
+            else:
+                checks.append(self._check_budget("latency", execution.execution_time_ms, max_latency_ms))
+        if max_ttfb_ms is not None:
+            if execution.ttfb_ms is None:
+                # 非流式适配器测不到首字节 / Non-streaming adapters can't measure TTFB
+                skipped.append(t("latency_not_measured").format(name="ttfb"))
+            else:
+                checks.append(self._check_budget("ttfb", execution.ttfb_ms, max_ttfb_ms))
+
+        details = {
+            "execution_time_ms": execution.execution_time_ms,
+            "ttfb_ms": execution.ttfb_ms,
+            "max_latency_ms": max_latency_ms,
+            "max_ttfb_ms": max_ttfb_ms,
+            "checks": [{"source": n, "score": s, "reason": r} for n, s, r in checks],
+        }
+        if not checks:
+            return [FactorResult(
+                factor_id=self.factor_id, score=1.0, reason="; ".join(skipped), details={**details, "skipped": True},
+            )]
+        score = min(s for _, s, _ in checks)
+        failed = [r for _, s, r in checks if s < 1.0]
+        return [FactorResult(
+            factor_id=self.factor_id,
+            score=score,
+            reason="; ".join((failed or [t("latency_within_budget")]) + skipped),
+            details=details,
+        )]
+
+    @staticmethod
+    def _check_budget(name: str, actual_ms: int, budget_ms: int) -> tuple[str, float, str]:
+        """超出预算时按 budget/actual 比例扣分 / Over budget scores budget/actual"""
+        if actual_ms <= budget_ms:
+            return name, 1.0, ""
+        score = budget_ms / actual_ms if actual_ms > 0 else 0.0
+        return name, score, t("latency_over_budget").format(name=name, actual=actual_ms, budget=budget_ms)
@@ -2,10 +2,11 @@
 
 import asyncio
 import importlib
+import random
 import time
 from glob import glob
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
 
 import yaml
 
@@ -13,17 +14,46 @@ from agent_evo.models import Config, TestCase, TestSuite
 from agent_evo.adapters.base import AgentAdapter
 from agent_evo.adapters.callable import CallableAdapter
 from agent_evo.adapters.http import HttpAdapter
+from agent_evo.adapters.stream_guard import StreamGuard
 from agent_evo.utils.i18n import t
+from agent_evo.utils.tracing import span
+
+if TYPE_CHECKING:
+    from agent_evo.core.history import RunHistory
+
+# 用例执行顺序 / Case execution orders
+CASE_ORDERS = ("file", "fail-first", "slow-first", "random")
 
 
 class GeneratorResult:
     """执行结果（未评判）/ Execution result (not yet evaluated)"""
 
-    def __init__(self, case: TestCase, output: str, execution_time_ms: int, error: Optional[str] = None):
+    def __init__(
+        self,
+        case: TestCase,
+        output: str,
+        execution_time_ms: int,
+        error: Optional[str] = None,
+        ttfb_ms: Optional[int] = None,
+        aborted: Optional[str] = None,
+        batched: bool = False,
+        aborted_dimension: Optional[str] = None,
+    ):
         self.case = case
         self.output = output
         self.execution_time_ms = execution_time_ms
         self.error = error
+        # 首字节耗时（适配器不支持时为 None）/ Time to first byte (None if adapter doesn't support it)
+        self.ttfb_ms = ttfb_ms
+        # 流式输出被提前终止的原因（output 为部分输出）/ Reason the stream was stopped early (output is partial)
+        self.aborted = aborted
+        # 提前终止所代替判定的评判维度（超出流式上限时为 None）
+        # Judge dimension the early stop decided (None when a stream limit was hit)
+        self.aborted_dimension = aborted_dimension
+        # 耗时为整批的耗时（批量调用无法逐条计时）/ The timing is the whole batch's (the batch call couldn't time each item)
+        self.batched = batched
+        # 多次采样时的采样序号 / Sample index when a case is sampled several times
+        self.sample_index = 0
 
 
 class Generator:
@@ -33,6 +63,8 @@ class Generator:
         self.config = config
         self.project_dir = project_dir
         self.adapter = self._create_adapter()
+        # 为每条用例构建流式守卫（由评测器注册）/ Builds a stream guard per case (registered by the evaluator)
+        self.stream_guard_factory: Optional[Callable[[TestCase], Optional[StreamGuard]]] = None
 
     def _create_adapter(self) -> AgentAdapter:
         """创建 Agent 适配器 / Create Agent adapter"""
@@ -51,6 +83,17 @@ class Generator:
         if self.config.agent.prompt_file:
             prompt_file = str(self.project_dir / self.config.agent.prompt_file)
 
+        batch_kwargs: dict[str, Any] = {}
+        if http_config.batch:
+            batch_kwargs = {
+                "batch_body_template": http_config.batch.body,
+                "batch_url": http_config.batch.url,
+                "batch_response_path": http_config.batch.response_path,
+                "batch_item_response_path": http_config.batch.item_response_path or http_config.response_path,
+                "max_batch_size": http_config.batch.max_size,
+                "batch_window_ms": http_config.batch.max_wait_ms,
+            }
+
         return HttpAdapter(
             url=http_config.url,
             method=http_config.method,
@@ -64,6 +107,9 @@ class Generator:
             stream_text_events=http_config.stream_text_events,
             timeout=http_config.timeout,
             prompt_file=prompt_file,
+            max_output_chars=http_config.max_output_chars,
+            max_stream_seconds=http_config.max_stream_seconds,
+            **batch_kwargs,
         )
 
     def _create_callable_adapter(self) -> AgentAdapter:
@@ -166,19 +212,33 @@ class Generator:
 
     async def run_case(self, case: TestCase) -> GeneratorResult:
         """运行单个测试用例 / Run a single test case"""
+        with span("generate", case_id=case.id, tags=case.tags) as s:
+            result = await self._invoke_case(case)
+            s.set_attribute("latency_ms", result.execution_time_ms)
+            s.set_attribute("ttfb_ms", result.ttfb_ms)
+            s.set_attribute("error", result.error)
+            s.set_attribute("aborted", result.aborted)
+            return result
+
+    async def _invoke_case(self, case: TestCase) -> GeneratorResult:
         start_time = time.time()
+        guard = self.stream_guard_factory(case) if self.stream_guard_factory else None
 
         try:
-            output = await self.adapter.invoke(
+            response = await self.adapter.invoke_detailed(
                 input=case.input_query,
-                context=self._build_context(case)
+                context=self._build_context(case),
+                guard=guard,
             )
             execution_time_ms = int((time.time() - start_time) * 1000)
 
             return GeneratorResult(
                 case=case,
-                output=output,
-                execution_time_ms=execution_time_ms
+                output=response.output,
+                execution_time_ms=execution_time_ms,
+                ttfb_ms=response.ttfb_ms,
+                aborted=response.aborted,
+                aborted_dimension=guard.dimension if guard and response.aborted else None,
             )
         except Exception as e:
             execution_time_ms = int((time.time() - start_time) * 1000)
@@ -189,34 +249,205 @@ class Generator:
                 error=str(e)
             )
 
+    async def run_batch(self, cases: list[TestCase]) -> list[GeneratorResult]:
+        """一次批量调用运行多条用例 / Run several cases in one batch call
+
+        适配器报告了单条耗时（AgentResponse.latency_ms）时按条计时；否则各条记整批耗时并标记 batched，
+        耗时预算与运行历史不使用这些耗时。
+        Items are timed individually when the adapter reports it (AgentResponse.latency_ms);
+        otherwise each gets the batch's wall time and is marked batched, and latency budgets and the
+        run history ignore that timing.
+        """
+        with span("generate.batch", size=len(cases)) as s:
+            if s.is_recording():
+                s.set_attribute("case_ids", [c.id for c in cases])
+            start_time = time.time()
+            try:
+                responses = await self.adapter.invoke_batch(
+                    [c.input_query for c in cases],
+                    [self._build_context(c) for c in cases],
+                )
+            except Exception as e:
+                execution_time_ms = int((time.time() - start_time) * 1000)
+                s.set_attribute("error", str(e))
+                return [
+                    GeneratorResult(case=c, output="", execution_time_ms=execution_time_ms, error=str(e), batched=True)
+                    for c in cases
+                ]
+            execution_time_ms = int((time.time() - start_time) * 1000)
+            s.set_attribute("latency_ms", execution_time_ms)
+
+        results = []
+        for case, response in zip(cases, responses):
+            if isinstance(response, Exception):
+                results.append(GeneratorResult(
+                    case=case, output="", execution_time_ms=execution_time_ms, error=str(response), batched=True,
+                ))
+            else:
+                batched = response.latency_ms is None
+                results.append(GeneratorResult(
+                    case=case, output=response.output,
+                    execution_time_ms=execution_time_ms if batched else response.latency_ms,
+                    ttfb_ms=response.ttfb_ms, aborted=response.aborted, batched=batched,
+                ))
+        return results
+
     async def run_all(
         self,
         cases: list[TestCase],
         concurrency: int = 5
     ) -> list[GeneratorResult]:
-        """并发运行所有测试用例 / Run all test cases concurrently"""
-        semaphore = asyncio.Semaphore(concurrency)
+        """并发运行所有测试用例 / Run all test cases concurrently
 
-        async def run_with_semaphore(case: TestCase) -> GeneratorResult:
-            async with semaphore:
-                return await self.run_case(case)
+        用例按 samples（用例级优先，否则 judge.samples）展开为多次采样，同一用例的采样在结果中相邻。
+        Cases are expanded into samples (case-level samples, else judge.samples); samples of the same
+        case are adjacent in the result.
 
+        适配器支持批量调用时，用例经微批调度器按批数量或等待时间窗口分组发送，
+        concurrency 限制同时在途的批次数。
+        When the adapter supports batching, cases go through a micro-batching scheduler that groups
+        them by batch size or time window; concurrency then limits batches in flight.
+        """
+        if self.adapter.supports_batch:
+            batcher = MicroBatcher(
+                self.run_batch,
+                max_size=self.adapter.max_batch_size,
+                max_wait_s=self.adapter.batch_window_ms / 1000,
+                max_inflight=concurrency,
+            )
+            run_one = batcher.submit
+        else:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def run_one(case: TestCase) -> GeneratorResult:
+                async with semaphore:
+                    return await self.run_case(case)
+
+        jobs = [(case, i) for case in cases for i in range(self.samples_for(case))]
         results = await asyncio.gather(
-            *[run_with_semaphore(case) for case in cases],
+            *[run_one(case) for case, _ in jobs],
             return_exceptions=True
         )
 
         # 处理异常 / Handle exceptions
         processed_results = []
-        for i, result in enumerate(results):
+        for (case, sample_index), result in zip(jobs, results):
             if isinstance(result, Exception):
-                processed_results.append(GeneratorResult(
-                    case=cases[i],
+                result = GeneratorResult(
+                    case=case,
                     output="",
                     execution_time_ms=0,
                     error=str(result)
-                ))
-            else:
-                processed_results.append(result)
+                )
+            result.sample_index = sample_index
+            processed_results.append(result)
 
         return processed_results
+
+    @staticmethod
+    def order_cases(
+        cases: list[TestCase],
+        order: str = "file",
+        history: Optional["RunHistory"] = None,
+        seed: Optional[int] = None,
+    ) -> list[TestCase]:
+        """按执行顺序策略排列用例 / Arrange cases by an execution order strategy
+
+        - file: 文件中的顺序 / order in the files
+        - fail-first: 预测失败概率高的先跑，概率相同时耗时长的先跑
+                      highest predicted failure probability first, longer expected duration breaks ties
+        - slow-first: 预期耗时长的先跑，缩短并发执行的长尾 / longest expected duration first to cut the tail
+        - random: 按 seed 随机打乱 / shuffled with seed
+
+        无历史时 fail-first / slow-first 退化为文件顺序（排序稳定）。
+        Without history fail-first / slow-first keep file order (the sort is stable).
+        """
+        if order not in CASE_ORDERS:
+            raise ValueError(t("unknown_order").format(order=order, choices=", ".join(CASE_ORDERS)))
+        if order == "file":
+            return list(cases)
+        if order == "random":
+            shuffled = list(cases)
+            random.Random(seed).shuffle(shuffled)
+            return shuffled
+        if history is None:
+            return list(cases)
+
+        # 无耗时记录的用例按已知用例的平均耗时估计 / Cases without timings are estimated at the mean known duration
+        durations = {c.id: history.expected_duration_ms(c.id) for c in cases}
+        known = [d for d in durations.values() if d is not None]
+        default_ms = sum(known) / len(known) if known else 0.0
+        expected_ms = {case_id: d if d is not None else default_ms for case_id, d in durations.items()}
+
+        if order == "slow-first":
+            return sorted(cases, key=lambda c: -expected_ms[c.id])
+        probability = {c.id: history.failure_probability(c) for c in cases}
+        return sorted(cases, key=lambda c: (-probability[c.id], -expected_ms[c.id]))
+
+    def samples_for(self, case: TestCase) -> int:
+        """用例的采样次数 / Number of samples for a case"""
+        return case.samples or self.config.judge.samples
+
+
+class MicroBatcher:
+    """微批调度器：凑满 max_size 或等待 max_wait_s 后发送一批
+    Micro-batching scheduler: sends a batch once max_size cases are pending or max_wait_s has passed
+
+    用法 / Usage:
+        batcher = MicroBatcher(generator.run_batch, max_size=32, max_wait_s=0.02, max_inflight=4)
+        result = await batcher.submit(case)
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[TestCase]], Awaitable[list[GeneratorResult]]],
+        max_size: int,
+        max_wait_s: float,
+        max_inflight: int,
+    ):
+        self._run_batch = run_batch
+        self._max_size = max(1, max_size)
+        self._max_wait_s = max_wait_s
+        self._semaphore = asyncio.Semaphore(max_inflight)
+        self._pending: list[tuple[TestCase, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, case: TestCase) -> GeneratorResult:
+        """提交一条用例，等待其所在批次完成 / Submit a case and wait for its batch to finish"""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((case, future))
+        if len(self._pending) >= self._max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_wait_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._send(batch))
+        # 保留引用，避免任务被回收 / Keep a reference so the task isn't garbage-collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[TestCase, asyncio.Future]]) -> None:
+        cases = [case for case, _ in batch]
+        async with self._semaphore:
+            try:
+                results = await self._run_batch(cases)
+            except Exception as e:
+                results = [GeneratorResult(case=c, output="", execution_time_ms=0, error=str(e)) for c in cases]
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        # 结果少于批内用例时，其余的 future 以异常结束，避免 submit 永远等待
+        # With fewer results than cases, fail the remaining futures so submit never hangs
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_exception(RuntimeError(t("batch_size_mismatch").format(expected=len(batch), got=len(results))))
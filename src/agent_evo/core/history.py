@@ -0,0 +1,256 @@
+"""运行历史与不稳定用例检测 / Run history and flaky case detection
+
+每次评测后按用例记录结果（状态、分数、耗时），保存在项目目录下的 JSON 文件中，
+每条用例只保留最近 window 次。
+After each evaluation the outcome of every case (status, score, duration) is recorded in a JSON
+file in the project directory; only the latest `window` runs are kept per case.
+
+不稳定度 = 相邻两次有效结果间的通过/失败翻转次数 / 可比较的相邻结果对数，ERROR 与 SKIPPED 不参与计算。
+只有用例内容指纹与提示词指纹都相同的相邻两次运行才可比较：提示词或用例改动引起的翻转不算不稳定。
+Flakiness = pass/fail flips between consecutive decisive outcomes / comparable consecutive pairs;
+ERROR and SKIPPED are ignored. Two consecutive runs are only comparable when both the case
+fingerprint and the prompt fingerprint match: flips caused by editing the prompt or the case are
+not flakiness.
+
+历史也用于排序：预测失败概率（近期失败、最近一次归因涉及的 tag、用例内容变化）与预期耗时。
+History also drives ordering: predicted failure probability (recent failures, tags in the latest
+diagnosis, changed case content) and expected duration.
+
+另外记录提示词各段落的指纹，并学习段落改动影响哪些用例与 tag（见 core/impact.py）。
+It also keeps fingerprints of the prompt's sections and learns which cases and tags an edit to each
+section affects (see core/impact.py).
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from agent_evo.models import CaseStatus, EvalReport, TestCase
+from agent_evo.models.config import HistoryConfig
+
+_DECISIVE = (CaseStatus.PASSED.value, CaseStatus.FAILED.value)
+
+# 失败概率估计参数 / Failure probability estimate parameters
+_DECAY = 0.7             # 每往前一次运行的权重衰减 / Weight decay per older run
+_UNKNOWN_PRIOR = 0.5     # 无历史用例的先验 / Prior for cases without history
+_CHANGED_BOOST = 0.3     # 用例内容变化 / Case content changed
+_DIAGNOSIS_BOOST = 0.2   # tag 出现在最近一次归因中 / Tag appears in the latest diagnosis
+
+
+def case_fingerprint(case: TestCase) -> str:
+    """用例内容指纹（输入、期望、tag 等定义字段）/ Fingerprint of a case's definition (input, expectations, tags, ...)"""
+    data = case.model_dump_json(exclude={"review_status", "tier", "samples"})
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+def prompt_fingerprint(sections: dict[str, str]) -> str:
+    """整个提示词的指纹（由各段落指纹得到）/ Fingerprint of the whole prompt (from its section fingerprints)"""
+    data = "\n".join(f"{name}={fp}" for name, fp in sorted(sections.items()))
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+class RunHistory:
+    """按用例记录的运行历史 / Per-case run history
+
+    用法 / Usage:
+        history = RunHistory.load(config.history, project_dir)
+        flaky = history.flaky_cases()
+        ...
+        history.record(report)
+        history.save()
+    """
+
+    def __init__(
+        self,
+        config: HistoryConfig,
+        path: Path,
+        cases: Optional[dict[str, list[dict[str, Any]]]] = None,
+        diagnosis_tags: Optional[list[str]] = None,
+        prompt_sections: Optional[dict[str, str]] = None,
+        impact: Optional[dict[str, dict[str, Any]]] = None,
+    ):
+        self.config = config
+        self.path = path
+        # case_id -> 按时间顺序的结果列表 / case_id -> outcomes in chronological order
+        self.cases: dict[str, list[dict[str, Any]]] = cases or {}
+        # 最近一次归因涉及的 tag / Tags touched by the latest diagnosis
+        self.diagnosis_tags: list[str] = diagnosis_tags or []
+        # 上次运行时提示词各段落的指纹 / Fingerprints of the prompt sections at the last run
+        self.prompt_sections: dict[str, str] = prompt_sections or {}
+        # 段落 -> {"edits": 改动次数, "seen": {用例: 观察次数}, "cases": {用例: 翻转次数},
+        #          "tag_seen": {tag: 观察次数}, "tags": {tag: 翻转或归因次数}}
+        # section -> {"edits": edits, "seen": {case: times observed}, "cases": {case: flips},
+        #             "tag_seen": {tag: times observed}, "tags": {tag: flips or diagnoses}}
+        self.impact: dict[str, dict[str, Any]] = impact or {}
+
+    @classmethod
+    def load(cls, config: HistoryConfig, project_dir: Path) -> "RunHistory":
+        """读取历史文件，不存在或损坏时从空历史开始
+        Load the history file; start empty if it is missing or corrupt"""
+        path = project_dir / config.path
+        data: dict[str, Any] = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        return cls(
+            config, path, data.get("cases", {}), data.get("diagnosis_tags", []),
+            data.get("prompt_sections", {}), data.get("impact", {}),
+        )
+
+    def save(self) -> None:
+        """写回历史文件 / Write the history file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps(
+                {
+                    "version": 1, "diagnosis_tags": self.diagnosis_tags, "prompt_sections": self.prompt_sections,
+                    "impact": self.impact, "cases": self.cases,
+                },
+                ensure_ascii=False,
+            ),
+            encoding="utf-8",
+        )
+
+    def record(
+        self,
+        report: EvalReport,
+        fingerprints: Optional[dict[str, str]] = None,
+        sections: Optional[dict[str, str]] = None,
+    ) -> None:
+        """追加一次评测的结果 / Append the outcomes of one evaluation
+
+        fingerprints 为 case_id → 用例指纹，用于下次识别内容变化的用例。
+        sections 为运行时提示词各段落的指纹（见 impact.section_fingerprints），用于学习段落改动的影响。
+        fingerprints maps case_id → case fingerprint, used next time to spot changed cases.
+        sections holds the fingerprints of the prompt sections the run used (see
+        impact.section_fingerprints), used to learn the impact of section edits.
+        """
+        fingerprints = fingerprints or {}
+        prompt_fp = None
+        if sections is not None:
+            self._learn_impact(report, sections)
+            prompt_fp = prompt_fingerprint(sections)
+        at = (report.finished_at or datetime.now()).isoformat(timespec="seconds")
+        for r in report.results:
+            entries = self.cases.setdefault(r.case_id, [])
+            entry = {
+                "at": at,
+                "status": r.status.value,
+                "score": round(r.score, 4),
+            }
+            # 整批的耗时不代表单条用例 / A batch's timing does not describe the single case
+            if not r.batched:
+                entry["ms"] = r.execution_time_ms
+            if r.case_id in fingerprints:
+                entry["fp"] = fingerprints[r.case_id]
+            if prompt_fp is not None:
+                entry["pfp"] = prompt_fp
+            entries.append(entry)
+            del entries[:-self.config.window]
+
+        if report.aggregated_diagnosis and report.aggregated_diagnosis.issues_by_tag:
+            self.diagnosis_tags = list(report.aggregated_diagnosis.issues_by_tag)
+        elif report.aggregated_diagnosis:
+            self.diagnosis_tags = list(report.failures_by_tag)
+
+    def _learn_impact(self, report: EvalReport, sections: dict[str, str]) -> None:
+        """与上次运行相比有段落变化时，把翻转的用例、其 tag 与上次归因的 tag 记到这些段落上；
+        同时记录每条用例（tag）在这些段落改动时被观察到的次数，作为比例的分母
+        When sections changed since the last run, credit them with the flipped cases, their tags and
+        the tags of the last diagnosis; also count how often each case (tag) was observed when those
+        sections changed, as the denominator of the rates"""
+        previous = self.prompt_sections
+        self.prompt_sections = dict(sections)
+        if not previous:
+            return
+        changed = [name for name in sections if previous.get(name) != sections[name]]
+        changed += [name for name in previous if name not in sections]
+        if not changed:
+            return
+
+        # 有上次结果才能判断翻转；不稳定用例的翻转与提示词无关
+        # A flip needs a previous outcome; flips of flaky cases say nothing about the prompt
+        flaky = self.flaky_cases()
+        observed = [
+            r for r in report.results
+            if not r.quarantined and r.case_id not in flaky and r.status.value in _DECISIVE
+            and self.outcomes(r.case_id)
+        ]
+        flipped = [r for r in observed if self.outcomes(r.case_id)[-1] != r.status.value]
+        seen_tags = set(self.diagnosis_tags).union(*(r.tags for r in observed))
+        hit_tags = set(self.diagnosis_tags).union(*(r.tags for r in flipped))
+
+        for name in changed:
+            entry = self.impact.setdefault(name, {})
+            entry["edits"] = entry.get("edits", 0) + 1
+            for key, counted in (
+                ("seen", [r.case_id for r in observed]), ("cases", [r.case_id for r in flipped]),
+                ("tag_seen", seen_tags), ("tags", hit_tags),
+            ):
+                counts = entry.setdefault(key, {})
+                for item in counted:
+                    counts[item] = counts.get(item, 0) + 1
+
+    # ── 不稳定度 / Flakiness ─────────────────────────────────
+
+    def outcomes(self, case_id: str) -> list[str]:
+        """最近的有效结果（passed / failed）/ Recent decisive outcomes (passed / failed)"""
+        return [e["status"] for e in self.cases.get(case_id, []) if e["status"] in _DECISIVE]
+
+    def flakiness(self, case_id: str) -> Optional[float]:
+        """不稳定度 0-1，只比较用例与提示词都未改动的相邻两次运行；可比较的结果对少于 min_runs - 1 时为 None
+        Flakiness in 0-1, comparing only consecutive runs where neither the case nor the prompt
+        changed; None with fewer than min_runs - 1 comparable pairs"""
+        entries = [e for e in self.cases.get(case_id, []) if e["status"] in _DECISIVE]
+        pairs = [
+            (a["status"], b["status"]) for a, b in zip(entries, entries[1:])
+            if a.get("fp") == b.get("fp") and a.get("pfp") == b.get("pfp")
+        ]
+        if len(pairs) < max(self.config.min_runs, 2) - 1:
+            return None
+        return sum(1 for a, b in pairs if a != b) / len(pairs)
+
+    def flaky_cases(self) -> dict[str, float]:
+        """不稳定度达到阈值的用例 / Cases whose flakiness reaches the threshold"""
+        flaky = {}
+        for case_id in self.cases:
+            score = self.flakiness(case_id)
+            if score is not None and score >= self.config.flaky_threshold:
+                flaky[case_id] = score
+        return flaky
+
+    # ── 排序依据 / Ordering signals ──────────────────────────
+
+    def failure_probability(self, case: TestCase) -> float:
+        """预测用例本次失败的概率（启发式，0-1）/ Predicted probability that the case fails this run (heuristic, 0-1)
+
+        近期结果按时间衰减加权（ERROR 计为失败），无历史时取先验；
+        用例内容变化、tag 出现在最近一次归因中时上调。
+        Recent outcomes weighted with time decay (ERROR counts as failure), a prior without history;
+        raised when the case changed or its tags appear in the latest diagnosis.
+        """
+        entries = [e for e in self.cases.get(case.id, []) if e["status"] != CaseStatus.SKIPPED.value]
+        if entries:
+            weights = [_DECAY ** age for age in range(len(entries))]
+            failures = [e["status"] != CaseStatus.PASSED.value for e in reversed(entries)]
+            probability = sum(w for w, failed in zip(weights, failures) if failed) / sum(weights)
+        else:
+            probability = _UNKNOWN_PRIOR
+
+        last_fp = next((e["fp"] for e in reversed(self.cases.get(case.id, [])) if "fp" in e), None)
+        if last_fp is not None and last_fp != case_fingerprint(case):
+            probability += _CHANGED_BOOST
+        if self.diagnosis_tags and set(case.tags) & set(self.diagnosis_tags):
+            probability += _DIAGNOSIS_BOOST
+        return min(probability, 1.0)
+
+    def expected_duration_ms(self, case_id: str) -> Optional[float]:
+        """近期平均耗时，无历史时为 None / Recent mean duration, None without history"""
+        durations = [e["ms"] for e in self.cases.get(case_id, []) if e.get("ms")]
+        return sum(durations) / len(durations) if durations else None
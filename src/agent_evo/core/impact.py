@@ -0,0 +1,195 @@
+"""提示词改动影响分析 / Prompt change impact analysis
+
+改动提示词的一个段落后不必重跑全部用例。提示词按 Markdown 标题切分为段落，
+每次评测在运行历史中记录各段落的指纹；与上次相比有段落变化时，把结果翻转（通过↔失败）的用例
+及其 tag、以及促成这次改动的归因 tag 记到这些段落上（见 RunHistory.record）。
+After editing one section of the prompt there is no need to rerun every case. The prompt is split
+into sections by Markdown headings, and every evaluation records the sections' fingerprints in
+the run history. When sections changed since the previous run, the cases whose outcome flipped
+(pass ↔ fail), their tags, and the diagnosis tags that prompted the edit are credited to those
+sections (see RunHistory.record).
+
+eval --affected-by <diff> 找出改动涉及的段落，按学到的影响关系给用例打分，只运行可能受影响的用例，
+分数高的先跑。用例在这些段落改动时被观察到的次数少于 _MIN_EDITS 时无法判断，也会运行，
+因此新段落会运行全部用例（可能受影响的仍然先跑）。
+eval --affected-by <diff> finds the sections a diff touches, scores cases by the learned impact,
+and runs only the likely-affected cases, highest score first. A case observed fewer than
+_MIN_EDITS times when those sections changed cannot be judged and runs as well, so a new section
+runs every case (the likely-affected ones still first).
+
+用法 / Usage:
+    diff = load_diff("HEAD~1", config, project_dir)
+    sections = diff_sections(diff, config.agent.prompt_file, prompt_text)
+    selected, scores, unknown = select_affected(cases, history, sections)
+"""
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+from agent_evo.models import Config, TestCase
+from agent_evo.utils.i18n import t
+
+if TYPE_CHECKING:
+    from agent_evo.core.history import RunHistory
+
+PREAMBLE = "(preamble)"   # 第一个标题之前的内容 / Content before the first heading
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$")
+_HUNK = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_NAMED_BOOST = 0.5   # 段落标题中出现用例 tag 时的分数 / Score when a section heading names a case tag
+_MIN_EDITS = 2       # 可据以略过用例的最少观察次数 / Observations needed before a case may be left out
+
+
+def split_sections(text: str) -> list[tuple[str, int, int]]:
+    """按 Markdown 标题切分提示词，返回 (段落名, 起始行, 结束行)，行号从 1 开始且包含两端；
+    重名标题依次加上 " (2)"、" (3)"
+    Split a prompt by Markdown headings into (section name, first line, last line), 1-based and
+    inclusive; repeated headings get " (2)", " (3)", ..."""
+    lines = text.splitlines()
+    starts: list[tuple[str, int]] = []
+    counts: dict[str, int] = {}
+    in_code = False
+    for i, line in enumerate(lines, 1):
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+            continue
+        match = None if in_code else _HEADING.match(line)
+        if match:
+            name = match.group(1)
+            counts[name] = counts.get(name, 0) + 1
+            starts.append((name if counts[name] == 1 else f"{name} ({counts[name]})", i))
+
+    sections = []
+    first = starts[0][1] if starts else len(lines) + 1
+    if any(line.strip() for line in lines[:first - 1]):
+        sections.append((PREAMBLE, 1, first - 1))
+    for k, (name, start) in enumerate(starts):
+        end = starts[k + 1][1] - 1 if k + 1 < len(starts) else len(lines)
+        sections.append((name, start, end))
+    return sections
+
+
+def section_fingerprints(text: str) -> dict[str, str]:
+    """各段落内容的指纹 / Fingerprint of each section's content"""
+    lines = text.splitlines()
+    return {
+        name: hashlib.sha1("\n".join(lines[start - 1:end]).strip().encode("utf-8")).hexdigest()[:12]
+        for name, start, end in split_sections(text)
+    }
+
+
+def load_diff(spec: str, config: Config, project_dir: Path) -> str:
+    """读取 --affected-by 的改动：diff 文件路径、"-"（标准输入）或 git 版本（与工作区比较提示词文件）
+    Read the --affected-by change: a diff file path, "-" (stdin), or a git revision (the prompt file
+    compared with the working tree)"""
+    if spec == "-":
+        return sys.stdin.read()
+    path = Path(spec)
+    if path.is_file():
+        return path.read_text(encoding="utf-8")
+    from agent_evo.integrations.git import GitIntegration
+    try:
+        return GitIntegration(config.git, project_dir).diff(spec, config.agent.prompt_file)
+    except Exception:
+        raise ValueError(t("affected_bad_diff").format(spec=spec)) from None
+
+
+def diff_sections(diff: str, prompt_path: str, prompt_text: str) -> Optional[set[str]]:
+    """统一 diff 改动了提示词的哪些段落（按当前提示词的行号定位）；diff 不涉及提示词文件时返回 None
+    Sections of the prompt touched by a unified diff (located by line in the current prompt); None
+    when the diff does not touch the prompt file
+
+    没有文件头的 diff 视为针对提示词文件。删除的标题行也算作改动了该段落（改名或删除）。
+    A diff without file headers is taken to be against the prompt file. A removed heading line also
+    counts as a change to that section (renamed or deleted).
+    """
+    target = Path(prompt_path).as_posix()
+    sections = split_sections(prompt_text)
+    changed: set[str] = set()
+    touched = False
+    in_target = not any(line.startswith("+++ ") for line in diff.splitlines())
+    new_line = 0
+
+    def locate(line_no: int) -> None:
+        for name, start, end in sections:
+            if start <= line_no <= end:
+                changed.add(name)
+                return
+        if sections:
+            changed.add(sections[-1][0])
+
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            path = line[4:].split("\t")[0].strip()
+            path = path[2:] if path[:2] in ("a/", "b/") else path
+            in_target = path != "/dev/null" and (path == target or path.endswith("/" + target) or target.endswith("/" + path))
+            continue
+        if line.startswith("--- ") or line.startswith("diff ") or not in_target:
+            continue
+        hunk = _HUNK.match(line)
+        if hunk:
+            new_line = int(hunk.group(3))
+            touched = True
+            continue
+        if line.startswith("+"):
+            locate(new_line)
+            new_line += 1
+        elif line.startswith("-"):
+            heading = _HEADING.match(line[1:])
+            if heading:
+                changed.add(heading.group(1))
+            # 删除发生在新文件当前行之前 / The deletion sits just before the current new-file line
+            locate(max(new_line, 1))
+        elif line.startswith(" "):
+            new_line += 1
+    return changed if touched else None
+
+
+def select_affected(
+    cases: list[TestCase],
+    history: "RunHistory",
+    changed: set[str],
+) -> tuple[list[TestCase], dict[str, float], list[str]]:
+    """按改动的段落给用例打分，返回 (要运行的用例（分数高的在前）, 用例分数, 影响数据不足的段落)
+    Score cases against the changed sections; returns (cases to run, highest score first; case
+    scores; sections without enough impact data)
+
+    分数取各段落中最高的一项：段落改动时该用例翻转的比例、其 tag 翻转或被归因的比例、
+    标题中出现用例 tag（_NAMED_BOOST）。分数为 0 的用例只有在每个改动的段落下都已被观察过
+    至少 _MIN_EDITS 次时才会略过，因此新用例与新段落总会运行。
+    The score is the highest over the sections of: the rate at which the case flipped when the
+    section changed, the rate at which one of its tags flipped or was diagnosed, and whether the
+    heading names one of its tags (_NAMED_BOOST). A case scoring 0 is only left out once it was
+    observed at least _MIN_EDITS times under every changed section, so new cases and new sections
+    always run.
+    """
+    scores: dict[str, float] = {}
+    uncertain: set[str] = set()
+    unknown: list[str] = []
+    for section in sorted(changed):
+        impact = history.impact.get(section, {})
+        if impact.get("edits", 0) < _MIN_EDITS:
+            unknown.append(section)
+        seen, flips = impact.get("seen", {}), impact.get("cases", {})
+        tag_seen, tag_hits = impact.get("tag_seen", {}), impact.get("tags", {})
+        heading = _words(section)
+        for case in cases:
+            observed = seen.get(case.id, 0)
+            if observed < _MIN_EDITS:
+                uncertain.add(case.id)
+            score = max(
+                _NAMED_BOOST if any(re.search(rf"\b{re.escape(_words(tag))}\b", heading) for tag in case.tags) else 0.0,
+                flips.get(case.id, 0) / observed if observed else 0.0,
+                max((tag_hits.get(tag, 0) / tag_seen[tag] for tag in case.tags if tag_seen.get(tag)), default=0.0),
+            )
+            if score > scores.get(case.id, 0.0):
+                scores[case.id] = min(score, 1.0)
+
+    ranked = sorted(cases, key=lambda c: -scores.get(c.id, 0.0))
+    return [c for c in ranked if c.id in scores or c.id in uncertain], scores, unknown
+
+
+def _words(text: str) -> str:
+    return text.lower().replace("_", " ").replace("-", " ")
@@ -0,0 +1,111 @@
+"""数据源导入进度与水位 / Source import progress and watermarks
+
+按数据源记录断点：已完整处理（提炼并写入）的最后一页之后的位置。
+拉取中途失败或被中断时，下次导入从断点继续；完整导入后断点清除。
+断点带有数据源定义的指纹（URL、参数、过滤条件、分页），定义变化后旧断点失效。
+Records a checkpoint per source: the position after the last page that was fully processed
+(refined and written). When fetching fails or is interrupted, the next import resumes from the
+checkpoint; a complete import clears it. Checkpoints carry a fingerprint of the source definition
+(URL, params, filter, pagination), so a changed definition invalidates the old checkpoint.
+
+配置了 watermark 的数据源还会记录水位（已导入记录的最大时间戳或 ID），只在完整导入后推进。
+Sources with a watermark also record it (the highest timestamp or ID imported so far); it only
+advances after a complete import.
+
+用法 / Usage:
+    state = ImportState.load(config, project_dir)
+    position = state.checkpoint(source)
+    ...
+    state.set_checkpoint(source, {"page": 5})
+    state.set_watermark(source, "2024-06-01T00:00:00Z")
+    state.save()
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from agent_evo.models import APISourceConfig, Config
+from agent_evo.models.config import ImportConfig
+
+
+def source_fingerprint(source: APISourceConfig) -> str:
+    """数据源定义的指纹（不含请求头，令牌轮换不影响断点）
+    Fingerprint of a source definition (headers excluded, so rotating tokens keep the checkpoint)"""
+    data = source.model_dump_json(include={"url", "method", "params", "filter", "data_path", "pagination"})
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()[:16]
+
+
+class ImportState:
+    """按数据源保存的导入进度 / Import progress per source"""
+
+    def __init__(self, path: Path, sources: Optional[dict[str, dict[str, Any]]] = None):
+        self.path = path
+        # 数据源名 -> {"checkpoint": {...}, "watermark": {...}} / source name -> {"checkpoint": {...}, "watermark": {...}}
+        self.sources: dict[str, dict[str, Any]] = sources or {}
+
+    @classmethod
+    def load(cls, config: Config, project_dir: Path) -> "ImportState":
+        """读取进度文件，不存在或损坏时从空状态开始
+        Load the progress file; start empty if it is missing or corrupt"""
+        path = project_dir / (config.import_config or ImportConfig()).state_path
+        data: dict[str, Any] = {}
+        if path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+        if not isinstance(data, dict):
+            data = {}
+        return cls(path, data.get("sources", {}))
+
+    def save(self) -> None:
+        """写回进度文件 / Write the progress file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({"version": 1, "sources": self.sources}, ensure_ascii=False, indent=2),
+            encoding="utf-8",
+        )
+
+    def watermark(self, source: APISourceConfig) -> Optional[Any]:
+        """数据源的当前水位；未导入过或水位字段变化时为 watermark.initial
+        The source's current watermark; watermark.initial if never imported or the watermark field changed"""
+        if source.watermark is None:
+            return None
+        entry = self.sources.get(source.name, {}).get("watermark")
+        if not entry or entry.get("field") != source.watermark.field:
+            return source.watermark.initial
+        return entry.get("value")
+
+    def set_watermark(self, source: APISourceConfig, value: Any) -> None:
+        """完整导入后推进水位 / Advance the watermark after a complete import"""
+        if source.watermark is None or value is None:
+            return
+        self.sources.setdefault(source.name, {})["watermark"] = {
+            "field": source.watermark.field,
+            "value": value,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def checkpoint(self, source: APISourceConfig) -> Optional[dict[str, Any]]:
+        """数据源的断点位置；没有或定义已变化时为 None
+        The source's checkpoint position; None when absent or the definition changed"""
+        entry = self.sources.get(source.name, {}).get("checkpoint")
+        if not entry or entry.get("fingerprint") != source_fingerprint(source):
+            return None
+        return entry.get("position")
+
+    def set_checkpoint(self, source: APISourceConfig, position: Optional[dict[str, Any]]) -> None:
+        """更新断点；position 为 None 表示已完整导入，清除断点
+        Update the checkpoint; a position of None means the import completed and clears it"""
+        entry = self.sources.setdefault(source.name, {})
+        if position is None:
+            entry.pop("checkpoint", None)
+            return
+        entry["checkpoint"] = {
+            "fingerprint": source_fingerprint(source),
+            "position": position,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
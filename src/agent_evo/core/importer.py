@@ -1,26 +1,114 @@
 """线上数据导入引擎 / Production data import engine"""
 
+import asyncio
 import csv
+import gzip
+import hashlib
+import io
 import json
-import uuid
+import random
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Any
+from typing import IO, Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional
 
 import yaml
 
 from agent_evo.models import Config, TestCase
 from agent_evo.models.test_case import TestCaseSource, TestCaseTier, ReviewStatus, ExpectedOutput
 from agent_evo.models.import_models import ProductionRecord, ImportResult, APISourceConfig
-from agent_evo.utils.llm import LLMClient
+from agent_evo.core.dedup import MinHashIndex, find_duplicates
+from agent_evo.core.sampling import RecordSampler
+from agent_evo.utils.llm import LLMClient, UsageTracker, BudgetExceededError
 from agent_evo.utils.i18n import t
 
+_MAX_ERRORS = 20   # ImportResult.errors 保留的最大条数 / Max messages kept in ImportResult.errors
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+_DONE = object()   # 记录队列结束标记 / End-of-records marker on the queue
+
+
+def record_case_id(record: ProductionRecord) -> str:
+    """记录对应的幂等用例 ID：由记录 ID（缺省时由输入与回复内容）哈希得到，重复导入得到相同 ID
+    Idempotent case ID of a record: hashed from the record ID (or its input and response when there
+    is none), so importing the same record again yields the same ID"""
+    key = record.id or f"{record.query}\0{record.agent_response}"
+    return f"prod-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+
+
+def watermark_key(value: Any, type: str = "timestamp") -> Any:
+    """水位值的比较键：数值直接比较，timestamp 的 ISO 字符串按时间比较，其余按字符串比较
+    Comparison key of a watermark value: numbers compare as numbers, ISO strings of a timestamp
+    compare as times, anything else as strings"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value)
+    text = str(value)
+    try:
+        return (0, float(text))
+    except ValueError:
+        pass
+    if type == "timestamp":
+        try:
+            parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return (0, parsed.timestamp())
+        except ValueError:
+            pass
+    return (1, text)
+
+
+class _PageRecords(list):
+    """一页映射后的记录；raw 为原始数据数组（判断是否满页），high 为本页的最高水位
+    Mapped records of one page; raw is the original data array (to tell whether the page was full),
+    high is the page's highest watermark"""
+    raw: list = []
+    high: Any = None
+
+
+class FetchedPage:
+    """拉取到的一页记录 / One fetched page of records
+
+    next_position 为从下一页继续的断点位置，最后一页为 None。
+    next_position is the checkpoint position to continue from the next page; None on the last page.
+    """
+
+    def __init__(
+        self, records: list[ProductionRecord], next_position: Optional[dict[str, Any]], high: Any = None,
+    ):
+        self.records = records
+        self.next_position = next_position
+        # 本页记录的最高水位 / Highest watermark among the page's records
+        self.high = high
+
+
+def open_text(file_path: str) -> IO[str]:
+    """以文本方式打开文件，gzip / zstd 压缩文件按文件头自动解压
+    Open a file as text; gzip / zstd compressed files are decompressed transparently (detected by magic bytes)
+
+    zstd 需要可选依赖 zstandard（extra: zstd）。
+    zstd needs the optional dependency zstandard (extra: zstd).
+    """
+    with open(file_path, "rb") as f:
+        magic = f.read(4)
+    if magic[:2] == _GZIP_MAGIC:
+        return gzip.open(file_path, "rt", encoding="utf-8", newline="")
+    if magic == _ZSTD_MAGIC:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(t("zstd_missing")) from None
+        raw = zstandard.ZstdDecompressor().stream_reader(open(file_path, "rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return open(file_path, "r", encoding="utf-8", newline="")
+
 
 class TestCaseImporter:
     """测评集导入引擎 / Test case import engine"""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, usage: Optional[UsageTracker] = None):
         self.config = config
-        self.llm = LLMClient(config.llm)
+        self.llm = LLMClient(config.llm, usage=usage)
         self.refine_prompt = self._load_prompt()
 
     def _load_prompt(self) -> str:
@@ -55,23 +143,40 @@ You are a test case refinement expert. Generate standard test cases based on pro
 
     # ── 格式解析 / Format parsing ────────────────────────────
 
-    def parse_jsonl(self, file_path: str) -> list[ProductionRecord]:
-        """解析 JSONL 文件 / Parse JSONL file"""
-        records = []
-        with open(file_path, "r", encoding="utf-8") as f:
+    def iter_records(
+        self, file_path: str, format: str = "jsonl", column_mapping: Optional[dict] = None,
+    ) -> Iterator[ProductionRecord]:
+        """逐条读取记录，支持 gzip / zstd 压缩文件（按文件头识别）
+        Read records one at a time; gzip / zstd compressed files are supported (detected by magic bytes)
+
+        JSONL 与 CSV 按行流式读取，内存占用与文件大小无关；YAML 需整体解析。
+        JSONL and CSV are streamed line by line with memory independent of file size; YAML is parsed whole.
+
+        Raises:
+            ValueError: 不支持的格式 / Unsupported format
+        """
+        if format == "jsonl":
+            return self.iter_jsonl(file_path)
+        if format == "csv":
+            return self.iter_csv(file_path, column_mapping)
+        if format == "yaml":
+            return self.iter_yaml(file_path)
+        raise ValueError(t("unsupported_format").format(fmt=format))
+
+    def iter_jsonl(self, file_path: str) -> Iterator[ProductionRecord]:
+        """逐行解析 JSONL 文件，跳过无效行 / Parse a JSONL file line by line, skipping invalid lines"""
+        with open_text(file_path) as f:
             for line in f:
                 line = line.strip()
                 if not line:
                     continue
                 try:
-                    data = json.loads(line)
-                    records.append(ProductionRecord(**data))
+                    yield ProductionRecord(**json.loads(line))
                 except Exception:
                     pass
-        return records
 
-    def parse_csv(self, file_path: str, column_mapping: Optional[dict] = None) -> list[ProductionRecord]:
-        """解析 CSV 文件 / Parse CSV file"""
+    def iter_csv(self, file_path: str, column_mapping: Optional[dict] = None) -> Iterator[ProductionRecord]:
+        """逐行解析 CSV 文件 / Parse a CSV file row by row"""
         mapping = column_mapping or {
             "query": "query",
             "agent_response": "agent_response",
@@ -79,31 +184,41 @@ You are a test case refinement expert. Generate standard test cases based on pro
             "error_type": "error_type",
         }
 
-        records = []
-        with open(file_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
+        with open_text(file_path) as f:
+            for row in csv.DictReader(f):
                 try:
                     record_data = {}
                     for target, source in mapping.items():
                         if source in row:
                             record_data[target] = row[source]
                     if "query" in record_data and "agent_response" in record_data:
-                        records.append(ProductionRecord(**record_data))
+                        yield ProductionRecord(**record_data)
                 except Exception:
                     pass
-        return records
 
-    def parse_yaml(self, file_path: str) -> list[ProductionRecord]:
-        """解析 YAML 文件 / Parse YAML file"""
-        with open(file_path, "r", encoding="utf-8") as f:
+    def iter_yaml(self, file_path: str) -> Iterator[ProductionRecord]:
+        """解析 YAML 文件（整体读入）/ Parse a YAML file (loaded whole)"""
+        with open_text(file_path) as f:
             data = yaml.safe_load(f)
 
+        if isinstance(data, dict) and "records" in data:
+            data = data["records"]
         if isinstance(data, list):
-            return [ProductionRecord(**item) for item in data if isinstance(item, dict)]
-        elif isinstance(data, dict) and "records" in data:
-            return [ProductionRecord(**item) for item in data["records"]]
-        return []
+            for item in data:
+                if isinstance(item, dict):
+                    yield ProductionRecord(**item)
+
+    def parse_jsonl(self, file_path: str) -> list[ProductionRecord]:
+        """解析 JSONL 文件 / Parse JSONL file"""
+        return list(self.iter_jsonl(file_path))
+
+    def parse_csv(self, file_path: str, column_mapping: Optional[dict] = None) -> list[ProductionRecord]:
+        """解析 CSV 文件 / Parse CSV file"""
+        return list(self.iter_csv(file_path, column_mapping))
+
+    def parse_yaml(self, file_path: str) -> list[ProductionRecord]:
+        """解析 YAML 文件 / Parse YAML file"""
+        return list(self.iter_yaml(file_path))
 
     # ── 导入流程 / Import workflow ────────────────────────────
 
@@ -114,21 +229,21 @@ You are a test case refinement expert. Generate standard test cases based on pro
         auto_refine: bool = True,
         column_mapping: Optional[dict] = None,
     ) -> tuple[list[TestCase], ImportResult]:
-        """从文件导入 / Import from file"""
-        # 解析 / Parse
-        if format == "jsonl":
-            records = self.parse_jsonl(file_path)
-        elif format == "csv":
-            records = self.parse_csv(file_path, column_mapping)
-        elif format == "yaml":
-            records = self.parse_yaml(file_path)
-        else:
-            return [], ImportResult(errors=[t("unsupported_format").format(fmt=format)])
-
-        if not records:
-            return [], ImportResult(errors=[t("no_valid_records")])
+        """从文件导入 / Import from file
 
-        return await self._refine_records(records, auto_refine)
+        结果整体保存在内存中；大文件请用 iter_records + refine_stream 流式处理。
+        Results are held in memory; stream large files with iter_records + refine_stream.
+        """
+        try:
+            records = self.iter_records(file_path, format, column_mapping)
+        except ValueError as e:
+            return [], ImportResult(errors=[str(e)])
+
+        cases: list[TestCase] = []
+        result = await self.refine_stream(records, auto_refine, on_case=cases.append)
+        if not result.total_records:
+            return [], ImportResult(errors=[t("no_valid_records")])
+        return cases, result
 
     async def import_from_source(
         self,
@@ -136,99 +251,266 @@ You are a test case refinement expert. Generate standard test cases based on pro
         auto_refine: bool = True,
     ) -> tuple[list[TestCase], ImportResult]:
         """从 HTTP API 数据源拉取并导入 / Fetch from HTTP API source and import"""
-        records = await self._fetch_from_api(source)
-
-        if not records:
+        cases: list[TestCase] = []
+        result = await self.refine_source(source, auto_refine, on_case=cases.append)
+        if not result.total_records:
             return [], ImportResult(errors=[t("no_valid_records")])
+        return cases, result
 
-        return await self._refine_records(records, auto_refine)
+    async def refine_source(
+        self,
+        source: APISourceConfig,
+        auto_refine: bool = True,
+        on_case: Optional[Callable[[TestCase], None]] = None,
+        resume: Optional[dict[str, Any]] = None,
+        on_checkpoint: Optional[Callable[[Optional[dict[str, Any]]], None]] = None,
+        since: Optional[Any] = None,
+        seen: Optional[set[str]] = None,
+        dedup_index: Optional[MinHashIndex] = None,
+    ) -> ImportResult:
+        """流式拉取并提炼数据源：提炼第 k 页的同时拉取后续页面
+        Stream-fetch and refine a source: later pages are fetched while page k is being refined
+
+        resume 为断点位置（见 iter_api_pages）。每当某页及其之前所有页的记录都处理完毕，
+        以该页之后的位置调用 on_checkpoint；全部完成时以 None 调用。
+        resume is a checkpoint position (see iter_api_pages). Whenever a page and all pages before it
+        are fully processed, on_checkpoint is called with the position after that page; it is called
+        with None once everything is done.
+
+        since 为当前水位（见 WatermarkConfig），seen 与 dedup_index 见 refine_stream。
+        已完成页面的最高水位随断点保存；只有全部完成时 result.watermark 才会设置。
+        since is the current watermark (see WatermarkConfig); for seen and dedup_index see
+        refine_stream. The highest watermark of completed pages is saved with the checkpoint;
+        result.watermark is only set once everything is done.
+
+        有记录提炼失败的页面不算完成：断点与水位停在它之前，下次导入会重新拉取并重试失败的记录，
+        已导入的记录则按幂等 ID 跳过。
+        A page with a record that failed refinement does not count as completed: the checkpoint and
+        watermark stay before it, so the next import fetches it again and retries the failed records,
+        while the records already imported are skipped by their idempotent IDs.
+
+        采样丢弃的记录视为已处理；reservoir 采样时记录要等全部读完才提炼，断点也随之推迟。
+        Sampled-out records count as processed; with reservoir sampling records are only refined
+        after everything is read, so checkpoints are deferred until then.
+        """
+        # 页序号 -> [待处理记录数, 之后的位置, 最高水位, 失败记录数]
+        # page seq -> [records pending, position after, high, records failed]
+        pages: dict[int, list] = {}
+        record_pages: dict[int, int] = {}   # id(record) -> 页序号 / page seq
+        completed = 0                       # 已连续完成的页数 / Pages completed in order
+        high = (resume or {}).get("watermark")
+        finished = False
+
+        def advance() -> None:
+            nonlocal completed, high, finished
+            while completed in pages and pages[completed][0] == 0 and not pages[completed][3]:
+                _, position, page_high, _ = pages.pop(completed)
+                completed += 1
+                high = self._higher(source, high, page_high)
+                if position is None:
+                    finished = True
+                elif high is not None:
+                    position = {**position, "watermark": high}
+                if on_checkpoint:
+                    on_checkpoint(position)
+
+        async def records():
+            seq = 0
+            async for page in self.iter_api_pages(source, resume, since):
+                pages[seq] = [len(page.records), page.next_position, page.high, 0]
+                for record in page.records:
+                    record_pages[id(record)] = seq
+                advance()
+                for record in page.records:
+                    yield record
+                seq += 1
+
+        def on_done(record: ProductionRecord, ok: bool) -> None:
+            page = pages[record_pages.pop(id(record))]
+            page[0] -= 1
+            page[3] += not ok
+            advance()
+
+        result = await self.refine_stream(
+            records(), auto_refine, on_case=on_case, on_done=on_done, seen=seen, dedup_index=dedup_index,
+        )
+        if finished:
+            result.watermark = self._higher(source, high, since)
+        return result
+
+    @staticmethod
+    def _higher(source: APISourceConfig, a: Any, b: Any) -> Any:
+        """两个水位中较高的一个（None 视为无）/ The higher of two watermarks (None counts as absent)"""
+        if a is None or b is None:
+            return b if a is None else a
+        kind = source.watermark.type if source.watermark else "timestamp"
+        return a if watermark_key(a, kind) >= watermark_key(b, kind) else b
 
     # ── HTTP 数据源拉取 / HTTP data source fetching ──────────
 
     async def _fetch_from_api(self, source: APISourceConfig) -> list[ProductionRecord]:
-        """从 HTTP API 拉取数据并映射为 ProductionRecord
-        Fetch data from HTTP API and map to ProductionRecord"""
+        """从 HTTP API 拉取全部数据并映射为 ProductionRecord
+        Fetch all data from HTTP API and map to ProductionRecord"""
+        all_records: list[ProductionRecord] = []
+        async for page in self.iter_api_pages(source):
+            all_records.extend(page.records)
+        return all_records
+
+    async def iter_api_pages(
+        self, source: APISourceConfig, resume: Optional[dict[str, Any]] = None, since: Optional[Any] = None,
+    ) -> AsyncIterator["FetchedPage"]:
+        """按顺序逐页产出数据源的记录 / Yield a source's records page by page, in order
+
+        page / offset 分页在窗口内并发预取（pagination.concurrency），按页序产出；
+        cursor 分页只能逐页拉取。resume 为断点位置 {"page": n, "cursor": ...}，
+        即 FetchedPage.next_position。
+        page / offset pagination prefetches pages concurrently within a window
+        (pagination.concurrency) and yields them in page order; cursor pagination can only fetch one
+        page at a time. resume is a checkpoint position {"page": n, "cursor": ...}, i.e. a
+        FetchedPage.next_position.
+
+        since 为当前水位：配置了 watermark.param 时作为请求参数发送，早于它的记录在本地丢弃。
+        since is the current watermark: it is sent as watermark.param when configured, and records
+        older than it are dropped locally.
+        """
         import httpx
 
-        all_records: list[ProductionRecord] = []
         pagination = source.pagination
 
         # 构建基础请求参数 / Build base request params
         base_params = dict(source.params)
         if source.filter:
             base_params.update(source.filter)
+        if since is not None and source.watermark and source.watermark.param:
+            base_params[source.watermark.param] = since
 
-        page = 1
-        cursor: Optional[str] = None
+        page = (resume or {}).get("page", 1)
+        cursor: Optional[str] = (resume or {}).get("cursor")
 
         async with httpx.AsyncClient(timeout=source.timeout) as client:
-            while True:
-                # 构建本次请求参数 / Build per-request params
-                request_params = dict(base_params)
-                if pagination:
-                    if pagination.type == "page":
-                        request_params[pagination.page_param] = page
-                        request_params[pagination.size_param] = pagination.size
-                    elif pagination.type == "offset":
-                        request_params[pagination.page_param] = (page - 1) * pagination.size
-                        request_params[pagination.size_param] = pagination.size
-                    elif pagination.type == "cursor" and cursor:
-                        param_name = pagination.cursor_param or pagination.page_param
-                        request_params[param_name] = cursor
-
-                # 发起请求 / Send request
-                if source.method == "GET":
-                    response = await client.get(
-                        source.url,
-                        headers=source.headers,
-                        params=request_params,
+            if pagination is None:
+                body = await self._request(client, source, base_params)
+                records = self._page_records(body, source, since)
+                yield FetchedPage(records or [], None, records.high if records else None)
+                return
+
+            if pagination.type == "cursor":
+                while page <= pagination.max_pages:
+                    request_params = dict(base_params)
+                    if cursor:
+                        request_params[pagination.cursor_param or pagination.page_param] = cursor
+                    body = await self._request(client, source, request_params)
+                    records = self._page_records(body, source, since)
+                    next_cursor = (
+                        self._extract_by_path(body, pagination.cursor_path) if pagination.cursor_path else None
                     )
-                else:
-                    response = await client.post(
-                        source.url,
-                        headers=source.headers,
-                        json=request_params,
+                    done = records is None or not next_cursor
+                    yield FetchedPage(
+                        records or [],
+                        None if done else {"page": page + 1, "cursor": str(next_cursor)},
+                        records.high if records else None,
                     )
+                    if done:
+                        return
+                    cursor = str(next_cursor)
+                    page += 1
+                return
 
-                response.raise_for_status()
-                body = response.json()
-
-                # 从响应中提取数据数组 / Extract data array from response
-                data_list = self._extract_by_path(body, source.data_path)
-                if not isinstance(data_list, list) or not data_list:
-                    break
-
-                # 字段映射 → ProductionRecord / Field mapping → ProductionRecord
-                for item in data_list:
-                    record = self._map_to_record(item, source.field_mapping)
-                    if record:
-                        all_records.append(record)
-
-                # 分页控制 / Pagination control
-                if not pagination:
-                    break
+            # page / offset：第一页确定总数后，后续页在窗口内并发预取
+            # page / offset: once the first page gives the total, later pages are prefetched within a window
+            def params_for(n: int) -> dict[str, Any]:
+                request_params = dict(base_params)
+                if pagination.type == "page":
+                    request_params[pagination.page_param] = n
+                else:
+                    request_params[pagination.page_param] = (n - 1) * pagination.size
+                request_params[pagination.size_param] = pagination.size
+                return request_params
+
+            last_page = pagination.max_pages
+            # 配置了 total_path 时先只拉一页，得到总数后再预取，避免请求不存在的页
+            # With total_path, fetch a single page until the total is known, to avoid requesting missing pages
+            window = 1 if pagination.total_path else pagination.concurrency
+            pending: dict[int, asyncio.Task] = {}
+            try:
+                while page <= last_page:
+                    while len(pending) < window and page + len(pending) <= last_page:
+                        n = page + len(pending)
+                        pending[n] = asyncio.create_task(self._request(client, source, params_for(n)))
+                    body = await pending.pop(page)
+                    records = self._page_records(body, source, since)
 
-                if pagination.type in ("page", "offset"):
-                    # 检查是否还有下一页 / Check if there are more pages
                     if pagination.total_path:
                         total = self._extract_by_path(body, pagination.total_path)
-                        if isinstance(total, (int, float)) and page * pagination.size >= total:
-                            break
-                    if len(data_list) < pagination.size:
-                        break
-                elif pagination.type == "cursor":
-                    if not pagination.cursor_path:
-                        break
-                    next_cursor = self._extract_by_path(body, pagination.cursor_path)
-                    if not next_cursor:
-                        break
-                    cursor = str(next_cursor)
+                        if isinstance(total, (int, float)):
+                            last_page = min(last_page, max(1, -(-int(total) // pagination.size)))
+                        window = pagination.concurrency
+                    done = records is None or len(records.raw) < pagination.size or page >= last_page
+                    yield FetchedPage(
+                        records or [], None if done else {"page": page + 1}, records.high if records else None,
+                    )
+                    if done:
+                        return
+                    page += 1
+            finally:
+                for task in pending.values():
+                    task.cancel()
+
+    def _page_records(
+        self, body: Any, source: APISourceConfig, since: Optional[Any] = None,
+    ) -> Optional["_PageRecords"]:
+        """从响应中提取数据数组并映射为记录；没有数据时为 None
+        Extract the data array from a response and map it to records; None when there is no data
+
+        记录 ID 加上数据源名作为命名空间；早于 since 的记录被丢弃。
+        Record IDs are namespaced by the source name; records older than since are dropped.
+        """
+        data_list = self._extract_by_path(body, source.data_path)
+        if not isinstance(data_list, list) or not data_list:
+            return None
+        watermark = source.watermark
+        floor = watermark_key(since, watermark.type) if watermark and since is not None else None
+        records = _PageRecords()
+        records.raw = data_list
+        for item in data_list:
+            value = self._extract_by_path(item, watermark.field) if watermark and isinstance(item, dict) else None
+            if floor is not None and value is not None and watermark_key(value, watermark.type) < floor:
+                continue
+            # 字段映射 → ProductionRecord / Field mapping → ProductionRecord
+            record = self._map_to_record(item, source.field_mapping)
+            if record is None:
+                continue
+            if record.id:
+                record.id = f"{source.name}:{record.id}"
+            records.append(record)
+            if value is not None:
+                records.high = self._higher(source, records.high, value)
+        return records
 
-                page += 1
-                if page > pagination.max_pages:
-                    break
+    @staticmethod
+    async def _request(client: Any, source: APISourceConfig, params: dict[str, Any]) -> Any:
+        """发起一次请求，连接错误、429 与 5xx 按指数退避重试（遵循 Retry-After）
+        Send one request, retrying connection errors, 429 and 5xx with exponential backoff (honouring Retry-After)"""
+        import httpx
 
-        return all_records
+        attempt = 0
+        while True:
+            try:
+                if source.method == "GET":
+                    response = await client.get(source.url, headers=source.headers, params=params)
+                else:
+                    response = await client.post(source.url, headers=source.headers, json=params)
+                if response.status_code not in _RETRY_STATUS or attempt >= source.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                retry_after = response.headers.get("Retry-After", "")
+                delay = float(retry_after) if retry_after.isdigit() else None
+            except httpx.TransportError:
+                if attempt >= source.max_retries:
+                    raise
+                delay = None
+            await asyncio.sleep(delay if delay is not None else min(0.5 * 2 ** attempt, 8.0) * random.uniform(0.5, 1.0))
+            attempt += 1
 
     @staticmethod
     def _extract_by_path(data: Any, path: str) -> Any:
@@ -282,25 +564,181 @@ You are a test case refinement expert. Generate standard test cases based on pro
         auto_refine: bool,
     ) -> tuple[list[TestCase], ImportResult]:
         """将 ProductionRecord 列表提炼为 TestCase / Refine ProductionRecord list to TestCase"""
-        cases = []
-        errors = []
-        for record in records:
+        cases: list[TestCase] = []
+        result = await self.refine_stream(records, auto_refine, on_case=cases.append)
+        return cases, result
+
+    async def refine_stream(
+        self,
+        records: Iterable[ProductionRecord] | AsyncIterable[ProductionRecord],
+        auto_refine: bool = True,
+        on_case: Optional[Callable[[TestCase], None]] = None,
+        concurrency: Optional[int] = None,
+        on_done: Optional[Callable[[ProductionRecord], None]] = None,
+        seen: Optional[set[str]] = None,
+        sampler: Optional[RecordSampler] = None,
+        dedup_index: Optional[MinHashIndex] = None,
+    ) -> ImportResult:
+        """流式提炼：后台按需从 records 取记录放入有界队列，最多 concurrency 条同时调用 LLM，
+        每提炼出一条用例立即交给 on_case，不在内存中累积
+        Streaming refinement: records are pulled on demand into a bounded queue in the background,
+        with at most `concurrency` LLM calls in flight, and each refined case is handed to on_case
+        right away instead of being accumulated
+
+        每条记录处理完后调用 on_done(record, ok)，提炼失败时 ok 为 False。超出预算后不再取新记录；
+        错误信息最多保留 _MAX_ERRORS 条，其余只计数。读取 records 出错时，
+        已取出的记录处理完后再抛出该异常。
+        on_done(record, ok) is called after each record is handled, with ok False when refinement
+        failed. Once over budget no further records are pulled; at most _MAX_ERRORS error messages are
+        kept, the rest are only counted. If reading records fails, the error is raised after the
+        records already pulled are handled.
+
+        seen 为已存在的用例 ID：幂等 ID（record_case_id）已在其中的记录直接跳过、不调用 LLM，
+        新 ID 会加入 seen，因此重试或重复拉取不会重复导入；提炼失败的记录会从 seen 中移除以便重试。
+        seen holds existing case IDs: records whose idempotent ID (record_case_id) is already in it
+        are skipped without calling the LLM, and new IDs are added to it, so retries and re-fetches
+        never import a record twice; records that fail refinement are removed from it again so they
+        can be retried.
+
+        sampler 默认按 import.sampling 创建（见 RecordSampler），在提炼前丢弃多余记录；
+        被丢弃的记录同样调用 on_done，统计写入 result.sampled_out*。
+        sampler defaults to one built from import.sampling (see RecordSampler) and drops surplus
+        records before refinement; dropped records get on_done as well and are counted in
+        result.sampled_out*.
+
+        dedup_index 为已有用例输入的 MinHash 索引（见 CorpusIndex.inputs）：记录的 query 与其中用例或
+        此前的记录近似重复时，在采样与提炼之前丢弃并计入 result.duplicates_removed，不调用 LLM；
+        其余记录以幂等 ID 加入索引，采样丢弃或提炼失败时再移除。
+        dedup_index is a MinHash index over existing case inputs (see CorpusIndex.inputs): a record
+        whose query near-duplicates a case in it or an earlier record is dropped before sampling and
+        refinement, counted in result.duplicates_removed, without calling the LLM; other records join
+        the index under their idempotent ID and leave it again when sampled out or failing refinement.
+        """
+        import_cfg = self.config.import_config
+        if sampler is None:
+            sampler = RecordSampler.from_config(self.config)
+        if concurrency is None:
+            concurrency = import_cfg.concurrency if import_cfg else 8
+        workers = max(1, concurrency) if auto_refine else 1
+        result = ImportResult()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+        stopped = False
+        read_error: list[BaseException] = []
+
+        def record_error(e: Exception) -> None:
+            result.failed += 1
+            if len(result.errors) < _MAX_ERRORS:
+                result.errors.append(t("process_record_fail").format(err=e))
+
+        def finish(record: ProductionRecord, ok: bool = True) -> None:
+            if on_done:
+                on_done(record, ok)
+
+        def forget(record: ProductionRecord) -> None:
+            # 未写入的记录不占用 ID 与索引，以后仍可导入 / Records never written give up their ID and index entry
+            case_id = record_case_id(record)
+            if seen is not None:
+                seen.discard(case_id)
+            if dedup_index is not None:
+                dedup_index.remove(case_id)
+
+        async def feed(record: ProductionRecord) -> None:
+            result.total_records += 1
+            case_id = record_case_id(record)
+            if seen is not None and case_id in seen:
+                result.skipped += 1
+                finish(record)
+                return
+            if dedup_index is not None:
+                # 提炼前按 query 去重，重复记录不调用 LLM / Dedup on the query before refinement, so duplicates cost no LLM call
+                signature = dedup_index.signature(record.query)
+                if dedup_index.query_all(signature, threshold=self.config.dedup.threshold, limit=1):
+                    result.duplicates_removed += 1
+                    finish(record)
+                    return
+                dedup_index.add(case_id, signature)
+            if seen is not None:
+                seen.add(case_id)
+            if sampler is None:
+                await queue.put(record)
+                return
+            released, dropped = sampler.offer(record)
+            await release(released, dropped)
+
+        async def release(released: list[ProductionRecord], dropped: list[ProductionRecord]) -> None:
+            for record in dropped:
+                forget(record)
+                finish(record)
+            for record in released:
+                await queue.put(record)
+
+        async def pump() -> None:
             try:
-                if auto_refine:
-                    case = await self.refine_to_test_case(record)
+                if isinstance(records, AsyncIterable):
+                    async for record in records:
+                        await feed(record)
                 else:
-                    case = self._record_to_basic_case(record)
-                cases.append(case)
+                    for record in records:
+                        await feed(record)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                errors.append(t("process_record_fail").format(err=e))
+                read_error.append(e)
+            if sampler is not None:
+                await release(*sampler.finish())
+            for _ in range(workers):
+                await queue.put(_DONE)
+
+        def stop() -> None:
+            # 超出预算：停止读取，清空队列并通知所有 worker 退出
+            # Over budget: stop reading, drain the queue and tell every worker to exit
+            nonlocal stopped
+            stopped = True
+            reader.cancel()
+            while not queue.empty():
+                queue.get_nowait()
+            for _ in range(workers):
+                queue.put_nowait(_DONE)
+
+        async def worker() -> None:
+            while True:
+                record = await queue.get()
+                if record is _DONE or stopped:
+                    return
+                try:
+                    if auto_refine:
+                        case = await self.refine_to_test_case(record)
+                    else:
+                        case = self._record_to_basic_case(record)
+                except BudgetExceededError as e:
+                    # 超出预算后不再提炼剩余记录 / Stop refining remaining records once over budget
+                    record_error(e)
+                    if not stopped:
+                        stop()
+                    return
+                except Exception as e:
+                    record_error(e)
+                    forget(record)
+                    finish(record, ok=False)
+                else:
+                    result.imported += 1
+                    result.pending_review += 1
+                    if on_case:
+                        on_case(case)
+                    finish(record)
 
-        result = ImportResult(
-            total_records=len(records),
-            imported=len(cases),
-            pending_review=len(cases),
-            errors=errors,
-        )
-        return cases, result
+        reader = asyncio.create_task(pump())
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            if not reader.done():
+                reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+        if sampler is not None:
+            sampler.fill(result)
+        if read_error:
+            raise read_error[0]
+        return result
 
     async def refine_to_test_case(self, record: ProductionRecord) -> TestCase:
         """利用 LLM 将线上数据提炼为标准 TestCase
@@ -316,6 +754,7 @@ You are a test case refinement expert. Generate standard test cases based on pro
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"},
             temperature=0.3,
+            phase="refine",
         )
         data = json.loads(response)
 
@@ -324,7 +763,7 @@ You are a test case refinement expert. Generate standard test cases based on pro
         default_tier = import_cfg.default_tier if import_cfg else "silver"
 
         return TestCase(
-            id=f"prod-{uuid.uuid4().hex[:8]}",
+            id=record_case_id(record),
             name=data.get("name", f"Production case: {record.query[:30]}"),
             input=record.query,
             expected_output=data.get("expected_output"),
@@ -340,7 +779,7 @@ You are a test case refinement expert. Generate standard test cases based on pro
     def _record_to_basic_case(record: ProductionRecord) -> TestCase:
         """不调 LLM，简单转换为 TestCase / Simple conversion without LLM"""
         return TestCase(
-            id=f"prod-{uuid.uuid4().hex[:8]}",
+            id=record_case_id(record),
             name=f"Production case: {record.query[:30]}",
             input=record.query,
             expected=ExpectedOutput(),
@@ -357,14 +796,13 @@ You are a test case refinement expert. Generate standard test cases based on pro
         self,
         new_cases: list[TestCase],
         existing_cases: list[TestCase],
+        index: Optional[MinHashIndex] = None,
     ) -> list[TestCase]:
-        """基于简单文本相似度去重（避免引入重型依赖）
-        Simple text-based deduplication (avoids heavy dependencies)"""
-        existing_inputs = {c.input_query.strip().lower() for c in existing_cases}
-        unique = []
-        for case in new_cases:
-            normalized = case.input_query.strip().lower()
-            if normalized not in existing_inputs:
-                unique.append(case)
-                existing_inputs.add(normalized)
+        """去除与已有用例或彼此近似重复的用例（MinHash-LSH，阈值见 dedup.threshold）
+        Drop cases that near-duplicate existing cases or each other (MinHash-LSH, threshold from dedup.threshold)
+
+        传入 index（如 CorpusIndex.inputs）时直接在其上查询，忽略 existing_cases。
+        With index (e.g. CorpusIndex.inputs), queries run against it and existing_cases is ignored.
+        """
+        unique, _ = find_duplicates(new_cases, existing_cases, self.config.dedup, index=index)
         return unique
@@ -1,22 +1,25 @@
 """变异扩充引擎 / Mutation expansion engine"""
 
+import asyncio
 import json
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from agent_evo.models import Config, TestCase
 from agent_evo.models.test_case import TestCaseSource, TestCaseTier, ReviewStatus
-from agent_evo.utils.llm import LLMClient
+from agent_evo.utils.i18n import t
+from agent_evo.utils.llm import LLMClient, UsageTracker, BudgetExceededError
+from agent_evo.utils.tracing import span
 
 
 class Mutator:
     """测评集变异扩充引擎：基于种子用例，LLM 自由发挥生成变异
     Test suite mutation engine: LLM freely generates mutations based on seed cases"""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, usage: Optional[UsageTracker] = None):
         self.config = config
-        self.llm = LLMClient(config.llm)
+        self.llm = LLMClient(config.llm, usage=usage)
         self.mutate_prompt = self._load_prompt()
 
     def _load_prompt(self) -> str:
@@ -62,15 +65,43 @@ You are a test case mutation expert. Generate meaningful mutations based on the
         seed_cases: list[TestCase],
         count_per_case: int = 3,
         business_docs: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        on_seed_done: Optional[Callable[[TestCase, list[TestCase], Optional[str]], None]] = None,
     ) -> list[TestCase]:
-        """批量变异生成测试用例 / Batch generate mutations"""
-        all_mutations: list[TestCase] = []
+        """批量变异生成测试用例，最多 concurrency 条种子并发
+        Batch generate mutations, with up to `concurrency` seeds in flight
 
-        for seed in seed_cases:
-            mutations = await self._mutate_single(seed, count_per_case, business_docs)
-            all_mutations.extend(mutations)
+        on_seed_done(seed, mutations, error) 在每条种子完成时调用（按完成顺序），用于进度与增量写入；
+        失败的种子 mutations 为空、error 为错误信息。超出预算后其余种子不再调用 LLM，以同一错误结束。
+        返回值按种子顺序排列。
+        on_seed_done(seed, mutations, error) is called as each seed finishes (in completion order), for
+        progress and incremental writing; a failed seed has no mutations and the error message. Once the
+        budget is exceeded the remaining seeds skip the LLM and finish with the same error. The return
+        value is in seed order.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.config.mutation.concurrency)
+        budget_error: list[str] = []   # 超出预算后的错误信息 / Error message once the budget is exceeded
 
-        return all_mutations
+        async def run(seed: TestCase) -> list[TestCase]:
+            mutations: list[TestCase] = []
+            error = None
+            async with semaphore:
+                if budget_error:
+                    error = budget_error[0]
+                else:
+                    try:
+                        mutations = await self._mutate_single(seed, count_per_case, business_docs)
+                    except BudgetExceededError as e:
+                        error = str(e)
+                        budget_error.append(error)
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+            if on_seed_done:
+                on_seed_done(seed, mutations, error)
+            return mutations
+
+        results = await asyncio.gather(*(run(seed) for seed in seed_cases))
+        return [m for mutations in results for m in mutations]
 
     async def _mutate_single(
         self,
@@ -78,7 +109,8 @@ You are a test case mutation expert. Generate meaningful mutations based on the
         count: int,
         business_docs: Optional[str] = None,
     ) -> list[TestCase]:
-        """对单条种子用例变异 / Mutate a single seed case"""
+        """对单条种子用例变异；LLM 调用或解析失败时抛出异常
+        Mutate a single seed case; raises when the LLM call or parsing fails"""
         # 构建种子信息 / Build seed info
         seed_info = {
             "id": seed.id,
@@ -106,51 +138,113 @@ You are a test case mutation expert. Generate meaningful mutations based on the
         if business_docs:
             prompt += f"\n\n## 业务文档（参考）/ Business docs (reference)\n{business_docs}"
 
-        try:
-            response = await self.llm.chat(
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.8,
-            )
-            data = json.loads(response)
-            mutations = data.get("mutations", [])
-
-            result = []
-            for i, m in enumerate(mutations):
-                case_id = f"{seed.id}-mut-{uuid.uuid4().hex[:6]}"
-                case = TestCase(
-                    id=case_id,
-                    name=m.get("name", f"{seed.name} mutation {i+1}"),
-                    input=m.get("input", ""),
-                    expected_output=m.get("expected_output"),
-                    expected=m.get("expected", {}),
-                    tags=m.get("tags", seed.tags),
-                    source=TestCaseSource.MUTATION,
-                    parent_id=seed.id,
-                    mutation_strategy=m.get("mutation_strategy"),
-                    review_status=ReviewStatus.PENDING,
-                    tier=TestCaseTier.SILVER,
-                )
-                result.append(case)
-            return result
+        response = await self.llm.chat(
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.8,
+            phase="mutate",
+        )
+        data = json.loads(response)
+        mutations = data.get("mutations", [])
 
-        except Exception as e:
-            return []
+        result = []
+        for i, m in enumerate(mutations):
+            case_id = f"{seed.id}-mut-{uuid.uuid4().hex[:6]}"
+            case = TestCase(
+                id=case_id,
+                name=m.get("name", f"{seed.name} mutation {i+1}"),
+                input=m.get("input", ""),
+                expected_output=m.get("expected_output"),
+                expected=m.get("expected", {}),
+                tags=m.get("tags", seed.tags),
+                source=TestCaseSource.MUTATION,
+                parent_id=seed.id,
+                mutation_strategy=m.get("mutation_strategy"),
+                review_status=ReviewStatus.PENDING,
+                tier=TestCaseTier.SILVER,
+            )
+            result.append(case)
+        return result
 
-    async def review_batch(self, cases: list[TestCase]) -> list[TestCase]:
+    async def review_batch(self, cases: list[TestCase]) -> "ReviewResult":
         """LLM 预审：检查变异用例的逻辑合理性，标记可疑项
-        LLM pre-review: check logical validity of mutations, flag suspicious ones"""
+        LLM pre-review: check logical validity of mutations, flag suspicious ones
+
+        用例按 mutation.review_chunk_tokens 估算的 token 数分块，最多 mutation.concurrency 块并发；
+        调用失败或响应缺少某些用例时，只对缺失的用例重试（mutation.review_retries 次），
+        仍未审核的用例记录在结果中，不会被当作已通过。
+        Cases are split into chunks by estimated tokens (mutation.review_chunk_tokens), with up to
+        mutation.concurrency chunks in flight; when a call fails or the response misses cases, only the
+        missing cases are retried (mutation.review_retries times). Cases still unreviewed are reported
+        in the result instead of being treated as approved.
+        """
+        result = ReviewResult(cases)
         if not cases:
-            return cases
+            return result
+
+        chunks = self._review_chunks(cases, self.config.mutation.review_chunk_tokens)
+        semaphore = asyncio.Semaphore(self.config.mutation.concurrency)
+
+        async def review_chunk(chunk: list[TestCase]) -> None:
+            async with semaphore:
+                pending = chunk
+                error = ""
+                for _ in range(self.config.mutation.review_retries + 1):
+                    try:
+                        reviews = await self._review_chunk(pending)
+                    except BudgetExceededError as e:
+                        error = str(e)
+                        break
+                    except Exception as e:
+                        error = str(e) or type(e).__name__
+                        continue
+                    for case in pending:
+                        review = reviews.get(case.id)
+                        if review is not None:
+                            result.record(case, review)
+                    pending = [c for c in pending if c.id not in reviews]
+                    if not pending:
+                        return
+                    error = t("review_missing")
+                for case in pending:
+                    result.unreviewed[case.id] = error
 
-        cases_info = []
-        for c in cases:
-            cases_info.append({
-                "id": c.id,
-                "input": c.input_query,
-                "expected_output": c.expected_output or "",
-                "mutation_strategy": c.mutation_strategy,
-            })
+        with span("mutate.review", cases=len(cases), chunks=len(chunks)) as s:
+            await asyncio.gather(*(review_chunk(chunk) for chunk in chunks))
+            s.set_attribute("rejected", len(result.rejected))
+            s.set_attribute("unreviewed", len(result.unreviewed))
+        return result
+
+    @staticmethod
+    def _review_info(case: TestCase) -> dict[str, Any]:
+        return {
+            "id": case.id,
+            "input": case.input_query,
+            "expected_output": case.expected_output or "",
+            "mutation_strategy": case.mutation_strategy,
+        }
+
+    @classmethod
+    def _review_chunks(cls, cases: list[TestCase], max_tokens: int) -> list[list[TestCase]]:
+        """按估算 token 数（约 4 字符 / token）贪心分块，每块至少一条用例
+        Greedily chunk by estimated tokens (~4 characters per token), at least one case per chunk"""
+        chunks: list[list[TestCase]] = []
+        current: list[TestCase] = []
+        tokens = 0
+        for case in cases:
+            size = len(json.dumps(cls._review_info(case), ensure_ascii=False)) // 4 + 1
+            if current and tokens + size > max_tokens:
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append(case)
+            tokens += size
+        if current:
+            chunks.append(current)
+        return chunks
+
+    async def _review_chunk(self, cases: list[TestCase]) -> dict[str, dict]:
+        """预审一块用例，返回 case_id → 审核结果 / Review one chunk, returning case_id → review"""
+        cases_info = [self._review_info(c) for c in cases]
 
         prompt = f"""你是一个测试用例审核专家。请检查以下变异生成的测试用例是否合理。
 You are a test case review expert. Check whether the following mutation-generated test cases are reasonable.
@@ -170,24 +264,35 @@ You are a test case review expert. Check whether the following mutation-generate
   ]
 }}"""
 
-        try:
-            response = await self.llm.chat(
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"},
-                temperature=0.1,
-            )
-            data = json.loads(response)
-            reviews = {r["id"]: r for r in data.get("reviews", [])}
+        response = await self.llm.chat(
+            messages=[{"role": "user", "content": prompt}],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            phase="review",
+        )
+        data = json.loads(response)
+        return {r["id"]: r for r in data.get("reviews", []) if isinstance(r, dict) and "id" in r}
+
+
+class ReviewResult:
+    """预审结果 / Pre-review result
 
-            for case in cases:
-                review = reviews.get(case.id)
-                if review and not review.get("approved", True):
-                    case.review_status = ReviewStatus.REJECTED
-                    # 保留 reason 到 judge_hints 字段（复用）
-                    # Store reason in judge_hints field (reuse)
-                    case.judge_hints = f"[Pre-review rejected] {review.get('reason', '')}"
+    cases 为全部用例（被拒绝的已标记为 rejected）；unreviewed 为 case_id → 未能审核的原因。
+    cases holds every case (rejected ones are marked rejected); unreviewed maps case_id → why it was not reviewed.
+    """
 
-        except Exception:
-            pass  # 预审失败不影响流程 / Pre-review failure doesn't block workflow
+    def __init__(self, cases: list[TestCase]):
+        self.cases = cases
+        self.reviewed = 0
+        self.rejected: list[str] = []
+        self.unreviewed: dict[str, str] = {}
 
-        return cases
+    def record(self, case: TestCase, review: dict) -> None:
+        """记录一条审核结论 / Record one review verdict"""
+        self.reviewed += 1
+        if not review.get("approved", True):
+            case.review_status = ReviewStatus.REJECTED
+            # 保留 reason 到 judge_hints 字段（复用）
+            # Store reason in judge_hints field (reuse)
+            case.judge_hints = f"[Pre-review rejected] {review.get('reason', '')}"
+            self.rejected.append(case.id)
@@ -6,16 +6,18 @@ from pathlib import Path
 from typing import Optional, Union
 
 from agent_evo.models import Config, TestCase, OptimizationResult, AggregatedDiagnosis
-from agent_evo.utils.llm import LLMClient
+from agent_evo.utils.llm import LLMClient, UsageTracker
+from agent_evo.utils.tracing import span
 
 
 class Optimizer:
     """提示词优化器 / Prompt optimizer"""
 
-    def __init__(self, config: Config, project_dir: Path):
+    def __init__(self, config: Config, project_dir: Path, usage: Optional[UsageTracker] = None):
         self.config = config
         self.project_dir = project_dir
-        self.llm = LLMClient(config.llm)
+        self.llm = LLMClient(config.llm, usage=usage)
+        self.usage = self.llm.usage
         self.optimize_prompt = self._load_prompt()
 
     def _load_prompt(self) -> str:
@@ -54,6 +56,7 @@ Output the optimized prompt wrapped in <optimized_prompt> and </optimized_prompt
         3. 始终保留 .bak 备份，进程崩溃时可恢复
         """
         prompt_file = self.project_dir / self.config.agent.prompt_file
+        usage_before = self.usage.summary()
 
         if not prompt_file.exists():
             return OptimizationResult(success=False, error_message=f"Prompt file not found: {prompt_file}")
@@ -71,68 +74,78 @@ Output the optimized prompt wrapped in <optimized_prompt> and </optimized_prompt
 
         try:
             for iteration in range(self.config.optimization.max_iterations):
-                prompt = self.optimize_prompt.format(
-                    current_prompt=current_prompt,
-                    diagnoses=diagnoses_str,
-                )
-
-                try:
-                    response = await self.llm.chat(messages=[{"role": "user", "content": prompt}])
-                    new_prompt = self._extract_optimized_prompt(response)
-
-                    if not new_prompt:
-                        # 提取失败时恢复原始 prompt / Restore original on extraction failure
-                        prompt_file.write_text(original_prompt, encoding="utf-8")
-                        return OptimizationResult(
-                            success=False, iterations=iteration + 1,
-                            error_message="Cannot extract optimized prompt from LLM response",
-                        )
-
-                    # 回归测试 / Regression test
-                    if self.config.optimization.run_regression:
-                        from agent_evo.core.generator import Generator
-                        from agent_evo.core.evaluator import Evaluator
-
-                        # 先写入新 prompt 用于回归验证
-                        # Write new prompt for regression validation
-                        prompt_file.write_text(new_prompt, encoding="utf-8")
-
-                        generator = Generator(self.config, self.project_dir)
-                        evaluator = Evaluator(self.config)
-                        generator.adapter = generator._create_adapter()
-
-                        results = await generator.run_all(test_cases)
-                        report = await evaluator.evaluate_all(results)
+                with span("optimize.iteration", iteration=iteration + 1):
+                    prompt = self.optimize_prompt.format(
+                        current_prompt=current_prompt,
+                        diagnoses=diagnoses_str,
+                    )
+
+                    try:
+                        response = await self.llm.chat(messages=[{"role": "user", "content": prompt}], phase="optimize")
+                        new_prompt = self._extract_optimized_prompt(response)
+
+                        if not new_prompt:
+                            # 提取失败时恢复原始 prompt / Restore original on extraction failure
+                            prompt_file.write_text(original_prompt, encoding="utf-8")
+                            return OptimizationResult(
+                                success=False, iterations=iteration + 1,
+                                error_message="Cannot extract optimized prompt from LLM response",
+                                usage=self.usage.summary(since=usage_before),
+                            )
 
-                        if report.pass_rate >= self.config.optimization.regression_threshold:
-                            # 验证通过，新 prompt 已在文件中，清理备份
-                            # Validation passed, new prompt is in file, clean up backup
+                        # 回归测试 / Regression test
+                        if self.config.optimization.run_regression:
+                            from agent_evo.core.generator import Generator
+                            from agent_evo.core.evaluator import Evaluator
+
+                            # 先写入新 prompt 用于回归验证
+                            # Write new prompt for regression validation
+                            prompt_file.write_text(new_prompt, encoding="utf-8")
+
+                            generator = Generator(self.config, self.project_dir)
+                            evaluator = Evaluator(self.config, usage=self.usage)
+                            generator.adapter = generator._create_adapter()
+                            evaluator.attach_stream_guards(generator)
+
+                            with span("regression", iteration=iteration + 1, cases=len(test_cases)) as s:
+                                results = await generator.run_all(test_cases)
+                                report = await evaluator.evaluate_all(results)
+                                s.set_attribute("pass_rate", report.pass_rate)
+
+                            if report.pass_rate >= self.config.optimization.regression_threshold:
+                                # 验证通过，新 prompt 已在文件中，清理备份
+                                # Validation passed, new prompt is in file, clean up backup
+                                self._cleanup_backup(backup_file)
+                                return OptimizationResult(
+                                    success=True, iterations=iteration + 1,
+                                    original_prompt=original_prompt, optimized_prompt=new_prompt,
+                                    regression_pass_rate=report.pass_rate,
+                                    usage=self.usage.summary(since=usage_before),
+                                )
+
+                            # 回归未通过，恢复原始 prompt 后继续迭代
+                            # Regression failed, restore original prompt before continuing
+                            prompt_file.write_text(original_prompt, encoding="utf-8")
+                            current_prompt = new_prompt
+                        else:
+                            # 不做回归，直接写入并返回
+                            # No regression, write and return directly
+                            prompt_file.write_text(new_prompt, encoding="utf-8")
                             self._cleanup_backup(backup_file)
                             return OptimizationResult(
                                 success=True, iterations=iteration + 1,
                                 original_prompt=original_prompt, optimized_prompt=new_prompt,
-                                regression_pass_rate=report.pass_rate,
+                                usage=self.usage.summary(since=usage_before),
                             )
-
-                        # 回归未通过，恢复原始 prompt 后继续迭代
-                        # Regression failed, restore original prompt before continuing
+                    except Exception as e:
+                        # 单次迭代异常，恢复原始 prompt
+                        # Single iteration exception, restore original prompt
                         prompt_file.write_text(original_prompt, encoding="utf-8")
-                        current_prompt = new_prompt
-                    else:
-                        # 不做回归，直接写入并返回
-                        # No regression, write and return directly
-                        prompt_file.write_text(new_prompt, encoding="utf-8")
                         self._cleanup_backup(backup_file)
                         return OptimizationResult(
-                            success=True, iterations=iteration + 1,
-                            original_prompt=original_prompt, optimized_prompt=new_prompt,
+                            success=False, iterations=iteration + 1, error_message=str(e),
+                            usage=self.usage.summary(since=usage_before),
                         )
-                except Exception as e:
-                    # 单次迭代异常，恢复原始 prompt
-                    # Single iteration exception, restore original prompt
-                    prompt_file.write_text(original_prompt, encoding="utf-8")
-                    self._cleanup_backup(backup_file)
-                    return OptimizationResult(success=False, iterations=iteration + 1, error_message=str(e))
 
             # 达到最大迭代次数，确保恢复原始提示词
             # Max iterations reached, ensure original prompt is restored
@@ -142,6 +155,7 @@ Output the optimized prompt wrapped in <optimized_prompt> and </optimized_prompt
                 success=False, iterations=self.config.optimization.max_iterations,
                 original_prompt=original_prompt, optimized_prompt=current_prompt,
                 error_message="Max iterations reached, original prompt restored",
+                usage=self.usage.summary(since=usage_before),
             )
         except Exception:
             # 任何未预期的异常，确保恢复原始 prompt
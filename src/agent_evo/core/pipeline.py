@@ -13,10 +13,14 @@ from agent_evo.models import (
 )
 from agent_evo.core.generator import Generator
 from agent_evo.core.evaluator import Evaluator
+from agent_evo.core.history import RunHistory, case_fingerprint
+from agent_evo.core.impact import diff_sections, load_diff, section_fingerprints, select_affected
 from agent_evo.core.optimizer import Optimizer
+from agent_evo.core.subset import CaseSubset
 from agent_evo.integrations.git import GitIntegration
-from agent_evo.utils.llm import LLMClient
+from agent_evo.utils.llm import LLMClient, UsageTracker, format_usage_lines
 from agent_evo.utils.i18n import t
+from agent_evo.utils.tracing import aflush_tracing, configure_tracing, span
 
 
 console = Console()
@@ -49,11 +53,17 @@ class Pipeline:
     def __init__(self, config: Config, project_dir: Optional[str] = None):
         self.config = config
         self.project_dir = Path(project_dir) if project_dir else Path.cwd()
+        # 所有组件共享同一个用量统计，预算对整次运行生效
+        # All components share one usage tracker so the budget applies to the whole run
+        self.usage = UsageTracker(config.llm)
         self.generator = Generator(config, self.project_dir)
-        self.evaluator = Evaluator(config)
-        self.optimizer = Optimizer(config, self.project_dir)
+        self.evaluator = Evaluator(config, usage=self.usage)
+        self.evaluator.attach_stream_guards(self.generator)
+        self.optimizer = Optimizer(config, self.project_dir, usage=self.usage)
         self.git = GitIntegration(config.git, self.project_dir) if config.git.enabled else None
-        self.llm = LLMClient(config.llm)
+        self.llm = LLMClient(config.llm, usage=self.usage)
+        self.history = RunHistory.load(config.history, self.project_dir) if config.history.enabled else None
+        configure_tracing(config.tracing)
 
     async def run(
         self,
@@ -63,21 +73,46 @@ class Pipeline:
         tier: Optional[str] = None,
         include_silver: bool = False,
         dry_run: bool = False,
+        order: str = "file",
+        seed: Optional[int] = None,
     ) -> PipelineResult:
         """四阶段批量流程 / Four-stage batch workflow"""
+        try:
+            with span("pipeline.run", auto_fix=auto_fix, create_pr=create_pr, tier=tier):
+                return await self._run(
+                    auto_fix=auto_fix, create_pr=create_pr, tags=tags,
+                    tier=tier, include_silver=include_silver, dry_run=dry_run,
+                    order=order, seed=seed,
+                )
+        finally:
+            await self._flush_trace()
+
+    async def _run(
+        self,
+        auto_fix: bool,
+        create_pr: bool,
+        tags: Optional[list[str]],
+        tier: Optional[str],
+        include_silver: bool,
+        dry_run: bool,
+        order: str,
+        seed: Optional[int],
+    ) -> PipelineResult:
         console.print(f"\n[bold blue]{t('pipeline_start')}[/bold blue]\n")
 
         # ── Phase A：批量执行 + 评测（因子化，归因即时完成）──
         # ── Phase A: Batch execution + evaluation (factor-based, attribution done in-place) ──
-        test_cases = self.generator.load_test_cases(tags=tags, include_silver=include_silver)
-        if tier:
-            test_cases = [c for c in test_cases if c.tier.value == tier]
+        test_cases = self._load_cases(tags=tags, tier=tier, include_silver=include_silver, order=order, seed=seed)
         console.print(t("loaded_cases").format(n=len(test_cases)))
+        fingerprints = {c.id: case_fingerprint(c) for c in test_cases}
+        sections = self._prompt_sections()
+        self._apply_history(test_cases)
 
         console.print(f"\n[bold]{t('phase_a')}[/bold]")
         started_at = datetime.now()
         results = await self.generator.run_all(test_cases)
-        eval_report = await self.evaluator.evaluate_all(results)
+        with span("evaluate", cases=len(results)):
+            eval_report = await self.evaluator.evaluate_all(results)
         eval_report.started_at = started_at
         eval_report.finished_at = datetime.now()
         eval_report.duration_seconds = (eval_report.finished_at - started_at).total_seconds()
@@ -91,7 +126,8 @@ class Pipeline:
             # ── Phase B：聚合分析（轻量，只传归因摘要）──
             # ── Phase B: Aggregated analysis (lightweight, only pass attribution summary) ──
             console.print(f"\n[bold]{t('phase_b')}[/bold]")
-            aggregated = await self._aggregate_diagnosis(eval_report)
+            with span("aggregate", failed=eval_report.failed):
+                aggregated = await self._aggregate_diagnosis(eval_report)
             eval_report.aggregated_diagnosis = aggregated
 
             if aggregated.suggested_prompt_changes:
@@ -107,10 +143,15 @@ class Pipeline:
                     # ── Phase C：统一优化 + 回归验证 ──
                     # ── Phase C: Unified optimization + regression ──
                     console.print(f"\n[bold]{t('phase_c')}[/bold]")
-                    optimization_result = await self.optimizer.optimize(
-                        aggregated_diagnosis=aggregated,
-                        test_cases=test_cases,
-                    )
+                    # 被隔离的不稳定用例不参与回归验证 / Quarantined flaky cases take no part in the regression check
+                    regression_cases = [c for c in test_cases if c.id not in self.evaluator.quarantined]
+                    with span("optimize") as s:
+                        optimization_result = await self.optimizer.optimize(
+                            aggregated_diagnosis=aggregated,
+                            test_cases=regression_cases,
+                        )
+                        s.set_attribute("success", optimization_result.success)
+                        s.set_attribute("iterations", optimization_result.iterations)
 
                     if optimization_result.success:
                         console.print(f"[green]{t('optimize_success').format(n=optimization_result.iterations)}[/green]")
@@ -121,16 +162,22 @@ class Pipeline:
                     # ── Phase D: Generate report + create PR ──
                     if create_pr and self.git and optimization_result.success:
                         console.print(f"\n[bold]{t('phase_d')}[/bold]")
-                        pr_url = await self.git.create_pr(
-                            title=f"[AgentEvo] Auto-optimize: fix {eval_report.failed} failed cases",
-                            body=self._generate_pr_body(eval_report, optimization_result, aggregated),
-                            changes=[(self.config.agent.prompt_file, optimization_result.optimized_prompt)],
-                        )
+                        with span("pr"):
+                            pr_url = await self.git.create_pr(
+                                title=f"[AgentEvo] Auto-optimize: fix {eval_report.failed} failed cases",
+                                body=self._generate_pr_body(eval_report, optimization_result, aggregated),
+                                changes=[(self.config.agent.prompt_file, optimization_result.optimized_prompt)],
+                            )
                         console.print(f"[green]{t('pr_created').format(url=pr_url)}[/green]")
             else:
                 console.print(f"[yellow]{t('no_auto_fix_patterns')}[/yellow]")
 
         eval_report.optimization = optimization_result
+        eval_report.usage = self.usage.summary()
+        # 在归因之后记录，便于下次按归因涉及的 tag 排序
+        # Recorded after diagnosis so the next run can prioritize the tags it touched
+        self._record_history(eval_report, fingerprints, sections)
+        self._print_usage(eval_report)
         return PipelineResult(eval_report=eval_report, optimization=optimization_result, pr_url=pr_url)
 
     async def eval_only(
@@ -138,13 +185,147 @@ class Pipeline:
         tags: Optional[list[str]] = None,
         tier: Optional[str] = None,
         include_silver: bool = False,
+        order: str = "file",
+        seed: Optional[int] = None,
+        sample: Optional[str] = None,
+        affected_by: Optional[str] = None,
     ) -> EvalReport:
-        """只运行评测，不优化 / Run evaluation only, no optimization"""
-        test_cases = self.generator.load_test_cases(tags=tags, include_silver=include_silver)
-        if tier:
-            test_cases = [c for c in test_cases if c.tier.value == tier]
-        results = await self.generator.run_all(test_cases)
-        return await self.evaluator.evaluate_all(results)
+        """只运行评测，不优化 / Run evaluation only, no optimization
+
+        sample 为 N 或 P% 时只评测分层抽样的子集，并把通过率推断到完整测评集（见 CaseSubset）。
+        affected_by 为提示词改动（diff 文件、"-" 或 git 版本）时只评测可能受影响的用例（见 core/impact.py）。
+        With sample set to N or P%, only a stratified subset is evaluated and the pass rate is
+        extrapolated to the full suite (see CaseSubset). With affected_by set to a prompt change (a diff
+        file, "-" or a git revision), only the cases likely affected are evaluated (see core/impact.py).
+        """
+        if sample and affected_by:
+            raise ValueError(t("affected_with_sample"))
+        try:
+            with span("pipeline.eval", tier=tier):
+                test_cases = self._load_cases(
+                    tags=tags, tier=tier, include_silver=include_silver, order=order, seed=seed,
+                )
+                subset = None
+                if sample:
+                    subset = CaseSubset.select(test_cases, sample, self.config.tag_policies, seed)
+                    test_cases = subset.cases
+                if affected_by:
+                    test_cases = self._select_affected(test_cases, affected_by, order)
+                fingerprints = {c.id: case_fingerprint(c) for c in test_cases}
+                sections = self._prompt_sections()
+                self._apply_history(test_cases)
+                results = await self.generator.run_all(test_cases)
+                with span("evaluate", cases=len(results)):
+                    report = await self.evaluator.evaluate_all(results)
+                if subset is not None:
+                    report.sampling = subset.summarize(report)
+                self._record_history(report, fingerprints, sections)
+                return report
+        finally:
+            await self._flush_trace()
+
+    def _load_cases(
+        self,
+        tags: Optional[list[str]],
+        tier: Optional[str],
+        include_silver: bool,
+        order: str = "file",
+        seed: Optional[int] = None,
+    ) -> list[TestCase]:
+        """加载、按 tier 过滤并排序用例 / Load cases, filter by tier and order them"""
+        with span("load", tags=tags or [], tier=tier, order=order) as s:
+            test_cases = self.generator.load_test_cases(tags=tags, include_silver=include_silver)
+            if tier:
+                test_cases = [c for c in test_cases if c.tier.value == tier]
+            test_cases = self.generator.order_cases(test_cases, order, self.history, seed)
+            s.set_attribute("cases", len(test_cases))
+            return test_cases
+
+    def _apply_history(self, test_cases: list[TestCase]) -> None:
+        """按运行历史处理不稳定用例：隔离或增加采样
+        Handle flaky cases from run history: quarantine or up-sample them"""
+        if not self.history:
+            return
+        case_ids = {c.id for c in test_cases}
+        self.evaluator.flakiness = {
+            case_id: score for case_id in case_ids
+            if (score := self.history.flakiness(case_id)) is not None
+        }
+        flaky = {case_id for case_id in self.history.flaky_cases() if case_id in case_ids}
+        if not flaky:
+            return
+
+        action = self.config.history.flaky_action
+        if action == "quarantine":
+            self.evaluator.quarantined = flaky
+            console.print(f"[yellow]{t('flaky_quarantined').format(n=len(flaky), ids=', '.join(sorted(flaky)))}[/yellow]")
+        elif action == "resample":
+            resample = self.config.history.resample
+            for case in test_cases:
+                if case.id in flaky and (case.samples or self.config.judge.samples) < resample:
+                    case.samples = resample
+            console.print(f"[yellow]{t('flaky_resampled').format(n=len(flaky), samples=resample)}[/yellow]")
+
+    def _prompt_text(self) -> Optional[str]:
+        """当前提示词文件内容，未配置或不存在时为 None / Current prompt file content; None when unset or missing"""
+        if not self.config.agent.prompt_file:
+            return None
+        path = self.project_dir / self.config.agent.prompt_file
+        return path.read_text(encoding="utf-8") if path.is_file() else None
+
+    def _prompt_sections(self) -> Optional[dict[str, str]]:
+        """运行前提示词各段落的指纹（优化会改写提示词，需在运行前取）
+        Fingerprints of the prompt sections before the run (taken up front since optimization rewrites the prompt)"""
+        text = self._prompt_text()
+        return section_fingerprints(text) if text is not None else None
+
+    def _select_affected(self, test_cases: list[TestCase], spec: str, order: str) -> list[TestCase]:
+        """只保留提示词改动可能影响的用例；--order 为 file 时按影响分数排序
+        Keep only the cases a prompt change likely affects; with --order file they are sorted by impact score"""
+        prompt = self._prompt_text()
+        if prompt is None or self.history is None:
+            console.print(f"[yellow]{t('affected_unavailable')}[/yellow]")
+            return test_cases
+        changed = diff_sections(load_diff(spec, self.config, self.project_dir), self.config.agent.prompt_file, prompt)
+        if changed is None:
+            console.print(f"[yellow]{t('affected_no_prompt_change')}[/yellow]")
+            return test_cases
+
+        selected, _, unknown = select_affected(test_cases, self.history, changed)
+        console.print(t("affected_sections").format(sections=", ".join(sorted(changed)) or "-"))
+        console.print(t("affected_selected").format(n=len(selected), total=len(test_cases)))
+        if unknown:
+            console.print(f"[yellow]{t('affected_unknown').format(sections=', '.join(unknown))}[/yellow]")
+        if order != "file":
+            keep = {c.id for c in selected}
+            return [c for c in test_cases if c.id in keep]
+        return selected
+
+    def _record_history(
+        self,
+        report: EvalReport,
+        fingerprints: Optional[dict[str, str]] = None,
+        sections: Optional[dict[str, str]] = None,
+    ) -> None:
+        """记录本次结果，写入失败不影响评测 / Record this run; a write failure doesn't affect the evaluation"""
+        if not self.history:
+            return
+        self.history.record(report, fingerprints, sections)
+        try:
+            self.history.save()
+        except OSError as e:
+            console.print(f"[yellow]{t('history_save_fail').format(err=e)}[/yellow]")
+
+    @staticmethod
+    async def _flush_trace() -> None:
+        """导出追踪数据，导出失败不影响评测结果 / Export trace data; export failures don't affect results"""
+        try:
+            target = await aflush_tracing()
+        except Exception as e:
+            console.print(f"[yellow]{t('trace_export_fail').format(err=e)}[/yellow]")
+            return
+        if target:
+            console.print(f"  {t('trace_exported').format(target=target)}")
 
     # ── Phase B 聚合分析 / Phase B Aggregated analysis ────────
 
@@ -181,6 +362,7 @@ class Pipeline:
                 messages=[{"role": "user", "content": prompt}],
                 response_format={"type": "json_object"},
                 temperature=0.3,
+                phase="aggregate",
             )
             data = json.loads(response)
             return AggregatedDiagnosis(**data)
@@ -204,7 +386,10 @@ class Pipeline:
         if report.factor_summary:
             console.print(f"\n  [bold]{t('factor_summary_title')}[/bold]")
             for fid, fs in report.factor_summary.items():
-                console.print(f"    {t('factor_line').format(fid=fid, activated=fs.activated_count, avg=fs.avg_score, fail=fs.fail_count)}")
+                if fs.activated_count:
+                    console.print(f"    {t('factor_line').format(fid=fid, activated=fs.activated_count, avg=fs.avg_score, fail=fs.fail_count)}")
+                if fs.skipped_count:
+                    console.print(f"    [yellow]{t('factor_unverified').format(fid=fid, count=fs.skipped_count)}[/yellow]")
 
         # 门禁检查 / Gate check
         if report.release_blocked:
@@ -216,6 +401,12 @@ class Pipeline:
             for r in report.get_failed_results()[:5]:
                 console.print(f"    - {r.case_id}: {r.fail_reason or r.summary[:60]}")
 
+    @staticmethod
+    def _print_usage(report: EvalReport) -> None:
+        """打印 LLM 用量与成本 / Print LLM usage and cost"""
+        for line in format_usage_lines(report.usage):
+            console.print(f"  {line}")
+
     def _generate_pr_body(self, report: EvalReport, opt_result: OptimizationResult, diagnosis: AggregatedDiagnosis) -> str:
         body = f"""## AgentEvo Auto-Optimization Report
 
@@ -0,0 +1,162 @@
+"""导入采样 / Import sampling
+
+同一 error_type 的线上失败往往成千上万，全部提炼既浪费 LLM 调用又不增加覆盖面。
+RecordSampler 在提炼之前把记录分层（error_type、输入相似度聚类或 metadata 字段），
+每层最多保留 max_per_stratum 条，总数不超过 max_records（各层轮流分配）。
+Production failures sharing one error_type often number in the thousands; refining them all wastes
+LLM calls without widening coverage. RecordSampler splits records into strata before refinement
+(error_type, clusters by input similarity, or a metadata field), keeps at most max_per_stratum
+records per stratum and at most max_records overall (shared round-robin across strata).
+
+两种方式 / Two methods:
+    first      流式保留每层最先出现的记录，不影响流水线 / Keeps the first records of each stratum while streaming
+    reservoir  每层蓄水池均匀抽样，内存中最多保留每层上限条记录；
+               读完全部记录后才开始提炼 / A uniform reservoir per stratum, holding at most the per-stratum
+               limit in memory; refinement starts once all records are read
+
+用法 / Usage:
+    sampler = RecordSampler.from_config(config)
+    released, dropped = sampler.offer(record)
+    ...
+    released, dropped = sampler.finish()
+    sampler.fill(result)
+"""
+
+import random
+from collections import Counter
+from typing import Optional
+
+from agent_evo.core.dedup import MinHashIndex
+from agent_evo.models import Config, DedupConfig, ImportSamplingConfig
+from agent_evo.models.import_models import ImportResult, ProductionRecord
+from agent_evo.utils.i18n import t
+
+_LABEL_CHARS = 40   # cluster 层标签中首条输入的最大长度 / Max length of the leading input in a cluster label
+
+
+class RecordSampler:
+    """提炼前的分层采样 / Stratified sampling before refinement"""
+
+    def __init__(self, config: ImportSamplingConfig, dedup: Optional[DedupConfig] = None):
+        self.config = config
+        by = config.stratify_by
+        if by not in ("error_type", "cluster") and not (by.startswith("metadata.") and len(by) > len("metadata.")):
+            raise ValueError(t("sampling_bad_stratum").format(by=by))
+
+        self._rng = random.Random(config.seed)
+        self._kept: Counter = Counter()                       # 层 -> 已保留数 / stratum -> records kept
+        self._seen: Counter = Counter()                       # 层 -> 已读取数（蓄水池用）/ stratum -> records read (reservoir)
+        self._reservoirs: dict[str, list[ProductionRecord]] = {}
+        self._labels: dict[str, str] = {}
+        self.dropped_by: Counter = Counter()                  # 原因 -> 丢弃数 / reason -> records dropped
+        self.dropped_strata: Counter = Counter()              # 层 -> 丢弃数 / stratum -> records dropped
+
+        # 蓄水池大小：两个上限中较小的一个；丢弃原因随之而定
+        # Reservoir size: the smaller of the two limits, which also decides the drop reason
+        limits = [n for n in (config.max_per_stratum, config.max_records) if n is not None]
+        self._size = min(limits) if limits else None
+        self._reason = (
+            "stratum_cap"
+            if config.max_per_stratum is not None and config.max_per_stratum == self._size
+            else "max_records"
+        )
+
+        self._clusters: Optional[MinHashIndex] = None
+        if by == "cluster":
+            dedup = dedup or DedupConfig()
+            self._clusters = MinHashIndex(
+                threshold=config.cluster_threshold, num_perm=dedup.num_perm, ngram=dedup.ngram,
+            )
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["RecordSampler"]:
+        """按 import.sampling 创建；未设置任何上限时返回 None
+        Create from import.sampling; None when no limit is set"""
+        if config.import_config is None:
+            return None
+        sampling = config.import_config.sampling
+        if sampling.max_per_stratum is None and sampling.max_records is None:
+            return None
+        return cls(sampling, config.dedup)
+
+    def stratum(self, record: ProductionRecord) -> str:
+        """记录所在的层 / The stratum a record belongs to"""
+        by = self.config.stratify_by
+        if by == "error_type":
+            return record.error_type or "unknown"
+        if by == "cluster":
+            # 在线聚类：与已有簇首相似则归入该簇，否则自成新簇
+            # Online clustering: join the cluster whose leader is similar, otherwise start a new one
+            signature = self._clusters.signature(record.query)
+            hit = self._clusters.query(signature)
+            if hit is not None:
+                return hit[0]
+            key = f"cluster-{len(self._clusters) + 1}"
+            self._clusters.add(key, signature)
+            self._labels[key] = f"{key}: {record.query[:_LABEL_CHARS]}"
+            return key
+        value = record.metadata.get(by[len("metadata."):])
+        return "unknown" if value is None or value == "" else str(value)
+
+    def offer(self, record: ProductionRecord) -> tuple[list[ProductionRecord], list[ProductionRecord]]:
+        """交给采样器一条记录，返回（现在可以提炼的记录, 被丢弃的记录）
+        Hand one record to the sampler; returns (records to refine now, records dropped)"""
+        key = self.stratum(record)
+        cfg = self.config
+
+        if cfg.method == "first":
+            if cfg.max_per_stratum is not None and self._kept[key] >= cfg.max_per_stratum:
+                return [], [self._drop(record, key, "stratum_cap")]
+            if cfg.max_records is not None and sum(self._kept.values()) >= cfg.max_records:
+                return [], [self._drop(record, key, "max_records")]
+            self._kept[key] += 1
+            return [record], []
+
+        # 蓄水池抽样（Algorithm R）/ Reservoir sampling (Algorithm R)
+        self._seen[key] += 1
+        reservoir = self._reservoirs.setdefault(key, [])
+        if len(reservoir) < self._size:
+            reservoir.append(record)
+            return [], []
+        j = self._rng.randrange(self._seen[key])
+        if j < self._size:
+            reservoir[j], record = record, reservoir[j]
+        return [], [self._drop(record, key, self._reason)]
+
+    def finish(self) -> tuple[list[ProductionRecord], list[ProductionRecord]]:
+        """记录读完后调用：返回蓄水池中要提炼的记录与因总数上限丢弃的记录
+        Call once all records are read: returns the reservoir records to refine and those dropped
+        by the overall limit"""
+        if self.config.method == "first":
+            return [], []
+
+        # 各层轮流取，直到达到 max_records / Take from each stratum in turn until max_records is reached
+        limit = self.config.max_records
+        released: list[ProductionRecord] = []
+        depth = max((len(r) for r in self._reservoirs.values()), default=0)
+        for i in range(depth):
+            for reservoir in self._reservoirs.values():
+                if i < len(reservoir):
+                    released.append(reservoir[i])
+        keep = released if limit is None else released[:limit]
+        dropped = [] if limit is None else released[limit:]
+        index = {id(r): key for key, reservoir in self._reservoirs.items() for r in reservoir}
+        for record in keep:
+            self._kept[index[id(record)]] += 1
+        for record in dropped:
+            self._drop(record, index[id(record)], "max_records")
+        self._reservoirs.clear()
+        return keep, dropped
+
+    def fill(self, result: ImportResult) -> None:
+        """把采样统计写入导入结果 / Write sampling counts into the import result"""
+        result.sampled_out = sum(self.dropped_by.values())
+        result.sampled_out_by = dict(self.dropped_by)
+        result.sampled_out_strata = {
+            self._labels.get(key, key): n for key, n in self.dropped_strata.most_common()
+        }
+
+    def _drop(self, record: ProductionRecord, key: str, reason: str) -> ProductionRecord:
+        self.dropped_by[reason] += 1
+        self.dropped_strata[key] += 1
+        return record
@@ -8,6 +8,9 @@ import yaml
 
 from agent_evo.models.test_case import TestCase, TestSuite
 
+# 有 libyaml 时用 C 实现加速增量写入 / Use the libyaml C emitter for incremental writes when available
+_FAST_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
 
 def test_cases_to_yaml(
     cases: list[TestCase],
@@ -42,13 +45,98 @@ def save_test_cases(
     return path
 
 
+class YamlCaseWriter:
+    """增量写入测评集 YAML：每追加一条用例立即落盘，中途中断时已写入的用例不会丢失
+    Incremental test suite YAML writer: each appended case is flushed immediately, so cases
+    written before an interruption are kept
+
+    文件在任意时刻都是合法的测评集：没有用例时写为 cases: []，第一次写入时再改为块列表。
+    The file is a valid test suite at any point: with no cases it holds cases: [], switched to a
+    block list on the first write.
+
+    append=True 时保留文件中已有的用例（及其 name / description），新用例追加在后面；
+    已有用例计入 existing，不计入 count。
+    With append=True the cases already in the file (and its name / description) are kept and new
+    cases follow them; existing cases are counted in existing, not in count.
+    existing_ids 为已有用例的 ID / existing_ids holds the IDs of the existing cases.
+
+    用法 / Usage:
+        with YamlCaseWriter(path, name="...") as writer:
+            writer.write(cases)
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        name: str = "Generated Test Cases",
+        description: Optional[str] = None,
+        append: bool = False,
+    ):
+        self.path = Path(output_path)
+        self.name = name
+        self.description = description
+        self.append = append
+        self.count = 0
+        self.existing = 0
+        self.existing_ids: set[str] = set()
+        self._file = None
+        self._empty_at: Optional[int] = None   # 空列表 "cases: []" 在文件中的位置 / Offset of the empty "cases: []"
+
+    def __enter__(self) -> "YamlCaseWriter":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        existing: list = []
+        if self.append and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = yaml.safe_load(f)
+            if isinstance(data, dict):
+                self.name = data.get("name", self.name)
+                self.description = data.get("description", self.description)
+                existing = data.get("cases") or []
+        self._file = open(self.path, "w", encoding="utf-8")
+        header = {"name": self.name}
+        if self.description:
+            header["description"] = self.description
+        self._file.write(yaml.dump(header, allow_unicode=True, default_flow_style=False, sort_keys=False))
+        if existing:
+            self._file.write("cases:\n")
+            self._file.write(yaml.dump(existing, allow_unicode=True, default_flow_style=False, sort_keys=False))
+            self.existing = len(existing)
+            self.existing_ids = {c["id"] for c in existing if isinstance(c, dict) and "id" in c}
+        else:
+            # 只写 "cases:" 会被读成 null / A bare "cases:" would load as null
+            self._empty_at = self._file.tell()
+            self._file.write("cases: []\n")
+        self._file.flush()
+        return self
+
+    def write(self, cases: list[TestCase]) -> None:
+        """追加用例并落盘 / Append cases and flush"""
+        if not cases:
+            return
+        if self._empty_at is not None:
+            self._file.seek(self._empty_at)
+            self._file.truncate()
+            self._file.write("cases:\n")
+            self._empty_at = None
+        self._file.write(yaml.dump(
+            [_case_to_dict(c) for c in cases],
+            Dumper=_FAST_DUMPER, allow_unicode=True, default_flow_style=False, sort_keys=False,
+        ))
+        self._file.flush()
+        self.count += len(cases)
+
+    def __exit__(self, *exc) -> None:
+        self._file.close()
+        self._file = None
+
+
 def load_test_cases_from_yaml(file_path: str) -> list[TestCase]:
     """从 YAML 文件加载 TestCase 列表 / Load TestCase list from YAML file"""
     path = Path(file_path)
     with open(path, "r", encoding="utf-8") as f:
         data = yaml.safe_load(f)
 
-    if not data or "cases" not in data:
+    if not data or not data.get("cases"):
         return []
 
     return [TestCase(**c) for c in data["cases"]]
@@ -95,5 +183,7 @@ def _case_to_dict(case: TestCase) -> dict:
         d["bad_output"] = case.bad_output
     if case.judge_hints:
         d["judge_hints"] = case.judge_hints
+    if case.samples:
+        d["samples"] = case.samples
 
     return d
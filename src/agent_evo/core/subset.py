@@ -0,0 +1,173 @@
+"""抽样评测 / Sampled evaluation
+
+每个 PR 都跑完整的黄金 + 白银集太慢。eval --sample N|P% 按 (层级, tag) 分层，
+按各层在测评集中的占比分配名额，只评测抽中的用例，再把通过率推断到完整测评集并给出 95% 置信区间。
+Running the full gold + silver suite on every PR is too slow. eval --sample N|P% stratifies cases
+by (tier, tag), allocates the sample in proportion to each stratum's share of the suite, evaluates
+only the sampled cases, and extrapolates the pass rate to the full suite with a 95% confidence
+interval.
+
+- 带多个 tag 的用例归入第一个 required_for_release 的 tag（按 tag_policies 顺序），否则归入第一个 tag。
+  A case with several tags goes to its first required_for_release tag (in tag_policies order),
+  otherwise to its first tag.
+- 每个 required_for_release 的 tag 至少抽中一条用例，必要时样本会略大于 N。
+  Every required_for_release tag gets at least one case, so the sample may end up slightly larger than N.
+- 同一 seed 下抽样结果确定；每层使用独立的随机数，其它层的用例增减不影响本层的抽样。
+  The sample is deterministic for a seed; each stratum draws from its own random stream, so adding
+  or removing cases elsewhere does not change it.
+
+用法 / Usage:
+    subset = CaseSubset.select(cases, "10%", config.tag_policies, seed=0)
+    report = await evaluate(subset.cases)
+    report.sampling = subset.summarize(report)
+"""
+
+import random
+from typing import Optional
+
+from agent_evo.models import (
+    CaseStatus,
+    EvalReport,
+    SampleEstimate,
+    SampleSummary,
+    TagPolicyConfig,
+    TestCase,
+)
+from agent_evo.utils.i18n import t
+from agent_evo.utils.stats import stratified_estimate
+
+_UNTAGGED = "-"   # 无 tag 用例的层名 / Stratum name of untagged cases
+
+
+def sample_size(spec: str, population: int) -> int:
+    """解析 --sample：N 为用例数，P% 为占比（至少 1 条），不超过总数
+    Parse --sample: N is a case count and P% a share (at least one case), capped at the population"""
+    text = spec.strip()
+    try:
+        if text.endswith("%"):
+            percent = float(text[:-1])
+            if not 0 < percent <= 100:
+                raise ValueError
+            size = max(1, round(population * percent / 100))
+        else:
+            size = int(text)
+            if size < 1:
+                raise ValueError
+    except ValueError:
+        raise ValueError(t("bad_sample").format(spec=spec)) from None
+    return min(size, population)
+
+
+class CaseSubset:
+    """按 (层级, tag) 分层抽取的用例子集 / A subset of cases stratified by (tier, tag)"""
+
+    def __init__(
+        self,
+        cases: list[TestCase],
+        strata: dict[str, str],
+        population: dict[str, int],
+        tag_population: dict[str, int],
+        seed: int,
+    ):
+        self.cases = cases
+        self.strata = strata                  # 用例 ID -> 层 / case ID -> stratum
+        self.population = population          # 层 -> 完整测评集中的用例数 / stratum -> cases in the full suite
+        self.tag_population = tag_population  # tag -> 完整测评集中的用例数 / tag -> cases in the full suite
+        self.seed = seed
+
+    @staticmethod
+    def stratum(case: TestCase, required: list[str]) -> str:
+        """用例所在的层："层级/tag" / A case's stratum: "tier/tag" """
+        tag = next((tag for tag in required if tag in case.tags), None)
+        if tag is None:
+            tag = case.tags[0] if case.tags else _UNTAGGED
+        return f"{case.tier.value}/{tag}"
+
+    @classmethod
+    def select(
+        cls,
+        cases: list[TestCase],
+        spec: str,
+        tag_policies: dict[str, TagPolicyConfig],
+        seed: Optional[int] = None,
+    ) -> "CaseSubset":
+        """按比例分层抽样，保持用例原有顺序 / Proportional stratified sample, keeping the cases' order"""
+        seed = 0 if seed is None else seed
+        required = [tag for tag, policy in tag_policies.items() if policy.required_for_release]
+        size = sample_size(spec, len(cases))
+
+        groups: dict[str, list[TestCase]] = {}
+        strata: dict[str, str] = {}
+        for case in cases:
+            key = cls.stratum(case, required)
+            groups.setdefault(key, []).append(case)
+            strata[case.id] = key
+
+        # 最大余数法按比例分配名额 / Proportional allocation by largest remainder
+        quotas = {key: size * len(group) / len(cases) for key, group in groups.items()} if cases else {}
+        counts = {key: int(q) for key, q in quotas.items()}
+        remainder = size - sum(counts.values())
+        for key in sorted(quotas, key=lambda k: (counts[k] - quotas[k], k))[:remainder]:
+            counts[key] += 1
+
+        chosen: set[str] = set()
+        for key, group in groups.items():
+            rng = random.Random(f"{seed}:{key}")
+            chosen.update(c.id for c in rng.sample(group, counts[key]))
+
+        # 保证每个 required_for_release 的 tag 都有用例 / Make sure every required_for_release tag has a case
+        for tag in required:
+            candidates = [c for c in cases if tag in c.tags]
+            if candidates and not any(c.id in chosen for c in candidates):
+                chosen.add(random.Random(f"{seed}:{tag}").choice(candidates).id)
+
+        tag_population: dict[str, int] = {}
+        for case in cases:
+            for tag in case.tags:
+                tag_population[tag] = tag_population.get(tag, 0) + 1
+        return cls(
+            [c for c in cases if c.id in chosen],
+            strata,
+            {key: len(group) for key, group in groups.items()},
+            tag_population,
+            seed,
+        )
+
+    def summarize(self, report: EvalReport) -> SampleSummary:
+        """把抽样评测结果推断到完整测评集；被隔离或跳过的用例不计入
+        Extrapolate the sampled results to the full suite; quarantined and skipped cases are not counted"""
+        counted = [
+            r for r in report.results
+            if not r.quarantined and r.status != CaseStatus.SKIPPED and r.case_id in self.strata
+        ]
+
+        by_stratum: dict[str, list[int]] = {key: [0, 0] for key in self.population}
+        by_tag: dict[str, list[int]] = {}
+        for r in counted:
+            buckets = [by_stratum[self.strata[r.case_id]]] + [by_tag.setdefault(tag, [0, 0]) for tag in r.tags]
+            for bucket in buckets:
+                bucket[0] += 1
+                bucket[1] += int(r.status == CaseStatus.PASSED)
+
+        strata = {
+            key: self._estimate([(self.population[key], n, c)])
+            for key, (n, c) in sorted(by_stratum.items()) if n
+        }
+        tags = {
+            tag: self._estimate([(self.tag_population.get(tag, n), n, c)])
+            for tag, (n, c) in sorted(by_tag.items())
+        }
+        overall = self._estimate([(self.population[key], n, c) for key, (n, c) in by_stratum.items()])
+        return SampleSummary(seed=self.seed, estimate=overall, strata=strata, tags=tags)
+
+    @staticmethod
+    def _estimate(strata: list[tuple[int, int, int]]) -> SampleEstimate:
+        estimate = SampleEstimate(
+            population=sum(size for size, _, _ in strata),
+            sampled=sum(n for _, n, _ in strata),
+            passed=sum(c for _, _, c in strata),
+        )
+        result = stratified_estimate(strata)
+        if result is not None:
+            estimate.pass_rate, estimate.ci_low, estimate.ci_high = result
+        return estimate
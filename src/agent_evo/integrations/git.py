@@ -52,6 +52,10 @@ class GitIntegration:
         commit = repo.index.commit(message)
         return commit.hexsha
     
+    def diff(self, rev: str, path: str) -> str:
+        """文件相对某个版本的改动（统一 diff，与工作区比较）/ Changes to a file since a revision (unified diff against the working tree)"""
+        return self._get_repo().git.diff(rev, "--", path)
+    
     def push(self, branch: Optional[str] = None) -> None:
         """推送到远程 / Push to remote"""
         repo = self._get_repo()
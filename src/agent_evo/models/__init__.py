@@ -3,6 +3,8 @@
 from agent_evo.models.config import (
     Config, AgentConfig, LLMConfig, JudgeConfig, OptimizationConfig, GitConfig,
     FactorConfig, TagPolicyConfig, MutationConfig, ImportConfig, DimensionConfig,
+    ModelPricing, TracingConfig, HistoryConfig, JudgeCascadeConfig, DedupConfig,
+    ImportSamplingConfig,
 )
 from agent_evo.models.test_case import (
     TestCase, TestSuite, ExpectedOutput, TestCaseInput,
@@ -11,24 +13,31 @@ from agent_evo.models.test_case import (
 )
 from agent_evo.models.eval_result import (
     CaseResult, EvalReport, CaseStatus, TagStats,
-    FactorResult, FactorSummary, AggregatedDiagnosis,
+    FactorResult, FactorSummary, AggregatedDiagnosis, CascadeSummary,
+    SampleEstimate, SampleSummary,
 )
 from agent_evo.models.optimization import OptimizationResult
-from agent_evo.models.import_models import ProductionRecord, ImportResult, APISourceConfig, PaginationConfig
+from agent_evo.models.usage import PhaseUsage, UsageSummary
+from agent_evo.models.import_models import ProductionRecord, ImportResult, APISourceConfig, PaginationConfig, WatermarkConfig
 
 __all__ = [
     # 配置 / Configuration
     "Config", "AgentConfig", "LLMConfig", "JudgeConfig", "OptimizationConfig", "GitConfig",
     "FactorConfig", "TagPolicyConfig", "MutationConfig", "ImportConfig", "DimensionConfig",
+    "ModelPricing", "TracingConfig", "HistoryConfig", "JudgeCascadeConfig", "DedupConfig",
+    "ImportSamplingConfig",
     # 测试用例 / Test cases
     "TestCase", "TestSuite", "ExpectedOutput", "TestCaseInput",
     "TestCaseTier", "TestCaseSource", "ReviewStatus",
     "JsonPathAssertion", "ToolCallAssertion", "ToolCallConstraints",
     # 评测结果 / Evaluation results
     "CaseResult", "EvalReport", "CaseStatus", "TagStats",
-    "FactorResult", "FactorSummary", "AggregatedDiagnosis",
+    "FactorResult", "FactorSummary", "AggregatedDiagnosis", "CascadeSummary",
+    "SampleEstimate", "SampleSummary",
     # 优化 / Optimization
     "OptimizationResult",
+    # 用量 / Usage
+    "PhaseUsage", "UsageSummary",
     # 导入 / Import
-    "ProductionRecord", "ImportResult", "APISourceConfig", "PaginationConfig",
+    "ProductionRecord", "ImportResult", "APISourceConfig", "PaginationConfig", "WatermarkConfig",
 ]
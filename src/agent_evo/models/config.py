@@ -1,12 +1,34 @@
 """配置模型 / Configuration models"""
 
 import warnings
-from typing import Optional, Literal
+from typing import Any, Optional, Literal
 from pydantic import BaseModel, Field, model_validator
 
 from agent_evo.models.import_models import APISourceConfig
 
 
+class HttpBatchConfig(BaseModel):
+    """HTTP 批量调用配置 / HTTP batch invocation configuration
+
+    批量请求体中的 "${items}" 会被替换为按 body 模板逐条构建的请求体列表；
+    响应中 response_path 指向与输入顺序一致的结果列表。
+    "${items}" in the batch body is replaced by the list of per-item bodies built from the body template;
+    response_path in the response points to a result list in input order.
+    """
+    url: Optional[str] = Field(default=None, description="批量接口地址，默认同 url / Batch endpoint, defaults to url")
+    body: dict = Field(
+        default_factory=lambda: {"items": "${items}"},
+        description="批量请求体模板 / Batch request body template",
+    )
+    response_path: str = Field(default="results", description="结果列表的 JSON 路径 / JSON path of the result list")
+    item_response_path: Optional[str] = Field(
+        default=None,
+        description="单条结果中输出文本的 JSON 路径，默认同 response_path / JSON path of the output within each result, defaults to response_path",
+    )
+    max_size: int = Field(default=32, ge=1, description="单批最大用例数 / Max cases per batch")
+    max_wait_ms: int = Field(default=20, ge=0, description="凑批最长等待时间 / Max time to wait for a batch to fill")
+
+
 class HttpAgentConfig(BaseModel):
     """HTTP Agent 配置 / HTTP Agent configuration"""
     url: str = Field(..., description="API 地址 / API URL")
@@ -30,6 +52,17 @@ class HttpAgentConfig(BaseModel):
     )
     timeout: float = Field(default=120.0, description="请求超时秒数 / Request timeout in seconds")
 
+    # 流式提前终止（仅 stream=true 时生效）/ Streaming early termination (only when stream=true)
+    early_stop: bool = Field(
+        default=False,
+        description="输出中出现禁止的关键词或工具调用时立即停止并判失败 / Stop and fail as soon as a forbidden keyword or tool call streams",
+    )
+    max_output_chars: Optional[int] = Field(default=None, ge=1, description="流式输出长度上限 / Max streamed output length")
+    max_stream_seconds: Optional[float] = Field(default=None, gt=0, description="流式输出时长上限 / Max stream duration")
+
+    # 批量调用（配置后非流式用例按批发送）/ Batch invocation (non-streaming cases are sent in batches when set)
+    batch: Optional[HttpBatchConfig] = Field(default=None, description="批量调用配置 / Batch invocation config")
+
 
 class AgentConfig(BaseModel):
     """被测 Agent 配置 / Agent under test configuration
@@ -69,12 +102,44 @@ class AgentConfig(BaseModel):
         return self
 
 
+class ModelPricing(BaseModel):
+    """模型价格（美元 / 百万 token）/ Model pricing (USD per 1M tokens)"""
+    prompt: float = Field(default=0.0, ge=0.0, description="输入 token 单价 / Prompt token price")
+    completion: float = Field(default=0.0, ge=0.0, description="输出 token 单价 / Completion token price")
+
+
 class LLMConfig(BaseModel):
     """LLM 配置 / LLM configuration"""
-    provider: str = Field(default="openai", description="LLM 提供商 / LLM provider")
-    model: str = Field(default="gpt-4o", description="模型名称 / Model name")
+    provider: str = Field(
+        default="openai",
+        description="LLM 提供商 / LLM provider: openai (and compatible), anthropic, azure, fake",
+    )
+    model: str = Field(default="gpt-4o", description="模型名称（azure 为部署名）/ Model name (deployment name for azure)")
     api_key: Optional[str] = Field(default=None, description="API Key，支持 ${ENV_VAR} 格式 / API Key, supports ${ENV_VAR}")
     base_url: Optional[str] = Field(default=None, description="API Base URL")
+    api_version: Optional[str] = Field(default=None, description="API 版本（azure）/ API version (azure)")
+    options: dict[str, Any] = Field(
+        default_factory=dict, description="提供商专用选项 / Provider-specific options",
+    )
+
+    # 所有提供商共用的重试与连接池 / Retries and connection pool shared by all providers
+    timeout: float = Field(default=60.0, gt=0, description="单次请求超时秒数 / Per-request timeout in seconds")
+    max_retries: int = Field(default=2, ge=0, description="临时错误的最大重试次数 / Max retries on transient errors")
+    max_connections: int = Field(default=20, ge=1, description="连接池大小 / Connection pool size")
+    requests_per_minute: Optional[int] = Field(
+        default=None, ge=1,
+        description="同一端点的全局请求速率上限（含重试）/ Global request rate limit per endpoint (retries included)",
+    )
+
+    # 成本核算 / Cost accounting
+    pricing: dict[str, ModelPricing] = Field(
+        default_factory=dict,
+        description="价格表：模型名 → 单价 / Price table: model name → pricing",
+    )
+    budget_usd: Optional[float] = Field(
+        default=None, ge=0.0,
+        description="单次运行的 LLM 花费上限，超出后不再发起新调用 / Per-run LLM spend cap, no new calls once exceeded",
+    )
 
 
 # ─── Deprecated ──────────────────────────────────────────
@@ -100,6 +165,9 @@ class TagPolicyConfig(BaseModel):
     fail_fast: bool = Field(default=False, description="一条失败即停止 / Stop on first failure")
     required_for_release: bool = Field(default=False, description="发布阻断 / Required for release")
     description: str = ""
+    # 性能预算（用例未单独配置时生效）/ Performance budgets (apply when the case sets none)
+    max_latency_ms: Optional[int] = Field(default=None, ge=0, description="总耗时上限（毫秒）/ Max total latency (ms)")
+    max_ttfb_ms: Optional[int] = Field(default=None, ge=0, description="首字节耗时上限（毫秒）/ Max time to first byte (ms)")
 
 
 class MutationConfig(BaseModel):
@@ -108,6 +176,61 @@ class MutationConfig(BaseModel):
     auto_review: bool = Field(default=True, description="是否使用 LLM 预审 / Whether to use LLM pre-review")
     business_docs: Optional[str] = Field(default=None, description="业务文档路径 / Business document path")
     hint_directions: list[str] = Field(default_factory=list, description="参考方向提示 / Reference direction hints")
+    concurrency: int = Field(
+        default=8, ge=1,
+        description="并发变异的种子数，速率由 llm.requests_per_minute 限制 / Seeds mutated concurrently; rate limited by llm.requests_per_minute",
+    )
+    review_chunk_tokens: int = Field(
+        default=6000, ge=100,
+        description="预审每块用例的估算 token 上限 / Estimated token cap for the cases in one pre-review chunk",
+    )
+    review_retries: int = Field(
+        default=2, ge=0,
+        description="预审失败或漏审时每块的重试次数 / Retries per chunk when pre-review fails or misses cases",
+    )
+
+
+class DedupConfig(BaseModel):
+    """近似重复检测与相似用例查询配置（MinHash-LSH）/ Near-duplicate detection and similar case lookup config (MinHash-LSH)"""
+    enabled: bool = Field(default=True, description="import / mutate 时是否去除近似重复 / Drop near-duplicates during import / mutate")
+    threshold: float = Field(
+        default=0.8, gt=0.0, le=1.0,
+        description="字符 n-gram Jaccard 相似度阈值，达到即视为重复 / Character n-gram Jaccard similarity at which cases count as duplicates",
+    )
+    ngram: int = Field(default=3, ge=1, description="字符 n-gram 长度 / Character n-gram length")
+    num_perm: int = Field(default=64, ge=8, description="MinHash 签名长度 / MinHash signature length")
+    related_threshold: float = Field(
+        default=0.5, gt=0.0, le=1.0,
+        description="「相似用例」查询的相似度阈值（import 时查找覆盖线上失败的已有用例）/ Similarity threshold for \"similar cases\" lookups (existing cases covering production failures during import)",
+    )
+    index_path: str = Field(
+        default="./.agent-evo/corpus_index.json",
+        description="持久化的测评集 MinHash 索引文件，按 YAML 文件增量更新 / Persistent test suite MinHash index, updated incrementally per YAML file",
+    )
+
+
+class ImportSamplingConfig(BaseModel):
+    """导入采样配置：在 LLM 提炼前按分层抽样，把调用花在多样的记录上
+    Import sampling config: records are sampled per stratum before LLM refinement, so calls are
+    spent on diverse records
+
+    未设置 max_per_stratum 与 max_records 时不采样。
+    No sampling happens unless max_per_stratum or max_records is set.
+    """
+    stratify_by: str = Field(
+        default="error_type",
+        description="分层依据：error_type、cluster（按输入的 MinHash 相似度聚类）或 metadata.<key> / Strata: error_type, cluster (MinHash similarity of the input) or metadata.<key>",
+    )
+    max_per_stratum: Optional[int] = Field(default=None, ge=1, description="每层最多保留的记录数 / Max records kept per stratum")
+    max_records: Optional[int] = Field(default=None, ge=1, description="总共最多保留的记录数，各层轮流分配 / Max records kept overall, shared round-robin across strata")
+    method: Literal["first", "reservoir"] = Field(
+        default="first",
+        description="first：流式保留每层最先出现的记录；reservoir：每层蓄水池均匀抽样，读完后再提炼 / first: keep the first records of each stratum while streaming; reservoir: uniform reservoir per stratum, refined after the stream ends",
+    )
+    cluster_threshold: float = Field(
+        default=0.5, gt=0.0, le=1.0, description="cluster 分层的相似度阈值 / Similarity threshold for cluster strata",
+    )
+    seed: Optional[int] = Field(default=None, description="蓄水池抽样的随机种子 / Random seed for reservoir sampling")
 
 
 class ImportConfig(BaseModel):
@@ -117,14 +240,57 @@ class ImportConfig(BaseModel):
     auto_deduplicate: bool = True
     default_tier: str = "silver"
     default_tags: list[str] = Field(default_factory=lambda: ["regression"])
+    concurrency: int = Field(default=8, ge=1, description="同时进行的 LLM 提炼调用数 / LLM refinement calls in flight at once")
+    state_path: str = Field(
+        default="./.agent-evo/import_state.json",
+        description="数据源导入进度（断点）文件 / Source import progress (checkpoint) file",
+    )
+    sampling: ImportSamplingConfig = Field(default_factory=ImportSamplingConfig, description="导入采样 / Import sampling")
 
 
 # ─── 主配置 / Main configuration ─────────────────────────
 
+class JudgeCascadeConfig(BaseModel):
+    """评判级联配置：先用快速模型评判，结果不确定时再交给主模型
+    Judge cascade config: a fast model judges first, uncertain results are escalated to the main model
+
+    满足任一条件即升级 / Escalated when any of:
+    - 快速评判的加权分落在 pass_threshold ± band 内 / the fast weighted score lies within pass_threshold ± band
+    - 各维度分数的极差超过 max_spread / the spread between dimension scores exceeds max_spread
+    - 快速评判调用失败 / the fast judge call failed
+    """
+    enabled: bool = Field(default=False, description="是否启用级联 / Whether the cascade is enabled")
+    llm: dict[str, Any] = Field(
+        default_factory=lambda: {"model": "gpt-4o-mini"},
+        description="快速评判模型配置，未设置的字段继承 llm / Fast judge LLM settings; unset fields inherit from llm",
+    )
+    band: float = Field(
+        default=0.1, ge=0.0, le=1.0,
+        description="pass_threshold 两侧的不确定区间宽度 / Width of the uncertainty band on each side of pass_threshold",
+    )
+    max_spread: float = Field(
+        default=0.5, ge=0.0, le=1.0,
+        description="维度分数极差上限，超过视为不一致 / Max spread between dimension scores before they count as inconsistent",
+    )
+
+
 class JudgeConfig(BaseModel):
     """评判配置 / Judge configuration"""
     pass_threshold: float = Field(default=0.7, ge=0.0, le=1.0, description="通过阈值 / Pass threshold")
 
+    # 评判级联 / Judge cascade
+    cascade: JudgeCascadeConfig = Field(default_factory=JudgeCascadeConfig)
+
+    # 多次采样 / Multiple samples
+    samples: int = Field(
+        default=1, ge=1,
+        description="每条用例的默认采样次数，用例可用 samples 覆盖 / Default samples per case, overridable per case",
+    )
+    sample_pass_ratio: float = Field(
+        default=0.5, ge=0.0, le=1.0,
+        description="多次采样时用例判定通过所需的采样通过比例 / Fraction of samples that must pass for a multi-sample case to pass",
+    )
+
     # 因子权重 / Factor weights
     factors: dict[str, FactorConfig] = Field(
         default_factory=lambda: {
@@ -132,6 +298,7 @@ class JudgeConfig(BaseModel):
             "behavior": FactorConfig(weight=0.8, fatal=False),
             "structure": FactorConfig(weight=0.5, fatal=False),
             "custom": FactorConfig(weight=1.0, fatal=True),
+            "latency": FactorConfig(weight=1.0, fatal=True),
         }
     )
 
@@ -174,6 +341,37 @@ class GitConfig(BaseModel):
     pr_branch_prefix: str = Field(default="agent-evo/optimize")
 
 
+class TracingConfig(BaseModel):
+    """链路追踪配置 / Tracing configuration"""
+    enabled: bool = Field(default=False, description="是否启用追踪 / Whether tracing is enabled")
+    exporter: Literal["json", "otlp"] = Field(
+        default="json",
+        description="导出方式：本地 JSON 文件或 OTLP/HTTP collector / Exporter: local JSON file or OTLP/HTTP collector",
+    )
+    path: str = Field(default="./reports/trace.json", description="JSON 追踪文件路径 / JSON trace file path")
+    endpoint: str = Field(default="http://localhost:4318", description="OTLP/HTTP collector 地址 / OTLP/HTTP collector endpoint")
+    headers: dict[str, str] = Field(default_factory=dict, description="OTLP 请求头 / OTLP request headers")
+    service_name: str = Field(default="agent-evo", description="服务名 / Service name")
+
+
+class HistoryConfig(BaseModel):
+    """运行历史与不稳定用例配置 / Run history and flaky case configuration"""
+    enabled: bool = Field(default=True, description="是否记录运行历史 / Whether to record run history")
+    path: str = Field(default="./.agent-evo/history.json", description="历史文件路径 / History file path")
+    window: int = Field(default=20, ge=2, description="每条用例保留的最近运行次数 / Recent runs kept per case")
+    min_runs: int = Field(default=5, ge=2, description="计算不稳定度所需的最少运行次数 / Min runs before flakiness is computed")
+    flaky_threshold: float = Field(
+        default=0.3, ge=0.0, le=1.0,
+        description="通过/失败翻转比例达到该值即视为不稳定 / Pass/fail flip ratio at which a case counts as flaky",
+    )
+    flaky_action: Literal["none", "quarantine", "resample"] = Field(
+        default="quarantine",
+        description="不稳定用例的处理：仅标记 / 隔离（不计入统计与门禁）/ 增加采样次数 "
+                    "/ Handling of flaky cases: mark only / quarantine (excluded from stats and gating) / up-sample",
+    )
+    resample: int = Field(default=5, ge=2, description="flaky_action=resample 时的采样次数 / Samples when flaky_action=resample")
+
+
 class Config(BaseModel):
     """AgentEvo 完整配置 / AgentEvo full configuration"""
     version: str = "1"
@@ -190,6 +388,9 @@ class Config(BaseModel):
     mutation: MutationConfig = Field(default_factory=MutationConfig)
     import_config: Optional[ImportConfig] = Field(default=None, alias="import")
     tag_policies: dict[str, TagPolicyConfig] = Field(default_factory=dict)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    dedup: DedupConfig = Field(default_factory=DedupConfig)
 
     # HTTP 数据源配置（用于 agent-evo import --source）
     # HTTP data source config (for agent-evo import --source)
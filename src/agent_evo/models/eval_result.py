@@ -5,6 +5,8 @@ from enum import Enum
 from typing import Optional, Any
 from pydantic import BaseModel, Field
 
+from agent_evo.models.usage import UsageSummary
+
 
 class CaseStatus(str, Enum):
     """用例状态 / Case status"""
@@ -31,6 +33,7 @@ class FactorSummary(BaseModel):
     avg_score: float = 0.0         # 平均分 / Average score
     fail_count: int = 0            # 不通过次数 / Failure count
     fatal_fail_count: int = 0      # 致命失败次数 / Fatal failure count
+    skipped_count: int = 0         # 检查被跳过、未参与评分的次数（如测不到的耗时）/ Checks skipped and left unscored (e.g. unmeasured timing)
 
 
 # ─── 用例结果 / Case results ─────────────────────────────
@@ -61,9 +64,23 @@ class CaseResult(BaseModel):
     # 元数据 / Metadata
     tags: list[str] = Field(default_factory=list)
     execution_time_ms: int = 0
+    batched: bool = False   # 耗时为整批的耗时，不计入耗时预算与历史 / Timing is the whole batch's; not used for budgets or history
     timestamp: datetime = Field(default_factory=datetime.now)
     error_message: Optional[str] = None
 
+    # 多次采样统计（samples > 1 时，score 为各采样平均分）
+    # Multi-sample statistics (when samples > 1, score is the mean over samples)
+    samples: int = 1
+    samples_passed: int = 0
+    sample_scores: list[float] = Field(default_factory=list)
+    pass_at_k: dict[int, float] = Field(default_factory=dict)  # k -> pass@k
+    mean_score: Optional[float] = None
+    score_variance: Optional[float] = None
+
+    # 运行历史 / Run history
+    flakiness: Optional[float] = None   # 不稳定度（历史不足时为 None）/ Flakiness (None without enough history)
+    quarantined: bool = False           # 已隔离：不计入统计与门禁 / Quarantined: excluded from stats and gating
+
 
 # ─── 统计 / Statistics ───────────────────────────────────
 
@@ -76,6 +93,40 @@ class TagStats(BaseModel):
     # 新增 / Additional fields
     threshold: Optional[float] = None       # 该 tag 配置的通过阈值 / Pass threshold configured for this tag
     meets_threshold: Optional[bool] = None  # 是否达标 / Whether the threshold is met
+    # 按采样计的通过率 95% Wilson 置信区间 / 95% Wilson confidence interval of the per-sample pass rate
+    samples: int = 0
+    samples_passed: int = 0
+    ci_low: Optional[float] = None
+    ci_high: Optional[float] = None
+
+
+class CascadeSummary(BaseModel):
+    """评判级联统计，用于调整不确定区间 / Judge cascade statistics, used to tune the uncertainty band"""
+    judged: int = 0                     # 快速模型评判次数 / Judgments made by the fast model
+    escalated: int = 0                  # 升级到主模型的次数 / Judgments escalated to the main model
+    by_reason: dict[str, int] = Field(default_factory=dict)  # band / spread / error -> 次数 / count
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalated / self.judged if self.judged else 0.0
+
+
+class SampleEstimate(BaseModel):
+    """抽样评测推断到完整测评集的通过率 / Pass rate of a sampled run extrapolated to the full suite"""
+    population: int = 0                 # 完整测评集中的用例数 / Cases in the full suite
+    sampled: int = 0                    # 抽中并计入统计的用例数 / Cases sampled and counted
+    passed: int = 0
+    pass_rate: float = 0.0              # 推断的通过率 / Estimated pass rate
+    ci_low: Optional[float] = None      # 95% 置信区间 / 95% confidence interval
+    ci_high: Optional[float] = None
+
+
+class SampleSummary(BaseModel):
+    """抽样评测（eval --sample）/ Sampled evaluation (eval --sample)"""
+    seed: int = 0
+    estimate: SampleEstimate = Field(default_factory=SampleEstimate)          # 整体 / Overall
+    strata: dict[str, SampleEstimate] = Field(default_factory=dict)           # "tier/tag" -> 估计 / estimate
+    tags: dict[str, SampleEstimate] = Field(default_factory=dict)             # tag -> 估计 / estimate
 
 
 # ─── 聚合归因 / Aggregated diagnosis ─────────────────────
@@ -114,6 +165,9 @@ class EvalReport(BaseModel):
     release_blocked: bool = False
     blocking_tags: list[str] = Field(default_factory=list)
 
+    # 被隔离的不稳定用例 / Quarantined flaky cases
+    quarantined: list[str] = Field(default_factory=list)
+
     # 失败汇总（按 tag 分类）/ Failures summary (grouped by tag)
     failures_by_tag: dict[str, list[str]] = Field(default_factory=dict)  # tag -> [case_id]
 
@@ -123,14 +177,23 @@ class EvalReport(BaseModel):
     # 优化结果 / Optimization result
     optimization: Optional["OptimizationResult"] = None
 
+    # LLM 用量与成本 / LLM usage and cost
+    usage: Optional[UsageSummary] = None
+
+    # 评判级联（启用时）/ Judge cascade (when enabled)
+    cascade: Optional[CascadeSummary] = None
+
+    # 抽样评测（eval --sample）/ Sampled evaluation (eval --sample)
+    sampling: Optional[SampleSummary] = None
+
     # 时间 / Timing
     started_at: Optional[datetime] = None
     finished_at: Optional[datetime] = None
     duration_seconds: float = 0.0
 
     def get_failed_results(self) -> list[CaseResult]:
-        """获取失败的用例 / Get failed cases"""
-        return [r for r in self.results if r.status == CaseStatus.FAILED]
+        """获取失败的用例（不含被隔离的用例）/ Get failed cases (quarantined cases excluded)"""
+        return [r for r in self.results if r.status == CaseStatus.FAILED and not r.quarantined]
 
 
 # 避免循环引用 / Avoid circular imports
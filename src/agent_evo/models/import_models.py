@@ -2,11 +2,15 @@
 
 from datetime import datetime
 from typing import Optional, Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class ProductionRecord(BaseModel):
     """线上生产数据记录 / Production data record"""
+    id: Optional[str] = Field(
+        default=None,
+        description="记录的稳定 ID（如日志 ID），用于生成幂等的用例 ID；缺省时按内容生成 / Stable record ID (e.g. log ID) used to derive an idempotent case ID; derived from the content when missing",
+    )
     query: str = Field(..., description="用户原始输入 / User original input")
     agent_response: str = Field(..., description="Agent 原始回复 / Agent original response")
     is_correct: Optional[bool] = Field(default=None, description="人工标注：是否正确 / Manual label: is correct")
@@ -15,6 +19,12 @@ class ProductionRecord(BaseModel):
     source_timestamp: Optional[datetime] = Field(default=None, description="原始时间戳 / Original timestamp")
     metadata: dict[str, Any] = Field(default_factory=dict, description="额外元数据 / Additional metadata")
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def id_to_str(cls, value: Any) -> Any:
+        """数值型 ID 转为字符串 / Convert numeric IDs to strings"""
+        return str(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+
 
 class ImportResult(BaseModel):
     """导入结果 / Import result"""
@@ -22,6 +32,18 @@ class ImportResult(BaseModel):
     imported: int = 0
     duplicates_removed: int = 0
     pending_review: int = 0
+    failed: int = 0
+    skipped: int = Field(default=0, description="用例 ID 已存在而跳过的记录数 / Records skipped because their case ID already exists")
+    sampled_out: int = Field(default=0, description="采样丢弃的记录数 / Records dropped by sampling")
+    sampled_out_by: dict[str, int] = Field(
+        default_factory=dict, description="按原因统计的采样丢弃数（stratum_cap / max_records）/ Sampled-out counts by reason (stratum_cap / max_records)",
+    )
+    sampled_out_strata: dict[str, int] = Field(
+        default_factory=dict, description="按层统计的采样丢弃数 / Sampled-out counts by stratum",
+    )
+    watermark: Optional[Any] = Field(
+        default=None, description="完整导入后的新水位（未完成时为 None）/ New watermark after a complete import (None when incomplete)",
+    )
     errors: list[str] = Field(default_factory=list)
 
 
@@ -39,6 +61,8 @@ class APISourceConfig(BaseModel):
     method: Literal["GET", "POST"] = Field(default="GET", description="HTTP 方法 / HTTP method")
     headers: dict[str, str] = Field(default_factory=dict, description="请求头 / Request headers")
     params: dict[str, Any] = Field(default_factory=dict, description="查询参数（GET）或请求体（POST）/ Query params (GET) or request body (POST)")
+    # 增量导入水位 / Incremental import watermark
+    watermark: Optional["WatermarkConfig"] = Field(default=None, description="增量导入水位 / Incremental import watermark")
     # 分页配置 / Pagination configuration
     pagination: Optional["PaginationConfig"] = Field(default=None, description="分页配置 / Pagination config")
     # 响应解析 / Response parsing
@@ -55,6 +79,10 @@ class APISourceConfig(BaseModel):
     filter: Optional[dict[str, Any]] = Field(default=None, description="请求时附加的过滤条件 / Additional filter conditions for request")
     # 超时 / Timeout
     timeout: int = Field(default=30, description="请求超时秒数 / Request timeout in seconds")
+    max_retries: int = Field(
+        default=3, ge=0,
+        description="连接错误、429 与 5xx 的最大重试次数（指数退避）/ Max retries on connection errors, 429 and 5xx (exponential backoff)",
+    )
 
 
 class PaginationConfig(BaseModel):
@@ -67,3 +95,26 @@ class PaginationConfig(BaseModel):
     cursor_path: Optional[str] = Field(default=None, description="响应中游标字段路径 / Path to cursor in response")
     cursor_param: Optional[str] = Field(default=None, description="请求中游标参数名 / Cursor param name in request")
     max_pages: int = Field(default=100, description="最大拉取页数（安全阀）/ Maximum pages to fetch (safety limit)")
+    concurrency: int = Field(
+        default=4, ge=1,
+        description="page / offset 分页同时预取的页数；cursor 分页始终逐页拉取 / Pages prefetched at once for page / offset pagination; cursor pagination always fetches one page at a time",
+    )
+
+
+class WatermarkConfig(BaseModel):
+    """增量导入水位：按数据源记录已导入记录中 field 的最大值，下次只拉取不早于它的记录
+    Incremental import watermark: the highest `field` value among imported records is kept per
+    source, and later imports only fetch records not older than it
+
+    设置 param 时水位作为请求参数发送（服务端过滤）；无论是否设置都会在本地过滤。
+    水位上相同的记录会被再次拉取，由幂等的用例 ID 跳过。
+    With param set, the watermark is sent as a request parameter (server-side filtering); records
+    are filtered locally either way. Records at the watermark itself are fetched again and skipped
+    by their idempotent case IDs.
+    """
+    field: str = Field(..., description="记录中水位字段的路径（点分隔）/ Path to the watermark field in a record (dot-separated)")
+    type: Literal["timestamp", "id"] = Field(
+        default="timestamp", description="timestamp：ISO 时间或数值时间戳；id：递增 ID / timestamp: ISO time or numeric epoch; id: increasing ID",
+    )
+    param: Optional[str] = Field(default=None, description="携带水位的请求参数名 / Request parameter carrying the watermark")
+    initial: Optional[Any] = Field(default=None, description="首次导入的起始水位 / Starting watermark for the first import")
@@ -3,6 +3,8 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 
+from agent_evo.models.usage import UsageSummary
+
 
 class OptimizationResult(BaseModel):
     """优化结果 / Optimization result"""
@@ -22,3 +24,6 @@ class OptimizationResult(BaseModel):
     
     # 错误信息 / Error message
     error_message: Optional[str] = None
+
+    # 优化阶段的 LLM 用量（含回归评测）/ LLM usage during optimization (incl. regression judging)
+    usage: Optional[UsageSummary] = None
@@ -93,6 +93,10 @@ class ExpectedOutput(BaseModel):
     # 自定义校验 / Custom validation
     validator: Optional[str] = Field(default=None, description="自定义校验函数路径 / Custom validator function path")
 
+    # 性能预算 / Performance budgets
+    max_latency_ms: Optional[int] = Field(default=None, ge=0, description="总耗时上限（毫秒）/ Max total latency (ms)")
+    max_ttfb_ms: Optional[int] = Field(default=None, ge=0, description="首字节耗时上限（毫秒）/ Max time to first byte (ms)")
+
 
 # ─── 输入模型 / Input model ──────────────────────────────
 
@@ -121,6 +125,10 @@ class TestCase(BaseModel):
 
     tags: list[str] = Field(default_factory=list, description="标签 / Tags")
     judge_hints: Optional[str] = Field(default=None, description="给评判器的额外提示 / Additional hints for the judge")
+    samples: Optional[int] = Field(
+        default=None, ge=1,
+        description="采样次数，覆盖 judge.samples / Number of samples, overrides judge.samples",
+    )
 
     # --- 新增字段（均有默认值，向后兼容）/ New fields (all with defaults, backward compatible) ---
     source: TestCaseSource = Field(default=TestCaseSource.MANUAL, description="用例来源 / Case source")
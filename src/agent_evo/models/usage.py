@@ -0,0 +1,38 @@
+"""LLM 用量模型 / LLM usage models"""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class PhaseUsage(BaseModel):
+    """单个阶段的 LLM 用量 / LLM usage of a single phase"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class UsageSummary(BaseModel):
+    """LLM 用量汇总（按阶段）/ LLM usage summary (by phase)
+
+    阶段 / Phases: judge, aggregate, optimize, mutate, review, refine
+    """
+    by_phase: dict[str, PhaseUsage] = Field(default_factory=dict)
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    # 成本是否可计算（模型在价格表中）/ Whether cost is known (model present in price table)
+    priced: bool = True
+
+    # 预算 / Budget
+    budget_usd: Optional[float] = None
+    budget_exceeded: bool = False
+    refused_calls: int = 0         # 因超预算被拒绝的调用数 / Calls refused due to exceeded budget
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
@@ -1,6 +1,12 @@
 """工具模块 / Utility modules"""
 
-from agent_evo.utils.llm import LLMClient
+from agent_evo.utils.llm import LLMClient, UsageTracker, BudgetExceededError, close_llm_clients
+from agent_evo.utils.llm_providers import LLMProvider, ChatResult, register_provider
 from agent_evo.utils.i18n import t, set_language, get_language
+from agent_evo.utils.tracing import configure_tracing, span, current_span, flush_tracing, aflush_tracing
 
-__all__ = ["LLMClient", "t", "set_language", "get_language"]
+__all__ = [
+    "LLMClient", "UsageTracker", "BudgetExceededError", "close_llm_clients", "t", "set_language", "get_language",
+    "configure_tracing", "span", "current_span", "flush_tracing", "aflush_tracing",
+    "LLMProvider", "ChatResult", "register_provider",
+]
@@ -75,6 +75,10 @@ _TEXTS: dict[str, dict[str, str]] = {
         "zh": "{fid}: 激活 {activated} 次, 平均分 {avg:.2f}, 失败 {fail} 次",
         "en": "{fid}: activated {activated} times, avg score {avg:.2f}, failed {fail} times",
     },
+    "factor_unverified": {
+        "zh": "⚠ {fid}: {count} 条用例的检查被跳过（如批量调用、测不到首字节），未经验证",
+        "en": "⚠ {fid}: check skipped for {count} case(s) (e.g. batch calls, TTFB not measured), not verified",
+    },
     "fatal_factor_fail": {
         "zh": "致命因子 {fid} 未通过: {reason}",
         "en": "Fatal factor {fid} failed: {reason}",
@@ -107,6 +111,10 @@ _TEXTS: dict[str, dict[str, str]] = {
     "gate_check_pass": {"zh": "门禁检查通过", "en": "Gate check passed"},
     "gate_check_fail": {"zh": "门禁检查失败，阻断发布", "en": "Gate check failed, release blocked"},
     "gate_no_cases": {"zh": "无用例", "en": "No cases"},
+    "gate_unverified": {
+        "zh": "以下检查未覆盖全部用例，门禁结果不代表其已验证:",
+        "en": "These checks did not cover every case; the gate result does not verify them:",
+    },
     "release_blocked": {
         "zh": "门禁阻断: {tags} 未达标",
         "en": "Release blocked: {tags} did not meet threshold",
@@ -136,6 +144,19 @@ _TEXTS: dict[str, dict[str, str]] = {
     "total_records": {"zh": "总记录数", "en": "Total records"},
     "imported_count": {"zh": "成功导入", "en": "Successfully imported"},
     "dedup_removed": {"zh": "去重移除", "en": "Duplicates removed"},
+
+    # ── dedupe 命令 / dedupe command ──
+    "dedupe_none": {"zh": "{n} 条用例中未发现近似重复", "en": "No near-duplicates among {n} cases"},
+    "dedupe_col_file": {"zh": "文件", "en": "File"},
+    "dedupe_col_duplicate_of": {"zh": "重复于", "en": "Duplicate of"},
+    "dedupe_col_similarity": {"zh": "相似度", "en": "Similarity"},
+    "dedupe_kept_gold": {"zh": "黄金集，保留", "en": "gold, kept"},
+    "dedupe_dry_run": {"zh": "试运行：将从 {total} 条用例中删除 {n} 条", "en": "Dry run: would delete {n} of {total} cases"},
+    "dedupe_done": {"zh": "已从 {files} 个文件中删除 {n} 条近似重复用例（共 {total} 条）", "en": "Deleted {n} near-duplicate cases from {files} files ({total} cases scanned)"},
+    # ── similar 命令 / similar command ──
+    "similar_none": {"zh": "{n} 条已索引用例中没有相似用例", "en": "No similar cases among {n} indexed cases"},
+    "import_related": {"zh": "{n}/{total} 条导入用例与已有用例相似（可能已被覆盖）：", "en": "{n}/{total} imported cases resemble existing cases (possibly already covered):"},
+    "import_related_col": {"zh": "相似的已有用例", "en": "Similar existing cases"},
     "pending_count": {"zh": "待审核", "en": "Pending review"},
     "output_file": {"zh": "输出文件", "en": "Output file"},
     "no_cases_imported": {"zh": "未导入任何用例", "en": "No cases imported"},
@@ -161,8 +182,21 @@ _TEXTS: dict[str, dict[str, str]] = {
     "loaded_seeds": {"zh": "加载了 {n} 条种子用例", "en": "Loaded {n} seed cases"},
     "mutate_per_seed": {"zh": "每条种子生成 {n} 个变异...", "en": "Generating {n} mutations per seed..."},
     "generated_mutations": {"zh": "生成了 {n} 条变异用例", "en": "Generated {n} mutation cases"},
+    "mutate_seed_progress": {
+        "zh": "[{done}/{total}] {id}: 生成 {n} 条变异（已写入 {written} 条）",
+        "en": "[{done}/{total}] {id}: {n} mutations ({written} written)",
+    },
+    "mutate_seed_failed": {
+        "zh": "[{done}/{total}] {id}: 变异失败：{err}",
+        "en": "[{done}/{total}] {id}: mutation failed: {err}",
+    },
     "llm_reviewing": {"zh": "LLM 预审中...", "en": "LLM pre-reviewing..."},
     "review_rejected": {"zh": "预审拒绝 {n} 条", "en": "{n} cases rejected by pre-review"},
+    "review_unreviewed": {
+        "zh": "{n} 条用例未完成预审，需人工重点审核: {ids}",
+        "en": "{n} cases could not be pre-reviewed and need careful manual review: {ids}",
+    },
+    "review_missing": {"zh": "预审响应中缺少该用例", "en": "case missing from the pre-review response"},
     "written_cases": {"zh": "已写入 {n} 条用例到 {path}", "en": "Written {n} cases to {path}"},
     "mutate_review_hint": {
         "zh": "所有用例状态为 pending，请通过 agent-evo review 审核",
@@ -267,6 +301,18 @@ _TEXTS: dict[str, dict[str, str]] = {
 
     # ── 其他 / Others ──
     "unsupported_format": {"zh": "不支持的格式: {fmt}", "en": "Unsupported format: {fmt}"},
+    "import_resuming": {"zh": "从上次中断处继续：第 {page} 页（--no-resume 重新开始）", "en": "Resuming the interrupted import from page {page} (--no-resume to start over)"},
+    "import_checkpoint_saved": {"zh": "进度已保存，再次运行将从第 {page} 页继续", "en": "Progress saved; running again resumes from page {page}"},
+    "import_failed_retry": {"zh": "{n} 条记录提炼失败：断点与水位停在它们之前，下次导入时会重试", "en": "{n} records failed refinement; the checkpoint and watermark stay before them, so they are retried on the next import"},
+    "import_watermark": {"zh": "增量导入：只拉取 {field} 不早于 {value} 的记录（--full 全量拉取）", "en": "Incremental import: only records with {field} at or after {value} (--full to fetch everything)"},
+    "import_skipped": {"zh": "已导入过（跳过）", "en": "Already imported (skipped)"},
+    "import_no_new": {"zh": "没有新记录（{skipped} 条已导入过）", "en": "No new records ({skipped} already imported)"},
+    "sampling_bad_stratum": {"zh": "不支持的分层依据: {by}（可选 error_type、cluster、metadata.<key>）", "en": "Unsupported stratify_by: {by} (use error_type, cluster or metadata.<key>)"},
+    "import_sampled_out": {"zh": "采样丢弃", "en": "Sampled out"},
+    "sampled_reason_stratum_cap": {"zh": "超出每层上限", "en": "over per-stratum cap"},
+    "sampled_reason_max_records": {"zh": "超出总数上限", "en": "over overall limit"},
+    "import_sampled_strata": {"zh": "丢弃最多的层", "en": "Most sampled-out strata"},
+    "zstd_missing": {"zh": "读取 zstd 压缩文件需要安装 zstandard：pip install zstandard", "en": "Reading zstd compressed files requires zstandard: pip install zstandard"},
     "no_valid_records": {"zh": "未解析到有效记录", "en": "No valid records parsed"},
     "missing_keywords": {"zh": "缺少关键词: {kw}", "en": "Missing keywords: {kw}"},
     "forbidden_keywords": {"zh": "包含禁止词: {kw}", "en": "Contains forbidden words: {kw}"},
@@ -297,4 +343,97 @@ _TEXTS: dict[str, dict[str, str]] = {
     "tool_max_calls_exceeded": {"zh": "工具调用次数 {actual} 超过最大限制 {max}", "en": "Tool call count {actual} exceeded max limit {max}"},
     "tool_sequence_mismatch": {"zh": "工具调用序列不匹配: 期望 {expected}, 实际 {actual}", "en": "Tool call sequence mismatch: expected {expected}, got {actual}"},
     "tool_sequence_missing": {"zh": "缺少必需的工具调用: {tools}", "en": "Missing required tool calls: {tools}"},
+
+    # ── LLM 用量 / LLM usage ──
+    "usage_total": {
+        "zh": "LLM 用量: 输入 {prompt} tokens, 输出 {completion} tokens, 成本 {cost}",
+        "en": "LLM usage: {prompt} prompt tokens, {completion} completion tokens, cost {cost}",
+    },
+    "usage_phase_line": {
+        "zh": "{phase}: {calls} 次调用, 输入 {prompt} / 输出 {completion} tokens, ${cost:.4f}",
+        "en": "{phase}: {calls} calls, {prompt} prompt / {completion} completion tokens, ${cost:.4f}",
+    },
+    "usage_cost_unknown": {"zh": "未知（价格表未覆盖该模型）", "en": "unknown (model not in price table)"},
+    "budget_unpriced_model": {
+        "zh": "设置了 LLM 预算，但价格表（llm.pricing）中没有模型 {model}，无法计算花费；请补充其价格或去掉预算",
+        "en": "An LLM budget is set but model {model} is not in the price table (llm.pricing), so spend cannot be tracked; add its price or drop the budget",
+    },
+    "usage_budget_exceeded": {
+        "zh": "已超出预算 ${budget:.4f}，拒绝了 {refused} 次 LLM 调用",
+        "en": "Budget ${budget:.4f} exceeded, {refused} LLM calls refused",
+    },
+    "budget_skipped": {"zh": "LLM 预算已用尽，未评判", "en": "LLM budget exhausted, not judged"},
+
+    # ── 耗时预算 / Latency budgets ──
+    "latency_within_budget": {"zh": "耗时在预算内", "en": "Latency within budget"},
+    "batch_size_mismatch": {"zh": "批量调用返回 {got} 条结果，应为 {expected} 条", "en": "Batch call returned {got} results, expected {expected}"},
+    "latency_batched": {"zh": "批量调用只测得整批耗时，跳过耗时检查", "en": "Batch call only timed as a whole, latency check skipped"},
+    "latency_not_measured": {"zh": "{name} 耗时未测得，跳过检查", "en": "{name} not measured, check skipped"},
+    "latency_over_budget": {"zh": "{name} 耗时 {actual}ms 超出预算 {budget}ms", "en": "{name} {actual}ms exceeded budget {budget}ms"},
+
+    # ── 链路追踪 / Tracing ──
+    "trace_exported": {"zh": "追踪数据已导出: {target}", "en": "Trace exported: {target}"},
+    "trace_export_fail": {"zh": "追踪数据导出失败: {err}", "en": "Trace export failed: {err}"},
+
+    # ── 性能剖析 / Profiling ──
+    "profile_overview": {
+        "zh": "性能剖析: 总耗时 {wall:.2f}s, 框架 CPU {cpu:.2f}s, 等待 Agent/评判 {waiting:.2f}s",
+        "en": "Profile: wall {wall:.2f}s, framework CPU {cpu:.2f}s, waiting on agent/judge {waiting:.2f}s",
+    },
+    "profile_cpu_categories": {"zh": "CPU 分布: {categories}", "en": "CPU by category: {categories}"},
+    "profile_slow_case": {
+        "zh": "慢用例 {id}: Agent {agent:.0f}ms, 评判 {judge:.0f}ms",
+        "en": "Slow case {id}: agent {agent:.0f}ms, judge {judge:.0f}ms",
+    },
+    "profile_saved": {
+        "zh": "剖析结果已保存: {prof}, {summary}, {timeline}",
+        "en": "Profile saved: {prof}, {summary}, {timeline}",
+    },
+
+    # ── 流式提前终止 / Streaming early stop ──
+    "stream_forbidden_keyword": {"zh": "流式输出中出现禁止的关键词: {keyword}", "en": "Forbidden keyword streamed: {keyword}"},
+    "stream_forbidden_tool": {"zh": "流式输出中出现禁止的工具调用: {tool}", "en": "Forbidden tool call streamed: {tool}"},
+    "stream_max_output": {"zh": "输出超过 {chars} 字符，已中止", "en": "Output exceeded {chars} characters, aborted"},
+    "stream_max_duration": {"zh": "输出超过 {seconds} 秒，已中止", "en": "Stream exceeded {seconds}s, aborted"},
+    "stream_aborted": {"zh": "流式输出被提前终止: {reason}", "en": "Stream stopped early: {reason}"},
+    "samples_summary": {
+        "zh": "{passed}/{n} 次采样通过，平均分 {mean:.2f}，方差 {var:.3f}",
+        "en": "{passed}/{n} samples passed, mean {mean:.2f}, variance {var:.3f}",
+    },
+    "flaky_quarantined": {
+        "zh": "已隔离 {n} 条不稳定用例（不计入统计与门禁）: {ids}",
+        "en": "Quarantined {n} flaky case(s) (excluded from stats and gating): {ids}",
+    },
+    "flaky_resampled": {
+        "zh": "{n} 条不稳定用例将采样 {samples} 次",
+        "en": "{n} flaky case(s) will be sampled {samples} times",
+    },
+    "history_save_fail": {"zh": "运行历史保存失败: {err}", "en": "Failed to save run history: {err}"},
+    "flaky_title": {"zh": "不稳定用例", "en": "Flaky Cases"},
+    "flaky_none": {"zh": "暂无不稳定用例", "en": "No flaky cases"},
+    "col_flakiness": {"zh": "不稳定度", "en": "Flakiness"},
+    "col_runs": {"zh": "运行次数", "en": "Runs"},
+    "col_recent": {"zh": "最近结果", "en": "Recent"},
+    "col_tag": {"zh": "Tag", "en": "Tag"},
+    "bad_sample": {"zh": "无效的 --sample: {spec}（应为用例数 N 或占比 P%）", "en": "Invalid --sample: {spec} (expected a case count N or a share P%)"},
+    "sample_title": {"zh": "抽样评测：{n} / {total} 条用例（seed {seed}）", "en": "Sampled run: {n} of {total} cases (seed {seed})"},
+    "sample_estimate": {"zh": "完整测评集通过率估计", "en": "Estimated full-suite pass rate"},
+    "sample_col_cases": {"zh": "抽中 / 总数", "en": "Sampled / Total"},
+    "sample_col_ci": {"zh": "95% 置信区间", "en": "95% CI"},
+    "affected_with_sample": {"zh": "--affected-by 与 --sample 不能同时使用", "en": "--affected-by cannot be combined with --sample"},
+    "affected_unavailable": {"zh": "未配置提示词文件或运行历史已关闭，无法分析影响，运行全部用例", "en": "No prompt file or run history is disabled; cannot analyze impact, running all cases"},
+    "affected_bad_diff": {"zh": "--affected-by {spec} 既不是 diff 文件也不是 git 版本", "en": "--affected-by {spec} is neither a diff file nor a git revision"},
+    "affected_no_prompt_change": {"zh": "改动不涉及提示词文件，运行全部用例", "en": "The change does not touch the prompt file; running all cases"},
+    "affected_sections": {"zh": "改动的提示词段落: {sections}", "en": "Changed prompt sections: {sections}"},
+    "affected_selected": {"zh": "可能受影响的用例: {n} / {total}", "en": "Likely affected cases: {n} of {total}"},
+    "affected_unknown": {"zh": "以下段落的影响数据不足，尚未充分观察的用例也会运行: {sections}", "en": "Not enough impact data for these sections, so cases not yet observed under them run too: {sections}"},
+    "quarantined_label": {"zh": "已隔离", "en": "Quarantined"},
+    "flaky_label": {"zh": "不稳定", "en": "Flaky"},
+    "unknown_order": {"zh": "未知的执行顺序 {order}，可选: {choices}", "en": "Unknown order {order}, choose from: {choices}"},
+
+    # ── 评判级联 / Judge cascade ──
+    "cascade_summary": {
+        "zh": "评判级联: 快速评判 {judged} 次, 升级 {escalated} 次 ({rate:.0%}){reasons}",
+        "en": "Judge cascade: {judged} fast judgments, {escalated} escalated ({rate:.0%}){reasons}",
+    },
 }
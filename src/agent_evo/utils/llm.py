@@ -1,42 +1,252 @@
 """LLM 调用封装 / LLM call wrapper"""
 
-import os
+import asyncio
+import random
 from typing import Any, Optional
 
+import httpx
+
 from agent_evo.models.config import LLMConfig
+from agent_evo.models.eval_result import CascadeSummary
+from agent_evo.models.usage import PhaseUsage, UsageSummary
+from agent_evo.utils.i18n import t
+from agent_evo.utils.tracing import span
+from agent_evo.utils.llm_providers import LLMProvider, create_provider
 
 
-class LLMClient:
-    """LLM 客户端 / LLM client"""
-    
+class BudgetExceededError(RuntimeError):
+    """LLM 花费超出预算 / LLM spend exceeded the budget"""
+
+
+class UsageTracker:
+    """LLM 用量与成本统计，同一次运行的所有 LLMClient 共享一个实例
+    LLM usage and cost tracker, shared by all LLMClients of one run
+
+    按阶段（judge / aggregate / optimize / mutate / review / refine）累计 token 数，
+    并根据价格表计算成本；配置了预算时，超出后拒绝新的调用。
+    Accumulates token counts per phase (judge / aggregate / optimize / mutate / review / refine)
+    and computes cost from the price table; when a budget is set, new calls are refused once exceeded.
+    """
+
     def __init__(self, config: LLMConfig):
+        self.pricing = config.pricing
+        self.budget_usd = config.budget_usd
+        self._phases: dict[str, PhaseUsage] = {}
+        self._unpriced_models: set[str] = set()
+        self.refused_calls = 0
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(p.cost_usd for p in self._phases.values())
+
+    @property
+    def exceeded(self) -> bool:
+        return self.budget_usd is not None and self.cost_usd >= self.budget_usd
+
+    def check_budget(self) -> None:
+        """超预算时抛出 BudgetExceededError / Raise BudgetExceededError when over budget"""
+        if self.exceeded:
+            self.refused_calls += 1
+            raise BudgetExceededError(
+                f"LLM 预算已用尽 / LLM budget exhausted: ${self.cost_usd:.4f} >= ${self.budget_usd:.4f}"
+            )
+
+    def require_price(self, model: str) -> None:
+        """设置了预算时模型必须在价格表中，否则花费恒为 0、预算永不触发
+        With a budget set the model must be in the price table; otherwise spend stays at 0 and the
+        budget never triggers
+
+        Raises:
+            ValueError: 设置了预算但模型没有价格 / A budget is set but the model has no price
+        """
+        if self.budget_usd is not None and model not in self.pricing:
+            raise ValueError(t("budget_unpriced_model").format(model=model))
+
+    def record(self, phase: str, model: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """记录一次调用的用量 / Record usage of one call"""
+        usage = self._phases.setdefault(phase, PhaseUsage())
+        usage.calls += 1
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+
+        price = self.pricing.get(model)
+        if price is None:
+            self._unpriced_models.add(model)
+            return
+        usage.cost_usd += (prompt_tokens * price.prompt + completion_tokens * price.completion) / 1_000_000
+
+    def summary(self, since: Optional[UsageSummary] = None) -> UsageSummary:
+        """生成用量汇总；传入 since 时只统计其之后的增量
+        Build usage summary; with since, only the delta after that snapshot is counted"""
+        by_phase: dict[str, PhaseUsage] = {}
+        for phase, usage in self._phases.items():
+            base = since.by_phase.get(phase, PhaseUsage()) if since else PhaseUsage()
+            delta = PhaseUsage(
+                calls=usage.calls - base.calls,
+                prompt_tokens=usage.prompt_tokens - base.prompt_tokens,
+                completion_tokens=usage.completion_tokens - base.completion_tokens,
+                cost_usd=usage.cost_usd - base.cost_usd,
+            )
+            if delta.calls:
+                by_phase[phase] = delta
+
+        return UsageSummary(
+            by_phase=by_phase,
+            prompt_tokens=sum(p.prompt_tokens for p in by_phase.values()),
+            completion_tokens=sum(p.completion_tokens for p in by_phase.values()),
+            cost_usd=sum(p.cost_usd for p in by_phase.values()),
+            priced=not self._unpriced_models,
+            budget_usd=self.budget_usd,
+            budget_exceeded=self.exceeded,
+            refused_calls=self.refused_calls - (since.refused_calls if since else 0),
+        )
+
+
+def format_usage_lines(usage: Optional[UsageSummary]) -> list[str]:
+    """将用量汇总格式化为可打印的文本行 / Format usage summary into printable lines"""
+    if usage is None or not usage.by_phase:
+        return []
+    cost = f"${usage.cost_usd:.4f}" if usage.priced else t("usage_cost_unknown")
+    lines = [t("usage_total").format(
+        prompt=usage.prompt_tokens, completion=usage.completion_tokens, cost=cost,
+    )]
+    for phase, p in usage.by_phase.items():
+        lines.append("  " + t("usage_phase_line").format(
+            phase=phase, calls=p.calls, prompt=p.prompt_tokens,
+            completion=p.completion_tokens, cost=p.cost_usd,
+        ))
+    if usage.budget_exceeded:
+        lines.append(t("usage_budget_exceeded").format(
+            budget=usage.budget_usd, refused=usage.refused_calls,
+        ))
+    return lines
+
+
+def format_cascade_line(cascade: Optional[CascadeSummary]) -> Optional[str]:
+    """将评判级联统计格式化为一行文本 / Format judge cascade statistics as one line"""
+    if cascade is None or not cascade.judged:
+        return None
+    reasons = ", ".join(f"{reason} {count}" for reason, count in sorted(cascade.by_reason.items()))
+    return t("cascade_summary").format(
+        judged=cascade.judged, escalated=cascade.escalated, rate=cascade.escalation_rate,
+        reasons=f"; {reasons}" if reasons else "",
+    )
+
+
+class RateLimiter:
+    """按固定间隔放行请求的限流器 / Rate limiter releasing requests at a fixed interval"""
+
+    def __init__(self, requests_per_minute: int):
+        self.interval = 60.0 / requests_per_minute
+        self._next_at = 0.0
+
+    async def acquire(self) -> float:
+        """等待下一个请求名额，返回等待秒数 / Wait for the next request slot, return the seconds waited"""
+        now = asyncio.get_running_loop().time()
+        wait = max(self._next_at - now, 0.0)
+        self._next_at = max(self._next_at, now) + self.interval
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class _SharedTransport:
+    """同一端点（提供商 + base_url + API Key）共享的连接池、限流器与提供商实例
+    Connection pool, rate limiter and provider instances shared by one endpoint (provider + base_url + API key)
+
+    连接池参数与限流取自该端点第一个配置。
+    Pool limits and the rate limit come from the first config seen for the endpoint.
+    """
+
+    def __init__(self, config: LLMConfig):
+        self.loop = asyncio.get_running_loop()
+        self.http = httpx.AsyncClient(
+            timeout=config.timeout,
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_connections,
+            ),
+        )
+        self.limiter = RateLimiter(config.requests_per_minute) if config.requests_per_minute else None
+        self._providers: dict[str, LLMProvider] = {}
+
+    def provider(self, config: LLMConfig) -> LLMProvider:
+        """按完整配置复用提供商实例 / Reuse a provider instance per full config"""
+        key = config.model_dump_json(exclude={"pricing", "budget_usd"})
+        if key not in self._providers:
+            self._providers[key] = create_provider(config, self.http)
+        return self._providers[key]
+
+
+# 进程级传输注册表 / Process-wide transport registry
+_TRANSPORTS: dict[tuple[Optional[str], ...], _SharedTransport] = {}
+
+
+def _transport_key(config: LLMConfig) -> tuple[Optional[str], ...]:
+    return (config.provider, config.base_url, config.api_key)
+
+
+def _get_transport(config: LLMConfig) -> _SharedTransport:
+    """获取端点的共享传输；事件循环变化（如多次 asyncio.run）后重建
+    Get the endpoint's shared transport; rebuilt when the event loop changed (e.g. repeated asyncio.run)"""
+    key = _transport_key(config)
+    transport = _TRANSPORTS.get(key)
+    if transport is None or transport.loop is not asyncio.get_running_loop():
+        transport = _SharedTransport(config)
+        _TRANSPORTS[key] = transport
+    return transport
+
+
+async def close_llm_clients() -> None:
+    """关闭当前事件循环中所有共享连接池 / Close all shared connection pools of the current event loop"""
+    loop = asyncio.get_running_loop()
+    for key, transport in list(_TRANSPORTS.items()):
+        if transport.loop is loop:
+            del _TRANSPORTS[key]
+            await transport.http.aclose()
+
+
+class LLMClient:
+    """LLM 客户端 / LLM client
+
+    提供商由 llm.provider 选择（见 llm_providers），所有提供商共用同一套
+    重试（指数退避 + 抖动）、连接池、用量统计与追踪。
+    The provider is selected by llm.provider (see llm_providers); all providers share the same
+    retries (exponential backoff + jitter), connection pool, usage accounting and tracing.
+
+    客户端本身很轻：连接池、限流器与提供商实例按端点在进程内共享，
+    各组件（Evaluator、Optimizer、Mutator 等）各自创建 LLMClient 不会产生额外连接。
+    The client itself is lightweight: the connection pool, rate limiter and provider instances are
+    shared process-wide per endpoint, so components (Evaluator, Optimizer, Mutator, ...) creating
+    their own LLMClient do not open extra connections.
+    """
+
+    def __init__(self, config: LLMConfig, usage: Optional[UsageTracker] = None):
         self.config = config
-        self._client = None
-    
-    def _get_client(self):
-        """延迟初始化客户端 / Lazy-initialize the client"""
-        if self._client is None:
-            if self.config.provider == "openai":
-                from openai import AsyncOpenAI
-                
-                api_key = self.config.api_key or os.environ.get("OPENAI_API_KEY")
-                base_url = self.config.base_url
-                
-                self._client = AsyncOpenAI(
-                    api_key=api_key,
-                    base_url=base_url
-                )
-            else:
-                raise ValueError(f"不支持的 LLM 提供商 / Unsupported LLM provider: {self.config.provider}")
-        
-        return self._client
+        self.usage = usage or UsageTracker(config)
+        self.usage.require_price(config.model)
+
+    async def aclose(self) -> None:
+        """关闭本客户端端点的共享连接池，之后的调用会重建
+        Close the shared connection pool of this client's endpoint; later calls rebuild it"""
+        key = _transport_key(self.config)
+        transport = _TRANSPORTS.get(key)
+        if transport is not None and transport.loop is asyncio.get_running_loop():
+            del _TRANSPORTS[key]
+            await transport.http.aclose()
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """第 attempt 次重试前的等待秒数 / Seconds to wait before retry number attempt"""
+        return min(0.5 * 2 ** attempt, 8.0) * random.uniform(0.5, 1.0)
     
     async def chat(
         self,
         messages: list[dict[str, str]],
         response_format: Optional[dict[str, Any]] = None,
         temperature: float = 0.7,
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        phase: str = "other",
     ) -> str:
         """
         发送聊天请求 / Send chat request
@@ -46,22 +256,49 @@ class LLMClient:
             response_format: 响应格式（如 {"type": "json_object"}）/ Response format
             temperature: 温度 / Temperature
             max_tokens: 最大 token 数 / Maximum token count
+            phase: 用量归属的阶段 / Phase the usage is attributed to
             
         Returns:
             响应内容 / Response content
+
+        Raises:
+            BudgetExceededError: 已超出预算 / Budget already exceeded
         """
-        client = self._get_client()
-        
-        kwargs = {
-            "model": self.config.model,
-            "messages": messages,
-            "temperature": temperature,
-            "max_tokens": max_tokens
-        }
-        
-        if response_format:
-            kwargs["response_format"] = response_format
-        
-        response = await client.chat.completions.create(**kwargs)
-        
-        return response.choices[0].message.content or ""
+        self.usage.check_budget()
+        transport = _get_transport(self.config)
+        provider = transport.provider(self.config)
+
+        with span("llm.chat", model=self.config.model, phase=phase, provider=self.config.provider) as s:
+            attempt = 0
+            throttled = 0.0
+            while True:
+                if transport.limiter:
+                    throttled += await transport.limiter.acquire()
+                try:
+                    result = await provider.complete(
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        response_format=response_format,
+                    )
+                    break
+                except Exception as e:
+                    if attempt >= self.config.max_retries or not provider.is_retryable(e):
+                        s.set_attribute("retries", attempt)
+                        raise
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+
+            s.set_attribute("retries", attempt)
+            if throttled:
+                s.set_attribute("throttled_ms", int(throttled * 1000))
+            s.set_attribute("prompt_tokens", result.prompt_tokens)
+            s.set_attribute("completion_tokens", result.completion_tokens)
+            self.usage.record(
+                phase=phase,
+                model=self.config.model,
+                prompt_tokens=result.prompt_tokens,
+                completion_tokens=result.completion_tokens,
+            )
+
+        return result.content
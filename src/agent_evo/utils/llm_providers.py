@@ -0,0 +1,282 @@
+"""LLM 提供商 / LLM providers
+
+每个提供商只负责把一次聊天请求翻译成对应的 API 调用并解析结果；
+重试、连接池、用量与追踪由 LLMClient 统一处理。
+Each provider only translates one chat request into its API call and parses the result;
+retries, connection pooling, usage and tracing are handled uniformly by LLMClient.
+
+内置 / Built-in:
+- openai: OpenAI 及兼容接口（vLLM、DeepSeek 等，配合 base_url）/ OpenAI and compatible APIs (vLLM, DeepSeek, ... via base_url)
+- anthropic: Anthropic Messages API
+- azure: Azure OpenAI（model 即部署名）/ Azure OpenAI (model is the deployment name)
+- fake: 本地确定性桩，不发网络请求，用于测试与基准 / deterministic local stub without network, for tests and benchmarks
+
+自定义提供商 / Custom providers:
+    register_provider("my_llm", MyProvider)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Optional
+
+import httpx
+
+from agent_evo.models.config import LLMConfig
+
+# 可重试的 HTTP 状态码 / Retryable HTTP status codes
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class ChatResult:
+    """一次聊天调用的结果 / Result of one chat call"""
+
+    def __init__(self, content: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.content = content
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class LLMProvider(ABC):
+    """LLM 提供商基类 / LLM provider base class
+
+    http_client 为 LLMClient 创建的共享连接池，提供商应通过它发送请求。
+    http_client is the shared connection pool created by LLMClient; providers should send requests through it.
+    """
+
+    # 提供商默认读取的 API Key 环境变量 / Environment variable the provider reads the API key from by default
+    api_key_env: Optional[str] = None
+
+    def __init__(self, config: LLMConfig, http_client: httpx.AsyncClient):
+        self.config = config
+        self.http = http_client
+        self.api_key = config.api_key or (os.environ.get(self.api_key_env) if self.api_key_env else None)
+
+    @abstractmethod
+    async def complete(
+        self,
+        messages: list[dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[dict[str, Any]] = None,
+    ) -> ChatResult:
+        """发送一次聊天请求 / Send one chat request"""
+
+    def is_retryable(self, error: Exception) -> bool:
+        """是否为可重试的临时错误 / Whether the error is transient and worth retrying"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS
+        return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI 及兼容接口 / OpenAI and compatible APIs"""
+
+    api_key_env = "OPENAI_API_KEY"
+
+    def __init__(self, config: LLMConfig, http_client: httpx.AsyncClient):
+        super().__init__(config, http_client)
+        from openai import AsyncOpenAI
+
+        # 重试由 LLMClient 统一处理，关闭 SDK 自带重试
+        # Retries are handled by LLMClient, so the SDK's own retries are disabled
+        self.client = AsyncOpenAI(
+            api_key=self.api_key,
+            base_url=config.base_url,
+            http_client=http_client,
+            max_retries=0,
+        )
+
+    async def complete(self, messages, temperature, max_tokens, response_format=None) -> ChatResult:
+        kwargs: dict[str, Any] = {
+            "model": self.config.model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if response_format:
+            kwargs["response_format"] = response_format
+        response = await self.client.chat.completions.create(**kwargs)
+        usage = getattr(response, "usage", None)
+        return ChatResult(
+            content=response.choices[0].message.content or "",
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        import openai
+
+        if isinstance(error, openai.APIStatusError):
+            return error.status_code in RETRYABLE_STATUS
+        if isinstance(error, openai.APIConnectionError):  # 包括超时 / Includes timeouts
+            return True
+        return super().is_retryable(error)
+
+
+class AzureOpenAIProvider(LLMProvider):
+    """Azure OpenAI：base_url 为资源地址，model 为部署名
+    Azure OpenAI: base_url is the resource endpoint, model is the deployment name"""
+
+    api_key_env = "AZURE_OPENAI_API_KEY"
+    default_api_version = "2024-06-01"
+
+    async def complete(self, messages, temperature, max_tokens, response_format=None) -> ChatResult:
+        endpoint = (self.config.base_url or os.environ.get("AZURE_OPENAI_ENDPOINT") or "").rstrip("/")
+        if not endpoint:
+            raise ValueError("llm.base_url (Azure endpoint) is required for provider 'azure'")
+        body: dict[str, Any] = {"messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+        if response_format:
+            body["response_format"] = response_format
+        response = await self.http.post(
+            f"{endpoint}/openai/deployments/{self.config.model}/chat/completions",
+            params={"api-version": self.config.api_version or self.default_api_version},
+            headers={"api-key": self.api_key or ""},
+            json=body,
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get("usage") or {}
+        return ChatResult(
+            content=data["choices"][0]["message"].get("content") or "",
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic Messages API
+
+    system 消息合并到顶层 system 字段；没有 JSON 模式，要求 JSON 时在 system 中追加说明。
+    System messages are merged into the top-level system field; there is no JSON mode, so a JSON
+    instruction is appended to the system prompt when JSON is requested.
+    """
+
+    api_key_env = "ANTHROPIC_API_KEY"
+    api_version = "2023-06-01"
+
+    async def complete(self, messages, temperature, max_tokens, response_format=None) -> ChatResult:
+        system = [m["content"] for m in messages if m["role"] == "system"]
+        if response_format and response_format.get("type") == "json_object":
+            system.append("Respond with a single valid JSON object and nothing else.")
+        body: dict[str, Any] = {
+            "model": self.config.model,
+            "messages": [m for m in messages if m["role"] != "system"],
+            "temperature": min(temperature, 1.0),
+            "max_tokens": max_tokens,
+        }
+        if system:
+            body["system"] = "\n\n".join(system)
+
+        base_url = (self.config.base_url or "https://api.anthropic.com").rstrip("/")
+        response = await self.http.post(
+            f"{base_url}/v1/messages",
+            headers={"x-api-key": self.api_key or "", "anthropic-version": self.api_version},
+            json=body,
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get("usage") or {}
+        return ChatResult(
+            content="".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text"),
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+        )
+
+    def is_retryable(self, error: Exception) -> bool:
+        # 529 = overloaded
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 529:
+            return True
+        return super().is_retryable(error)
+
+
+class FakeProvider(LLMProvider):
+    """本地确定性桩：相同请求总是得到相同响应，不发网络请求
+    Deterministic local stub: the same request always gets the same response, no network
+
+    llm.options 可选项 / Options in llm.options:
+    - latency_ms: 模拟延迟 / simulated latency (default 0)
+    - score: 评判分数；不设置时由请求内容哈希得到 0.5-1.0 之间的分数
+             judge score; derived from a hash of the request (0.5-1.0) when unset
+    - response: 固定响应文本，覆盖上述逻辑 / fixed response text, overrides the above
+    - error_rate: 返回 503 的比例 / fraction of requests failing with 503
+    - seed: 随机种子 / random seed (default 0)
+
+    是否出错由 seed、请求内容哈希与该请求的第几次发送决定，与并发调度顺序无关，
+    重试时会重新判定。
+    Whether a request fails is decided by the seed, the request's digest and how many times that
+    request was sent, independent of concurrent scheduling order; a retry is decided afresh.
+
+    请求 JSON 时返回评判格式（content / behavior / structure），否则返回普通文本。
+    Returns the judge format (content / behavior / structure) when JSON is requested, plain text otherwise.
+    """
+
+    def __init__(self, config: LLMConfig, http_client: httpx.AsyncClient):
+        super().__init__(config, http_client)
+        self._sent: Counter = Counter()   # 请求哈希 -> 已发送次数 / request digest -> times sent
+
+    async def complete(self, messages, temperature, max_tokens, response_format=None) -> ChatResult:
+        options = self.config.options
+        latency_ms = float(options.get("latency_ms", 0))
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+        prompt = "\n".join(m.get("content", "") for m in messages)
+        sha = hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+        digest = int(sha[:8], 16)
+        attempt = self._sent[sha]
+        self._sent[sha] += 1
+        error_rate = float(options.get("error_rate", 0))
+        if error_rate and random.Random(f"{options.get('seed', 0)}:{sha}:{attempt}").random() < error_rate:
+            request = httpx.Request("POST", "fake://llm")
+            raise httpx.HTTPStatusError(
+                "fake provider error", request=request, response=httpx.Response(503, request=request),
+            )
+
+        if "response" in options:
+            content = str(options["response"])
+        elif response_format and response_format.get("type") == "json_object":
+            score = float(options["score"]) if "score" in options else 0.5 + (digest % 501) / 1000
+            content = json.dumps({
+                "content": {"applicable": True, "score": score, "reason": "fake judge"},
+                "behavior": {"applicable": False},
+                "structure": {"applicable": False},
+            })
+        else:
+            content = f"fake response {digest:08x}"
+
+        # 按 4 字符 ≈ 1 token 估算用量 / Estimate usage at ~4 characters per token
+        return ChatResult(content, prompt_tokens=len(prompt) // 4 + 1, completion_tokens=len(content) // 4 + 1)
+
+
+_PROVIDERS: dict[str, type[LLMProvider]] = {
+    "openai": OpenAIProvider,
+    "azure": AzureOpenAIProvider,
+    "anthropic": AnthropicProvider,
+    "fake": FakeProvider,
+}
+
+
+def register_provider(name: str, provider: type[LLMProvider]) -> None:
+    """注册自定义提供商 / Register a custom provider"""
+    _PROVIDERS[name] = provider
+
+
+def available_providers() -> list[str]:
+    """已注册的提供商 / Registered providers"""
+    return sorted(_PROVIDERS)
+
+
+def create_provider(config: LLMConfig, http_client: httpx.AsyncClient) -> LLMProvider:
+    """按 llm.provider 创建提供商 / Create the provider selected by llm.provider"""
+    provider = _PROVIDERS.get(config.provider)
+    if provider is None:
+        raise ValueError(
+            f"不支持的 LLM 提供商 / Unsupported LLM provider: {config.provider} "
+            f"(available: {', '.join(available_providers())})"
+        )
+    return provider(config, http_client)
@@ -0,0 +1,244 @@
+"""性能剖析 / Profiling
+
+用于回答「一次运行为什么慢」：是 Agent、评判模型，还是 AgentEvo 自身（YAML 加载、pydantic、HTML 渲染）。
+Answers "why was this run slow": the Agent, the judge model, or AgentEvo itself (YAML loading, pydantic, HTML rendering).
+
+产出三个文件，与报告放在一起 / Produces three files next to the report:
+- <name>.prof            cProfile 原始数据（pstats / snakeviz 可读）/ raw cProfile data (readable by pstats / snakeviz)
+- <name>.profile.json    摘要：CPU 分类、阶段耗时、最慢函数与用例 / summary: CPU by category, phase time, slowest functions and cases
+- <name>.timeline.json   Chrome Trace 格式的 span 与 asyncio 任务时间线（chrome://tracing / Perfetto）
+                         span and asyncio task timeline in Chrome Trace format (chrome://tracing / Perfetto)
+
+cProfile 使用事件循环所在线程的 CPU 时间计时，等待网络（事件循环空闲）的时间不计入；
+同步 Agent 在线程池中运行，其 CPU 时间也不计入。
+cProfile is timed with the CPU time of the event loop's thread, so time spent awaiting the network
+(idle event loop) is excluded; sync Agents run in the thread pool, so their CPU time is excluded as well.
+"""
+
+import asyncio
+import cProfile
+import json
+import pstats
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+from agent_evo.utils.tracing import Span, subscribe, unsubscribe
+
+# 按源文件路径归类 CPU 时间（先匹配先得）/ Classify CPU time by source path (first match wins)
+_CATEGORIES: list[tuple[str, tuple[str, ...]]] = [
+    ("html_report", ("agent_evo/cli/commands/report",)),
+    ("yaml", ("/yaml/", "_yaml")),
+    ("pydantic", ("/pydantic/", "pydantic_core")),
+    ("json", ("/json/", "_json")),
+    ("http_client", ("/httpx/", "/httpcore/", "/h11/", "/anyio/", "/ssl.py")),
+    ("llm_sdk", ("/openai/",)),
+    ("terminal_output", ("/rich/",)),
+    ("asyncio", ("/asyncio/", "selectors.py")),
+    ("agent_evo", ("agent_evo/",)),
+]
+
+
+def _categorize(filename: str) -> str:
+    path = filename.replace("\\", "/")
+    for category, needles in _CATEGORIES:
+        if any(n in path for n in needles):
+            return category
+    return "other"
+
+
+class Profiler:
+    """命令级性能剖析器 / Command-level profiler
+
+    用法 / Usage:
+        profiler = Profiler()
+        profiler.start()
+        ...
+        profiler.stop()
+        profiler.save(Path("reports/eval_20250101_120000"), report)
+    """
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        # 只计本线程的 CPU 时间，不含线程池中的 Agent / Only this thread's CPU time, not Agents in the thread pool
+        self._profile = cProfile.Profile(time.thread_time)
+        self._spans: list[Span] = []
+        self._tasks: list[tuple[str, float, float]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_factory = None
+        self._wall_start = 0.0
+        self._wall_end = 0.0
+        self._epoch_ns = 0
+
+    # ── 采集 / Collection ───────────────────────────────────
+
+    def start(self) -> None:
+        """开始采集，需在事件循环内调用 / Start collecting; must be called inside the event loop"""
+        self._wall_start = time.perf_counter()
+        self._epoch_ns = time.time_ns()
+        subscribe(self._on_span)
+
+        self._loop = asyncio.get_running_loop()
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+
+        self._profile.enable()
+
+    def stop(self) -> None:
+        """停止采集，可重复调用 / Stop collecting; safe to call more than once"""
+        if self._loop is None:
+            return
+        self._profile.disable()
+        self._wall_end = time.perf_counter()
+        unsubscribe(self._on_span)
+        self._loop.set_task_factory(self._previous_factory)
+        self._loop = None
+
+    def _on_span(self, span: Span) -> None:
+        self._spans.append(span)
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro, **kwargs):
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        name = getattr(coro, "__qualname__", type(coro).__name__)
+        created = time.perf_counter()
+        task.add_done_callback(lambda _: self._tasks.append((name, created, time.perf_counter())))
+        return task
+
+    # ── 汇总 / Summary ──────────────────────────────────────
+
+    def summary(self, report: Any = None) -> dict[str, Any]:
+        """生成剖析摘要 / Build profile summary"""
+        stats = pstats.Stats(self._profile)
+        cpu_by_category: dict[str, float] = defaultdict(float)
+        functions = []
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            cpu_by_category[_categorize(filename)] += tottime
+            functions.append((tottime, cumtime, ncalls, f"{filename}:{line}({func})"))
+        functions.sort(reverse=True)
+
+        wall_s = self._wall_end - self._wall_start
+        cpu_s = sum(cpu_by_category.values())
+
+        # 按 span 名称汇总墙钟时间（并发时可能超过总时长）
+        # Wall time summed per span name (may exceed total duration under concurrency)
+        phase_ms: dict[str, float] = defaultdict(float)
+        for s in self._spans:
+            phase_ms[s.name] += s.duration_ms
+
+        return {
+            "wall_s": round(wall_s, 3),
+            "framework_cpu_s": round(cpu_s, 3),
+            # 剩余时间主要是等待 Agent / 评判模型 / Remaining time is mostly waiting for the Agent / judge
+            "waiting_s": round(max(wall_s - cpu_s, 0.0), 3),
+            "cpu_by_category_s": {
+                k: round(v, 4) for k, v in sorted(cpu_by_category.items(), key=lambda kv: -kv[1])
+            },
+            "phase_wall_ms": {k: round(v, 1) for k, v in sorted(phase_ms.items(), key=lambda kv: -kv[1])},
+            "top_functions": [
+                {"function": name, "self_cpu_s": round(tt, 4), "cum_cpu_s": round(ct, 4), "calls": nc}
+                for tt, ct, nc, name in functions[:self.top_n]
+            ],
+            "slowest_cases": self._slowest_cases(report),
+            "asyncio_tasks": len(self._tasks),
+        }
+
+    def _slowest_cases(self, report: Any) -> list[dict[str, Any]]:
+        """按用例汇总 Agent 与评判耗时，取最慢的 N 条 / Sum Agent and judge time per case, keep the N slowest"""
+        cases: dict[str, dict[str, Any]] = {}
+        for s in self._spans:
+            case_id = s.attributes.get("case_id")
+            if not case_id:
+                continue
+            entry = cases.setdefault(case_id, {"case_id": case_id, "agent_ms": 0.0, "judge_ms": 0.0})
+            if s.name == "generate":
+                entry["agent_ms"] += s.duration_ms
+            elif s.name == "judge":
+                entry["judge_ms"] += s.duration_ms
+
+        # 未记录 span 时退回报告中的执行耗时 / Fall back to report execution time when no spans were recorded
+        if not cases and report is not None:
+            for r in report.results:
+                cases[r.case_id] = {"case_id": r.case_id, "agent_ms": float(r.execution_time_ms), "judge_ms": 0.0}
+
+        if report is not None:
+            status = {r.case_id: r.status.value for r in report.results}
+            for case_id, entry in cases.items():
+                entry["status"] = status.get(case_id)
+
+        for entry in cases.values():
+            entry["agent_ms"] = round(entry["agent_ms"], 1)
+            entry["judge_ms"] = round(entry["judge_ms"], 1)
+            entry["total_ms"] = round(entry["agent_ms"] + entry["judge_ms"], 1)
+        return sorted(cases.values(), key=lambda e: -e["total_ms"])[:self.top_n]
+
+    def timeline(self) -> dict[str, Any]:
+        """Chrome Trace 格式的时间线 / Timeline in Chrome Trace format"""
+        events: list[dict[str, Any]] = []
+        span_items = [
+            (
+                (s.start_ns - self._epoch_ns) / 1000, (s.end_ns - s.start_ns) / 1000,
+                s.name, "span", {k: str(v) for k, v in s.attributes.items()},
+            )
+            for s in self._spans
+        ]
+        task_items = [
+            ((created - self._wall_start) * 1_000_000, (done - created) * 1_000_000, name, "task", {})
+            for name, created, done in self._tasks
+        ]
+        for pid, items in ((1, span_items), (2, task_items)):
+            # 将重叠的区间分配到不同的行 / Assign overlapping intervals to separate lanes
+            lane_ends: list[float] = []
+            for ts, dur, name, cat, args in sorted(items, key=lambda i: i[0]):
+                lane = next((i for i, end in enumerate(lane_ends) if end <= ts), None)
+                if lane is None:
+                    lane = len(lane_ends)
+                    lane_ends.append(0.0)
+                lane_ends[lane] = ts + dur
+                events.append({
+                    "name": name, "cat": cat, "ph": "X", "ts": round(ts, 1), "dur": round(dur, 1),
+                    "pid": pid, "tid": lane, "args": args,
+                })
+        events.append({"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "spans"}})
+        events.append({"name": "process_name", "ph": "M", "pid": 2, "args": {"name": "asyncio tasks"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, base_path: Path, report: Any = None) -> dict[str, Path]:
+        """将剖析结果写到 base_path 旁 / Write profile output next to base_path"""
+        base_path.parent.mkdir(parents=True, exist_ok=True)
+        paths = {
+            "prof": base_path.with_name(base_path.name + ".prof"),
+            "summary": base_path.with_name(base_path.name + ".profile.json"),
+            "timeline": base_path.with_name(base_path.name + ".timeline.json"),
+        }
+        self._profile.dump_stats(str(paths["prof"]))
+        paths["summary"].write_text(
+            json.dumps(self.summary(report), ensure_ascii=False, indent=2), encoding="utf-8",
+        )
+        paths["timeline"].write_text(json.dumps(self.timeline(), ensure_ascii=False), encoding="utf-8")
+        return paths
+
+
+def format_profile_lines(summary: dict[str, Any], paths: dict[str, Path]) -> list[str]:
+    """将剖析摘要格式化为可打印的文本行 / Format profile summary into printable lines"""
+    from agent_evo.utils.i18n import t
+
+    lines = [t("profile_overview").format(
+        wall=summary["wall_s"], cpu=summary["framework_cpu_s"], waiting=summary["waiting_s"],
+    )]
+    categories = ", ".join(
+        f"{k} {v:.2f}s" for k, v in list(summary["cpu_by_category_s"].items())[:5]
+    )
+    if categories:
+        lines.append("  " + t("profile_cpu_categories").format(categories=categories))
+    for case in summary["slowest_cases"][:3]:
+        lines.append("  " + t("profile_slow_case").format(
+            id=case["case_id"], agent=case["agent_ms"], judge=case["judge_ms"],
+        ))
+    lines.append(t("profile_saved").format(
+        prof=paths["prof"], summary=paths["summary"], timeline=paths["timeline"],
+    ))
+    return lines
@@ -0,0 +1,96 @@
+"""统计工具 / Statistics helpers
+
+多次采样评测与抽样评测共用 / Shared by multi-sample evaluation and sampled evaluation runs.
+"""
+
+import math
+from typing import Optional
+
+
+def pass_at_k(n: int, c: int, k: int) -> float:
+    """pass@k 无偏估计：n 次采样中 c 次通过时，随机取 k 次至少一次通过的概率
+    Unbiased pass@k estimate: probability that at least one of k samples drawn from n (c passing) passes
+
+    1 - C(n-c, k) / C(n, k)
+    """
+    if k <= 0 or n <= 0:
+        return 0.0
+    k = min(k, n)
+    if n - c < k:
+        return 1.0
+    return 1.0 - math.comb(n - c, k) / math.comb(n, k)
+
+
+def mean_variance(values: list[float]) -> tuple[float, float]:
+    """均值与样本方差（n-1），少于两个值时方差为 0
+    Mean and sample variance (n-1); variance is 0 for fewer than two values"""
+    if not values:
+        return 0.0, 0.0
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, 0.0
+    variance = sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+    return mean, variance
+
+
+def wilson_interval(successes: float, total: float, z: float = 1.96) -> Optional[tuple[float, float]]:
+    """通过率的 Wilson 置信区间（默认 95%），样本量为 0 时返回 None
+    Wilson confidence interval for a pass rate (95% by default); None when there are no samples
+
+    样本量小或通过率接近 0/1 时比正态近似更可靠。也接受有效样本量（非整数）。
+    More reliable than the normal approximation for small samples or rates near 0/1. Also accepts
+    an effective sample size (non-integer).
+    """
+    if total <= 0:
+        return None
+    p = successes / total
+    z2 = z * z
+    denom = 1 + z2 / total
+    center = (p + z2 / (2 * total)) / denom
+    margin = z * math.sqrt(p * (1 - p) / total + z2 / (4 * total * total)) / denom
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def stratified_estimate(
+    strata: list[tuple[int, int, int]], z: float = 1.96,
+) -> Optional[tuple[float, float, float]]:
+    """分层抽样推断总体通过率：返回 (估计值, 区间下限, 区间上限)，没有样本时返回 None
+    Infer a population pass rate from a stratified sample: returns (estimate, low, high), or None
+    without samples
+
+    strata 为每层的 (总体数, 样本数, 通过数)。估计值按各层总体占比加权；区间为 Wilson 区间，
+    样本量取加权方差对应的有效样本量，并做有限总体校正（全部抽中时区间退化为一点）。
+    没有样本的层不参与加权。
+    strata holds (population, sampled, passed) per stratum. The estimate weights strata by their
+    population share; the interval is a Wilson interval at the effective sample size implied by
+    the weighted variance, with the finite population correction (it collapses to a point only
+    when every stratum is fully sampled).
+
+    没有样本的层不参与估计值，但区间按其总体占比放宽到最坏情况（这些用例全部失败或全部通过）。
+    Strata without samples do not enter the estimate, but the interval is widened by their
+    population share for the worst case (those cases all failing or all passing).
+    """
+    sampled = [(size, n, c) for size, n, c in strata if n > 0]
+    population = sum(size for size, _, _ in sampled)
+    n_total = sum(n for _, n, _ in sampled)
+    if not n_total:
+        return None
+    p = sum(size / population * c / n for size, n, c in sampled)
+    unsampled = 1 - population / sum(size for size, _, _ in strata)
+    if n_total >= population:
+        low = high = p
+    else:
+        variance = 0.0
+        for size, n, c in sampled:
+            fpc = (size - n) / (size - 1) if size > 1 else 0.0
+            rate = c / n
+            variance += (size / population) ** 2 * rate * (1 - rate) / n * fpc
+        if variance > 0:
+            n_eff = p * (1 - p) / variance
+        else:
+            # 各层内全通过或全失败：按整体有限总体校正后的样本量 / All-pass or all-fail strata: sample size under the overall correction
+            n_eff = n_total * (population - 1) / (population - n_total)
+        low, high = wilson_interval(p * n_eff, n_eff, z)
+        low, high = min(low, p), max(high, p)
+    # 未抽样的层按最坏情况 0 / 1 计入 / Unsampled strata count at their worst case of 0 / 1
+    return p, low * (1 - unsampled), high * (1 - unsampled) + unsampled
@@ -0,0 +1,265 @@
+"""链路追踪 / Tracing
+
+为 Pipeline 各阶段（加载、执行、评判、聚合、优化、回归、PR）记录 span，
+可导出为本地 JSON 文件或通过 OTLP/HTTP 发送到本地 collector（无需 OpenTelemetry SDK）。
+Records spans for every Pipeline phase (load, generate, judge, aggregate, optimize, regression, PR),
+exported to a local JSON file or sent to a local collector over OTLP/HTTP (no OpenTelemetry SDK needed).
+
+未启用时 span() 返回共享的空对象，不分配任何状态；构造代价较高的属性（列表、格式化字符串）
+应先检查 s.is_recording() 再设置。
+When disabled, span() returns a shared no-op object and allocates no state; attributes that are
+costly to build (lists, formatted strings) should be set only after checking s.is_recording().
+
+在事件循环中应使用 aflush_tracing()，导出（文件写入或 OTLP 请求）在工作线程中进行，不阻塞循环。
+On the event loop use aflush_tracing(): the export (file write or OTLP request) runs in a worker
+thread and does not block the loop.
+
+除导出外，也可通过 subscribe() 订阅结束的 span（性能剖析模式使用），此时即使未启用导出也会记录 span。
+Besides exporting, finished spans can be observed via subscribe() (used by profiling mode);
+spans are then recorded even when export is disabled.
+"""
+
+import asyncio
+import json
+import os
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from agent_evo.models.config import TracingConfig
+
+
+class Span:
+    """单个 span / A single span"""
+
+    def __init__(self, tracer: Optional["Tracer"], name: str, attributes: dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self._token = None
+
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_to_attribute(self, key: str, value: float) -> None:
+        """累加数值属性（如 token 数）/ Accumulate a numeric attribute (e.g. tokens)"""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def __enter__(self) -> "Span":
+        self.start_ns = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self._tracer is not None:
+            self._tracer._finished.append(self)
+        for listener in _listeners:
+            listener(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """未启用追踪时使用的空 span / No-op span used when tracing is disabled"""
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_to_attribute(self, key: str, value: float) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("agent_evo_current_span", default=None)
+_tracer: Optional["Tracer"] = None
+_listeners: list[Callable[[Span], None]] = []
+
+
+class Tracer:
+    """收集 span 并在 flush 时导出 / Collect spans and export them on flush"""
+
+    def __init__(self, config: TracingConfig):
+        self.config = config
+        self._finished: list[Span] = []
+        self._wrote = False   # 本进程是否已写过 JSON 文件 / Whether this process already wrote the JSON file
+
+    def flush(self) -> Optional[str]:
+        """导出已结束的 span，返回导出目标 / Export finished spans, return the export target"""
+        if not self._finished:
+            return None
+        spans, self._finished = self._finished, []
+        return self._export(spans)
+
+    async def aflush(self) -> Optional[str]:
+        """在工作线程中导出已结束的 span，不阻塞事件循环
+        Export finished spans in a worker thread, without blocking the event loop"""
+        if not self._finished:
+            return None
+        # 在循环线程中取走 span，之后结束的 span 留给下次导出
+        # Take the spans on the loop thread; spans finishing later are left for the next export
+        spans, self._finished = self._finished, []
+        return await asyncio.to_thread(self._export, spans)
+
+    def _export(self, spans: list[Span]) -> str:
+        if self.config.exporter == "otlp":
+            return self._export_otlp(spans)
+        return self._export_json(spans)
+
+    def _export_json(self, spans: list[Span]) -> str:
+        path = Path(self.config.path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        existing: list[dict] = []
+        if self._wrote and path.exists():
+            # 同一 Tracer 的多次 flush 追加到同一文件；首次 flush 覆盖上次运行留下的文件
+            # Later flushes of the same Tracer append to the file; the first one replaces a previous run's file
+            try:
+                existing = json.loads(path.read_text(encoding="utf-8")).get("spans", [])
+            except (json.JSONDecodeError, AttributeError):
+                existing = []
+        data = {
+            "service_name": self.config.service_name,
+            "spans": existing + [s.to_dict() for s in spans],
+        }
+        path.write_text(json.dumps(data, ensure_ascii=False, indent=2, default=str), encoding="utf-8")
+        self._wrote = True
+        return str(path)
+
+    def _export_otlp(self, spans: list[Span]) -> str:
+        """以 OTLP/HTTP JSON 协议发送到 collector / Send to collector via OTLP/HTTP JSON"""
+        import httpx
+
+        endpoint = self.config.endpoint.rstrip("/") + "/v1/traces"
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attr("service.name", self.config.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "agent_evo"},
+                    "spans": [_otlp_span(s) for s in spans],
+                }],
+            }],
+        }
+        response = httpx.post(endpoint, json=payload, headers=self.config.headers, timeout=10.0)
+        response.raise_for_status()
+        return endpoint
+
+
+def _otlp_attr(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    if isinstance(value, (list, tuple)):
+        return {"key": key, "value": {"arrayValue": {"values": [{"stringValue": str(v)} for v in value]}}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attr(k, v) for k, v in span.attributes.items() if v is not None],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+# ── 模块级接口 / Module-level API ──────────────────────────
+
+def configure_tracing(config: TracingConfig) -> Optional[Tracer]:
+    """按配置启用或关闭追踪 / Enable or disable tracing according to config"""
+    global _tracer
+    _tracer = Tracer(config) if config.enabled else None
+    return _tracer
+
+
+def span(name: str, **attributes: Any):
+    """开启一个 span（上下文管理器）/ Start a span (context manager)
+
+    用法 / Usage:
+        with span("generate", case_id=case.id) as s:
+            ...
+            s.set_attribute("latency_ms", 123)
+    """
+    if _tracer is None and not _listeners:
+        return _NOOP_SPAN
+    return Span(_tracer, name, attributes)
+
+
+def current_span():
+    """获取当前 span（未启用时为空对象）/ Get the current span (no-op when disabled)"""
+    if _tracer is None and not _listeners:
+        return _NOOP_SPAN
+    return _current_span.get() or _NOOP_SPAN
+
+
+def subscribe(listener: Callable[[Span], None]) -> None:
+    """订阅结束的 span / Subscribe to finished spans"""
+    _listeners.append(listener)
+
+
+def unsubscribe(listener: Callable[[Span], None]) -> None:
+    """取消订阅 / Unsubscribe"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def flush_tracing() -> Optional[str]:
+    """导出已结束的 span / Export finished spans"""
+    if _tracer is None:
+        return None
+    return _tracer.flush()
+
+
+async def aflush_tracing() -> Optional[str]:
+    """在工作线程中导出已结束的 span（事件循环中使用）
+    Export finished spans in a worker thread (for use on the event loop)"""
+    if _tracer is None:
+        return None
+    return await _tracer.aflush()
@@ -0,0 +1,11 @@
+"""测试公共夹具 / Shared test fixtures"""
+
+import pytest
+
+from agent_evo.models import Config
+
+
+@pytest.fixture
+def config() -> Config:
+    """最小可用配置 / A minimal valid configuration"""
+    return Config.model_validate({"agent": {"module": "agent", "prompt_file": "prompt.md"}})
@@ -0,0 +1,99 @@
+"""近似去重测试 / Near-duplicate detection tests"""
+
+import json
+
+from agent_evo.core.dedup import CorpusIndex, MinHashIndex
+from agent_evo.core.serializer import YamlCaseWriter
+from agent_evo.models import DedupConfig, TestCase
+
+
+def test_index_finds_near_duplicates_only():
+    index = MinHashIndex(threshold=0.7, num_perm=64, ngram=3)
+    index.add("a", index.signature("How do I reset my account password?"))
+    index.add("b", index.signature("What is the refund policy for annual plans?"))
+
+    hit = index.query(index.signature("how do I reset my account password"))
+    assert hit is not None and hit[0] == "a" and hit[1] >= 0.7
+    assert index.query(index.signature("Where can I download my invoices?")) is None
+
+
+def test_signature_is_deterministic_and_remove_drops_key():
+    index = MinHashIndex(threshold=0.7, num_perm=64, ngram=3)
+    signature = index.signature("shipping to Canada takes how long")
+    assert signature == MinHashIndex(threshold=0.7, num_perm=64, ngram=3).signature("shipping to Canada takes how long")
+
+    index.add("a", signature)
+    assert "a" in index and len(index) == 1
+    index.remove("a")
+    assert "a" not in index
+    assert index.query(signature) is None
+
+
+# ── 持久化测评集索引 / Persistent corpus index ──
+
+def _write_suite(path, *cases: tuple[str, str]) -> str:
+    with YamlCaseWriter(str(path)) as writer:
+        writer.write([TestCase(id=case_id, name=case_id, input=text) for case_id, text in cases])
+    return str(path)
+
+
+def _corpus(tmp_path, **config) -> CorpusIndex:
+    return CorpusIndex.load(DedupConfig(index_path="index.json", **config), tmp_path)
+
+
+def test_corpus_index_round_trips_through_file(tmp_path):
+    gold = _write_suite(tmp_path / "gold.yaml", ("a", "How do I reset my account password?"))
+    corpus = _corpus(tmp_path)
+    assert corpus.refresh([gold]) == (1, 0)
+    corpus.save()
+    assert not corpus.dirty
+
+    loaded = _corpus(tmp_path)
+    assert len(loaded) == 1 and not loaded.dirty
+    assert loaded.refresh([gold]) == (0, 0)
+    assert [hit[:2] for hit in loaded.similar("how do I reset my account password")] == [("a", gold)]
+
+
+def test_corpus_index_reindexes_modified_and_drops_removed_files(tmp_path):
+    gold = _write_suite(tmp_path / "gold.yaml", ("a", "How do I reset my account password?"))
+    silver = _write_suite(tmp_path / "silver.yaml", ("b", "What is the refund policy for annual plans?"))
+    corpus = _corpus(tmp_path)
+    corpus.refresh([gold, silver])
+    corpus.save()
+
+    _write_suite(tmp_path / "gold.yaml", ("c", "Where can I download the invoices for my last three orders?"))
+    loaded = _corpus(tmp_path)
+    assert loaded.refresh([gold]) == (1, 1)
+    assert loaded.dirty
+    assert set(loaded.case_files) == {"c"}
+    assert loaded.similar("How do I reset my account password?") == []
+    assert loaded.similar("What is the refund policy for annual plans?") == []
+    assert loaded.similar("where can I download the invoices for my last three orders")[0][0] == "c"
+
+
+def test_corpus_index_resets_when_num_perm_changes(tmp_path):
+    gold = _write_suite(tmp_path / "gold.yaml", ("a", "How do I reset my account password?"))
+    corpus = _corpus(tmp_path, num_perm=64)
+    corpus.refresh([gold])
+    corpus.save()
+
+    loaded = _corpus(tmp_path, num_perm=32)
+    assert len(loaded) == 0 and loaded.dirty
+    assert loaded.refresh([gold]) == (1, 0)
+    loaded.save()
+    assert json.loads((tmp_path / "index.json").read_text(encoding="utf-8"))["params"]["num_perm"] == 32
+
+
+def test_corpus_index_first_file_wins_for_duplicate_ids(tmp_path):
+    gold = _write_suite(tmp_path / "gold.yaml", ("dup", "How do I reset my account password?"))
+    silver = _write_suite(tmp_path / "silver.yaml", ("dup", "What is the refund policy for annual plans?"))
+    corpus = _corpus(tmp_path)
+    corpus.refresh([gold, silver])
+    assert corpus.case_files == {"dup": gold}
+    assert corpus.similar("What is the refund policy for annual plans?") == []
+
+    # 先索引的文件被移除后，同 ID 用例由后一个文件接替
+    # Once the first file is removed, the case with the same ID passes to the later file
+    assert corpus.refresh([silver]) == (0, 1)
+    assert corpus.case_files == {"dup": silver}
+    assert corpus.similar("what is the refund policy for annual plans")[0][:2] == ("dup", silver)
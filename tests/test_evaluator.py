@@ -0,0 +1,50 @@
+"""评测器测试 / Evaluator tests"""
+
+import asyncio
+
+from agent_evo.core.evaluator import Evaluator
+from agent_evo.core.generator import GeneratorResult
+from agent_evo.models import CaseStatus, FactorConfig, TestCase
+
+
+def _aborted(dimension):
+    case = TestCase(id="c1", name="case", input="q", expected={"not_contains": ["secret"]})
+    return GeneratorResult(case, "the secret", execution_time_ms=5, aborted="hit", aborted_dimension=dimension)
+
+
+def test_early_stop_scores_its_dimension(config):
+    result = asyncio.run(Evaluator(config).evaluate_case(_aborted("content")))
+    [content] = [fr for fr in result.factor_scores if fr.factor_id == "content"]
+    assert content.score == 0.0 and content.details["early_stop"]
+    assert result.status == CaseStatus.FAILED
+
+
+def test_early_stop_fatal_dimension_fails_directly(config):
+    config.judge.factors["content"] = FactorConfig(fatal=True)
+    result = asyncio.run(Evaluator(config).evaluate_case(_aborted("content")))
+    assert result.status == CaseStatus.FAILED
+    assert [fr.factor_id for fr in result.factor_scores] == ["content"]
+
+
+def test_stream_limit_abort_fails(config):
+    result = asyncio.run(Evaluator(config).evaluate_case(_aborted(None)))
+    assert result.status == CaseStatus.FAILED
+    assert result.factor_scores[0].factor_id == "early_stop"
+
+
+def test_batched_latency_check_is_reported_as_unverified(config):
+    cases = [
+        TestCase(id=f"c{i}", name=f"case {i}", input="q", expected={"max_latency_ms": 100}) for i in range(3)
+    ]
+    results = [
+        GeneratorResult(cases[0], "out", execution_time_ms=50),
+        GeneratorResult(cases[1], "out", execution_time_ms=5000, batched=True),
+        GeneratorResult(cases[2], "out", execution_time_ms=5000, batched=True),
+    ]
+    report = asyncio.run(Evaluator(config).evaluate_all(results))
+
+    assert report.passed == 3
+    latency = report.factor_summary["latency"]
+    # 批量用例的耗时检查被跳过：不计入激活与平均分，而是单独计为未验证
+    # The batched cases' latency checks were skipped: counted as unverified, not as activated
+    assert (latency.activated_count, latency.avg_score, latency.skipped_count) == (1, 1.0, 2)
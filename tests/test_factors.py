@@ -0,0 +1,103 @@
+"""评判因子测试 / Evaluation factor tests"""
+
+import asyncio
+import json
+
+from agent_evo.core.factors import CoreJudgeFactor, LatencyFactor
+from agent_evo.core.generator import GeneratorResult
+from agent_evo.models import JudgeCascadeConfig, LLMConfig, TagPolicyConfig, TestCase
+from agent_evo.utils.llm import LLMClient
+
+
+def _case(**expected) -> TestCase:
+    return TestCase(id="c1", name="case", input="q", tags=["fast"], expected=expected)
+
+
+def _latency(case: TestCase, result: GeneratorResult, policies=None):
+    return asyncio.run(LatencyFactor(policies).evaluate(case, result.output, execution=result))
+
+
+def test_latency_within_and_over_budget():
+    case = _case(max_latency_ms=100)
+    [ok] = _latency(case, GeneratorResult(case, "out", execution_time_ms=80))
+    assert ok.score == 1.0
+    [slow] = _latency(case, GeneratorResult(case, "out", execution_time_ms=200))
+    assert slow.score == 0.5
+
+
+def test_ttfb_check_skipped_when_not_measured():
+    case = _case()
+    policies = {"fast": TagPolicyConfig(max_ttfb_ms=50)}
+    [result] = _latency(case, GeneratorResult(case, "out", execution_time_ms=30), policies)
+    assert result.details["skipped"] is True
+    assert "ttfb" in result.reason
+
+
+def test_ttfb_checked_when_measured():
+    case = _case(max_latency_ms=1000, max_ttfb_ms=50)
+    [result] = _latency(case, GeneratorResult(case, "out", execution_time_ms=300, ttfb_ms=100))
+    assert result.score == 0.5
+    assert "skipped" not in result.details
+
+
+def test_latency_check_skipped_for_batched_timing():
+    case = _case(max_latency_ms=100)
+    [result] = _latency(case, GeneratorResult(case, "out", execution_time_ms=500, batched=True))
+    assert result.details["skipped"] is True
+
+
+# ── 评判级联 / Judge cascade ──
+
+def _fake_llm(model: str, **options) -> LLMClient:
+    return LLMClient(LLMConfig(provider="fake", model=model, max_retries=0, options=options))
+
+
+def _cascade(fast_options: dict):
+    """快速模型按 fast_options 评判，主模型固定给 0.9 / Fast model judges per fast_options, main model gives 0.9"""
+    core = CoreJudgeFactor()
+    core.fast_llm = _fake_llm("fast", **fast_options)
+    core.cascade = JudgeCascadeConfig(enabled=True, band=0.1, max_spread=0.5)
+    core.pass_threshold = 0.7
+    main = _fake_llm("main", score=0.9)
+    case = _case(output="expected answer")
+    results = asyncio.run(core.evaluate(case, "out", llm=main))
+    phases = set(main.usage.summary().by_phase) | set(core.fast_llm.usage.summary().by_phase)
+    return results, phases
+
+
+def test_cascade_keeps_confident_fast_verdict():
+    results, phases = _cascade({"score": 0.95})
+    assert [fr.factor_id for fr in results] == ["content"]
+    assert results[0].score == 0.95
+    assert results[0].details["cascade"] == {"tier": "fast"}
+    assert phases == {"judge_fast"}
+
+
+def test_cascade_escalates_score_inside_band():
+    results, phases = _cascade({"score": 0.72})
+    assert results[0].score == 0.9
+    assert results[0].details["cascade"] == {"tier": "strong", "reason": "band", "fast_score": 0.72}
+    assert phases == {"judge_fast", "judge"}
+
+
+def test_cascade_escalates_disagreeing_dimensions():
+    response = json.dumps({
+        "content": {"applicable": True, "score": 0.6, "reason": "partial"},
+        "behavior": {"applicable": True, "score": 0.0, "reason": "off"},
+        "structure": {"applicable": False},
+    })
+    results, phases = _cascade({"response": response})
+    # 加权分 0.6 / 1.8 ≈ 0.333 远低于带，仅因维度分歧（0.6 > max_spread）升级
+    # Weighted 0.6 / 1.8 ≈ 0.333 is well below the band; escalated only for the 0.6 spread
+    cascade = results[0].details["cascade"]
+    assert cascade["tier"] == "strong" and cascade["reason"] == "spread"
+    assert cascade["fast_score"] == round(0.6 / 1.8, 4)
+    assert all(fr.details["cascade"] is cascade for fr in results)
+    assert phases == {"judge_fast", "judge"}
+
+
+def test_cascade_escalates_fast_judge_error():
+    results, phases = _cascade({"score": 0.95, "error_rate": 1.0})
+    assert results[0].score == 0.9
+    assert results[0].details["cascade"]["reason"] == "error"
+    assert "judge" in phases
@@ -0,0 +1,125 @@
+"""测试执行器测试 / Test executor tests"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from agent_evo.core.generator import Generator, GeneratorResult, MicroBatcher
+from agent_evo.core.history import RunHistory, case_fingerprint
+from agent_evo.models import TestCase
+from agent_evo.models.config import HistoryConfig
+
+
+def _cases(n: int) -> list[TestCase]:
+    return [TestCase(id=f"c{i}", name=f"case {i}", input="q") for i in range(n)]
+
+
+def test_micro_batcher_groups_by_size():
+    sizes = []
+
+    async def run_batch(cases):
+        sizes.append(len(cases))
+        return [GeneratorResult(c, c.id, execution_time_ms=1) for c in cases]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_size=3, max_wait_s=0.01, max_inflight=2)
+        return await asyncio.gather(*(batcher.submit(c) for c in _cases(7)))
+
+    results = asyncio.run(main())
+    assert [r.output for r in results] == [f"c{i}" for i in range(7)]
+    assert sorted(sizes) == [1, 3, 3]
+
+
+def test_micro_batcher_fails_unmatched_futures():
+    async def run_batch(cases):
+        return [GeneratorResult(cases[0], "only one", execution_time_ms=1)]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_size=2, max_wait_s=0.01, max_inflight=1)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(c) for c in _cases(2)), return_exceptions=True), timeout=1,
+        )
+
+    first, second = asyncio.run(main())
+    assert first.output == "only one"
+    assert isinstance(second, RuntimeError)
+
+
+@pytest.mark.parametrize("latency_ms, batched", [(None, True), (7, False)])
+def test_run_batch_marks_timing(config, latency_ms, batched):
+    from agent_evo.adapters.base import AgentResponse
+    from agent_evo.core import generator as generator_module
+
+    class Adapter:
+        async def invoke_batch(self, inputs, contexts):
+            return [AgentResponse(output="ok", latency_ms=latency_ms) for _ in inputs]
+
+    gen = generator_module.Generator.__new__(generator_module.Generator)
+    gen.config = config
+    gen.adapter = Adapter()
+    results = asyncio.run(gen.run_batch(_cases(2)))
+    assert [r.batched for r in results] == [batched] * 2
+    if latency_ms is not None:
+        assert all(r.execution_time_ms == latency_ms for r in results)
+
+
+# ── 执行顺序 / Execution order ──
+
+def _ordering_history(cases: list[TestCase]) -> RunHistory:
+    """c0 稳定通过且快，c1 总失败且快，c2 无历史，c3 通过但慢，c4 总失败且较慢
+    c0 passes quickly, c1 always fails quickly, c2 has no history, c3 passes slowly, c4 always fails, slower"""
+    runs = {"c0": ("passed", 100), "c1": ("failed", 50), "c3": ("passed", 900), "c4": ("failed", 300)}
+    by_id = {c.id: c for c in cases}
+    return RunHistory(HistoryConfig(), Path("history.json"), {
+        case_id: [{"at": "", "status": status, "score": 0, "ms": ms, "fp": case_fingerprint(by_id[case_id])}] * 2
+        for case_id, (status, ms) in runs.items()
+    })
+
+
+def _ids(cases: list[TestCase]) -> list[str]:
+    return [c.id for c in cases]
+
+
+def test_fail_first_orders_by_failure_probability_then_duration():
+    cases = _cases(5)
+    ordered = Generator.order_cases(cases, "fail-first", _ordering_history(cases))
+    # c4 / c1 必然失败（耗时长者在前），c2 取先验 0.5，c3 / c0 均为 0（耗时长者在前）
+    # c4 / c1 always fail (slower first), c2 gets the 0.5 prior, c3 / c0 are both 0 (slower first)
+    assert _ids(ordered) == ["c4", "c1", "c2", "c3", "c0"]
+
+
+def test_fail_first_boosts_changed_cases():
+    cases = _cases(5)
+    history = _ordering_history(cases)
+    cases[3] = TestCase(id="c3", name="case 3", input="edited")
+    assert _ids(Generator.order_cases(cases, "fail-first", history))[:3] == ["c4", "c1", "c2"]
+    assert history.failure_probability(cases[3]) == pytest.approx(0.3)
+
+
+def test_slow_first_estimates_unknown_durations_with_the_mean():
+    cases = _cases(5)
+    ordered = Generator.order_cases(cases, "slow-first", _ordering_history(cases))
+    # c2 无记录，按已知平均 337.5ms 估计 / c2 has no timings and is estimated at the known mean, 337.5ms
+    assert _ids(ordered) == ["c3", "c2", "c4", "c0", "c1"]
+
+
+@pytest.mark.parametrize("order", ["file", "fail-first", "slow-first"])
+def test_history_based_orders_keep_file_order_without_history(order):
+    cases = _cases(5)
+    ordered = Generator.order_cases(cases, order)
+    assert _ids(ordered) == _ids(cases) and ordered is not cases
+
+
+def test_random_order_is_deterministic_per_seed():
+    cases = _cases(20)
+    first = Generator.order_cases(cases, "random", seed=7)
+    assert _ids(first) == _ids(Generator.order_cases(cases, "random", seed=7))
+    assert _ids(first) != _ids(cases)
+    assert sorted(_ids(first)) == sorted(_ids(cases))
+    assert _ids(first) != _ids(Generator.order_cases(cases, "random", seed=8))
+
+
+def test_unknown_order_is_rejected():
+    with pytest.raises(ValueError):
+        Generator.order_cases(_cases(2), "alphabetical")
@@ -0,0 +1,52 @@
+"""运行历史测试 / Run history tests"""
+
+from pathlib import Path
+
+from agent_evo.core.history import RunHistory
+from agent_evo.models.config import HistoryConfig
+
+
+def _history(**outcomes: str) -> RunHistory:
+    """每个字符代表一次结果：p 通过、f 失败、e 出错；"|" 表示其后提示词已改动
+    One character per run: p passed, f failed, e error; "|" marks a prompt edit before the next run"""
+    names = {"p": "passed", "f": "failed", "e": "error"}
+    cases = {}
+    for case_id, runs in outcomes.items():
+        entries, prompt = [], 0
+        for c in runs:
+            if c == "|":
+                prompt += 1
+                continue
+            entries.append({"at": "", "status": names[c], "score": 0, "fp": "case", "pfp": f"prompt-{prompt}"})
+        cases[case_id] = entries
+    return RunHistory(HistoryConfig(min_runs=3, flaky_threshold=0.5), Path("history.json"), cases)
+
+
+def test_flakiness_counts_flips_between_decisive_outcomes():
+    history = _history(stable="pppp", flaky="pfpf", errors="pepep", short="pf")
+    assert history.flakiness("stable") == 0.0
+    assert history.flakiness("flaky") == 1.0
+    # ERROR 不参与计算 / ERROR is ignored
+    assert history.flakiness("errors") == 0.0
+    assert history.flakiness("short") is None
+    assert history.flakiness("missing") is None
+
+
+def test_flaky_cases_applies_threshold():
+    history = _history(a="ppfp", b="pfpf", c="ppff")
+    assert history.flaky_cases() == {"a": 2 / 3, "b": 1.0}
+
+
+def test_flips_across_prompt_or_case_edits_are_not_flaky():
+    # 一次优化迭代改坏、下一次修好 / One optimizer iteration breaks the case, the next fixes it
+    history = _history(edited="pp|ff|p", noisy="pp|fpf")
+    assert history.flakiness("edited") == 0.0
+    assert history.flakiness("noisy") == 2 / 3
+    assert _history(once="pp|f|p").flakiness("once") is None
+
+    history.cases["case_edit"] = [
+        {"at": "", "status": s, "score": 0, "fp": fp, "pfp": "x"}
+        for s, fp in (("passed", "v1"), ("passed", "v1"), ("failed", "v2"), ("failed", "v2"), ("passed", "v3"))
+    ]
+    assert history.flakiness("case_edit") == 0.0
+    assert "case_edit" not in history.flaky_cases()
@@ -0,0 +1,91 @@
+"""HTTP 适配器请求体模板测试 / HTTP adapter body template tests"""
+
+from typing import Any, Optional
+
+import pytest
+
+from agent_evo.adapters.http import _build_request_body, _compile_template, _resolve_env_vars
+
+
+def _legacy_build(template: Any, input_text: str, context: Optional[dict[str, Any]]) -> Any:
+    """预编译之前逐次递归替换的实现（取自历史版本），作为对照
+    The per-call recursive substitution used before precompilation (from git history), as a reference"""
+    def substitute(obj: Any) -> Any:
+        if isinstance(obj, str):
+            if obj == "${input}":
+                return input_text
+            if obj.startswith("${context.") and obj.endswith("}"):
+                return (context or {}).get(obj[10:-1], obj)
+            result = obj.replace("${input}", input_text)
+            if context:
+                for k, v in context.items():
+                    result = result.replace(f"${{context.{k}}}", str(v))
+            return _resolve_env_vars(result)
+        if isinstance(obj, dict):
+            return {k: substitute(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [substitute(item) for item in obj]
+        return obj
+
+    return substitute(template)
+
+
+TEMPLATE = {
+    "query": "${input}",
+    "user": "${context.user_id}",
+    "meta": {
+        "greeting": "Hi ${context.name}, you asked: ${input}",
+        "auth": "Bearer ${API_TOKEN}",
+        "missing": "${context.absent}",
+        "inline_missing": "x-${context.absent}-y",
+        "nested": [{"q": "${input}"}, "static ${API_TOKEN}", 3, None],
+    },
+    "history": ["${context.turns}", "${context.flags}", {"deep": ["${context.score}"]}],
+    "limits": {"max": 10, "ratio": 0.5, "stream": False, "tags": ["a", "b"]},
+    "number": 42,
+}
+
+CONTEXTS = [
+    None,
+    {},
+    {"user_id": 7, "name": "Ada", "turns": [{"role": "user"}], "flags": {"beta": True}, "score": 0.25},
+    {"user_id": None, "name": "", "turns": [], "score": False},
+]
+
+
+@pytest.fixture(autouse=True)
+def _token(monkeypatch):
+    monkeypatch.setenv("API_TOKEN", "secret")
+
+
+@pytest.mark.parametrize("context", CONTEXTS)
+def test_compiled_template_matches_legacy_substitution(context):
+    builder = _compile_template(TEMPLATE)
+    for text in ("hello", "", "multi\nline ünïcode"):
+        assert builder(text, context) == _legacy_build(TEMPLATE, text, context)
+        assert _build_request_body(TEMPLATE, text, context) == _legacy_build(TEMPLATE, text, context)
+
+
+def test_whole_placeholders_keep_non_string_types():
+    context = {"turns": [{"role": "user"}], "flags": {"beta": True}, "score": 0.25, "user_id": 7}
+    body = _compile_template(TEMPLATE)("q", context)
+    assert body["user"] == 7
+    assert body["history"] == [[{"role": "user"}], {"beta": True}, {"deep": [0.25]}]
+    assert body["meta"]["nested"] == [{"q": "q"}, "static secret", 3, None]
+
+
+def test_static_subtrees_resolved_once_and_shared():
+    builder = _compile_template(TEMPLATE)
+    first, second = builder("a", None), builder("b", None)
+    assert first["limits"] is second["limits"]
+    assert first["meta"]["auth"] == "Bearer secret"
+    static = _compile_template({"k": ["${API_TOKEN}"]})
+    assert static("a", None) is static("b", None) == {"k": ["secret"]}
+
+
+def test_filled_values_are_not_substituted_again():
+    # 旧实现会把输入中的占位符再次替换，编译版只填入一次
+    # The legacy version re-substituted placeholders found in the input; the compiled one fills once
+    template = {"q": "ask: ${input} (${context.name})"}
+    body = _compile_template(template)("${context.name} ${API_TOKEN}", {"name": "Ada"})
+    assert body == {"q": "ask: ${context.name} ${API_TOKEN} (Ada)"}
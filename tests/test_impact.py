@@ -0,0 +1,49 @@
+"""提示词改动影响分析测试 / Prompt change impact analysis tests"""
+
+from agent_evo.core.impact import PREAMBLE, diff_sections, split_sections
+
+PROMPT = """You are a support agent.
+
+# Tone
+Be polite.
+
+# Refunds
+Refund within 30 days.
+```
+# not a heading
+```
+
+# Tone
+Repeat tone.
+"""
+
+
+def test_split_sections_handles_preamble_code_and_repeats():
+    assert split_sections(PROMPT) == [
+        (PREAMBLE, 1, 2), ("Tone", 3, 5), ("Refunds", 6, 11), ("Tone (2)", 12, 13),
+    ]
+
+
+def test_diff_sections_locates_added_and_removed_lines():
+    diff = """--- a/prompt.md
++++ b/prompt.md
+@@ -6,2 +6,2 @@
+ # Refunds
+-Refund within 14 days.
++Refund within 30 days.
+@@ -13,1 +13,1 @@
+-# Style
++Repeat tone.
+"""
+    assert diff_sections(diff, "prompt.md", PROMPT) == {"Refunds", "Tone (2)", "Style"}
+
+
+def test_diff_sections_ignores_other_files():
+    diff = """--- a/other.md
++++ b/other.md
+@@ -1,1 +1,1 @@
+-old
++new
+"""
+    assert diff_sections(diff, "prompt.md", PROMPT) is None
+    assert diff_sections("@@ -1,1 +1,1 @@\n-x\n+You are an agent.\n", "prompt.md", PROMPT) == {PREAMBLE}
@@ -0,0 +1,268 @@
+"""导入引擎测试 / Import engine tests"""
+
+import asyncio
+
+import httpx
+import pytest
+
+from agent_evo.core import importer as importer_module
+from agent_evo.core.importer import FetchedPage, record_case_id
+from agent_evo.models.import_models import (
+    APISourceConfig,
+    PaginationConfig,
+    ProductionRecord,
+    WatermarkConfig,
+)
+
+
+def _source() -> APISourceConfig:
+    return APISourceConfig(url="http://example.test", watermark=WatermarkConfig(field="ts", type="id"))
+
+
+def _importer(config, pages, fail=()):
+    """页面固定、提炼结果可控的导入器 / An importer with fixed pages and controllable refinement"""
+    importer = importer_module.TestCaseImporter(config)
+
+    async def iter_api_pages(source, resume=None, since=None):
+        start = (resume or {}).get("page", 1)
+        for n, (records, high) in enumerate(pages, 1):
+            if n >= start:
+                yield FetchedPage(records, {"page": n + 1} if n < len(pages) else None, high)
+
+    async def refine(record):
+        if record.id in fail:
+            raise RuntimeError("refine failed")
+        return importer._record_to_basic_case(record)
+
+    importer.iter_api_pages = iter_api_pages
+    importer.refine_to_test_case = refine
+    return importer
+
+
+def _records(*ids: str) -> list[ProductionRecord]:
+    return [ProductionRecord(id=i, query=f"query {i}", agent_response="bad") for i in ids]
+
+
+def test_failed_record_holds_watermark_and_checkpoint(config):
+    pages = [(_records("1", "2"), 2), (_records("3"), 3)]
+    checkpoints = []
+    importer = _importer(config, pages, fail={"2"})
+    seen: set[str] = set()
+
+    result = asyncio.run(importer.refine_source(_source(), on_checkpoint=checkpoints.append, seen=seen))
+
+    assert (result.failed, result.imported) == (1, 2)
+    assert result.watermark is None
+    assert checkpoints == []
+    assert record_case_id(pages[0][0][1]) not in seen
+
+
+def test_failed_record_is_retried_on_next_run(config):
+    pages = [(_records("1"), 1), (_records("2", "3"), 3), (_records("4"), 4)]
+    checkpoints = []
+    seen: set[str] = set()
+    first = asyncio.run(
+        _importer(config, pages, fail={"3"}).refine_source(_source(), on_checkpoint=checkpoints.append, seen=seen)
+    )
+    assert first.watermark is None
+    assert checkpoints == [{"page": 2, "watermark": 1}]
+
+    second = asyncio.run(
+        _importer(config, pages).refine_source(_source(), resume=checkpoints[-1], since=1, seen=seen)
+    )
+    assert (second.imported, second.skipped, second.failed) == (1, 2, 0)
+    assert second.watermark == 4
+
+
+def test_complete_import_advances_watermark(config):
+    pages = [(_records("1", "2"), 2), (_records("3"), 3)]
+    checkpoints = []
+    result = asyncio.run(
+        _importer(config, pages).refine_source(_source(), on_checkpoint=checkpoints.append, seen=set())
+    )
+    assert result.watermark == 3
+    assert checkpoints == [{"page": 2, "watermark": 2}, None]
+
+
+def test_duplicate_queries_skip_refinement(config):
+    from agent_evo.core.dedup import MinHashIndex
+
+    refined = []
+    importer = _importer(config, [])
+    base_refine = importer.refine_to_test_case
+
+    async def refine(record):
+        refined.append(record.id)
+        return await base_refine(record)
+
+    importer.refine_to_test_case = refine
+    index = MinHashIndex(config.dedup.threshold, config.dedup.num_perm, config.dedup.ngram)
+    records = [
+        ProductionRecord(id="1", query="how do I reset my account password today", agent_response="bad"),
+        ProductionRecord(id="2", query="how do I reset my account password today?", agent_response="bad"),
+        ProductionRecord(id="3", query="what is the refund policy for annual plans", agent_response="bad"),
+    ]
+
+    result = asyncio.run(importer.refine_stream(records, dedup_index=index))
+
+    assert refined == ["1", "3"]
+    assert (result.imported, result.duplicates_removed) == (2, 1)
+
+
+# ── HTTP 分页与重试 / HTTP pagination and retries ──
+
+def _mock_http(monkeypatch, handler):
+    """让导入器的 httpx.AsyncClient 走 MockTransport / Route the importer's httpx.AsyncClient through a MockTransport"""
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        httpx, "AsyncClient", lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    # 退避抖动归零，重试不真正等待 / Zero the backoff jitter so retries do not actually wait
+    monkeypatch.setattr(importer_module.random, "uniform", lambda a, b: 0.0)
+
+
+def _items(page: int, count: int) -> list[dict]:
+    return [{"id": f"{page}-{i}", "query": "q", "agent_response": "a"} for i in range(count)]
+
+
+def _paged_source(**pagination) -> APISourceConfig:
+    return APISourceConfig(
+        name="api", url="http://example.test/records", max_retries=2,
+        field_mapping={"id": "id", "query": "query", "agent_response": "agent_response"},
+        pagination=PaginationConfig(size=2, **pagination),
+    )
+
+
+def _collect(config, source: APISourceConfig) -> list[FetchedPage]:
+    async def run():
+        return [page async for page in importer_module.TestCaseImporter(config).iter_api_pages(source)]
+    return asyncio.run(run())
+
+
+def test_short_last_page_stops_and_cancels_prefetched_pages(config, monkeypatch):
+    requested, cancelled = [], []
+    never = asyncio.Event()
+
+    async def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        if page > 3:
+            # 预取窗口中超出末页的请求永远挂起，应在提前返回时被取消
+            # Prefetched requests past the last page hang forever and must be cancelled on the early return
+            try:
+                await never.wait()
+            except asyncio.CancelledError:
+                cancelled.append(page)
+                raise
+        return httpx.Response(200, json={"data": _items(page, 1 if page == 3 else 2)})
+
+    _mock_http(monkeypatch, handler)
+    source = _paged_source(concurrency=4)
+
+    async def run():
+        pages = [page async for page in importer_module.TestCaseImporter(config).iter_api_pages(source)]
+        await asyncio.sleep(0)
+        return pages, asyncio.all_tasks() - {asyncio.current_task()}
+
+    pages, leftover = asyncio.run(run())
+
+    assert [len(p.records) for p in pages] == [2, 2, 1]
+    assert [p.next_position for p in pages] == [{"page": 2}, {"page": 3}, None]
+    assert pages[0].records[0].id == "api:1-0"
+    # 页 4 已发出，页 5、6 在发出前就被取消，没有遗留任务
+    # Page 4 was in flight, pages 5 and 6 were cancelled before being sent; no task is left behind
+    assert sorted(requested) == [1, 2, 3, 4]
+    assert cancelled == [4]
+    assert not leftover
+
+
+def test_total_path_limits_requests_to_existing_pages(config, monkeypatch):
+    requested = []
+
+    def handler(request):
+        page = int(request.url.params["page"])
+        requested.append(page)
+        assert request.url.params["page_size"] == "2"
+        # 服务端总是返回满页，只有 total 能让拉取停下
+        # The server always returns full pages, so only the total can stop the fetch
+        return httpx.Response(200, json={"meta": {"total": 5}, "data": _items(page, 2)})
+
+    _mock_http(monkeypatch, handler)
+    pages = _collect(config, _paged_source(total_path="meta.total", concurrency=4))
+
+    assert len(pages) == 3 and pages[-1].next_position is None
+    assert sorted(requested) == [1, 2, 3]
+
+
+def test_offset_pagination_sends_offsets(config, monkeypatch):
+    offsets = []
+
+    def handler(request):
+        offset = int(request.url.params["offset"])
+        offsets.append(offset)
+        return httpx.Response(200, json={"data": _items(offset, 2 if offset < 4 else 0)})
+
+    _mock_http(monkeypatch, handler)
+    pages = _collect(config, _paged_source(type="offset", page_param="offset", concurrency=1))
+
+    assert [len(p.records) for p in pages] == [2, 2, 0]
+    assert offsets == [0, 2, 4]
+
+
+def test_request_retries_429_and_5xx_then_succeeds(monkeypatch):
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"data": []}),
+    ]
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return responses[len(calls) - 1]
+
+    _mock_http(monkeypatch, handler)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            return await importer_module.TestCaseImporter._request(client, _paged_source(), {"page": 1})
+
+    assert asyncio.run(run()) == {"data": []}
+    assert len(calls) == 3
+
+
+def test_request_gives_up_after_max_retries(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(502)
+
+    _mock_http(monkeypatch, handler)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            await importer_module.TestCaseImporter._request(client, _paged_source(), {})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    # 首次请求 + max_retries 次重试 / The first request plus max_retries retries
+    assert len(calls) == 3
+
+
+def test_request_does_not_retry_client_errors(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(404)
+
+    _mock_http(monkeypatch, handler)
+
+    async def run():
+        async with httpx.AsyncClient() as client:
+            await importer_module.TestCaseImporter._request(client, _paged_source(), {})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(run())
+    assert len(calls) == 1
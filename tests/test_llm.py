@@ -0,0 +1,68 @@
+"""LLM 调用封装测试 / LLM call wrapper tests"""
+
+import pytest
+
+from agent_evo.models.config import LLMConfig
+from agent_evo.utils.llm import LLMClient
+
+
+def test_budget_requires_priced_model():
+    with pytest.raises(ValueError, match="gpt-4o"):
+        LLMClient(LLMConfig(model="gpt-4o", budget_usd=1.0))
+
+
+def test_priced_or_unbudgeted_model_is_accepted():
+    LLMClient(LLMConfig(model="gpt-4o"))
+    LLMClient(LLMConfig(model="gpt-4o", budget_usd=1.0, pricing={"gpt-4o": {"prompt": 2.5, "completion": 10}}))
+
+
+def test_cli_command_closes_connection_pools():
+    from agent_evo.cli.main import _run_command
+    from agent_evo.utils import llm
+
+    opened = []
+
+    async def command():
+        transport = llm._get_transport(LLMConfig(provider="fake", model="fake"))
+        opened.append(transport)
+        raise SystemExit(1)
+
+    with pytest.raises(SystemExit):
+        _run_command(command())
+    assert opened[0].http.is_closed
+    assert llm._transport_key(LLMConfig(provider="fake", model="fake")) not in llm._TRANSPORTS
+
+
+def test_provider_base_is_abstract():
+    import httpx
+
+    from agent_evo.utils.llm_providers import LLMProvider
+
+    with pytest.raises(TypeError):
+        LLMProvider(LLMConfig(), httpx.AsyncClient())
+
+
+def test_fake_provider_errors_do_not_depend_on_call_order():
+    import asyncio
+
+    import httpx
+
+    from agent_evo.utils.llm_providers import FakeProvider
+
+    config = LLMConfig(provider="fake", model="fake", options={"error_rate": 0.5, "seed": 3})
+    prompts = [f"request {i}" for i in range(20)]
+
+    async def outcomes(order):
+        provider = FakeProvider(config, httpx.AsyncClient())
+        failed = {}
+        for prompt in order:
+            try:
+                await provider.complete([{"role": "user", "content": prompt}], 0.0, 16)
+                failed[prompt] = False
+            except httpx.HTTPStatusError:
+                failed[prompt] = True
+        return failed
+
+    forward = asyncio.run(outcomes(prompts))
+    assert forward == asyncio.run(outcomes(list(reversed(prompts))))
+    assert 0 < sum(forward.values()) < len(prompts)
@@ -0,0 +1,136 @@
+"""变异引擎测试 / Mutator tests"""
+
+import asyncio
+
+from agent_evo.core.mutator import Mutator
+from agent_evo.models import TestCase
+from agent_evo.models.test_case import ReviewStatus
+from agent_evo.utils.i18n import t
+from agent_evo.utils.llm import BudgetExceededError
+
+
+def _seeds(n: int) -> list[TestCase]:
+    return [TestCase(id=f"s{i}", name=f"seed {i}", input="q") for i in range(n)]
+
+
+def _mutator(config, mutate_single) -> Mutator:
+    mutator = Mutator.__new__(Mutator)
+    mutator.config = config
+    mutator._mutate_single = mutate_single
+    return mutator
+
+
+def test_mutate_reports_seed_errors(config):
+    async def mutate_single(seed, count, business_docs=None):
+        if seed.id == "s1":
+            raise ValueError("bad json")
+        return [TestCase(id=f"{seed.id}-mut", name="m", input="q")]
+
+    done = []
+    mutations = asyncio.run(_mutator(config, mutate_single).mutate(
+        _seeds(3), on_seed_done=lambda seed, muts, error: done.append((seed.id, len(muts), error)),
+    ))
+    assert [m.id for m in mutations] == ["s0-mut", "s2-mut"]
+    assert sorted(done) == [("s0", 1, None), ("s1", 0, "bad json"), ("s2", 1, None)]
+
+
+def test_mutate_stops_after_budget_exceeded(config):
+    calls = []
+
+    async def mutate_single(seed, count, business_docs=None):
+        calls.append(seed.id)
+        raise BudgetExceededError("over budget")
+
+    done = []
+    mutations = asyncio.run(_mutator(config, mutate_single).mutate(
+        _seeds(4), concurrency=1, on_seed_done=lambda seed, muts, error: done.append(error),
+    ))
+    assert mutations == []
+    assert calls == ["s0"]
+    assert done == ["over budget"] * 4
+
+
+# ── 预审 / Pre-review ──
+
+def _mutations(n: int) -> list[TestCase]:
+    # 每条约 45 个估算 token / About 45 estimated tokens each
+    return [TestCase(id=f"m{i}", name=f"mutation {i}", input=f"{i:02d} " + "x" * 100) for i in range(n)]
+
+
+def _reviewer(config, review_chunk, chunk_tokens=100, retries=1) -> Mutator:
+    config.mutation.review_chunk_tokens = chunk_tokens
+    config.mutation.review_retries = retries
+    mutator = Mutator.__new__(Mutator)
+    mutator.config = config
+    mutator._review_chunk = review_chunk
+    return mutator
+
+
+def test_review_batch_chunks_by_estimated_tokens(config):
+    calls = []
+
+    async def review_chunk(cases):
+        calls.append([c.id for c in cases])
+        return {c.id: {"approved": c.id != "m3", "reason": "nonsense"} for c in cases}
+
+    cases = _mutations(5)
+    result = asyncio.run(_reviewer(config, review_chunk).review_batch(cases))
+
+    assert sorted(calls) == [["m0", "m1"], ["m2", "m3"], ["m4"]]
+    assert result.reviewed == 5 and result.rejected == ["m3"] and result.unreviewed == {}
+    assert cases[3].review_status == ReviewStatus.REJECTED
+    assert cases[3].judge_hints == "[Pre-review rejected] nonsense"
+
+
+def test_oversized_case_gets_its_own_chunk():
+    chunks = Mutator._review_chunks(_mutations(3), max_tokens=10)
+    assert [[c.id for c in chunk] for chunk in chunks] == [["m0"], ["m1"], ["m2"]]
+
+
+def test_review_batch_reports_failed_chunk_as_unreviewed(config):
+    calls = []
+
+    async def review_chunk(cases):
+        ids = [c.id for c in cases]
+        calls.append(ids)
+        if "m2" in ids:
+            raise ValueError("bad json")
+        return {c.id: {"approved": True} for c in cases}
+
+    cases = _mutations(5)
+    result = asyncio.run(_reviewer(config, review_chunk, retries=1).review_batch(cases))
+
+    # 失败的块重试一次后仍失败，其用例不算通过 / The failing chunk is retried once, then its cases stay unreviewed
+    assert calls.count(["m2", "m3"]) == 2
+    assert result.reviewed == 3
+    assert result.unreviewed == {"m2": "bad json", "m3": "bad json"}
+    assert all(c.review_status != ReviewStatus.REJECTED for c in cases)
+
+
+def test_review_batch_retries_only_missing_cases(config):
+    calls = []
+
+    async def review_chunk(cases):
+        ids = [c.id for c in cases]
+        calls.append(ids)
+        # 首次响应漏掉 m1，之后总是漏掉 m4 / The first response omits m1; m4 is always omitted
+        return {i: {"approved": True} for i in ids if i != "m4" and not (i == "m1" and len(calls) == 1)}
+
+    result = asyncio.run(_reviewer(config, review_chunk, chunk_tokens=1000, retries=2).review_batch(_mutations(5)))
+
+    # 首次调用 + 2 次重试 / The first call plus 2 retries
+    assert calls == [["m0", "m1", "m2", "m3", "m4"], ["m1", "m4"], ["m4"]]
+    assert result.reviewed == 4
+    assert result.unreviewed == {"m4": t("review_missing")}
+
+
+def test_review_batch_stops_retrying_on_budget(config):
+    calls = []
+
+    async def review_chunk(cases):
+        calls.append([c.id for c in cases])
+        raise BudgetExceededError("over budget")
+
+    result = asyncio.run(_reviewer(config, review_chunk, chunk_tokens=1000, retries=2).review_batch(_mutations(2)))
+    assert len(calls) == 1
+    assert result.unreviewed == {"m0": "over budget", "m1": "over budget"}
@@ -0,0 +1,46 @@
+"""导入采样测试 / Import sampling tests"""
+
+import pytest
+
+from agent_evo.core.sampling import RecordSampler
+from agent_evo.models import ImportSamplingConfig
+from agent_evo.models.import_models import ImportResult, ProductionRecord
+
+
+def _records(spec: dict[str, int]) -> list[ProductionRecord]:
+    return [
+        ProductionRecord(id=f"{kind}-{i}", query=f"{kind} query {i}", agent_response="bad", error_type=kind)
+        for kind, n in spec.items() for i in range(n)
+    ]
+
+
+def test_first_keeps_leading_records_per_stratum():
+    sampler = RecordSampler(ImportSamplingConfig(max_per_stratum=2, max_records=3))
+    kept = [r.id for record in _records({"a": 3, "b": 3}) for r in sampler.offer(record)[0]]
+    assert kept == ["a-0", "a-1", "b-0"]
+
+    result = ImportResult()
+    sampler.fill(result)
+    assert result.sampled_out == 3
+    assert result.sampled_out_by == {"stratum_cap": 1, "max_records": 2}
+
+
+def test_reservoir_is_seeded_and_shares_max_records_across_strata():
+    def run(seed: int) -> list[str]:
+        config = ImportSamplingConfig(max_per_stratum=2, max_records=3, method="reservoir", seed=seed)
+        sampler = RecordSampler(config)
+        for record in _records({"a": 10, "b": 10}):
+            assert sampler.offer(record)[0] == []
+        kept, dropped = sampler.finish()
+        assert len(dropped) == 1
+        return [r.id for r in kept]
+
+    kept = run(1)
+    assert kept == run(1)
+    assert len(kept) == 3
+    assert {r.split("-")[0] for r in kept} == {"a", "b"}
+
+
+def test_bad_stratum_is_rejected():
+    with pytest.raises(ValueError):
+        RecordSampler(ImportSamplingConfig(stratify_by="metadata.", max_records=1))
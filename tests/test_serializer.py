@@ -0,0 +1,31 @@
+"""测评集序列化测试 / Test suite serialization tests"""
+
+import yaml
+
+from agent_evo.core.serializer import YamlCaseWriter, load_test_cases_from_yaml
+from agent_evo.models import TestCase, TestSuite
+
+
+def _case(case_id: str) -> TestCase:
+    return TestCase(id=case_id, name=case_id, input="q")
+
+
+def test_writer_without_cases_leaves_valid_suite(tmp_path):
+    path = tmp_path / "out.yaml"
+    with YamlCaseWriter(str(path), name="empty"):
+        suite = TestSuite(**yaml.safe_load(path.read_text(encoding="utf-8")))
+        assert suite.cases == []
+    assert TestSuite(**yaml.safe_load(path.read_text(encoding="utf-8"))).cases == []
+
+
+def test_writer_switches_to_block_list_and_appends(tmp_path):
+    path = tmp_path / "out.yaml"
+    with YamlCaseWriter(str(path)) as writer:
+        writer.write([_case("a")])
+        writer.write([_case("b")])
+    assert [c.id for c in load_test_cases_from_yaml(str(path))] == ["a", "b"]
+
+    with YamlCaseWriter(str(path), append=True) as writer:
+        assert writer.existing_ids == {"a", "b"}
+        writer.write([_case("c")])
+    assert [c.id for c in load_test_cases_from_yaml(str(path))] == ["a", "b", "c"]
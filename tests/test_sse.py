@@ -0,0 +1,28 @@
+"""SSE 解码器测试 / SSE decoder tests"""
+
+from agent_evo.adapters.sse import SSEDecoder
+
+
+def _decode(*chunks: bytes) -> list[tuple[str, str, str]]:
+    decoder = SSEDecoder()
+    events = [e for chunk in chunks for e in decoder.feed(chunk)] + decoder.flush()
+    return [(e.event, e.data, e.id) for e in events]
+
+
+def test_line_endings_and_split_chunks():
+    stream = b"\xef\xbb\xbfdata: a\r\n\r\ndata: b\r\rdata: c\n\n"
+    expected = [("message", "a", None), ("message", "b", None), ("message", "c", None)]
+    assert _decode(stream) == expected
+    # 逐字节输入，包括被拆开的 BOM 与 \r\n / Byte by byte, including a split BOM and \r\n
+    assert _decode(*(stream[i:i + 1] for i in range(len(stream)))) == expected
+
+
+def test_fields_comments_and_multiline_data():
+    stream = b": keep-alive\nevent: delta\nid: 7\nretry: 100\ndata: one\ndata:two\n\ndata: three\n\n"
+    assert _decode(stream) == [("delta", "one\ntwo", "7"), ("message", "three", "7")]
+
+
+def test_bare_json_lines_and_unterminated_event():
+    assert _decode(b'{"a": 1}\n{"b": 2}\ndata: tail') == [
+        ("message", '{"a": 1}', None), ("message", '{"b": 2}', None), ("message", "tail", None),
+    ]
@@ -0,0 +1,59 @@
+"""统计工具测试 / Statistics helper tests"""
+
+import pytest
+
+from agent_evo.utils.stats import mean_variance, pass_at_k, stratified_estimate, wilson_interval
+
+
+def test_pass_at_k():
+    assert pass_at_k(10, 0, 1) == 0.0
+    assert pass_at_k(10, 10, 3) == 1.0
+    assert pass_at_k(10, 5, 1) == pytest.approx(0.5)
+    assert pass_at_k(5, 1, 2) == pytest.approx(1 - 6 / 10)
+    assert pass_at_k(3, 1, 5) == 1.0   # k 超过 n 时按 n 计 / k is capped at n
+    assert pass_at_k(0, 0, 1) == 0.0
+
+
+def test_mean_variance():
+    assert mean_variance([]) == (0.0, 0.0)
+    assert mean_variance([0.5]) == (0.5, 0.0)
+    assert mean_variance([0.0, 1.0]) == (0.5, pytest.approx(0.5))
+
+
+def test_wilson_interval():
+    assert wilson_interval(0, 0) is None
+    low, high = wilson_interval(5, 10)
+    assert low == pytest.approx(0.2366, abs=1e-4)
+    assert high == pytest.approx(0.7634, abs=1e-4)
+    low, high = wilson_interval(10, 10)
+    assert high == 1.0 and 0.69 < low < 0.73
+
+
+def test_stratified_estimate_without_samples():
+    assert stratified_estimate([(10, 0, 0)]) is None
+
+
+def test_stratified_estimate_weights_by_population():
+    p, low, high = stratified_estimate([(90, 9, 9), (10, 1, 0)])
+    assert p == pytest.approx(0.9)
+    assert low < p < high
+
+
+def test_stratified_estimate_collapses_only_when_fully_sampled():
+    assert stratified_estimate([(3, 3, 2), (2, 2, 2)]) == (pytest.approx(0.8),) * 3
+
+
+def test_stratified_estimate_widens_for_unsampled_strata():
+    # 20 个单用例层只抽中 5 个且全部通过 / 20 single-case strata, 5 sampled, all passing
+    strata = [(1, 1, 1)] * 5 + [(1, 0, 0)] * 15
+    p, low, high = stratified_estimate(strata)
+    assert p == 1.0
+    assert low <= 0.25
+    assert high == 1.0
+    assert high - low >= 0.75
+
+
+def test_stratified_estimate_unsampled_share_bounds_interval():
+    p, low, high = stratified_estimate([(50, 50, 25), (50, 0, 0)])
+    assert p == pytest.approx(0.5)
+    assert (low, high) == (pytest.approx(0.25), pytest.approx(0.75))
@@ -0,0 +1,95 @@
+"""流式提前终止测试 / Streaming early stop tests"""
+
+import random
+
+import pytest
+
+from agent_evo.adapters.stream_guard import (
+    ForbiddenKeywordPredicate,
+    ForbiddenToolPredicate,
+    StreamGuard,
+)
+from agent_evo.core.factors import CoreJudgeFactor
+
+
+def _feed(guard: StreamGuard, chunks: list[str]):
+    for chunk in chunks:
+        reason = guard.feed(chunk)
+        if reason:
+            return reason
+    return None
+
+
+def test_keyword_spanning_chunks():
+    guard = StreamGuard([ForbiddenKeywordPredicate(["password"])])
+    assert _feed(guard, ["your pass", "word is"]) is not None
+    assert guard.dimension == "content"
+
+
+def test_tool_action_format_fires_once_complete():
+    guard = StreamGuard([ForbiddenToolPredicate(["delete_user"])])
+    assert guard.feed("Action: delete_user\n") is None
+    assert guard.feed('Action Input: {"id": 1}\n') is not None
+    assert guard.dimension == "behavior"
+
+
+def test_tool_xml_format():
+    guard = StreamGuard([ForbiddenToolPredicate(["delete_user"])])
+    assert _feed(guard, ['<tool_call>{"name": "del', 'ete_user", "arguments": {}}', "</tool_call>"]) is not None
+
+
+def test_tool_mentions_do_not_fire():
+    guard = StreamGuard([ForbiddenToolPredicate(["delete_user"])])
+    chunks = [
+        'I will not call delete_user. ',
+        'Config: {"name": "delete_user"}\n',
+        "Action: delete_user\nand nothing else",
+    ]
+    assert _feed(guard, chunks) is None
+
+
+def test_tool_after_xml_call_ignores_action_format():
+    # 评判在出现 <tool_call> 调用后不再识别 Action 格式 / The judge ignores the Action format once a <tool_call> call exists
+    guard = StreamGuard([ForbiddenToolPredicate(["delete_user"])])
+    chunks = ['<tool_call>{"name": "search"}</tool_call>\n', "Action: delete_user\n", 'Action Input: {"id": 1}\n']
+    assert _feed(guard, chunks) is None
+
+
+OUTPUTS = [
+    'Thought: clean up.\nAction: search\nAction Input: {"q": "x"}\nObservation: ok\n'
+    'Action: delete_user\nAction Input: {"id": 1}\nDone.',
+    'Thought: done.\nAction: Final Answer\nThe account delete_user job is queued.\n',
+    'Sure. <tool_call>{"name": "search", "arguments": {}}</tool_call> then '
+    '<tool_call>{"name": "delete_user", "arguments": {"id": 2}}</tool_call>',
+    'Use <tool_call> tags. <tool_call>not json</tool_call> <tool_call>{"tool": "delete_user"}</tool_call>',
+    "I will not call delete_user.\nAction: delete_user\nand nothing else",
+]
+
+
+def _first_hit_by_reparsing(chunks: list[str]):
+    """逐片重新解析完整输出（旧实现）得到的首次命中位置 / First hit when re-parsing the whole output on every chunk (old approach)"""
+    text = ""
+    for i, chunk in enumerate(chunks):
+        text += chunk
+        if "delete_user" in {call["name"] for call in CoreJudgeFactor._extract_tool_calls(text)}:
+            return i
+    return None
+
+
+@pytest.mark.parametrize("output", OUTPUTS)
+def test_incremental_parsing_matches_reparsing_whole_output(output):
+    rng = random.Random(0)
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(output)), rng.randint(1, 12)))
+        chunks = [output[a:b] for a, b in zip([0] + cuts, cuts + [len(output)])]
+        predicate = ForbiddenToolPredicate(["delete_user"])
+        hit = next((i for i, c in enumerate(chunks) if predicate.check(c, c)), None)
+        assert hit == _first_hit_by_reparsing(chunks)
+
+
+def test_buffer_stays_bounded_on_long_output():
+    predicate = ForbiddenToolPredicate(["delete_user"])
+    chunks = ['Action: search\nAction Input: {"q": 1}\n', "Action: Final Answer\n"] + ["lorem ipsum "] * 5000
+    for chunk in chunks:
+        assert predicate.check(chunk, chunk) is None
+        assert len(predicate._buffer) < 64
@@ -0,0 +1,61 @@
+"""抽样评测测试 / Sampled evaluation tests"""
+
+import pytest
+
+from agent_evo.core.subset import CaseSubset, sample_size
+from agent_evo.models import CaseResult, CaseStatus, EvalReport, TagPolicyConfig, TestCase
+
+
+def _cases(tags: list[str]) -> list[TestCase]:
+    return [TestCase(id=f"c{i}", name=f"case {i}", input="q", tags=[tag]) for i, tag in enumerate(tags)]
+
+
+def _report(cases: list[TestCase], passed: bool = True) -> EvalReport:
+    status = CaseStatus.PASSED if passed else CaseStatus.FAILED
+    return EvalReport(results=[
+        CaseResult(case_id=c.id, case_name=c.name, status=status, input="q", output="", expected={}, tags=c.tags)
+        for c in cases
+    ])
+
+
+def test_sample_size():
+    assert sample_size("5", 20) == 5
+    assert sample_size("50", 20) == 20
+    assert sample_size("10%", 20) == 2
+    assert sample_size("1%", 20) == 1
+    for spec in ("0", "-1", "0%", "150%", "abc"):
+        with pytest.raises(ValueError):
+            sample_size(spec, 20)
+
+
+def test_select_is_proportional_and_deterministic():
+    cases = _cases(["a"] * 60 + ["b"] * 30 + ["c"] * 10)
+    subset = CaseSubset.select(cases, "10", {}, seed=1)
+    counts = {tag: sum(tag in c.tags for c in subset.cases) for tag in "abc"}
+    assert counts == {"a": 6, "b": 3, "c": 1}
+    assert [c.id for c in CaseSubset.select(cases, "10", {}, seed=1).cases] == [c.id for c in subset.cases]
+    assert [c.id for c in subset.cases] == sorted((c.id for c in subset.cases), key=lambda i: int(i[1:]))
+
+
+def test_select_covers_required_tags():
+    cases = _cases(["a"] * 99 + ["critical"])
+    policies = {"critical": TagPolicyConfig(required_for_release=True)}
+    subset = CaseSubset.select(cases, "5", policies, seed=0)
+    assert any("critical" in c.tags for c in subset.cases)
+    assert len(subset.cases) == 6
+
+
+def test_summarize_does_not_collapse_interval_for_unsampled_strata():
+    cases = _cases([f"t{i}" for i in range(20)])
+    subset = CaseSubset.select(cases, "5", {}, seed=0)
+    estimate = subset.summarize(_report(subset.cases)).estimate
+    assert (estimate.population, estimate.sampled, estimate.pass_rate) == (20, 5, 1.0)
+    assert estimate.ci_high == 1.0
+    assert estimate.ci_low <= 0.25
+
+
+def test_summarize_full_sample_is_exact():
+    cases = _cases(["a", "a", "b", "b"])
+    subset = CaseSubset.select(cases, "100%", {}, seed=0)
+    estimate = subset.summarize(_report(subset.cases)).estimate
+    assert estimate.pass_rate == estimate.ci_low == estimate.ci_high == 1.0
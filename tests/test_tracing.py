@@ -0,0 +1,120 @@
+"""链路追踪测试 / Tracing tests"""
+
+import asyncio
+import json
+import threading
+
+from agent_evo.models.config import TracingConfig
+from agent_evo.utils import tracing
+
+
+def test_disabled_span_is_not_recording():
+    tracing.configure_tracing(TracingConfig(enabled=False))
+    with tracing.span("work") as s:
+        assert not s.is_recording()
+
+
+def test_aflush_exports_off_the_event_loop(tmp_path, monkeypatch):
+    tracer = tracing.configure_tracing(TracingConfig(enabled=True, exporter="json", path=str(tmp_path / "t.json")))
+    threads = []
+    export = tracer._export
+
+    def record_thread(spans):
+        threads.append(threading.current_thread())
+        return export(spans)
+
+    monkeypatch.setattr(tracer, "_export", record_thread)
+
+    async def main():
+        with tracing.span("work", n=1) as s:
+            assert s.is_recording()
+        return await tracing.aflush_tracing(), threading.current_thread()
+
+    try:
+        target, loop_thread = asyncio.run(main())
+    finally:
+        tracing.configure_tracing(TracingConfig(enabled=False))
+    assert threads and threads[0] is not loop_thread
+    assert [s["name"] for s in json.loads((tmp_path / "t.json").read_text())["spans"]] == ["work"]
+    assert target == str(tmp_path / "t.json")
+
+
+def test_new_tracer_replaces_previous_run_file(tmp_path):
+    path = tmp_path / "t.json"
+
+    def run(name):
+        tracer = tracing.configure_tracing(TracingConfig(enabled=True, exporter="json", path=str(path)))
+        try:
+            with tracing.span(f"{name}.1"):
+                pass
+            tracer.flush()
+            with tracing.span(f"{name}.2"):
+                pass
+            tracer.flush()
+        finally:
+            tracing.configure_tracing(TracingConfig(enabled=False))
+        return [s["name"] for s in json.loads(path.read_text())["spans"]]
+
+    assert run("first") == ["first.1", "first.2"]
+    assert run("second") == ["second.1", "second.2"]
+
+
+def test_otlp_export_payload_and_collector_error(monkeypatch):
+    import httpx
+    import pytest
+
+    requests = []
+    status = {"code": 200}
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(status["code"])
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(httpx, "post", lambda url, **kwargs: client.post(url, **kwargs))
+    tracer = tracing.configure_tracing(TracingConfig(
+        enabled=True, exporter="otlp", endpoint="http://collector:4318/", headers={"x-token": "t"},
+    ))
+    try:
+        with tracing.span("parent", tags=["a"]):
+            try:
+                with tracing.span("child", cases=2, ratio=0.5, ok=True, missing=None):
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+        assert tracer.flush() == "http://collector:4318/v1/traces"
+
+        request = requests[0]
+        assert request.headers["x-token"] == "t"
+        spans = json.loads(request.content)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        child, parent = spans
+        assert child["traceId"] == parent["traceId"] and len(child["traceId"]) == 32
+        assert child["parentSpanId"] == parent["spanId"] and "parentSpanId" not in parent
+        assert child["status"] == {"code": 2, "message": "ValueError: boom"}
+        assert parent["status"] == {"code": 1}
+        assert {a["key"]: a["value"] for a in child["attributes"]} == {
+            "cases": {"intValue": "2"}, "ratio": {"doubleValue": 0.5}, "ok": {"boolValue": True},
+        }
+        assert parent["attributes"] == [{"key": "tags", "value": {"arrayValue": {"values": [{"stringValue": "a"}]}}}]
+
+        # collector 出错时向调用方抛出 / A collector error is raised to the caller
+        status["code"] = 503
+        with tracing.span("again"):
+            pass
+        with pytest.raises(httpx.HTTPStatusError):
+            tracer.flush()
+    finally:
+        tracing.configure_tracing(TracingConfig(enabled=False))
+
+
+def test_pipeline_reports_export_failure_without_raising(monkeypatch):
+    from agent_evo.core import pipeline
+
+    async def failing():
+        raise OSError("collector down")
+
+    printed = []
+    monkeypatch.setattr(pipeline, "aflush_tracing", failing)
+    monkeypatch.setattr(pipeline.console, "print", printed.append)
+    asyncio.run(pipeline.Pipeline._flush_trace())
+    assert "collector down" in printed[0]